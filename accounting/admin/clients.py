@@ -61,6 +61,7 @@ class HasObligationsFilter(admin.SimpleListFilter):
             return queryset.filter(obligation_settings__is_active=False)
         return queryset
 from ..export_import import export_clients_to_excel, export_clients_summary_to_excel
+from ..services.document_counters import rebuild_document_counters
 from .mixins import VoIPCallInline, TicketInline, ClientProfileDocumentInline
 
 
@@ -646,6 +647,9 @@ class ClientDocumentAdmin(admin.ModelAdmin):
             doc.is_current = True
             doc.save(update_fields=['is_current'])
 
+        # Το update() παρακάμπτει τα signals των μετρητών φακέλων
+        rebuild_document_counters(client_ids=set(queryset.values_list('client_id', flat=True)))
+
         messages.success(request, f'✅ Ορίστηκαν {queryset.count()} ως τρέχουσες εκδόσεις')
 
     # === Override save_model for versioning ===
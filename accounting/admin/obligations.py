@@ -36,6 +36,7 @@ from ..forms import (
     ObligationProfileForm,
 )
 from .mixins import ClientDocumentInline
+from ..services.notification_feed import sync_obligation_notifications
 
 
 @admin.register(ObligationGroup)
@@ -539,20 +540,25 @@ class MonthlyObligationAdmin(admin.ModelAdmin):
 
     @admin.action(description='✓ Ολοκλήρωση επιλεγμένων')
     def mark_as_completed(self, request, queryset):
-        updated = queryset.filter(status__in=['pending', 'overdue']).update(
+        queryset = queryset.filter(status__in=['pending', 'overdue'])
+        obligation_ids = list(queryset.values_list('id', flat=True))
+        updated = queryset.update(
             status='completed',
             completed_date=timezone.now().date(),
             completed_by=request.user
         )
+        sync_obligation_notifications(obligation_ids)
         self.message_user(request, f'✅ Ολοκληρώθηκαν {updated} υποχρεώσεις!', messages.SUCCESS)
 
     @admin.action(description='↺ Επαναφορά σε εκκρεμεί')
     def mark_as_pending(self, request, queryset):
+        obligation_ids = list(queryset.values_list('id', flat=True))
         updated = queryset.update(
             status='pending',
             completed_date=None,
             completed_by=None
         )
+        sync_obligation_notifications(obligation_ids)
         self.message_user(request, f'↺ Επαναφέρθηκαν {updated} υποχρεώσεις!', messages.SUCCESS)
 
     @admin.action(description='📊 Export σε CSV')
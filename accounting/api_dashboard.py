@@ -15,6 +15,8 @@ from calendar import monthrange
 from collections import defaultdict
 
 from .models import ClientProfile, MonthlyObligation
+from .services.obligation_calendar import effective_status
+from .utils.stats_cache import get_cached_stats
 
 
 @api_view(['GET'])
@@ -29,8 +31,24 @@ def dashboard_stats(request):
     - total_obligations_completed_this_month
     - overdue_count
     - upcoming_deadlines (next 7 days)
+
+    Τα αποτελέσματα cacheάρονται για λίγο (CACHE_TTL_STATS) και ακυρώνονται
+    από τα signals των MonthlyObligation/ClientProfile.
+    """
+    today = timezone.localdate()
+    data = get_cached_stats(
+        'dashboard_stats', (today.isoformat(),),
+        lambda: _compute_dashboard_stats(today)
+    )
+    return Response(data)
+
+
+def _compute_dashboard_stats(today):
+    """
+    Τα stats του dashboard: ένα conditional aggregate για όλους τους μετρητές
+    υποχρεώσεων, ένα για τους πελάτες και από ένα για τις λίστες
+    (upcoming, top types).
     """
-    today = timezone.now().date()
     current_month = today.month
     current_year = today.year
     next_week = today + timedelta(days=7)
@@ -38,28 +56,29 @@ def dashboard_stats(request):
     # Active clients count
     total_clients = ClientProfile.objects.filter(is_active=True).count()
 
-    # Pending obligations
-    total_obligations_pending = MonthlyObligation.objects.filter(
-        status='pending'
-    ).count()
-
-    # Completed this month
-    total_obligations_completed_this_month = MonthlyObligation.objects.filter(
-        status='completed',
-        completed_date__year=current_year,
-        completed_date__month=current_month
-    ).count()
-
-    # Overdue count
-    overdue_count = MonthlyObligation.objects.filter(
-        Q(status='overdue') | Q(status='pending', deadline__lt=today)
-    ).count()
-
-    # Update overdue status for those that are pending but past deadline
-    MonthlyObligation.objects.filter(
-        status='pending',
-        deadline__lt=today
-    ).update(status='overdue')
+    # Όλοι οι μετρητές υποχρεώσεων σε ένα query. Χωρίς UPDATE: τα pending με
+    # παρελθούσα προθεσμία μετρούν ως overdue μέχρι να τα μεταφέρει το
+    # mark_overdue_obligations_task
+    status_aggregates = {
+        f'status_{value}': Count('id', filter=Q(current_status=value))
+        for value, _label in MonthlyObligation.STATUS_CHOICES
+    }
+    counters = MonthlyObligation.objects.annotate(
+        current_status=effective_status(today)
+    ).aggregate(
+        completed_this_month=Count('id', filter=Q(
+            status='completed',
+            completed_date__year=current_year,
+            completed_date__month=current_month
+        )),
+        overdue=Count('id', filter=Q(current_status='overdue')),
+        **status_aggregates
+    )
+    status_breakdown = {
+        value: counters[f'status_{value}']
+        for value, _label in MonthlyObligation.STATUS_CHOICES
+        if counters[f'status_{value}']
+    }
 
     # Upcoming deadlines (next 7 days)
     upcoming_obligations = MonthlyObligation.objects.filter(
@@ -81,12 +100,6 @@ def dashboard_stats(request):
         for obl in upcoming_obligations
     ]
 
-    # Additional stats
-    stats_by_status = MonthlyObligation.objects.values('status').annotate(
-        count=Count('id')
-    )
-    status_breakdown = {item['status']: item['count'] for item in stats_by_status}
-
     # Top obligation types this month
     top_types = MonthlyObligation.objects.filter(
         year=current_year,
@@ -95,11 +108,11 @@ def dashboard_stats(request):
         count=Count('id')
     ).order_by('-count')[:5]
 
-    return Response({
+    return {
         'total_clients': total_clients,
-        'total_obligations_pending': total_obligations_pending,
-        'total_obligations_completed_this_month': total_obligations_completed_this_month,
-        'overdue_count': overdue_count,
+        'total_obligations_pending': counters['status_pending'],
+        'total_obligations_completed_this_month': counters['completed_this_month'],
+        'overdue_count': counters['overdue'],
         'upcoming_deadlines': upcoming_deadlines,
         'upcoming_count': len(upcoming_deadlines),
         'status_breakdown': status_breakdown,
@@ -108,7 +121,7 @@ def dashboard_stats(request):
             'month': current_month,
             'year': current_year
         }
-    })
+    }
 
 
 @api_view(['GET'])
@@ -124,7 +137,7 @@ def dashboard_calendar(request):
 
     Returns: [{date, count, obligations: [{id, client_name, type}]}]
     """
-    today = timezone.now().date()
+    today = timezone.localdate()
 
     # Get parameters
     try:
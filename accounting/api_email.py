@@ -13,7 +13,7 @@ from django.db.models import Q
 
 from .models import (
     ClientProfile, MonthlyObligation, EmailTemplate, EmailLog, ClientDocument,
-    EmailSettings
+    EmailSettings, BulkCompletionJob
 )
 from .services.email_service import EmailService
 
@@ -161,6 +161,37 @@ class BulkCompleteNotifySerializer(serializers.Serializer):
     send_notifications = serializers.BooleanField(default=False)
 
 
+class BulkCompletionJobSerializer(serializers.ModelSerializer):
+    """Serializer for BulkCompletionJob (πρόοδος/αποτελέσματα)"""
+    job_id = serializers.IntegerField(source='id', read_only=True)
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    progress = serializers.IntegerField(read_only=True)
+    is_finished = serializers.BooleanField(read_only=True)
+    success = serializers.SerializerMethodField()
+    message = serializers.SerializerMethodField()
+
+    class Meta:
+        model = BulkCompletionJob
+        fields = [
+            'job_id', 'status', 'status_display', 'is_finished', 'success', 'message',
+            'progress', 'total', 'processed', 'completed_count',
+            'send_emails', 'results', 'email_results', 'error_message',
+            'created_at', 'started_at', 'finished_at',
+        ]
+
+    def get_success(self, obj):
+        return obj.status != 'failed'
+
+    def get_message(self, obj):
+        if obj.status == 'completed':
+            return f'{obj.completed_count} υποχρεώσεις ολοκληρώθηκαν.'
+        if obj.status == 'failed':
+            return f'Η μαζική ολοκλήρωση απέτυχε: {obj.error_message}'
+        if obj.status == 'running':
+            return 'Η μαζική ολοκλήρωση βρίσκεται σε εξέλιξη.'
+        return 'Η μαζική ολοκλήρωση προστέθηκε στην ουρά.'
+
+
 # ============================================
 # EMAIL TEMPLATE ENDPOINTS
 # ============================================
@@ -775,6 +806,10 @@ def bulk_complete_with_documents(request):
     POST /api/v1/obligations/bulk-complete-with-documents/
     Bulk complete obligations with individual documents for each obligation.
 
+    Το request μόνο αποθηκεύει προσωρινά τα αρχεία και επιστρέφει job id (202).
+    Η επεξεργασία γίνεται από το Celery task process_bulk_completion_job·
+    η πρόοδος από το GET /api/v1/obligations/bulk-complete-jobs/<job_id>/
+
     Body (multipart/form-data):
         obligation_ids: JSON array of obligation IDs
         file_{obligation_id}: File for specific obligation (optional)
@@ -783,9 +818,10 @@ def bulk_complete_with_documents(request):
         attach_to_emails: boolean (default: false)
         template_id: integer (optional) - Email template to use, otherwise auto-select
     """
-    from django.utils import timezone
     import json
-    import os
+    import logging
+    from django.urls import reverse
+    from .services.bulk_completion import stage_bulk_completion, run_bulk_completion_job
 
     # Parse obligation_ids from JSON
     obligation_ids_raw = request.data.get('obligation_ids', '[]')
@@ -806,6 +842,14 @@ def bulk_complete_with_documents(request):
             status=status.HTTP_400_BAD_REQUEST
         )
 
+    try:
+        obligation_ids = [int(obligation_id) for obligation_id in obligation_ids]
+    except (TypeError, ValueError):
+        return Response(
+            {'error': 'Μη έγκυρη μορφή obligation_ids.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
     # Parse boolean options
     save_to_folders = request.data.get('save_to_folders', 'true')
     if isinstance(save_to_folders, str):
@@ -835,151 +879,60 @@ def bulk_complete_with_documents(request):
         except EmailTemplate.DoesNotExist:
             pass  # Will fallback to auto-select
 
-    # Get obligations
-    obligations = MonthlyObligation.objects.filter(
+    if not MonthlyObligation.objects.filter(
         id__in=obligation_ids,
         status__in=['pending', 'overdue']
-    ).select_related('client', 'obligation_type')
-
-    if not obligations.exists():
+    ).exists():
         return Response(
             {'error': 'Δεν βρέθηκαν υποχρεώσεις προς ολοκλήρωση.'},
             status=status.HTTP_404_NOT_FOUND
         )
 
-    results = []
-    completed_count = 0
-    email_results = {
-        'sent': 0,
-        'failed': 0,
-        'skipped': 0,
-        'details': []
-    }
+    job = stage_bulk_completion(
+        user=request.user,
+        obligation_ids=obligation_ids,
+        files=request.FILES,
+        save_to_folders=save_to_folders,
+        send_emails=send_emails,
+        attach_to_emails=attach_to_emails,
+        template=override_template,
+    )
 
-    allowed_extensions = ['.pdf', '.doc', '.docx', '.xls', '.xlsx', '.jpg', '.jpeg', '.png']
+    try:
+        from .tasks import process_bulk_completion_job
+        process_bulk_completion_job.delay(job.id)
+    except Exception as e:
+        # Χωρίς broker: εκτέλεση συγχρονικά (όπως το EmailService.send_email)
+        logging.getLogger(__name__).warning(
+            f"Could not queue bulk completion job #{job.id}, running synchronously: {e}"
+        )
+        job = run_bulk_completion_job(job.id)
 
-    for obligation in obligations:
-        client = obligation.client
-        document = None
-        email_sent = False
-
-        # Check for file specific to this obligation
-        file_key = f'file_{obligation.id}'
-        uploaded_file = request.FILES.get(file_key)
-
-        if uploaded_file and save_to_folders:
-            # Validate file
-            ext = os.path.splitext(uploaded_file.name)[1].lower()
-            if ext in allowed_extensions and uploaded_file.size <= 10 * 1024 * 1024:
-                # Determine category
-                category = 'general'
-                if obligation.obligation_type:
-                    type_code = obligation.obligation_type.code.upper()
-                    if 'ΦΠΑ' in type_code:
-                        category = 'vat'
-                    elif 'ΜΥΦ' in type_code:
-                        category = 'myf'
-                    elif 'ΑΠΔ' in type_code:
-                        category = 'payroll'
-                    elif 'Ε1' in type_code or 'Ε3' in type_code:
-                        category = 'tax'
-
-                document = ClientDocument.objects.create(
-                    client=client,
-                    obligation=obligation,
-                    file=uploaded_file,
-                    document_category=category,
-                    description=f'Υποχρέωση {obligation.obligation_type.name} {obligation.month:02d}/{obligation.year}'
-                )
-
-        # Mark obligation as completed
-        obligation.status = 'completed'
-        obligation.completed_date = timezone.now().date()
-        obligation.completed_by = request.user
-        obligation.save()
-        completed_count += 1
+    data = BulkCompletionJobSerializer(job).data
+    data['status_url'] = reverse('accounting:api_v1_bulk_complete_job_status', args=[job.id])
+    return Response(data, status=status.HTTP_202_ACCEPTED)
 
-        # Send email if requested
-        if send_emails:
-            if not client.email:
-                email_results['skipped'] += 1
-                email_results['details'].append({
-                    'obligation_id': obligation.id,
-                    'client': client.eponimia,
-                    'status': 'skipped',
-                    'message': 'Ο πελάτης δεν έχει email'
-                })
-            else:
-                # Use override template if specified, otherwise auto-select
-                template = override_template or EmailTemplate.get_template_for_obligation(obligation)
-                if template:
-                    # Collect attachments only if attach_to_emails is true
-                    attachments = []
-                    if attach_to_emails and document and document.file:
-                        attachments.append(document.file)
-
-                    # Render and send
-                    subject, body = EmailService.render_template(
-                        template=template,
-                        obligation=obligation,
-                        user=request.user
-                    )
-
-                    success, result = EmailService.send_email(
-                        recipient_email=client.email,
-                        subject=subject,
-                        body=body,
-                        client=client,
-                        obligation=obligation,
-                        template=template,
-                        user=request.user,
-                        attachments=attachments
-                    )
-
-                    if success:
-                        email_results['sent'] += 1
-                        email_sent = True
-                        email_results['details'].append({
-                            'obligation_id': obligation.id,
-                            'client': client.eponimia,
-                            'status': 'sent',
-                            'message': f'Στάλθηκε στο {client.email}'
-                        })
-                    else:
-                        email_results['failed'] += 1
-                        email_results['details'].append({
-                            'obligation_id': obligation.id,
-                            'client': client.eponimia,
-                            'status': 'failed',
-                            'message': str(result)
-                        })
-                else:
-                    email_results['failed'] += 1
-                    email_results['details'].append({
-                        'obligation_id': obligation.id,
-                        'client': client.eponimia,
-                        'status': 'failed',
-                        'message': 'Δεν βρέθηκε πρότυπο email'
-                    })
-
-        results.append({
-            'obligation_id': obligation.id,
-            'client': client.eponimia,
-            'document_id': document.id if document else None,
-            'email_sent': email_sent
-        })
 
-    response_data = {
-        'success': True,
-        'message': f'{completed_count} υποχρεώσεις ολοκληρώθηκαν.',
-        'completed_count': completed_count,
-        'results': results,
-    }
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def bulk_complete_job_status(request, job_id):
+    """
+    GET /api/v1/obligations/bulk-complete-jobs/<job_id>/
+    Πρόοδος/αποτελέσματα μιας εργασίας μαζικής ολοκλήρωσης (polling από το frontend).
+    """
+    jobs = BulkCompletionJob.objects.all()
+    if not request.user.is_staff:
+        jobs = jobs.filter(created_by=request.user)
 
-    if send_emails:
-        response_data['email_results'] = email_results
+    try:
+        job = jobs.get(id=job_id)
+    except BulkCompletionJob.DoesNotExist:
+        return Response(
+            {'error': 'Η εργασία δεν βρέθηκε.'},
+            status=status.HTTP_404_NOT_FOUND
+        )
 
-    return Response(response_data)
+    return Response(BulkCompletionJobSerializer(job).data)
 
 
 # ============================================
@@ -5,6 +5,7 @@ Export/Import API for LogistikoCRM
 Handles Excel export and import for clients matching the admin template.
 """
 import io
+import logging
 import os
 import tempfile
 from datetime import datetime
@@ -12,13 +13,21 @@ from datetime import datetime
 from django.http import HttpResponse
 from django.db import transaction
 from django.core.management import call_command
-from rest_framework import status
+from django.urls import reverse
+from rest_framework import serializers, status
 from rest_framework.decorators import api_view, permission_classes, parser_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
 
-from .models import ClientProfile, ObligationType, ObligationProfile, ClientObligation
+from common.utils.streaming_export import csv_response
+
+from .models import ClientProfile, ClientImportJob, ObligationType, ObligationProfile, ClientObligation
+from .services.client_import import (
+    ClientImportError, run_client_import_job, stage_client_import
+)
+
+logger = logging.getLogger(__name__)
 
 try:
     import openpyxl
@@ -203,6 +212,49 @@ def export_clients_csv(request):
 # CLIENT IMPORT FROM EXCEL
 # ==============================================================================
 
+class ClientImportJobSerializer(serializers.ModelSerializer):
+    """Serializer for ClientImportJob (πρόοδος/αναφορά γραμμών)"""
+    job_id = serializers.IntegerField(source='id', read_only=True)
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    progress = serializers.IntegerField(read_only=True)
+    is_finished = serializers.BooleanField(read_only=True)
+    success = serializers.SerializerMethodField()
+    message = serializers.SerializerMethodField()
+    errors = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ClientImportJob
+        fields = [
+            'job_id', 'status', 'status_display', 'is_finished', 'success', 'message',
+            'mode', 'original_filename', 'progress', 'total_rows', 'processed',
+            'created_count', 'updated_count', 'skipped_count', 'error_count',
+            'errors', 'report', 'error_message',
+            'created_at', 'started_at', 'finished_at',
+        ]
+
+    def get_success(self, obj):
+        return obj.status != 'failed'
+
+    def get_message(self, obj):
+        if obj.status == 'completed':
+            return (
+                f'Δημιουργήθηκαν {obj.created_count} πελάτες. Ενημερώθηκαν {obj.updated_count}. '
+                f'Παραλείφθηκαν {obj.skipped_count}. Σφάλματα: {obj.error_count}.'
+            )
+        if obj.status == 'failed':
+            return f'Η εισαγωγή απέτυχε: {obj.error_message}'
+        if obj.status == 'running':
+            return 'Η εισαγωγή βρίσκεται σε εξέλιξη.'
+        return 'Η εισαγωγή προστέθηκε στην ουρά.'
+
+    def get_errors(self, obj):
+        """Τα πρώτα 20 σφάλματα ως κείμενο (η πλήρης αναφορά στο report)."""
+        return [
+            f"Γραμμή {entry['row']}: {'; '.join(entry['messages'])}"
+            for entry in obj.report if entry['level'] == 'error'
+        ][:20]
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 @parser_classes([MultiPartParser, FormParser])
@@ -210,6 +262,14 @@ def import_clients_csv(request):
     """
     POST /api/v1/import/clients/csv/
     Import clients from Excel file (same format as template).
+
+    Το request μόνο αποθηκεύει προσωρινά το αρχείο και επιστρέφει job id (202).
+    Η εισαγωγή γίνεται από το Celery task process_client_import_job·
+    η πρόοδος και η αναφορά ανά γραμμή από το GET /api/v1/import/clients/jobs/<job_id>/
+
+    Body (multipart/form-data):
+        file: Excel (.xlsx)
+        mode: 'skip' (default) ή 'update'
     """
     if not HAS_OPENPYXL:
         return Response(
@@ -224,7 +284,7 @@ def import_clients_csv(request):
         )
 
     excel_file = request.FILES['file']
-    mode = request.data.get('mode', 'skip')  # 'skip' or 'update'
+    mode = 'update' if request.data.get('mode') == 'update' else 'skip'
 
     # Check file extension
     if not excel_file.name.endswith(('.xlsx', '.xls')):
@@ -234,218 +294,56 @@ def import_clients_csv(request):
         )
 
     try:
-        # Read Excel file
-        wb = openpyxl.load_workbook(excel_file)
-        ws = wb.active
-
-        # Field mapping - Greek headers to model fields
-        field_mapping = {
-            'Α.Φ.Μ.': 'afm',
-            'Δ.Ο.Υ.': 'doy',
-            'Επωνυμία/Επώνυμο': 'eponimia',
-            'Όνομα': 'onoma',
-            'Όνομα Πατρός': 'onoma_patros',
-            'Αριθμός Ταυτότητας': 'arithmos_taftotitas',
-            'Είδος Ταυτότητας': 'eidos_taftotitas',
-            'Προσωπικός Αριθμός': 'prosopikos_arithmos',
-            'Α.Μ.Κ.Α.': 'amka',
-            'Α.Μ. Ι.Κ.Α.': 'am_ika',
-            'Αριθμός Γ.Ε.ΜΗ.': 'arithmos_gemi',
-            'Αριθμός Δ.ΥΠ.Α': 'arithmos_dypa',
-            'Φύλο': 'filo',
-            'Διεύθυνση Κατοικίας': 'diefthinsi_katoikias',
-            'Αριθμός': 'arithmos_katoikias',
-            'Πόλη Κατοικίας': 'poli_katoikias',
-            'Δήμος Κατοικίας': 'dimos_katoikias',
-            'Νομός Κατοικίας': 'nomos_katoikias',
-            'T.K. Κατοικίας': 'tk_katoikias',
-            'Τηλέφωνο Οικίας 1': 'tilefono_oikias_1',
-            'Τηλέφωνο Οικίας 2': 'tilefono_oikias_2',
-            'Κινητό τηλέφωνο': 'kinito_tilefono',
-            'Διεύθυνση Επιχείρησης': 'diefthinsi_epixeirisis',
-            'Αριθμός Επιχείρησης': 'arithmos_epixeirisis',
-            'Πόλη Επιχείρησης': 'poli_epixeirisis',
-            'Δήμος Επιχείρησης': 'dimos_epixeirisis',
-            'Νομός Επιχείρησης': 'nomos_epixeirisis',
-            'Τ.Κ. Επιχείρησης': 'tk_epixeirisis',
-            'Τηλέφωνο Επιχείρησης 1': 'tilefono_epixeirisis_1',
-            'Τηλέφωνο Επιχείρησης 2': 'tilefono_epixeirisis_2',
-            'Email': 'email',
-            'Τράπεζα': 'trapeza',
-            'IBAN': 'iban',
-            'Είδος Υπόχρεου': 'eidos_ipoxreou',
-            'Κατηγορία Βιβλίων': 'katigoria_vivlion',
-            'Νομική Μορφή': 'nomiki_morfi',
-            'Αγρότης': 'agrotis',
-            'Όνομα Χρήστη Taxis Net': 'onoma_xristi_taxisnet',
-            'Κωδικός Taxis Net': 'kodikos_taxisnet',
-            'Όνομα Χρήστη Ι.Κ.Α. Εργοδότη': 'onoma_xristi_ika_ergodoti',
-            'Κωδικός Ι.Κ.Α. Εργοδότη': 'kodikos_ika_ergodoti',
-            'Όνομα Χρήστη Γ.Ε.ΜΗ.': 'onoma_xristi_gemi',
-            'Κωδικός Γ.Ε.ΜΗ.': 'kodikos_gemi',
-            'Α.Φ.Μ Συζύγου/Μ.Σ.Σ.': 'afm_sizigou',
-            'Α.Φ.Μ. Φορέας': 'afm_foreas',
-            'ΑΜ ΚΛΕΙΔΙ': 'am_klidi',
-        }
-
-        # Read headers from row 1
-        headers = {}
-        for col_idx, cell in enumerate(ws[1], start=1):
-            header_name = str(cell.value).strip() if cell.value else None
-            if header_name and header_name in field_mapping:
-                headers[col_idx] = field_mapping[header_name]
-
-        if not headers:
-            return Response(
-                {'error': 'Δεν βρέθηκαν έγκυρα headers. Χρησιμοποιήστε το template.'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        created_count = 0
-        updated_count = 0
-        skipped_count = 0
-        errors = []
+        job = stage_client_import(request.user, excel_file, mode)
+    except ClientImportError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Determine start row (skip example rows with AFM starting with 123456)
-        start_row = 2
-        first_afm_cell = ws.cell(2, 1).value
-        if first_afm_cell and str(first_afm_cell).startswith('123456'):
-            start_row = 3
-
-        with transaction.atomic():
-            for row_num in range(start_row, ws.max_row + 1):
-                # Parse row
-                row_data = {}
-                has_data = False
-
-                for col_idx, field_name in headers.items():
-                    value = ws.cell(row_num, col_idx).value
-                    if value is not None and str(value).strip():
-                        has_data = True
-
-                    # Clean and convert value
-                    value = clean_value(value, field_name)
-                    if value is not None:
-                        row_data[field_name] = value
-
-                if not has_data:
-                    continue
-
-                # Validate required fields
-                afm = row_data.get('afm', '').strip()
-                eponimia = row_data.get('eponimia', '').strip()
-
-                if not afm:
-                    errors.append(f'Γραμμή {row_num}: Λείπει το ΑΦΜ')
-                    continue
+    try:
+        from .tasks import process_client_import_job
+        process_client_import_job.delay(job.id)
+    except Exception as e:
+        # Χωρίς broker: εκτέλεση συγχρονικά (όπως το bulk complete)
+        logger.warning(f"Could not queue client import job #{job.id}, running synchronously: {e}")
+        job = run_client_import_job(job.id)
 
-                if len(afm) != 9 or not afm.isdigit():
-                    errors.append(f'Γραμμή {row_num}: Μη έγκυρο ΑΦΜ "{afm}"')
-                    continue
+    data = ClientImportJobSerializer(job).data
+    data['status_url'] = reverse('accounting:api_import_clients_job_status', args=[job.id])
+    return Response(data, status=status.HTTP_202_ACCEPTED)
 
-                if not eponimia:
-                    errors.append(f'Γραμμή {row_num}: Λείπει η επωνυμία')
-                    continue
 
-                # Default eidos_ipoxreou if not provided
-                if 'eidos_ipoxreou' not in row_data or not row_data['eidos_ipoxreou']:
-                    row_data['eidos_ipoxreou'] = 'professional'
-
-                # Check if client exists
-                existing = ClientProfile.objects.filter(afm=afm).first()
-
-                if existing:
-                    if mode == 'update':
-                        # Update existing client
-                        for field, value in row_data.items():
-                            if field != 'afm' and value:
-                                setattr(existing, field, value)
-                        existing.save()
-                        updated_count += 1
-                    else:
-                        skipped_count += 1
-                else:
-                    # Create new client
-                    row_data['is_active'] = True
-                    ClientProfile.objects.create(**row_data)
-                    created_count += 1
-
-        return Response({
-            'success': True,
-            'created_count': created_count,
-            'updated_count': updated_count,
-            'skipped_count': skipped_count,
-            'errors': errors[:20],
-            'message': f'Δημιουργήθηκαν {created_count} πελάτες. Ενημερώθηκαν {updated_count}. Παραλείφθηκαν {skipped_count}.'
-        })
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def import_clients_job_status(request, job_id):
+    """
+    GET /api/v1/import/clients/jobs/<job_id>/
+    Πρόοδος/αναφορά μιας εισαγωγής πελατών (polling από το frontend).
+    ?export_format=csv: λήψη της αναφοράς γραμμών ως CSV.
+    """
+    jobs = ClientImportJob.objects.all()
+    if not request.user.is_staff:
+        jobs = jobs.filter(created_by=request.user)
 
-    except Exception as e:
+    try:
+        job = jobs.get(id=job_id)
+    except ClientImportJob.DoesNotExist:
         return Response(
-            {'error': f'Σφάλμα κατά την ανάγνωση του αρχείου: {str(e)}'},
-            status=status.HTTP_400_BAD_REQUEST
+            {'error': 'Η εργασία δεν βρέθηκε.'},
+            status=status.HTTP_404_NOT_FOUND
         )
 
+    if request.query_params.get('export_format') == 'csv':
+        rows = (
+            [entry['row'], entry['afm'], 'Σφάλμα' if entry['level'] == 'error' else 'Προειδοποίηση',
+             '; '.join(entry['messages'])]
+            for entry in job.report
+        )
+        return csv_response(
+            f'Import_Pelaton_{job.id}_anafora.csv',
+            ['Γραμμή', 'Α.Φ.Μ.', 'Επίπεδο', 'Μηνύματα'],
+            rows
+        )
 
-def clean_value(value, field_name):
-    """Clean and convert values based on field type."""
-    if value is None:
-        return None
-
-    # String cleaning
-    if isinstance(value, str):
-        value = value.strip()
-        if value == '' or value.upper() in ['ΚΕΝΟ', 'EMPTY', '-', 'N/A']:
-            return None
-
-    # Είδος Υπόχρεου mapping
-    if field_name == 'eidos_ipoxreou':
-        mapping = {
-            'ΙΔΙΩΤΗΣ': 'individual',
-            'ΕΠΑΓΓΕΛΜΑΤΙΑΣ': 'professional',
-            'ΕΤΑΙΡΕΙΑ': 'company',
-            'INDIVIDUAL': 'individual',
-            'PROFESSIONAL': 'professional',
-            'COMPANY': 'company',
-        }
-        value_upper = str(value).strip().upper()
-        return mapping.get(value_upper, 'professional')
-
-    # Κατηγορία Βιβλίων mapping
-    if field_name == 'katigoria_vivlion':
-        mapping = {
-            'Α': 'A',
-            'Β': 'B',
-            'Γ': 'C',
-            'ΧΩΡΙΣ': 'none',
-            'A': 'A',
-            'B': 'B',
-            'C': 'C',
-            'NONE': 'none',
-        }
-        if value:
-            value_clean = str(value).strip().upper()
-            return mapping.get(value_clean, '')
-        return ''
-
-    # Boolean fields
-    if field_name == 'agrotis':
-        if isinstance(value, bool):
-            return value
-        value_upper = str(value).upper()
-        return value_upper in ['ΝΑΙ', 'NAI', 'YES', 'TRUE', '1', 'Ν']
-
-    # Φύλο mapping
-    if field_name == 'filo':
-        if value:
-            value_upper = str(value).upper()
-            if value_upper in ['Μ', 'M', 'ΑΝΔΡΑΣ', 'MALE', 'MAN']:
-                return 'M'
-            elif value_upper in ['Γ', 'F', 'ΓΥΝΑΙΚΑ', 'FEMALE', 'WOMAN']:
-                return 'F'
-        return ''
-
-    # Default: string
-    return str(value) if value else ''
+    return Response(ClientImportJobSerializer(job).data)
 
 
 # ==============================================================================
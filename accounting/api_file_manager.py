@@ -40,7 +40,7 @@ Endpoints:
   Dashboard/Stats:
     - GET /api/v1/file-manager/stats/                  - File statistics
     - GET /api/v1/file-manager/recent/                 - Recent documents
-    - GET /api/v1/file-manager/browse/                 - Browse folder structure
+    - GET /api/v1/file-manager/browse/                 - Browse folder structure (ETag)
 """
 
 from rest_framework import viewsets, status, filters, serializers
@@ -51,11 +51,13 @@ from rest_framework.pagination import PageNumberPagination
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend, FilterSet, NumberFilter, CharFilter, BooleanFilter
-from django.db.models import Q, Count, Sum
+from django.db.models import Q
 from django.db.models.functions import TruncMonth
 from django.http import FileResponse, Http404
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from datetime import timedelta
 import os
 import mimetypes
@@ -65,6 +67,8 @@ from .models import (
     DocumentTag, DocumentTagAssignment, SharedLink, SharedLinkAccess,
     DocumentFavorite, DocumentCollection, get_client_folder
 )
+from .services.document_counters import document_totals, folder_tree, get_documents_version
+from .services.file_index import storage_summary
 
 
 # ============================================
@@ -933,22 +937,15 @@ class FileManagerStatsView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        # Total documents
-        total_docs = ClientDocument.objects.filter(is_current=True).count()
+        # Σύνολα, ανά κατηγορία και ανά τύπο από τους DocumentFolderCounter
+        totals = document_totals()
 
-        # Size stats
-        total_size = ClientDocument.objects.filter(is_current=True).aggregate(
-            total=Sum('file_size'))['total'] or 0
-
-        # By category
-        by_category = ClientDocument.objects.filter(is_current=True).values(
-            'document_category'
-        ).annotate(count=Count('id')).order_by('-count')
-
-        # By file type
-        by_type = ClientDocument.objects.filter(is_current=True).values(
-            'file_type'
-        ).annotate(count=Count('id')).order_by('-count')[:10]
+        # Χώρος στον δίσκο από το ευρετήριο αρχείων (refresh_file_index),
+        # με fallback στα μεγέθη της βάσης αν δεν έχει γίνει ακόμα σάρωση
+        storage = storage_summary()
+        total_size = storage['size'] if storage['indexed_at'] else totals['total_size']
+        storage['size_display'] = self._format_size(storage['size'])
+        storage['orphan_size_display'] = self._format_size(storage['orphan_size'])
 
         # Recent uploads (last 7 days)
         week_ago = timezone.now() - timedelta(days=7)
@@ -967,15 +964,16 @@ class FileManagerStatsView(APIView):
         collections_count = DocumentCollection.objects.filter(owner=request.user).count()
 
         return Response({
-            'total_documents': total_docs,
+            'total_documents': totals['total_documents'],
             'total_size': total_size,
             'total_size_display': self._format_size(total_size),
             'recent_uploads_count': recent_count,
             'active_shared_links': active_links,
             'favorites_count': favorites_count,
             'collections_count': collections_count,
-            'by_category': list(by_category),
-            'by_file_type': list(by_type)
+            'by_category': totals['by_category'],
+            'by_file_type': totals['by_file_type'],
+            'storage': storage,
         })
 
     def _format_size(self, size):
@@ -1001,32 +999,42 @@ class RecentDocumentsView(APIView):
         return Response(serializer.data)
 
 
+def _browse_etag(request, *args, **kwargs):
+    """ETag των επιπέδων πελάτες/έτη/μήνες: έκδοση μετρητών + παράμετροι."""
+    params = request.GET
+    if params.get('month'):
+        # Η λίστα εγγράφων δεν βγαίνει από τους μετρητές
+        return None
+    version = get_documents_version()
+    if version is None:
+        return None
+    return f"browse-{version}-{params.get('client_id', '')}-{params.get('year', '')}"
+
+
+@method_decorator(condition(etag_func=_browse_etag), name='get')
 class BrowseFoldersView(APIView):
-    """Browse folder structure"""
+    """
+    Browse folder structure.
+
+    Πελάτες, έτη και μήνες διαβάζονται από τους DocumentFolderCounter
+    (cached, με ETag / If-None-Match -> 304).
+    """
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        # Get distinct clients with documents
-        clients_with_docs = ClientProfile.objects.filter(
-            documents__isnull=False
-        ).distinct().annotate(
-            doc_count=Count('documents', filter=Q(documents__is_current=True))
-        ).order_by('eponimia')
-
         client_id = request.query_params.get('client_id')
         year = request.query_params.get('year')
         month = request.query_params.get('month')
 
         if client_id:
-            # Get years for specific client
-            client = get_object_or_404(ClientProfile, id=client_id)
-            docs = ClientDocument.objects.filter(client=client, is_current=True)
+            client = get_object_or_404(ClientProfile.objects.only('id', 'eponimia'), id=client_id)
 
             if year:
-                docs = docs.filter(year=int(year))
                 if month:
                     # Get documents for specific month
-                    docs = docs.filter(month=int(month))
+                    docs = ClientDocument.objects.filter(
+                        client=client, is_current=True, year=int(year), month=int(month)
+                    )
                     serializer = DocumentListSerializer(docs, many=True, context={'request': request})
                     return Response({
                         'type': 'documents',
@@ -1037,33 +1045,22 @@ class BrowseFoldersView(APIView):
                     })
                 else:
                     # Get months for year
-                    months = docs.values('month').annotate(
-                        count=Count('id')
-                    ).order_by('month')
                     return Response({
                         'type': 'months',
                         'client': {'id': client.id, 'eponimia': client.eponimia},
                         'year': year,
-                        'months': list(months)
+                        'months': folder_tree(client.id, int(year))
                     })
             else:
                 # Get years
-                years = docs.values('year').annotate(
-                    count=Count('id')
-                ).order_by('-year')
                 return Response({
                     'type': 'years',
                     'client': {'id': client.id, 'eponimia': client.eponimia},
-                    'years': list(years)
+                    'years': folder_tree(client.id)
                 })
 
         # Return client list
         return Response({
             'type': 'clients',
-            'clients': [{
-                'id': c.id,
-                'eponimia': c.eponimia,
-                'afm': c.afm,
-                'document_count': c.doc_count
-            } for c in clients_with_docs]
+            'clients': folder_tree()
         })
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+accounting/api_live.py
+Live feed κλήσεων/tickets για το React dashboard - JWT authenticated.
+
+Endpoints:
+    - GET /api/v1/live/events/  - Events μετά το ?since=, ETag -> 304 (προεπιλογή)
+    - GET /api/v1/live/feed/    - Server-Sent Events (Last-Event-ID / ?since=),
+                                  μόνο με LIVE_FEED_SSE_ENABLED
+"""
+
+from django.conf import settings
+from django.http import HttpResponseNotModified, StreamingHttpResponse
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.response import Response
+
+from .services.live_feed import current_seq, event_stream, events_since, format_sse
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Επιτρέπει `Accept: text/event-stream`· τα σφάλματα (π.χ. 401) γίνονται event 'error'."""
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return format_sse(0, 'error', data).encode(self.charset)
+
+
+def _since(request, default):
+    value = request.headers.get('Last-Event-ID') or request.query_params.get('since')
+    try:
+        return max(0, int(value))
+    except (TypeError, ValueError):
+        return default
+
+
+def live_etag(seq):
+    return f'"live-{seq}"'
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@renderer_classes([EventStreamRenderer, JSONRenderer])
+def live_feed(request):
+    """
+    Server-Sent Events με τα deltas κλήσεων/tickets.
+    GET /api/v1/live/feed/
+
+    Events: hello, call, ticket, reset (ξαναφόρτωσε τις λίστες).
+    Χωρίς Last-Event-ID/?since= ξεκινά από το τρέχον seq.
+
+    Κάθε stream δεσμεύει έναν worker· με sync gunicorn workers μένει
+    απενεργοποιημένο (404) και ο browser κάνει polling στο /live/events/.
+    """
+    if not getattr(settings, 'LIVE_FEED_SSE_ENABLED', False):
+        return Response({'detail': 'Live stream is disabled, use /api/v1/live/events/'}, status=404)
+
+    response = StreamingHttpResponse(
+        event_stream(_since(request, current_seq())), content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx: χωρίς buffering
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def live_events(request):
+    """
+    Conditional GET στο seq του feed (προεπιλεγμένο transport του dashboard).
+    GET /api/v1/live/events/?since=<seq>
+
+    If-None-Match ίδιο με το τρέχον ETag -> 304 χωρίς σώμα.
+
+    Returns:
+        {"seq": 42, "events": [...], "reset": false}
+    """
+    seq = current_seq()
+    etag = live_etag(seq)
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    since = _since(request, seq)
+    last, events, reset = events_since(since)
+    response = Response({'seq': last, 'events': events, 'reset': reset})
+    response['ETag'] = live_etag(last)
+    return response
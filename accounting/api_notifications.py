@@ -2,94 +2,65 @@
 """
 accounting/api_notifications.py
 REST API endpoint for notifications - JWT authenticated for React frontend.
+
+Οι ειδοποιήσεις διαβάζονται από το ObligationNotification (βλ.
+accounting/services/notification_feed.py), όχι από τις υποχρεώσεις.
 """
 
+from django.http import HttpResponseNotModified
+from django.utils import timezone
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from django.utils import timezone
-from datetime import timedelta
 
-from .models import MonthlyObligation
+from .services.notification_feed import (
+    feed_cursors, feed_etag, feed_version, mark_notifications_read, notification_counts,
+    notification_feed,
+)
 
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def _cursor(value):
+    try:
+        return max(0, int(value))
+    except (TypeError, ValueError):
+        return None
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def notifications_list(request):
     """
     Get user notifications for dashboard.
-    GET /api/v1/notifications/
+    GET /api/v1/notifications/?since=<cursor>&read_since=<read_cursor>
 
     Returns notifications for:
     - Overdue obligations
     - Due today
     - Upcoming (next 3 days)
+
+    Χωρίς ?since= επιστρέφει snapshot, αλλιώς μόνο τις αλλαγές (οι
+    ειδοποιήσεις με is_active=false αφαιρούνται). If-None-Match ίδιο με το
+    τρέχον ETag -> 304 χωρίς σώμα.
     """
-    now = timezone.now()
-    notifications = []
+    today = timezone.localdate()
+    version = feed_version()
+    etag = feed_etag(*feed_cursors(request.user), today, version)
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
 
     try:
-        # Overdue obligations
-        overdue = MonthlyObligation.objects.filter(
-            deadline__lt=now.date(),
-            status__in=['pending', 'overdue']
-        ).select_related('client', 'obligation_type').order_by('deadline')[:10]
-
-        for obl in overdue:
-            days_overdue = (now.date() - obl.deadline).days
-            notifications.append({
-                'id': obl.id,
-                'type': 'overdue',
-                'priority': 'high',
-                'title': f'Καθυστερημένη: {obl.obligation_type.name if obl.obligation_type else "Υποχρέωση"}',
-                'message': f'{obl.client.eponimia if obl.client else "Πελάτης"} - {days_overdue} μέρες καθυστέρηση',
-                'deadline': obl.deadline.isoformat() if obl.deadline else None,
-                'client_id': obl.client.id if obl.client else None,
-                'icon': 'overdue',
-            })
-
-        # Due today
-        today_obligations = MonthlyObligation.objects.filter(
-            deadline=now.date(),
-            status='pending'
-        ).select_related('client', 'obligation_type')
-
-        for obl in today_obligations:
-            notifications.append({
-                'id': obl.id,
-                'type': 'due_today',
-                'priority': 'medium',
-                'title': f'Λήγει Σήμερα: {obl.obligation_type.name if obl.obligation_type else "Υποχρέωση"}',
-                'message': f'{obl.client.eponimia if obl.client else "Πελάτης"}',
-                'deadline': obl.deadline.isoformat() if obl.deadline else None,
-                'client_id': obl.client.id if obl.client else None,
-                'icon': 'warning',
-            })
-
-        # Upcoming (next 3 days)
-        next_3_days = now.date() + timedelta(days=3)
-        upcoming = MonthlyObligation.objects.filter(
-            deadline__range=[now.date() + timedelta(days=1), next_3_days],
-            status='pending'
-        ).select_related('client', 'obligation_type').order_by('deadline')[:5]
-
-        for obl in upcoming:
-            days_until = (obl.deadline - now.date()).days
-            notifications.append({
-                'id': obl.id,
-                'type': 'upcoming',
-                'priority': 'low',
-                'title': f'Προσεχώς: {obl.obligation_type.name if obl.obligation_type else "Υποχρέωση"}',
-                'message': f'{obl.client.eponimia if obl.client else "Πελάτης"} - σε {days_until} μέρες',
-                'deadline': obl.deadline.isoformat() if obl.deadline else None,
-                'client_id': obl.client.id if obl.client else None,
-                'icon': 'calendar',
-            })
-
+        data = notification_feed(
+            request.user,
+            since=_cursor(request.query_params.get('since')),
+            read_since=_cursor(request.query_params.get('read_since')),
+            today=today,
+        )
     except Exception as e:
         logger.error(f"Error fetching notifications: {e}")
         # Return empty list on error instead of failing
@@ -98,12 +69,35 @@ def notifications_list(request):
             'count': 0,
             'overdue_count': 0,
             'today_count': 0,
+            'unread_count': 0,
             'error': str(e)
         })
 
+    response = Response(data)
+    response['ETag'] = feed_etag(data['cursor'], data['read_cursor'], today, version)
+    return response
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def notifications_mark_read(request):
+    """
+    Σήμανση ειδοποιήσεων ως διαβασμένων.
+    POST /api/v1/notifications/read/
+
+    Body: {"ids": [1, 2, 3]} (IDs υποχρεώσεων) ή {"all": true}
+    """
+    if request.data.get('all'):
+        marked = mark_notifications_read(request.user)
+    else:
+        ids = request.data.get('ids')
+        if not isinstance(ids, list) or not ids:
+            return Response({'error': 'Δεν δόθηκαν IDs ειδοποιήσεων.'}, status=400)
+        marked = mark_notifications_read(
+            request.user, [value for value in map(_cursor, ids) if value is not None]
+        )
+
     return Response({
-        'notifications': notifications,
-        'count': len(notifications),
-        'overdue_count': len([n for n in notifications if n['type'] == 'overdue']),
-        'today_count': len([n for n in notifications if n['type'] == 'due_today']),
+        'marked': marked,
+        'unread_count': notification_counts(request.user)['unread_count'],
     })
@@ -18,6 +18,8 @@ from django.utils import timezone
 from django.db.models import Q
 
 from .models import MonthlyObligation, ClientProfile, ObligationType, ClientDocument
+from .services.notification_feed import sync_obligation_notifications
+from .utils.stats_cache import invalidate_stats_cache
 
 
 class ObligationPagination(PageNumberPagination):
@@ -317,16 +319,16 @@ class ObligationViewSet(viewsets.ModelViewSet):
         """
         GET /api/obligations/overdue/
         Get all overdue obligations
+
+        Μόνο SELECT: τα pending με παρελθούσα προθεσμία περιλαμβάνονται μέχρι
+        να τα μεταφέρει σε overdue το mark_overdue_obligations_task.
         """
-        today = timezone.now().date()
+        today = timezone.localdate()
         overdue = self.get_queryset().filter(
             status__in=['pending', 'overdue'],
             deadline__lt=today
         ).order_by('deadline')
 
-        # Update status to overdue if needed
-        overdue.update(status='overdue')
-
         page = self.paginate_queryset(overdue)
         if page is not None:
             serializer = ObligationListSerializer(page, many=True)
@@ -385,6 +387,9 @@ class ObligationViewSet(viewsets.ModelViewSet):
             completed_date=timezone.now().date(),
             completed_by=request.user
         )
+        # Το queryset.update() δεν στέλνει signals
+        invalidate_stats_cache()
+        sync_obligation_notifications(obligation_ids)
 
         return Response({
             'message': f'{updated_count} υποχρεώσεις ολοκληρώθηκαν.',
@@ -521,6 +526,8 @@ class ObligationViewSet(viewsets.ModelViewSet):
             update_data['completed_by'] = request.user
 
         updated_count = obligations.update(**update_data)
+        invalidate_stats_cache()
+        sync_obligation_notifications(obligation_ids)
 
         return Response({
             'message': f'{updated_count} υποχρεώσεις ενημερώθηκαν σε "{new_status}".',
@@ -555,54 +562,21 @@ class ObligationViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def export(self, request):
         """
-        GET /api/obligations/export/?format=excel
-        Export obligations to Excel with filters applied
+        GET /api/obligations/export/?export_format=xlsx|csv
+        Export obligations to Excel (default) or CSV with filters applied.
+        Streams rows from values_list().iterator() - constant memory.
         """
-        import io
-        from django.http import HttpResponse
-
-        try:
-            import openpyxl
-            from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-        except ImportError:
-            return Response(
-                {'error': 'Η βιβλιοθήκη openpyxl δεν είναι εγκατεστημένη.'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+        from common.utils.streaming_export import DEFAULT_CHUNK_SIZE, export_response
 
         # Get filtered queryset using the same filter as list
         queryset = self.filter_queryset(self.get_queryset())
 
-        # Create workbook
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Υποχρεώσεις"
-
-        # Styles
-        header_font = Font(bold=True, color="FFFFFF")
-        header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-        header_alignment = Alignment(horizontal="center", vertical="center")
-        thin_border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-
-        # Headers
         headers = [
             "ID", "Πελάτης", "ΑΦΜ", "Τύπος Υποχρέωσης", "Κωδικός",
             "Μήνας", "Έτος", "Προθεσμία", "Κατάσταση", "Ημ/νία Ολοκλήρωσης",
             "Σημειώσεις"
         ]
 
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col, value=header)
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = header_alignment
-            cell.border = thin_border
-
         # Status translations
         status_map = {
             'pending': 'Εκκρεμεί',
@@ -610,52 +584,67 @@ class ObligationViewSet(viewsets.ModelViewSet):
             'overdue': 'Καθυστερεί',
         }
 
-        # Data rows
-        for row_num, obl in enumerate(queryset, 2):
-            data = [
-                obl.id,
-                obl.client.eponimia,
-                obl.client.afm,
-                obl.obligation_type.name,
-                obl.obligation_type.code,
-                obl.month,
-                obl.year,
-                obl.deadline.strftime('%d/%m/%Y') if obl.deadline else '',
-                status_map.get(obl.status, obl.status),
-                obl.completed_date.strftime('%d/%m/%Y') if obl.completed_date else '',
-                obl.notes or ''
-            ]
-
-            for col, value in enumerate(data, 1):
-                cell = ws.cell(row=row_num, column=col, value=value)
-                cell.border = thin_border
-
-        # Adjust column widths
-        column_widths = [8, 30, 12, 25, 10, 8, 8, 12, 15, 15, 30]
-        for i, width in enumerate(column_widths, 1):
-            ws.column_dimensions[openpyxl.utils.get_column_letter(i)].width = width
-
-        # Save to buffer
-        buffer = io.BytesIO()
-        wb.save(buffer)
-        buffer.seek(0)
-
-        # Generate filename with current date
-        filename = f"υποχρεώσεις_{timezone.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-
-        response = HttpResponse(
-            buffer.getvalue(),
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        def rows():
+            values = queryset.values_list(
+                'id', 'client__eponimia', 'client__afm', 'obligation_type__name',
+                'obligation_type__code', 'month', 'year', 'deadline', 'status',
+                'completed_date', 'notes'
+            ).iterator(chunk_size=DEFAULT_CHUNK_SIZE)
+            for (obl_id, eponimia, afm, type_name, type_code, month, year,
+                 deadline, obl_status, completed_date, notes) in values:
+                yield [
+                    obl_id,
+                    eponimia,
+                    afm,
+                    type_name,
+                    type_code,
+                    month,
+                    year,
+                    deadline.strftime('%d/%m/%Y') if deadline else '',
+                    status_map.get(obl_status, obl_status),
+                    completed_date.strftime('%d/%m/%Y') if completed_date else '',
+                    notes or ''
+                ]
+
+        export_format = request.query_params.get('export_format', 'xlsx')
+        if export_format not in ('xlsx', 'csv'):
+            return Response(
+                {'error': 'Μη υποστηριζόμενη μορφή. Επιτρέπονται: xlsx, csv'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        return response
+        try:
+            # Generate filename with current date
+            return export_response(
+                export_format,
+                f"υποχρεώσεις_{timezone.now().strftime('%Y%m%d_%H%M%S')}",
+                headers,
+                rows(),
+                sheet_name="Υποχρεώσεις",
+                widths=[8, 30, 12, 25, 10, 8, 8, 12, 15, 15, 30],
+            )
+        except ImportError:
+            return Response(
+                {'error': 'Η βιβλιοθήκη XlsxWriter δεν είναι εγκατεστημένη.'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+    def _calendar_filters(self, request):
+        """Προαιρετικά φίλτρα ημερολογίου (client_id, type_id, status)."""
+        filters = {}
+        for param, key in (('client_id', 'client_id'), ('type_id', 'type_id')):
+            try:
+                filters[key] = int(request.query_params[param])
+            except (KeyError, ValueError, TypeError):
+                pass
+        filters['status'] = request.query_params.get('status') or None
+        return filters
 
     @action(detail=False, methods=['get'])
     def calendar(self, request):
         """
         GET /api/v1/obligations/calendar/
-        Get obligations organized by day for calendar view
+        Per-day obligation counts for the calendar view (one GROUP BY query, cached)
 
         Query params:
         - month (1-12, required)
@@ -664,6 +653,10 @@ class ObligationViewSet(viewsets.ModelViewSet):
         - type_id (optional) - filter by obligation type ID
         - status (optional) - filter by status
 
+        Pending obligations past their deadline are counted as overdue;
+        the status itself is updated by mark_overdue_obligations_task.
+        The obligations of a day: GET /api/v1/obligations/calendar/day/
+
         Returns:
         {
             "month": 12,
@@ -674,7 +667,7 @@ class ObligationViewSet(viewsets.ModelViewSet):
                     "pending": 3,
                     "completed": 1,
                     "overdue": 1,
-                    "obligations": [...]
+                    "types": [{"code": "VAT", "name": "ΦΠΑ", "count": 4}, ...]
                 }
             },
             "summary": {
@@ -685,8 +678,7 @@ class ObligationViewSet(viewsets.ModelViewSet):
             }
         }
         """
-        from calendar import monthrange
-        from collections import defaultdict
+        from .services.obligation_calendar import calendar_summary
 
         today = timezone.now().date()
 
@@ -706,104 +698,50 @@ class ObligationViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Optional filters
-        client_id = request.query_params.get('client_id')
-        type_id = request.query_params.get('type_id')
-        filter_status = request.query_params.get('status')
-
-        # Get date range for the month
-        first_day = timezone.datetime(year, month, 1).date()
-        last_day_num = monthrange(year, month)[1]
-        last_day = timezone.datetime(year, month, last_day_num).date()
-
-        # Build queryset
-        queryset = self.get_queryset().filter(
-            deadline__gte=first_day,
-            deadline__lte=last_day
-        )
-
-        # Apply optional filters
-        if client_id:
-            try:
-                queryset = queryset.filter(client_id=int(client_id))
-            except (ValueError, TypeError):
-                pass
-
-        if type_id:
-            try:
-                queryset = queryset.filter(obligation_type_id=int(type_id))
-            except (ValueError, TypeError):
-                pass
-
-        if filter_status:
-            queryset = queryset.filter(status=filter_status)
-
-        # Update overdue status for pending obligations past deadline
-        queryset.filter(
-            status='pending',
-            deadline__lt=today
-        ).update(status='overdue')
-
-        # Refresh queryset after update with select_related to avoid N+1 queries
-        queryset = queryset.select_related(
-            'client', 'obligation_type'
-        ).order_by('deadline')
-
-        # Valid statuses for counting
-        VALID_STATUSES = {'pending', 'completed', 'overdue', 'in_progress', 'cancelled'}
-
-        # Group obligations by day
-        days = defaultdict(lambda: {
-            'total': 0,
-            'pending': 0,
-            'completed': 0,
-            'overdue': 0,
-            'in_progress': 0,
-            'cancelled': 0,
-            'obligations': []
-        })
-
-        for obl in queryset:
-            day_str = str(obl.deadline.day)
-            days[day_str]['total'] += 1
-            # Only increment known status counters
-            if obl.status in VALID_STATUSES:
-                days[day_str][obl.status] += 1
-            days[day_str]['obligations'].append({
-                'id': obl.id,
-                'client_name': obl.client.eponimia,
-                'client_id': obl.client.id,
-                'type_name': obl.obligation_type.name,
-                'type_code': obl.obligation_type.code,
-                'status': obl.status,
-                'deadline': obl.deadline.isoformat(),
-                'notes': obl.notes or '',
-            })
-
-        # Calculate summary
-        summary = {
-            'total': 0,
-            'pending': 0,
-            'completed': 0,
-            'overdue': 0,
-            'in_progress': 0,
-            'cancelled': 0,
-        }
-        for day_data in days.values():
-            summary['total'] += day_data['total']
-            summary['pending'] += day_data['pending']
-            summary['completed'] += day_data['completed']
-            summary['overdue'] += day_data['overdue']
-            summary['in_progress'] += day_data['in_progress']
-            summary['cancelled'] += day_data['cancelled']
-
+        data = calendar_summary(year, month, **self._calendar_filters(request))
         return Response({
             'month': month,
             'year': year,
-            'days': dict(days),
-            'summary': summary,
+            'days': data['days'],
+            'summary': data['summary'],
         })
 
+    @action(detail=False, methods=['get'], url_path='calendar/day')
+    def calendar_day(self, request):
+        """
+        GET /api/v1/obligations/calendar/day/?date=YYYY-MM-DD
+        Paginated obligations of one calendar day
+
+        Query params:
+        - date (YYYY-MM-DD, required)
+        - client_id, type_id, status (optional) - same filters as calendar/
+        - page, page_size (optional)
+        """
+        from datetime import date as date_cls
+        from .services.obligation_calendar import calendar_day_queryset
+
+        try:
+            day = date_cls.fromisoformat(request.query_params.get('date', ''))
+        except ValueError:
+            return Response(
+                {'error': 'Μη έγκυρη ημερομηνία (YYYY-MM-DD).'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        queryset = calendar_day_queryset(day, **self._calendar_filters(request))
+        page = self.paginate_queryset(queryset)
+        obligations = [{
+            'id': obl.id,
+            'client_name': obl.client.eponimia,
+            'client_id': obl.client_id,
+            'type_name': obl.obligation_type.name,
+            'type_code': obl.obligation_type.code,
+            'status': obl.calendar_status,
+            'deadline': obl.deadline.isoformat(),
+            'notes': obl.notes or '',
+        } for obl in page]
+        return self.get_paginated_response(obligations)
+
 
 # ============================================
 # OBLIGATION TYPE VIEWSET
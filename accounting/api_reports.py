@@ -10,11 +10,11 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.utils import timezone
 from django.db.models import Count, Q
-from django.db.models.functions import TruncMonth
-from datetime import timedelta
+from datetime import date
 from calendar import monthrange
 
 from .models import ClientProfile, MonthlyObligation
+from .utils.stats_cache import get_cached_stats
 from .utils.report_constants import (
     get_date_range,
     get_previous_period_range,
@@ -22,6 +22,81 @@ from .utils.report_constants import (
 )
 
 
+def _date_range_q(field: str, start, end):
+    """Q για `field` μέσα στο [start, end] ή None αν δεν υπάρχει εύρος."""
+    if start is None or end is None:
+        return None
+    return Q(**{f'{field}__gte': start, f'{field}__lte': end})
+
+
+def _last_twelve_months(today):
+    """Οι τελευταίοι 12 μήνες (παλαιότερος πρώτος) ως (year, month)."""
+    year, month = today.year, today.month
+    months = []
+    for _ in range(12):
+        months.append((year, month))
+        year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+    months.reverse()
+    return months
+
+
+def _obligation_counters(today, start_date, end_date, prev_start=None, prev_end=None, months=()):
+    """
+    Όλοι οι μετρητές MonthlyObligation των reports σε ένα query
+    (conditional aggregation).
+
+    Returns:
+        Dict με completed, pending, overdue, prev_completed και
+        month_<year>_<month> για κάθε μήνα του `months`.
+    """
+    completed = Q(status='completed')
+    aggregates = {
+        'pending': Count('id', filter=Q(status='pending')),
+        'overdue': Count('id', filter=Q(status='overdue') | Q(status='pending', deadline__lt=today)),
+    }
+
+    current = _date_range_q('completed_date', start_date, end_date)
+    aggregates['completed'] = Count('id', filter=completed & current if current else completed)
+
+    previous = _date_range_q('completed_date', prev_start, prev_end)
+    if previous:
+        aggregates['prev_completed'] = Count('id', filter=completed & previous)
+
+    for year, month in months:
+        month_range = _date_range_q(
+            'completed_date', date(year, month, 1), date(year, month, monthrange(year, month)[1])
+        )
+        aggregates[f'month_{year}_{month}'] = Count('id', filter=completed & month_range)
+
+    counters = MonthlyObligation.objects.aggregate(**aggregates)
+    counters.setdefault('prev_completed', 0)
+    return counters
+
+
+def _client_counters(start_date, end_date, prev_start=None, prev_end=None):
+    """Ενεργοί πελάτες και νέοι πελάτες τρέχουσας/προηγούμενης περιόδου σε ένα query."""
+    aggregates = {'total_clients': Count('id', filter=Q(is_active=True))}
+
+    current = _date_range_q('created_at__date', start_date, end_date)
+    if current:
+        aggregates['new_clients'] = Count('id', filter=current)
+    previous = _date_range_q('created_at__date', prev_start, prev_end)
+    if previous:
+        aggregates['prev_new_clients'] = Count('id', filter=previous)
+
+    counters = ClientProfile.objects.aggregate(**aggregates)
+    counters.setdefault('new_clients', 0)
+    counters.setdefault('prev_new_clients', 0)
+    return counters
+
+
+def _calc_change(current, previous):
+    """Ποσοστιαία μεταβολή για trend indicators."""
+    if previous == 0:
+        return 100 if current > 0 else 0
+    return round((current - previous) / previous * 100, 1)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def reports_stats(request):
@@ -41,37 +116,36 @@ def reports_stats(request):
     - monthly_activity: Monthly completion counts (last 12 months)
     - completion_rate: Percentage of completed vs total
     - comparison: Trend compared to previous period
+
+    Τα αποτελέσματα cacheάρονται για λίγο (CACHE_TTL_STATS) και ακυρώνονται
+    από τα signals των MonthlyObligation/ClientProfile.
     """
     period = request.query_params.get('period', 'month')
-    today = timezone.now().date()
+    today = timezone.localdate()
 
-    # Get date range based on period
-    start_date, end_date = get_date_range(period)
+    data = get_cached_stats(
+        'reports_stats', (period, today.isoformat()),
+        lambda: _compute_reports_stats(period, today)
+    )
+    return Response(data)
 
-    # Total active clients
-    total_clients = ClientProfile.objects.filter(is_active=True).count()
 
-    # Base querysets
-    all_obligations = MonthlyObligation.objects.all()
-
-    # Completed in period
-    completed_qs = all_obligations.filter(status='completed')
-    if start_date and end_date:
-        completed_qs = completed_qs.filter(
-            completed_date__gte=start_date,
-            completed_date__lte=end_date
-        )
-    completed_obligations = completed_qs.count()
+def _compute_reports_stats(period: str, today):
+    """Τα stats του reports_stats σε τρία queries (μετρητές, πελάτες, ανά τύπο)."""
+    # Get date range based on period
+    start_date, end_date = get_date_range(period)
+    prev_start, prev_end = get_previous_period_range(period, start_date, end_date)
+    months = _last_twelve_months(today)
 
-    # Pending (current)
-    pending_obligations = all_obligations.filter(status='pending').count()
+    counters = _obligation_counters(today, start_date, end_date, prev_start, prev_end, months)
+    clients = _client_counters(start_date, end_date, prev_start, prev_end)
 
-    # Overdue (current - includes pending past deadline)
-    overdue_obligations = all_obligations.filter(
-        Q(status='overdue') | Q(status='pending', deadline__lt=today)
-    ).count()
+    completed_obligations = counters['completed']
+    pending_obligations = counters['pending']
+    overdue_obligations = counters['overdue']
 
     # Obligations by type (all time or in period)
+    all_obligations = MonthlyObligation.objects.all()
     if start_date and end_date:
         type_qs = all_obligations.filter(
             Q(created_at__date__gte=start_date) |
@@ -86,54 +160,16 @@ def reports_stats(request):
         .order_by('-count')
     )
 
-    # Monthly activity (last 12 months)
-    twelve_months_ago = today.replace(day=1) - timedelta(days=365)
-    monthly_activity = list(
-        all_obligations.filter(
-            status='completed',
-            completed_date__gte=twelve_months_ago
-        ).annotate(
-            completed_month=TruncMonth('completed_date')
-        ).values('completed_month').annotate(
-            count=Count('id')
-        ).order_by('completed_month')
-    )
-
-    # Format monthly activity for frontend
-    monthly_data = []
-
-    for item in monthly_activity:
-        if item['completed_month']:
-            month_idx = item['completed_month'].month - 1
-            monthly_data.append({
-                'month': GREEK_MONTHS_SHORT[month_idx],
-                'month_num': item['completed_month'].month,
-                'year': item['completed_month'].year,
-                'count': item['count']
-            })
-
-    # Fill in missing months with zero
-    current_month = today.replace(day=1)
-    all_months = []
-    for i in range(12):
-        month_date = current_month - timedelta(days=30*i)
-        month_date = month_date.replace(day=1)
-        month_idx = month_date.month - 1
-
-        existing = next(
-            (m for m in monthly_data
-             if m['month_num'] == month_date.month and m['year'] == month_date.year),
-            None
-        )
-
-        all_months.append({
-            'month': GREEK_MONTHS_SHORT[month_idx],
-            'month_num': month_date.month,
-            'year': month_date.year,
-            'count': existing['count'] if existing else 0
-        })
-
-    all_months.reverse()
+    # Monthly activity (last 12 months, από τα ίδια conditional counts)
+    all_months = [
+        {
+            'month': GREEK_MONTHS_SHORT[month - 1],
+            'month_num': month,
+            'year': year,
+            'count': counters[f'month_{year}_{month}'],
+        }
+        for year, month in months
+    ]
 
     # Completion rate
     total_in_period = completed_obligations + pending_obligations + overdue_obligations
@@ -143,11 +179,17 @@ def reports_stats(request):
     )
 
     # Comparison with previous period (for trend indicators)
-    comparison = calculate_comparison(period, start_date, end_date)
+    if prev_start is None or prev_end is None:
+        comparison = {'clients_change': 0, 'completed_change': 0}
+    else:
+        comparison = {
+            'clients_change': _calc_change(clients['new_clients'], clients['prev_new_clients']),
+            'completed_change': _calc_change(completed_obligations, counters['prev_completed']),
+        }
 
-    return Response({
+    return {
         'period': period,
-        'total_clients': total_clients,
+        'total_clients': clients['total_clients'],
         'completed_obligations': completed_obligations,
         'pending_obligations': pending_obligations,
         'overdue_obligations': overdue_obligations,
@@ -156,13 +198,15 @@ def reports_stats(request):
         'completion_rate': completion_rate,
         'comparison': comparison,
         'generated_at': timezone.now().isoformat()
-    })
+    }
 
 
 def calculate_comparison(period: str, current_start, current_end):
     """
     Calculate comparison with previous period for trend indicators.
     Uses centralized date range utilities.
+
+    Δύο queries: ένα conditional aggregate στις υποχρεώσεις και ένα στους πελάτες.
     """
     # Use centralized utility for previous period calculation
     prev_start, prev_end = get_previous_period_range(period, current_start, current_end)
@@ -170,40 +214,22 @@ def calculate_comparison(period: str, current_start, current_end):
     if prev_start is None or prev_end is None:
         return {'clients_change': 0, 'completed_change': 0}
 
-    # Previous period stats
-    prev_completed = MonthlyObligation.objects.filter(
-        status='completed',
-        completed_date__gte=prev_start,
-        completed_date__lte=prev_end
-    ).count()
-
-    # Current period stats (for comparison calculation)
-    curr_completed = MonthlyObligation.objects.filter(
-        status='completed',
-        completed_date__gte=current_start,
-        completed_date__lte=current_end
-    ).count() if current_start and current_end else 0
-
-    # Calculate percentage changes
-    def calc_change(current, previous):
-        if previous == 0:
-            return 100 if current > 0 else 0
-        return round((current - previous) / previous * 100, 1)
-
-    # Client comparison - new clients in period
-    new_clients_current = ClientProfile.objects.filter(
-        created_at__date__gte=current_start,
-        created_at__date__lte=current_end
-    ).count() if current_start and current_end else 0
-
-    new_clients_prev = ClientProfile.objects.filter(
-        created_at__date__gte=prev_start,
-        created_at__date__lte=prev_end
-    ).count()
+    completed = Q(status='completed')
+    aggregates = {
+        'prev_completed': Count('id', filter=completed & _date_range_q('completed_date', prev_start, prev_end)),
+    }
+    current = _date_range_q('completed_date', current_start, current_end)
+    if current:
+        aggregates['curr_completed'] = Count('id', filter=completed & current)
+
+    obligation_counts = MonthlyObligation.objects.aggregate(**aggregates)
+    clients = _client_counters(current_start, current_end, prev_start, prev_end)
 
     return {
-        'clients_change': calc_change(new_clients_current, new_clients_prev),
-        'completed_change': calc_change(curr_completed, prev_completed),
+        'clients_change': _calc_change(clients['new_clients'], clients['prev_new_clients']),
+        'completed_change': _calc_change(
+            obligation_counts.get('curr_completed', 0), obligation_counts['prev_completed']
+        ),
     }
 
 
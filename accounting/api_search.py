@@ -1,18 +1,20 @@
 """
 Global Search API
 Author: ddiplas
-Version: 1.0
+Version: 1.1
 Description: Unified search API for clients, obligations, tickets, and calls.
              Supports Greek characters and returns max 5 results per category.
+             Οι αναζητήσεις γίνονται στο ευρετήριο SearchDocument (χωρίς τόνους,
+             ένα ranked query) - βλ. accounting/services/search_index.py
 """
 
 import logging
-from django.db.models import Q
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from .models import ClientProfile, MonthlyObligation, VoIPCall, Ticket
+from .services.search_index import search_documents
 
 logger = logging.getLogger(__name__)
 
@@ -26,11 +28,12 @@ def global_search(request):
     GET /api/v1/search/?q=<query>
 
     Search fields per entity:
-    - Clients: eponimia, afm, kinito_tilefono, tilefono_epixeirisis_1, email
-    - Obligations: client.eponimia, obligation_type.name, notes
-    - Tickets: title, description, client.eponimia
-    - Calls: phone_number, client.eponimia
+    - Clients: eponimia, onoma, afm, phones, email
+    - Obligations: obligation_type.name/code, client.eponimia, client.afm, notes
+    - Tickets: title, description, client.eponimia, call.phone_number
+    - Calls: phone_number, client.eponimia, notes
 
+    Χωρίς τόνους/πεζά-κεφαλαία ('παπαδοπουλος' βρίσκει 'ΠΑΠΑΔΌΠΟΥΛΟΣ').
     Returns max 5 results per category.
     """
     query = request.GET.get('q', '').strip()
@@ -48,11 +51,12 @@ def global_search(request):
         })
 
     try:
+        ids = search_documents(query, limit=5)
         results = {
-            'clients': search_clients(query),
-            'obligations': search_obligations(query),
-            'tickets': search_tickets(query),
-            'calls': search_calls(query)
+            'clients': client_results(ids['client']),
+            'obligations': obligation_results(ids['obligation']),
+            'tickets': ticket_results(ids['ticket']),
+            'calls': call_results(ids['call'])
         }
 
         total = sum(len(v) for v in results.values())
@@ -78,22 +82,17 @@ def global_search(request):
         }, status=500)
 
 
-def search_clients(query: str, limit: int = 5) -> list:
-    """
-    Search clients by:
-    - eponimia (company name)
-    - afm (tax ID)
-    - kinito_tilefono (mobile phone)
-    - tilefono_epixeirisis_1 (business phone)
-    - email
-    """
-    clients = ClientProfile.objects.filter(
-        Q(eponimia__icontains=query) |
-        Q(afm__icontains=query) |
-        Q(kinito_tilefono__icontains=query) |
-        Q(tilefono_epixeirisis_1__icontains=query) |
-        Q(email__icontains=query)
-    ).filter(is_active=True).order_by('eponimia')[:limit]
+def _in_order(queryset, ids: list) -> list:
+    """Οι εγγραφές με τη σειρά κατάταξης του ευρετηρίου."""
+    if not ids:
+        return []
+    objects = queryset.in_bulk(ids)
+    return [objects[pk] for pk in ids if pk in objects]
+
+
+def client_results(ids: list) -> list:
+    """Active clients, in search rank order."""
+    clients = _in_order(ClientProfile.objects.all(), ids)
 
     return [{
         'id': c.id,
@@ -110,19 +109,9 @@ def search_clients(query: str, limit: int = 5) -> list:
     } for c in clients]
 
 
-def search_obligations(query: str, limit: int = 5) -> list:
-    """
-    Search obligations by:
-    - client.eponimia (client name)
-    - obligation_type.name (type name)
-    - notes
-    """
-    obligations = MonthlyObligation.objects.filter(
-        Q(client__eponimia__icontains=query) |
-        Q(obligation_type__name__icontains=query) |
-        Q(notes__icontains=query) |
-        Q(client__afm__icontains=query)
-    ).select_related('client', 'obligation_type').order_by('-deadline')[:limit]
+def obligation_results(ids: list) -> list:
+    """Obligations, in search rank order (most recent deadline first on ties)."""
+    obligations = _in_order(MonthlyObligation.objects.select_related('client', 'obligation_type'), ids)
 
     status_labels = {
         'pending': 'Εκκρεμεί',
@@ -151,19 +140,9 @@ def search_obligations(query: str, limit: int = 5) -> list:
     } for o in obligations]
 
 
-def search_tickets(query: str, limit: int = 5) -> list:
-    """
-    Search tickets by:
-    - title
-    - description
-    - client.eponimia (client name)
-    """
-    tickets = Ticket.objects.filter(
-        Q(title__icontains=query) |
-        Q(description__icontains=query) |
-        Q(client__eponimia__icontains=query) |
-        Q(call__phone_number__icontains=query)
-    ).select_related('client', 'call').order_by('-created_at')[:limit]
+def ticket_results(ids: list) -> list:
+    """Tickets, in search rank order (newest first on ties)."""
+    tickets = _in_order(Ticket.objects.select_related('client', 'call'), ids)
 
     status_labels = {
         'open': 'Ανοιχτό',
@@ -190,17 +169,9 @@ def search_tickets(query: str, limit: int = 5) -> list:
     } for t in tickets]
 
 
-def search_calls(query: str, limit: int = 5) -> list:
-    """
-    Search calls by:
-    - phone_number
-    - client.eponimia (client name)
-    """
-    calls = VoIPCall.objects.filter(
-        Q(phone_number__icontains=query) |
-        Q(client__eponimia__icontains=query) |
-        Q(notes__icontains=query)
-    ).select_related('client').order_by('-started_at')[:limit]
+def call_results(ids: list) -> list:
+    """Calls, in search rank order (newest first on ties)."""
+    calls = _in_order(VoIPCall.objects.select_related('client'), ids)
 
     direction_labels = {
         'incoming': 'Εισερχόμενη',
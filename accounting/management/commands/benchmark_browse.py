@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+accounting/management/commands/benchmark_browse.py
+Description: Benchmark του browse/stats του file manager με συνθετικά έγγραφα.
+
+Συγκρίνει:
+- documents: Count()/distinct απευθείας στα ClientDocument (παλιά υλοποίηση)
+- counters: ένα query στους DocumentFolderCounter (χωρίς cache)
+- cached: το ίδιο μέσω του cache της έκδοσης μετρητών
+
+Τα συνθετικά δεδομένα γράφονται με bulk_create μέσα σε transaction που
+γίνεται πάντα rollback - στη βάση δεν μένει τίποτα.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count, Q, Sum
+from django.test.utils import CaptureQueriesContext
+
+from accounting.models import ClientDocument, ClientProfile
+from accounting.services.document_counters import (
+    document_totals, folder_tree, invalidate_document_counters_cache, rebuild_document_counters
+)
+
+CATEGORIES = ['vat', 'apd', 'myf', 'payroll', 'invoices_issued', 'invoices_received', 'bank', 'general']
+FILE_TYPES = ['pdf', 'pdf', 'pdf', 'xlsx', 'docx', 'jpg']
+
+
+class Command(BaseCommand):
+    help = 'Benchmark file manager browse/stats (documents vs folder counters) on synthetic documents'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--documents', type=int, default=500000, help='Synthetic documents (default: 500000)')
+        parser.add_argument('--clients', type=int, default=1000, help='Synthetic clients (default: 1000)')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per query (default: 5)')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            client_id, year = self._populate(options['clients'], options['documents'])
+
+            started = time.perf_counter()
+            folders = rebuild_document_counters()
+            self.stdout.write(f'rebuild_document_counters: {folders} folders in {time.perf_counter() - started:.2f}s\n')
+
+            scenarios = [
+                ('clients', self._legacy_clients, lambda: folder_tree()),
+                ('years', lambda: self._legacy_years(client_id), lambda: folder_tree(client_id)),
+                ('months', lambda: self._legacy_months(client_id, year), lambda: folder_tree(client_id, year)),
+                ('stats', self._legacy_stats, document_totals),
+            ]
+            for name, legacy, counters in scenarios:
+                self._measure(f'{name} / documents', legacy, options['repeat'])
+                self._measure(f'{name} / counters', counters, options['repeat'], uncached=True)
+                self._measure(f'{name} / cached', counters, options['repeat'])
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{options['documents']} documents, {options['clients']} clients (rolled back)"
+        ))
+
+    def _populate(self, clients, documents):
+        started = time.perf_counter()
+        ClientProfile.objects.bulk_create(
+            ClientProfile(afm=f'9{index:08d}', eponimia=f'Benchmark {index:05d}')
+            for index in range(clients)
+        )
+        client_ids = list(
+            ClientProfile.objects.filter(afm__startswith='9', eponimia__startswith='Benchmark ')
+            .order_by('id').values_list('id', flat=True)
+        )
+
+        def rows():
+            for index in range(documents):
+                file_type = FILE_TYPES[index % len(FILE_TYPES)]
+                name = f'doc_{index}.{file_type}'
+                yield ClientDocument(
+                    client_id=client_ids[index % len(client_ids)],
+                    file=f'clients/benchmark/{name}',
+                    original_filename=name,
+                    filename=name,
+                    file_type=file_type,
+                    file_size=1000 + index % 50000,
+                    document_category=CATEGORIES[index % len(CATEGORIES)],
+                    year=2021 + index % 5,
+                    month=1 + (index // 7) % 12,
+                    is_current=index % 10 != 0,
+                )
+
+        ClientDocument.objects.bulk_create(rows(), batch_size=5000)
+        self.stdout.write(f'Populated in {time.perf_counter() - started:.2f}s')
+        return client_ids[0], 2025
+
+    def _measure(self, label, func, repeat, uncached=False):
+        timings, queries = [], 0
+        if not uncached:
+            func()  # γέμισμα cache
+        for _ in range(repeat):
+            if uncached:
+                invalidate_document_counters_cache()
+            with CaptureQueriesContext(connection) as context:
+                started = time.perf_counter()
+                func()
+                timings.append(time.perf_counter() - started)
+            queries = len(context.captured_queries)
+        best = min(timings) * 1000
+        self.stdout.write(f'{label:>20}: {best:9.2f} ms, {queries} queries')
+
+    # Παλιά υλοποίηση (BrowseFoldersView / FileManagerStatsView)
+
+    @staticmethod
+    def _legacy_clients():
+        return list(ClientProfile.objects.filter(
+            documents__isnull=False
+        ).distinct().annotate(
+            doc_count=Count('documents', filter=Q(documents__is_current=True))
+        ).order_by('eponimia').values('id', 'eponimia', 'afm', 'doc_count'))
+
+    @staticmethod
+    def _legacy_years(client_id):
+        return list(ClientDocument.objects.filter(client_id=client_id, is_current=True).values('year').annotate(
+            count=Count('id')
+        ).order_by('-year'))
+
+    @staticmethod
+    def _legacy_months(client_id, year):
+        return list(ClientDocument.objects.filter(
+            client_id=client_id, is_current=True, year=year
+        ).values('month').annotate(count=Count('id')).order_by('month'))
+
+    @staticmethod
+    def _legacy_stats():
+        current = ClientDocument.objects.filter(is_current=True)
+        return (
+            current.count(),
+            current.aggregate(total=Sum('file_size'))['total'],
+            list(current.values('document_category').annotate(count=Count('id')).order_by('-count')),
+            list(current.values('file_type').annotate(count=Count('id')).order_by('-count')[:10]),
+        )
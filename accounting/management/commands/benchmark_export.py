@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+accounting/management/commands/benchmark_export.py
+Description: Benchmark του export υποχρεώσεων - peak RSS και χρόνος.
+
+Κάθε μέθοδος τρέχει σε ξεχωριστή διεργασία (fork) ώστε το ru_maxrss να
+αφορά μόνο αυτήν:
+- openpyxl: ολόκληρο workbook στη μνήμη, Border σε κάθε κελί, BytesIO (παλιά υλοποίηση)
+- xlsx: common.utils.streaming_export.write_xlsx (XlsxWriter constant_memory)
+- csv: common.utils.streaming_export.iter_csv
+
+Τα δεδομένα είναι συνθετικά, εκτός αν δοθεί --from-db.
+"""
+import io
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from common.utils.streaming_export import DEFAULT_CHUNK_SIZE, iter_csv, write_xlsx
+
+HEADERS = [
+    "ID", "Πελάτης", "ΑΦΜ", "Τύπος Υποχρέωσης", "Κωδικός",
+    "Μήνας", "Έτος", "Προθεσμία", "Κατάσταση", "Ημ/νία Ολοκλήρωσης",
+    "Σημειώσεις"
+]
+METHODS = ('openpyxl', 'xlsx', 'csv')
+
+
+def synthetic_rows(count):
+    start = date(2025, 1, 1)
+    for index in range(1, count + 1):
+        deadline = start + timedelta(days=index % 365)
+        yield [
+            index,
+            f'Πελάτης Δοκιμής {index % 5000}',
+            f'{index % 1000000000:09d}',
+            'ΦΠΑ Μηνιαίο',
+            'ΦΠΑ',
+            deadline.month,
+            deadline.year,
+            deadline.strftime('%d/%m/%Y'),
+            'Εκκρεμεί',
+            '',
+            'Σημείωση' if index % 10 == 0 else '',
+        ]
+
+
+def database_rows(limit):
+    from accounting.models import MonthlyObligation
+
+    values = MonthlyObligation.objects.order_by('id').values_list(
+        'id', 'client__eponimia', 'client__afm', 'obligation_type__name',
+        'obligation_type__code', 'month', 'year', 'deadline', 'status',
+        'completed_date', 'notes'
+    )[:limit].iterator(chunk_size=DEFAULT_CHUNK_SIZE)
+    for row in values:
+        row = list(row)
+        row[7] = row[7].strftime('%d/%m/%Y') if row[7] else ''
+        row[9] = row[9].strftime('%d/%m/%Y') if row[9] else ''
+        yield row
+
+
+def export_openpyxl(rows, output):
+    import openpyxl
+    from openpyxl.styles import Border, Side
+
+    workbook = openpyxl.Workbook()
+    worksheet = workbook.active
+    thin_border = Border(
+        left=Side(style='thin'), right=Side(style='thin'),
+        top=Side(style='thin'), bottom=Side(style='thin')
+    )
+    for col, header in enumerate(HEADERS, 1):
+        worksheet.cell(row=1, column=col, value=header).border = thin_border
+    for row_num, row in enumerate(rows, 2):
+        for col, value in enumerate(row, 1):
+            worksheet.cell(row=row_num, column=col, value=value).border = thin_border
+
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    output.write(buffer.getvalue())
+
+
+def export_xlsx(rows, output):
+    write_xlsx(output, HEADERS, rows, sheet_name='Υποχρεώσεις')
+
+
+def export_csv(rows, output):
+    for line in iter_csv(HEADERS, rows):
+        output.write(line.encode('utf-8'))
+
+
+EXPORTERS = {'openpyxl': export_openpyxl, 'xlsx': export_xlsx, 'csv': export_csv}
+
+
+def _max_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux: KB, macOS: bytes
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def _run(method, count, from_db, queue):
+    started = time.perf_counter()
+    rows = database_rows(count) if from_db else synthetic_rows(count)
+    with tempfile.TemporaryFile() as output:
+        EXPORTERS[method](rows, output)
+        size = output.tell()
+    queue.put({
+        'method': method,
+        'seconds': time.perf_counter() - started,
+        'rss_mb': _max_rss_mb(),
+        'size_mb': size / (1024 * 1024),
+    })
+
+
+class Command(BaseCommand):
+    help = 'Benchmark obligation export (openpyxl vs streaming xlsx/csv): peak RSS and wall time'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100_000, help='Rows to export (default: 100000)')
+        parser.add_argument(
+            '--methods', default=','.join(METHODS),
+            help=f'Comma separated: {", ".join(METHODS)} (default: all)',
+        )
+        parser.add_argument(
+            '--from-db', action='store_true',
+            help='Export existing MonthlyObligation rows instead of synthetic data',
+        )
+
+    def handle(self, *args, **options):
+        methods = [method.strip() for method in options['methods'].split(',') if method.strip()]
+        unknown = set(methods) - set(METHODS)
+        if unknown:
+            raise CommandError(f'Unknown methods: {", ".join(sorted(unknown))}')
+
+        # Κάθε μέτρηση σε νέα διεργασία - οι DB συνδέσεις δεν μοιράζονται στο fork
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        baseline = _max_rss_mb()
+
+        self.stdout.write(f"Exporting {options['rows']} obligations (baseline RSS {baseline:.0f} MB)")
+        for method in methods:
+            queue = context.Queue()
+            process = context.Process(target=_run, args=(method, options['rows'], options['from_db'], queue))
+            process.start()
+            process.join()
+            if process.exitcode:
+                raise CommandError(f'{method} failed (exit code {process.exitcode})')
+            result = queue.get(timeout=10)
+            self.stdout.write(
+                f"{result['method']:>9}: {result['seconds']:7.2f}s  "
+                f"peak RSS {result['rss_mb']:7.1f} MB  file {result['size_mb']:6.1f} MB"
+            )
+        self.stdout.write(self.style.SUCCESS('Done'))
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+accounting/management/commands/benchmark_folders.py
+Description: Benchmark δημιουργίας φακέλων πελατών σε προσωρινό φάκελο.
+
+Συγκρίνει:
+- eager: πλήρης σκελετός στο save του πελάτη και όλες οι κατηγορίες του μήνα
+  σε κάθε έγγραφο (παλιά συμπεριφορά)
+- lazy: μόνο ο φάκελος του εγγράφου και το INFO.txt στο πρώτο έγγραφο
+- rollover: σκελετός νέου έτους με exists + makedirs ανά φάκελο (παλιό
+  init_filing_system) απέναντι στον FolderProvisioner
+
+Μετράει κλήσεις os.mkdir / os.stat και χρόνο. Τα δεδομένα είναι συνθετικά
+(μη αποθηκευμένα objects) - δεν γράφεται τίποτα στη βάση.
+"""
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+
+from accounting.models import ClientDocument, ClientProfile
+from accounting.services import folder_provisioning
+from accounting.services.folder_provisioning import (
+    DEFAULT_MONTHLY_CATEGORIES, FolderLayout, FolderProvisioner, ensure_client_info, write_client_info
+)
+
+
+@contextmanager
+def count_fs_calls():
+    """Μετρητής κλήσεων os.mkdir / os.stat (τα os.makedirs / os.path.exists τις χρησιμοποιούν)."""
+    counts = {'mkdir': 0, 'stat': 0}
+    original_mkdir, original_stat = os.mkdir, os.stat
+
+    def mkdir(*args, **kwargs):
+        counts['mkdir'] += 1
+        return original_mkdir(*args, **kwargs)
+
+    def stat(*args, **kwargs):
+        counts['stat'] += 1
+        return original_stat(*args, **kwargs)
+
+    os.mkdir, os.stat = mkdir, stat
+    try:
+        yield counts
+    finally:
+        os.mkdir, os.stat = original_mkdir, original_stat
+
+
+class Command(BaseCommand):
+    help = 'Benchmark client folder creation (eager vs lazy, year rollover) in a temp directory'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=200, help='Synthetic clients (default: 200)')
+        parser.add_argument(
+            '--documents', type=int, default=5,
+            help='Uploaded documents per client (default: 5)',
+        )
+
+    def handle(self, *args, **options):
+        year = datetime.now().year
+        clients = [
+            ClientProfile(id=index + 1, afm=f'{index:09d}', eponimia=f'Πελάτης {index}')
+            for index in range(options['clients'])
+        ]
+        documents = [
+            (client, (number % 12) + 1, DEFAULT_MONTHLY_CATEGORIES[number % len(DEFAULT_MONTHLY_CATEGORIES)])
+            for client in clients
+            for number in range(options['documents'])
+        ]
+        all_categories = [category for category, _ in ClientDocument.CATEGORY_CHOICES]
+
+        def eager(layout):
+            for client in clients:
+                for path in layout.permanent_dirs(client) + layout.year_dirs(client, year):
+                    os.makedirs(path, exist_ok=True)
+                write_client_info(layout.client_root(client), client)
+            for client, month, category in documents:
+                month_path = os.path.join(layout.client_root(client), str(year), f'{month:02d}')
+                for name in all_categories:
+                    os.makedirs(os.path.join(month_path, name), exist_ok=True)
+                os.makedirs(os.path.join(month_path, category), exist_ok=True)
+
+        def lazy(layout):
+            folder_provisioning._info_written.clear()
+            for client, month, category in documents:
+                ensure_client_info(client, layout)
+                month_path = os.path.join(layout.client_root(client), str(year), f'{month:02d}')
+                os.makedirs(os.path.join(month_path, category), exist_ok=True)
+
+        def rollover_legacy(layout):
+            for client in clients:
+                for path in layout.year_dirs(client, year + 1):
+                    if not os.path.exists(path):
+                        os.makedirs(path, exist_ok=True)
+
+        def rollover_provisioner(layout):
+            FolderProvisioner(layout).provision(clients, years=[year + 1], permanent=False, info=False)
+
+        self._run('eager', eager)
+        self._run('lazy', lazy)
+        self._run('rollover (legacy)', rollover_legacy, prepare=lazy)
+        self._run('rollover (batch)', rollover_provisioner, prepare=lazy)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(clients)} clients, {len(documents)} documents'
+        ))
+
+    def _run(self, label, scenario, prepare=None):
+        archive_root = tempfile.mkdtemp(prefix='benchmark_folders_')
+        layout = FolderLayout(archive_root=archive_root)
+        try:
+            if prepare:
+                prepare(layout)
+            started = time.perf_counter()
+            with count_fs_calls() as counts:
+                scenario(layout)
+            elapsed = time.perf_counter() - started
+            directories = sum(len(dirs) for _, dirs, _ in os.walk(archive_root))
+        finally:
+            shutil.rmtree(archive_root, ignore_errors=True)
+
+        self.stdout.write(
+            f'{label:>18}: {counts["mkdir"]} mkdir, {counts["stat"]} stat, '
+            f'{directories} directories in {elapsed:.3f}s'
+        )
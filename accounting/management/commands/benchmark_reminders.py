@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+accounting/management/commands/benchmark_reminders.py
+Description: Benchmark των υπενθυμίσεων υποχρεώσεων απέναντι σε τοπικό SMTP sink.
+
+Συγκρίνει:
+- per-obligation: ένα email και ένα νέο SMTP connection ανά υποχρέωση (παλιά συμπεριφορά)
+- digest: ένα email ανά πελάτη με ένα ανοιχτό connection (BulkEmailSender)
+
+Τα δεδομένα είναι συνθετικά (μη αποθηκευμένα objects) - δεν γράφεται τίποτα στη βάση.
+"""
+import socketserver
+import threading
+import time
+from datetime import timedelta
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from accounting.models import ClientProfile, EmailTemplate, MonthlyObligation, ObligationType
+from accounting.services.reminder_digest import (
+    build_reminder_messages, group_obligations, send_reminder_messages
+)
+
+SMTP_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+FROM_EMAIL = 'benchmark@localhost'
+
+
+class SMTPSinkHandler(socketserver.StreamRequestHandler):
+    """Ελάχιστος SMTP server που δέχεται και πετάει τα μηνύματα."""
+
+    def reply(self, line):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        self.wfile.write(line.encode('ascii') + b'\r\n')
+
+    def handle(self):
+        self.reply('220 localhost SMTP sink')
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('ascii', 'replace').strip().upper()
+            if command.startswith(('EHLO', 'HELO')):
+                self.reply('250 localhost')
+            elif command == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                while True:
+                    data = self.rfile.readline()
+                    if not data or data == b'.\r\n':
+                        break
+                with self.server.lock:
+                    self.server.message_count += 1
+                self.reply('250 OK')
+            elif command == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                # MAIL FROM, RCPT TO, RSET, NOOP
+                self.reply('250 OK')
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, latency=0.0):
+        super().__init__(('127.0.0.1', 0), SMTPSinkHandler)
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.message_count = 0
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark obligation reminders (per-obligation vs digest) against a local SMTP sink'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=200, help='Synthetic clients (default: 200)')
+        parser.add_argument(
+            '--obligations', type=int, default=3,
+            help='Due obligations per client (default: 3)',
+        )
+        parser.add_argument(
+            '--latency', type=float, default=0.0,
+            help='Simulated SMTP round-trip per reply in ms (default: 0)',
+        )
+        parser.add_argument(
+            '--rate-limit', action='store_true',
+            help='Apply the shared RateLimiter to the digest run',
+        )
+
+    def handle(self, *args, **options):
+        today = timezone.now().date()
+        obligations = self._synthetic_obligations(options['clients'], options['obligations'], today)
+        template = EmailTemplate.get_reminder_template()
+
+        sink = SMTPSink(latency=options['latency'] / 1000.0)
+        thread = threading.Thread(target=sink.serve_forever, daemon=True)
+        thread.start()
+
+        def connection():
+            return get_connection(
+                backend=SMTP_BACKEND, host='127.0.0.1', port=sink.port,
+                username='', password='', use_tls=False, use_ssl=False, fail_silently=False,
+            )
+
+        try:
+            # Παλιά συμπεριφορά: ένα μήνυμα και ένα connection ανά υποχρέωση
+            messages = build_reminder_messages(
+                group_obligations(obligations, digest=False), template, today, from_email=FROM_EMAIL
+            )
+            started = time.perf_counter()
+            for message in messages:
+                connection().send_messages([message.email])
+            self._report('per-obligation', len(messages), time.perf_counter() - started)
+
+            # Digest: ένα μήνυμα ανά πελάτη, ένα ανοιχτό connection
+            messages = build_reminder_messages(
+                group_obligations(obligations), template, today, from_email=FROM_EMAIL
+            )
+            started = time.perf_counter()
+            send_reminder_messages(messages, connection=connection(), use_rate_limit=options['rate_limit'])
+            self._report('digest', len(messages), time.perf_counter() - started)
+
+            failed = sum(1 for message in messages if message.status != 'sent')
+            if failed:
+                self.stdout.write(self.style.WARNING(f'{failed} digest messages failed'))
+        finally:
+            sink.shutdown()
+            sink.server_close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(obligations)} obligations, {options["clients"]} clients, '
+            f'{sink.message_count} messages received by the sink'
+        ))
+
+    def _report(self, label, count, elapsed):
+        per_second = count / elapsed if elapsed else 0
+        self.stdout.write(f'{label:>15}: {count} emails in {elapsed:.3f}s ({per_second:.1f}/s)')
+
+    @staticmethod
+    def _synthetic_obligations(clients, per_client, today):
+        obligation_types = [
+            ObligationType(name=name, code=name) for name in ('ΦΠΑ', 'ΑΠΔ', 'ΜΥΦ', 'Ε1', 'Ε3')
+        ]
+        obligations = []
+        for index in range(clients):
+            client = ClientProfile(
+                id=index + 1, afm=f'{index:09d}', eponimia=f'Πελάτης {index}',
+                email=f'client{index}@example.com'
+            )
+            for number in range(per_client):
+                obligation = MonthlyObligation(
+                    client=client,
+                    obligation_type=obligation_types[number % len(obligation_types)],
+                    year=today.year,
+                    month=today.month,
+                    deadline=today + timedelta(days=number % 7),
+                )
+                obligations.append(obligation)
+        return obligations
@@ -5,6 +5,9 @@ Management command to find and optionally clean up orphan files.
 Orphan files are files that exist in the media/clients folder but
 are not referenced by any ClientDocument in the database.
 
+Orphans are read from the persistent file index (ClientFileIndex), which
+is refreshed incrementally before the search unless --no-refresh is given.
+
 Usage:
     # Just list orphan files (dry run)
     python manage.py cleanup_orphan_files
@@ -21,8 +24,11 @@ Usage:
     # Export list to file
     python manage.py cleanup_orphan_files --output orphans.txt
 
+    # Use the index from the last refresh_file_index run
+    python manage.py cleanup_orphan_files --no-refresh
+
 Author: LogistikoCRM
-Version: 1.0
+Version: 1.1
 """
 
 import os
@@ -31,7 +37,8 @@ from datetime import datetime
 from django.core.management.base import BaseCommand, CommandError
 from django.conf import settings
 
-from accounting.models import ClientDocument
+from accounting.models import ClientFileIndex
+from accounting.services.file_index import orphan_files as orphan_files_index, refresh_file_index
 
 
 class Command(BaseCommand):
@@ -63,6 +70,17 @@ class Command(BaseCommand):
             type=int,
             help='Only process files older than N days',
         )
+        parser.add_argument(
+            '--no-refresh',
+            action='store_true',
+            help='Use the file index as is (skip the incremental rescan)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Parallel client folder scans (default: FILE_INDEX_WORKERS or 8)',
+        )
 
     def handle(self, *args, **options):
         delete_mode = options['delete']
@@ -75,53 +93,31 @@ class Command(BaseCommand):
         self.stdout.write(self.style.NOTICE('Αναζήτηση ορφανών αρχείων'))
         self.stdout.write(self.style.NOTICE('=' * 60))
 
-        # Get all file paths from database
-        db_files = set()
-        for doc in ClientDocument.objects.all():
-            if doc.file:
-                # Get relative path from MEDIA_ROOT
-                try:
-                    db_files.add(doc.file.path)
-                except (ValueError, AttributeError):
-                    pass
-
-        self.stdout.write(f'Αρχεία στη βάση: {len(db_files)}')
+        # Ευρετήριο αρχείων: σταδιακή ενημέρωση (μόνο οι αλλαγές γράφονται στη βάση)
+        if options['no_refresh']:
+            self.stdout.write('Χρήση του υπάρχοντος ευρετηρίου αρχείων (--no-refresh)')
+        else:
+            stats = refresh_file_index(workers=options['workers'])
+            self.stdout.write(
+                f"Ευρετήριο: {stats['files']} αρχεία σε {stats['folders']} φακέλους "
+                f"(+{stats['created']} ~{stats['updated']} -{stats['deleted']}) σε {stats['duration']}s"
+            )
 
-        # Scan clients folder
         clients_path = os.path.join(settings.MEDIA_ROOT, 'clients')
-        if not os.path.exists(clients_path):
-            self.stdout.write(self.style.WARNING(f'Ο φάκελος {clients_path} δεν υπάρχει'))
-            return
 
-        # Find all files in clients folder
+        # Ορφανά = εγγραφές ευρετηρίου χωρίς ClientDocument (ένα query)
         orphan_files = []
         total_size = 0
-        now = datetime.now()
-
-        for root, dirs, files in os.walk(clients_path):
-            for filename in files:
-                # Skip INFO.txt and other system files
-                if filename in ['INFO.txt', '.DS_Store', 'Thumbs.db']:
-                    continue
-
-                file_path = os.path.join(root, filename)
-
-                # Check age if specified
-                if older_than_days:
-                    file_mtime = datetime.fromtimestamp(os.path.getmtime(file_path))
-                    age_days = (now - file_mtime).days
-                    if age_days < older_than_days:
-                        continue
-
-                # Check if file is in database
-                if file_path not in db_files:
-                    file_size = os.path.getsize(file_path)
-                    total_size += file_size
-                    orphan_files.append({
-                        'path': file_path,
-                        'size': file_size,
-                        'mtime': datetime.fromtimestamp(os.path.getmtime(file_path)),
-                    })
+        for path, size, mtime in orphan_files_index(older_than_days).order_by('path').values_list(
+            'path', 'size', 'mtime'
+        ).iterator(chunk_size=2000):
+            total_size += size
+            orphan_files.append({
+                'path': os.path.join(settings.MEDIA_ROOT, *path.split('/')),
+                'index_path': path,
+                'size': size,
+                'mtime': datetime.fromtimestamp(mtime),
+            })
 
         # Report findings
         if not orphan_files:
@@ -177,6 +173,7 @@ class Command(BaseCommand):
 
             deleted_count = 0
             deleted_size = 0
+            deleted_paths = []
             errors = []
 
             for orphan in orphan_files:
@@ -184,13 +181,20 @@ class Command(BaseCommand):
                     os.remove(orphan['path'])
                     deleted_count += 1
                     deleted_size += orphan['size']
+                    deleted_paths.append(orphan['index_path'])
 
                     if verbose:
                         self.stdout.write(f'Διαγράφηκε: {orphan["path"]}')
 
+                except FileNotFoundError:
+                    # Ήδη διαγραμμένο - απλώς φεύγει από το ευρετήριο
+                    deleted_paths.append(orphan['index_path'])
                 except Exception as e:
                     errors.append((orphan['path'], str(e)))
 
+            for start in range(0, len(deleted_paths), 500):
+                ClientFileIndex.objects.filter(path__in=deleted_paths[start:start + 500]).delete()
+
             self.stdout.write('')
             self.stdout.write(self.style.SUCCESS(
                 f'Διαγράφηκαν {deleted_count} αρχεία ({self._format_size(deleted_size)})'
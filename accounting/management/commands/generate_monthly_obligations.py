@@ -1,17 +1,23 @@
 """
 Generate Monthly Obligations - Professional Management Command
 Author: ddiplas
-Version: 3.0 TURBO
-Features: Progress bar, dry-run, email notifications, detailed logging
+Version: 3.1 TURBO
+Features: Progress bar, dry-run, email notifications, detailed logging,
+          set-based bulk mode (--bulk) with multi-month ranges (--from/--to)
 """
 
 import sys
+import time
 from django.core.management.base import BaseCommand, CommandError
 from django.utils import timezone
 from django.db import transaction
+from django.db.models import Q
 from django.core.mail import send_mail
 from django.conf import settings
 from accounting.models import ClientObligation, MonthlyObligation, ClientProfile
+from accounting.services.notification_feed import sync_obligation_notifications
+from accounting.services.search_index import index_search_documents
+from accounting.utils.stats_cache import invalidate_stats_cache
 from datetime import datetime, timedelta
 from collections import defaultdict
 import logging
@@ -29,6 +35,7 @@ class Command(BaseCommand):
         self.skipped_obligations = []
         self.errors = []
         self.stats = defaultdict(int)
+        self.timings = {}
     
     def add_arguments(self, parser):
         """Enhanced arguments με περισσότερες επιλογές"""
@@ -42,6 +49,29 @@ class Command(BaseCommand):
             type=int,
             help='Μήνας (default: επόμενος μήνας)'
         )
+        parser.add_argument(
+            '--from',
+            dest='period_from',
+            type=str,
+            help='Αρχή εύρους μηνών YYYY-MM (ενεργοποιεί --bulk)'
+        )
+        parser.add_argument(
+            '--to',
+            dest='period_to',
+            type=str,
+            help='Τέλος εύρους μηνών YYYY-MM (default: ίδιο με --from)'
+        )
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            help='⚡ Set-based δημιουργία (ένα query ανά φάση αντί για ένα ανά υποχρέωση)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Μέγεθος chunk για bulk_create/bulk_update (default: 1000)'
+        )
         parser.add_argument(
             '--dry-run',
             action='store_true',
@@ -88,7 +118,10 @@ class Command(BaseCommand):
                 if self.dry_run:
                     self.stdout.write(self.style.WARNING('\n🧪 DRY-RUN MODE - Δεν θα γίνουν αλλαγές!\n'))
                 
-                self.process_obligations()
+                if self.bulk:
+                    self.process_obligations_bulk()
+                else:
+                    self.process_obligations()
                 
                 if self.dry_run:
                     transaction.set_rollback(True)
@@ -130,6 +163,26 @@ class Command(BaseCommand):
         # Validate month
         if not 1 <= self.month <= 12:
             raise CommandError(f'❌ Μη έγκυρος μήνας: {self.month}')
+
+        # Month range (--from/--to) - always processed in bulk mode
+        period_from = kwargs.get('period_from')
+        period_to = kwargs.get('period_to')
+        if period_to and not period_from:
+            raise CommandError('❌ Το --to απαιτεί και --from')
+        if period_from:
+            start = self.parse_period(period_from)
+            end = self.parse_period(period_to) if period_to else start
+            if end < start:
+                raise CommandError(f'❌ Μη έγκυρο εύρος: {period_from} > {period_to}')
+            self.periods = self.expand_periods(start, end)
+            self.year, self.month = start
+        else:
+            self.periods = [(self.year, self.month)]
+
+        self.bulk = kwargs.get('bulk', False) or bool(period_from)
+        self.batch_size = kwargs.get('batch_size') or 1000
+        if self.batch_size < 1:
+            raise CommandError(f'❌ Μη έγκυρο batch size: {self.batch_size}')
         
         # Other options
         self.dry_run = kwargs.get('dry_run', False)
@@ -138,6 +191,45 @@ class Command(BaseCommand):
         self.force = kwargs.get('force', False)
         self.quiet = kwargs.get('quiet', False)
         self.verbose = kwargs.get('verbose', False)
+
+    @staticmethod
+    def parse_period(value):
+        """Parse 'YYYY-MM' σε (year, month)"""
+        try:
+            year, month = (int(part) for part in value.split('-'))
+        except (ValueError, AttributeError):
+            raise CommandError(f'❌ Μη έγκυρη περίοδος: {value} (αναμένεται YYYY-MM)')
+        if not 1 <= month <= 12:
+            raise CommandError(f'❌ Μη έγκυρος μήνας: {value}')
+        return year, month
+
+    @staticmethod
+    def expand_periods(start, end):
+        """Λίστα (year, month) από start έως end (inclusive)"""
+        periods = []
+        year, month = start
+        while (year, month) <= end:
+            periods.append((year, month))
+            month += 1
+            if month > 12:
+                month = 1
+                year += 1
+        return periods
+
+    def period_filter(self):
+        """Q filter για όλους τους μήνες που επεξεργάζεται η εκτέλεση"""
+        query = Q()
+        for year, month in self.periods:
+            query |= Q(year=year, month=month)
+        return query
+
+    def period_label(self):
+        """Ετικέτα περιόδου για μηνύματα (π.χ. 3/2026 ή 1/2026 - 12/2026)"""
+        first_year, first_month = self.periods[0]
+        last_year, last_month = self.periods[-1]
+        if len(self.periods) == 1:
+            return f'{first_month}/{first_year}'
+        return f'{first_month}/{first_year} - {last_month}/{last_year}'
     
     def print_header(self):
         """Print beautiful header"""
@@ -152,7 +244,11 @@ class Command(BaseCommand):
                       'Μάιος', 'Ιούνιος', 'Ιούλιος', 'Αύγουστος', 'Σεπτέμβριος', 
                       'Οκτώβριος', 'Νοέμβριος', 'Δεκέμβριος']
         
-        self.stdout.write(f'\n📅 Περίοδος: {self.style.WARNING(f"{month_names[self.month]} {self.year}")}')
+        if len(self.periods) == 1:
+            period_display = f"{month_names[self.month]} {self.year}"
+        else:
+            period_display = f"{self.period_label()} ({len(self.periods)} μήνες)"
+        self.stdout.write(f'\n📅 Περίοδος: {self.style.WARNING(period_display)}')
         self.stdout.write(f'🕐 Εκτέλεση: {timezone.now().strftime("%d/%m/%Y %H:%M:%S")}')
         
         if self.client_afm:
@@ -169,7 +265,7 @@ class Command(BaseCommand):
             query = query.filter(client__afm=self.client_afm)
         
         client_obligations = query.select_related('client').prefetch_related(
-            'obligation_types', 'obligation_profiles__obligations'
+            'obligation_types', 'obligation_profiles__obligation_types'
         )
         
         total_clients = client_obligations.count()
@@ -263,6 +359,164 @@ class Command(BaseCommand):
                 self.errors.append(f'{client.eponimia} - {obligation_type.name}: {str(e)}')
                 logger.error(f"Error processing {client.afm}: {str(e)}")
     
+    def process_obligations_bulk(self):
+        """
+        Set-based δημιουργία υποχρεώσεων για όλους τους μήνες του εύρους.
+
+        Φάσεις:
+        1. load    - πελάτες + τύποι υποχρεώσεων (prefetch, σταθερός αριθμός queries)
+        2. resolve - υπολογισμός αναμενόμενων (client, type, year, month) στη μνήμη
+        3. diff    - ένα query για τις υπάρχουσες MonthlyObligation του εύρους
+        4. write   - chunked bulk_create (ignore_conflicts) / bulk_update (--force)
+        """
+        # Phase 1: load
+        started = time.perf_counter()
+        query = ClientObligation.objects.filter(is_active=True)
+
+        if self.client_afm:
+            query = query.filter(client__afm=self.client_afm)
+
+        client_obligations = list(
+            query.select_related('client').prefetch_related(
+                'obligation_types', 'obligation_profiles__obligation_types'
+            )
+        )
+        self.timings['load'] = time.perf_counter() - started
+
+        if not client_obligations:
+            self.stdout.write(self.style.WARNING('⚠️  Δεν βρέθηκαν ενεργοί πελάτες!'))
+            return
+
+        if not self.quiet:
+            self.stdout.write(
+                f'\n🔍 Βρέθηκαν {self.style.SUCCESS(str(len(client_obligations)))} πελάτες με υποχρεώσεις '
+                f'({len(self.periods)} μήνες)\n'
+            )
+
+        # Phase 2: resolve - deadline/applicability cached per (type, year, month)
+        started = time.perf_counter()
+        today = timezone.now().date()
+        deadlines = {}
+        expected = {}
+        type_names = {}
+
+        for client_obl in client_obligations:
+            client = client_obl.client
+            for obligation_type in client_obl.get_all_obligation_types():
+                type_names[obligation_type.id] = obligation_type.name
+                for year, month in self.periods:
+                    cache_key = (obligation_type.id, year, month)
+                    if cache_key not in deadlines:
+                        try:
+                            if obligation_type.applies_to_month(month):
+                                deadlines[cache_key] = obligation_type.get_deadline_for_month(year, month)
+                            else:
+                                deadlines[cache_key] = False
+                        except Exception as e:
+                            deadlines[cache_key] = e
+
+                    deadline = deadlines[cache_key]
+                    if deadline is False:
+                        continue
+                    if deadline is None or isinstance(deadline, Exception):
+                        reason = str(deadline) if deadline else 'No deadline'
+                        self.errors.append(f'{client.eponimia} - {obligation_type.name} ({month}/{year}): {reason}')
+                        continue
+
+                    expected[(client.id, obligation_type.id, year, month)] = deadline
+        self.timings['resolve'] = time.perf_counter() - started
+
+        # Phase 3: diff against existing rows in a single query
+        started = time.perf_counter()
+        existing_query = MonthlyObligation.objects.filter(self.period_filter())
+        if self.client_afm:
+            existing_query = existing_query.filter(client__afm=self.client_afm)
+
+        existing = {
+            (client_id, type_id, year, month): pk
+            for pk, client_id, type_id, year, month in existing_query.values_list(
+                'id', 'client_id', 'obligation_type_id', 'year', 'month'
+            ).iterator(chunk_size=self.batch_size)
+        }
+
+        to_create = []
+        to_update = []
+        for key, deadline in expected.items():
+            client_id, type_id, year, month = key
+            # Ίδιος κανόνας με MonthlyObligation.save()
+            status = 'overdue' if deadline < today else 'pending'
+
+            if key in existing:
+                self.stats['skipped'] += 1
+                if self.force:
+                    to_update.append(MonthlyObligation(
+                        id=existing[key],
+                        deadline=deadline,
+                        status=status,
+                        completed_date=None,
+                        completed_by=None,
+                    ))
+                continue
+
+            to_create.append(MonthlyObligation(
+                client_id=client_id,
+                obligation_type_id=type_id,
+                year=year,
+                month=month,
+                deadline=deadline,
+                status=status,
+                hourly_rate=50.00,  # Default rate
+            ))
+            self.stats['created'] += 1
+            self.stats[type_names[type_id]] += 1
+        self.timings['diff'] = time.perf_counter() - started
+
+        # Phase 4: chunked writes
+        started = time.perf_counter()
+        total_chunks = (
+            -(-len(to_create) // self.batch_size) +
+            -(-len(to_update) // self.batch_size)
+        )
+        written_chunks = 0
+
+        for offset in range(0, len(to_create), self.batch_size):
+            MonthlyObligation.objects.bulk_create(
+                to_create[offset:offset + self.batch_size],
+                ignore_conflicts=True,
+            )
+            written_chunks += 1
+            if not self.quiet:
+                self.show_progress(written_chunks, total_chunks, f'Δημιουργία: {min(offset + self.batch_size, len(to_create))}')
+
+        for offset in range(0, len(to_update), self.batch_size):
+            MonthlyObligation.objects.bulk_update(
+                to_update[offset:offset + self.batch_size],
+                ['deadline', 'status', 'completed_date', 'completed_by'],
+            )
+            written_chunks += 1
+            if not self.quiet:
+                self.show_progress(written_chunks, total_chunks, f'Ενημέρωση: {min(offset + self.batch_size, len(to_update))}')
+
+        if to_update:
+            self.stats['updated'] = len(to_update)
+        if to_create or to_update:
+            # bulk_create/bulk_update δεν στέλνουν signals
+            transaction.on_commit(invalidate_stats_cache)
+        created_ids = [
+            pk for pk, *key in existing_query.order_by().values_list(
+                'id', 'client_id', 'obligation_type_id', 'year', 'month'
+            ).iterator(chunk_size=self.batch_size)
+            if tuple(key) not in existing
+        ] if to_create else []
+        if created_ids:
+            index_search_documents('obligation', created_ids)
+        if created_ids or to_update:
+            sync_obligation_notifications(created_ids + [obligation.pk for obligation in to_update])
+        self.timings['write'] = time.perf_counter() - started
+
+        if written_chunks and not self.quiet:
+            self.stdout.write('\n')
+
     def show_progress(self, current, total, message=''):
         """Show progress bar"""
         bar_length = 40
@@ -277,6 +531,10 @@ class Command(BaseCommand):
         """Print detailed results"""
         if self.quiet:
             self.stdout.write(f'Created: {self.stats["created"]}, Skipped: {self.stats["skipped"]}')
+            if self.timings:
+                self.stdout.write('Timings: ' + ', '.join(
+                    f'{phase}={seconds:.3f}s' for phase, seconds in self.timings.items()
+                ))
             return
         
         self.stdout.write('\n')
@@ -288,6 +546,9 @@ class Command(BaseCommand):
         self.stdout.write(f'\n✅ Δημιουργήθηκαν: {self.style.SUCCESS(str(self.stats["created"]))} υποχρεώσεις')
         self.stdout.write(f'⏭️  Υπήρχαν ήδη: {self.style.WARNING(str(self.stats["skipped"]))}')
         
+        if self.stats['updated']:
+            self.stdout.write(f'🔄 Επαναφέρθηκαν (--force): {self.stats["updated"]}')
+
         if self.errors:
             self.stdout.write(f'❌ Σφάλματα: {self.style.ERROR(str(len(self.errors)))}')
             if self.verbose:
@@ -298,13 +559,19 @@ class Command(BaseCommand):
         if self.verbose and self.stats['created'] > 0:
             self.stdout.write('\n📈 Ανά τύπο υποχρέωσης:')
             for key, value in sorted(self.stats.items()):
-                if key not in ['created', 'skipped'] and value > 0:
+                if key not in ['created', 'skipped', 'updated'] and value > 0:
                     self.stdout.write(f'   • {key}: {value}')
+
+        # Per-phase timings (bulk mode)
+        if self.timings:
+            self.stdout.write('\n⏱️  Χρόνοι ανά φάση:')
+            for phase, seconds in self.timings.items():
+                self.stdout.write(f'   • {phase}: {seconds:.3f}s')
+            self.stdout.write(f'   • σύνολο: {sum(self.timings.values()):.3f}s')
         
         # Database statistics
         total_pending = MonthlyObligation.objects.filter(
-            year=self.year,
-            month=self.month,
+            self.period_filter(),
             status='pending'
         ).count()
         
@@ -313,7 +580,7 @@ class Command(BaseCommand):
             status='pending'
         ).count()
         
-        self.stdout.write(f'\n📊 Συνολική κατάσταση {self.month}/{self.year}:')
+        self.stdout.write(f'\n📊 Συνολική κατάσταση {self.period_label()}:')
         self.stdout.write(f'   • Εκκρεμούν: {total_pending}')
         
         if total_overdue > 0:
@@ -321,10 +588,9 @@ class Command(BaseCommand):
         
         # Upcoming deadlines
         upcoming = MonthlyObligation.objects.filter(
-            year=self.year,
-            month=self.month,
+            self.period_filter(),
             status='pending'
-        ).order_by('deadline')[:5]
+        ).select_related('client', 'obligation_type').order_by('deadline')[:5]
         
         if upcoming and self.verbose:
             self.stdout.write('\n📅 Προσεχείς προθεσμίες:')
@@ -361,12 +627,12 @@ class Command(BaseCommand):
             return
         
         try:
-            subject = f'[LogistikoCRM] Υποχρεώσεις {self.month}/{self.year} - Report'
+            subject = f'[LogistikoCRM] Υποχρεώσεις {self.period_label()} - Report'
             
             message = f"""
 Καλησπέρα,
 
-Ολοκληρώθηκε η δημιουργία υποχρεώσεων για {self.month}/{self.year}.
+Ολοκληρώθηκε η δημιουργία υποχρεώσεων για {self.period_label()}.
 
 ΑΠΟΤΕΛΕΣΜΑΤΑ:
 ==============
@@ -379,15 +645,14 @@ class Command(BaseCommand):
 """
             # Add type statistics
             for key, value in sorted(self.stats.items()):
-                if key not in ['created', 'skipped'] and value > 0:
+                if key not in ['created', 'skipped', 'updated'] and value > 0:
                     message += f"• {key}: {value}\n"
             
             # Add upcoming deadlines
             upcoming = MonthlyObligation.objects.filter(
-                year=self.year,
-                month=self.month,
+                self.period_filter(),
                 status='pending'
-            ).order_by('deadline')[:10]
+            ).select_related('client', 'obligation_type').order_by('deadline')[:10]
             
             if upcoming:
                 message += "\n\nΠΡΟΣΕΧΕΙΣ ΠΡΟΘΕΣΜΙΕΣ:\n"
@@ -420,10 +685,16 @@ LogistikoCRM System
     def log_results(self):
         """Log results to file"""
         logger.info(
-            f"Obligations generated for {self.month}/{self.year}: "
+            f"Obligations generated for {self.period_label()}: "
             f"Created={self.stats['created']}, Skipped={self.stats['skipped']}, "
             f"Errors={len(self.errors)}"
         )
+
+        if self.timings:
+            logger.info(
+                "Bulk generation timings: " +
+                ", ".join(f"{phase}={seconds:.3f}s" for phase, seconds in self.timings.items())
+            )
         
         if self.errors:
             for error in self.errors:
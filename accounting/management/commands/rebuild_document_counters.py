@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""
+accounting/management/commands/rebuild_document_counters.py
+Author: ddiplas
+Version: 1.0
+Description: Rebuild the per-folder document counters used by the file manager browse/stats
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounting.services.document_counters import rebuild_document_counters
+
+
+class Command(BaseCommand):
+    help = 'Rebuild DocumentFolderCounter (file manager browse/stats) from ClientDocument'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--client',
+            type=int,
+            action='append',
+            dest='client_ids',
+            help='Only this client id (repeatable)',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        total = rebuild_document_counters(client_ids=options['client_ids'])
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(f"Document counters rebuilt: {total} folders in {elapsed:.2f}s"))
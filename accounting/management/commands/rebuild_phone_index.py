@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""
+accounting/management/commands/rebuild_phone_index.py
+Author: ddiplas
+Version: 1.0
+Description: Rebuild the normalized phone index used for VoIP caller matching
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from accounting.phone_utils import rebuild_phone_index
+from accounting.models import ClientProfile
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the normalized phone number index (ClientPhoneIndex) from ClientProfile'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Rows per bulk insert (default: 2000)',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        total = rebuild_phone_index(batch_size=options['batch_size'])
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Phone index rebuilt: {total} numbers for {ClientProfile.objects.count()} clients "
+            f"in {elapsed:.2f}s"
+        ))
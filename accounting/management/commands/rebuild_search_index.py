@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""
+accounting/management/commands/rebuild_search_index.py
+Author: ddiplas
+Version: 1.0
+Description: Rebuild the global search index (SearchDocument) from clients, obligations, tickets and calls
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from accounting.services.search_index import SEARCH_KINDS, install_search_backend, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild SearchDocument (global search) from ClientProfile, MonthlyObligation, Ticket and VoIPCall'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--kind',
+            choices=SEARCH_KINDS,
+            action='append',
+            dest='kinds',
+            help='Only this kind (repeatable)',
+        )
+        parser.add_argument(
+            '--install-backend',
+            action='store_true',
+            help='(Re)create the SQLite FTS5 table / PostgreSQL trigram indexes first',
+        )
+
+    def handle(self, *args, **options):
+        if options['install_backend']:
+            installed = install_search_backend(connection)
+            self.stdout.write(f"Search backend ({connection.vendor}): {'ok' if installed else 'LIKE fallback'}")
+
+        started = time.perf_counter()
+        total = rebuild_search_index(kinds=options['kinds'])
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(f"Search index rebuilt: {total} documents in {elapsed:.2f}s"))
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+accounting/management/commands/refresh_file_index.py
+Author: ddiplas
+Version: 1.0
+Description: Incrementally refresh the client file index (ClientFileIndex) from MEDIA_ROOT/clients
+"""
+from django.core.management.base import BaseCommand
+
+from accounting.services.file_index import refresh_file_index
+
+
+class Command(BaseCommand):
+    help = 'Incrementally refresh the client file index (ClientFileIndex) with parallel os.scandir'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--folder',
+            action='append',
+            dest='folders',
+            help='Only this client folder, e.g. 123456789_Name (repeatable)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Parallel client folder scans (default: FILE_INDEX_WORKERS or 8)',
+        )
+        parser.add_argument(
+            '--hash',
+            action='store_true',
+            help='Compute SHA-256 for new and changed files',
+        )
+
+    def handle(self, *args, **options):
+        stats = refresh_file_index(
+            folders=options['folders'], workers=options['workers'], with_hash=options['hash']
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"File index refreshed: {stats['files']} files in {stats['folders']} folders "
+            f"(+{stats['created']} new, {stats['updated']} changed, {stats['deleted']} removed, "
+            f"{stats['hashed']} hashed) in {stats['duration']}s"
+        ))
+        if stats['errors']:
+            self.stdout.write(self.style.WARNING(f"{stats['errors']} errors - see the log"))
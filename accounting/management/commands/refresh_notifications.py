@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+"""
+accounting/management/commands/refresh_notifications.py
+Author: ddiplas
+Version: 1.0
+Description: Re-check the stored deadline notifications (ObligationNotification) against the obligations
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounting.services.notification_feed import refresh_notification_feed
+
+
+class Command(BaseCommand):
+    help = 'Re-check ObligationNotification (overdue / due today / upcoming) against MonthlyObligation'
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        written = refresh_notification_feed()
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(f"Notifications refreshed: {written} written in {elapsed:.2f}s"))
@@ -0,0 +1,84 @@
+# Generated migration for ClientPhoneIndex model
+# accounting/migrations/10007_clientphoneindex.py
+
+import re
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Αντίγραφο από accounting/phone_utils.py (όπως ήταν όταν γράφτηκε το migration)
+PHONE_FIELDS = [
+    'tilefono_oikias_1',
+    'tilefono_oikias_2',
+    'kinito_tilefono',
+    'tilefono_epixeirisis_1',
+    'tilefono_epixeirisis_2',
+]
+MIN_PHONE_LENGTH = 5
+BATCH_SIZE = 2000
+
+
+def normalize_phone(phone_number):
+    """Μόνο ψηφία, χωρίς κωδικό χώρας (+30/0030), τα τελευταία 10."""
+    if not phone_number:
+        return ''
+
+    digits = re.sub(r'\D', '', str(phone_number))
+    if not digits:
+        return ''
+
+    if digits.startswith('30') and len(digits) > 10:
+        digits = digits[2:]
+    elif digits.startswith('0030') and len(digits) > 12:
+        digits = digits[4:]
+
+    if len(digits) >= 10:
+        return digits[-10:]
+    return digits
+
+
+def populate_phone_index(apps, schema_editor):
+    """Αρχικό γέμισμα του ευρετηρίου από τα υπάρχοντα ClientProfile"""
+    ClientProfile = apps.get_model('accounting', 'ClientProfile')
+    ClientPhoneIndex = apps.get_model('accounting', 'ClientPhoneIndex')
+
+    entries = []
+    for row in ClientProfile.objects.values('id', *PHONE_FIELDS).iterator(chunk_size=BATCH_SIZE):
+        for field_name in PHONE_FIELDS:
+            normalized = normalize_phone(row[field_name])
+            if len(normalized) >= MIN_PHONE_LENGTH:
+                entries.append(ClientPhoneIndex(client_id=row['id'], field_name=field_name, phone=normalized))
+        if len(entries) >= BATCH_SIZE:
+            ClientPhoneIndex.objects.bulk_create(entries)
+            entries = []
+
+    if entries:
+        ClientPhoneIndex.objects.bulk_create(entries)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0028_unified_document_system'),
+        ('accounting', '10006_door_access_log'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClientPhoneIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field_name', models.CharField(max_length=50, verbose_name='Πεδίο')),
+                ('phone', models.CharField(max_length=20, verbose_name='Κανονικοποιημένο Τηλέφωνο')),
+                ('client', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='phone_index_entries', to='accounting.clientprofile', verbose_name='Πελάτης')),
+            ],
+            options={
+                'verbose_name': 'Ευρετήριο Τηλεφώνου',
+                'verbose_name_plural': 'Ευρετήριο Τηλεφώνων',
+                'unique_together': {('client', 'field_name')},
+                'indexes': [models.Index(fields=['phone'], name='phone_index_phone_idx')],
+            },
+        ),
+        migrations.RunPython(populate_phone_index, migrations.RunPython.noop),
+    ]
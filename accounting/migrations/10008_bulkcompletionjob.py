@@ -0,0 +1,46 @@
+# Generated migration for BulkCompletionJob model
+# accounting/migrations/10008_bulkcompletionjob.py
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('accounting', '10007_clientphoneindex'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BulkCompletionJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Σε αναμονή'), ('running', 'Σε εξέλιξη'), ('completed', 'Ολοκληρώθηκε'), ('failed', 'Αποτυχία')], db_index=True, default='pending', max_length=20, verbose_name='Κατάσταση')),
+                ('obligation_ids', models.JSONField(default=list, verbose_name='Υποχρεώσεις')),
+                ('staged_files', models.JSONField(blank=True, default=dict, verbose_name='Αρχεία Staging')),
+                ('staging_dir', models.CharField(blank=True, max_length=500, verbose_name='Φάκελος Staging')),
+                ('save_to_folders', models.BooleanField(default=True, verbose_name='Αποθήκευση σε Φακέλους')),
+                ('send_emails', models.BooleanField(default=False, verbose_name='Αποστολή Email')),
+                ('attach_to_emails', models.BooleanField(default=False, verbose_name='Επισύναψη στα Email')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Σύνολο')),
+                ('processed', models.PositiveIntegerField(default=0, verbose_name='Επεξεργάστηκαν')),
+                ('completed_count', models.PositiveIntegerField(default=0, verbose_name='Ολοκληρώθηκαν')),
+                ('results', models.JSONField(blank=True, default=list, verbose_name='Αποτελέσματα')),
+                ('email_results', models.JSONField(blank=True, default=dict, verbose_name='Αποτελέσματα Email')),
+                ('error_message', models.TextField(blank=True, verbose_name='Μήνυμα Σφάλματος')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Δημιουργήθηκε')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Έναρξη')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Λήξη')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bulk_completion_jobs', to=settings.AUTH_USER_MODEL, verbose_name='Χρήστης')),
+                ('template', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='accounting.emailtemplate', verbose_name='Πρότυπο')),
+            ],
+            options={
+                'verbose_name': 'Εργασία Μαζικής Ολοκλήρωσης',
+                'verbose_name_plural': 'Εργασίες Μαζικής Ολοκλήρωσης',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated migration for the ScheduledEmail 'sending' claim status
+# accounting/migrations/10009_scheduledemail_sending_status.py
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '10008_bulkcompletionjob'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='scheduledemail',
+            name='status',
+            field=models.CharField(choices=[('pending', '⏳ Εκκρεμεί'), ('sending', '📤 Σε αποστολή'), ('sent', '✅ Στάλθηκε'), ('failed', '❌ Απέτυχε'), ('cancelled', '🚫 Ακυρώθηκε')], default='pending', max_length=20, verbose_name='Κατάσταση'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated migration for ClientImportJob model
+# accounting/migrations/10010_clientimportjob.py
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('accounting', '10009_scheduledemail_sending_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClientImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Σε αναμονή'), ('running', 'Σε εξέλιξη'), ('completed', 'Ολοκληρώθηκε'), ('failed', 'Αποτυχία')], db_index=True, default='pending', max_length=20, verbose_name='Κατάσταση')),
+                ('mode', models.CharField(choices=[('skip', 'Παράλειψη υπαρχόντων'), ('update', 'Ενημέρωση υπαρχόντων'), ('update_only', 'Μόνο ενημέρωση υπαρχόντων')], default='skip', max_length=20, verbose_name='Λειτουργία')),
+                ('original_filename', models.CharField(blank=True, max_length=255, verbose_name='Αρχείο')),
+                ('staged_path', models.CharField(blank=True, max_length=500, verbose_name='Αρχείο Staging')),
+                ('total_rows', models.PositiveIntegerField(default=0, verbose_name='Γραμμές')),
+                ('processed', models.PositiveIntegerField(default=0, verbose_name='Επεξεργάστηκαν')),
+                ('created_count', models.PositiveIntegerField(default=0, verbose_name='Νέοι')),
+                ('updated_count', models.PositiveIntegerField(default=0, verbose_name='Ενημερώθηκαν')),
+                ('skipped_count', models.PositiveIntegerField(default=0, verbose_name='Παραλείφθηκαν')),
+                ('error_count', models.PositiveIntegerField(default=0, verbose_name='Σφάλματα')),
+                ('report', models.JSONField(blank=True, default=list, verbose_name='Αναφορά Γραμμών')),
+                ('error_message', models.TextField(blank=True, verbose_name='Μήνυμα Σφάλματος')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Δημιουργήθηκε')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Έναρξη')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Λήξη')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='client_import_jobs', to=settings.AUTH_USER_MODEL, verbose_name='Χρήστης')),
+            ],
+            options={
+                'verbose_name': 'Εργασία Εισαγωγής Πελατών',
+                'verbose_name_plural': 'Εργασίες Εισαγωγής Πελατών',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
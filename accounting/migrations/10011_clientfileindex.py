@@ -0,0 +1,30 @@
+# Generated migration for ClientFileIndex model
+# accounting/migrations/10011_clientfileindex.py
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '10010_clientimportjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClientFileIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=500, unique=True, verbose_name='Διαδρομή')),
+                ('client_folder', models.CharField(db_index=True, max_length=255, verbose_name='Φάκελος Πελάτη')),
+                ('size', models.BigIntegerField(default=0, verbose_name='Μέγεθος (bytes)')),
+                ('mtime', models.FloatField(verbose_name='Τελευταία Τροποποίηση')),
+                ('sha256', models.CharField(blank=True, max_length=64, verbose_name='SHA-256')),
+                ('indexed_at', models.DateTimeField(auto_now=True, verbose_name='Ενημέρωση Ευρετηρίου')),
+            ],
+            options={
+                'verbose_name': 'Ευρετήριο Αρχείου',
+                'verbose_name_plural': 'Ευρετήριο Αρχείων',
+            },
+        ),
+    ]
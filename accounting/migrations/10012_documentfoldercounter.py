@@ -0,0 +1,58 @@
+# Generated migration for DocumentFolderCounter model
+# accounting/migrations/10012_documentfoldercounter.py
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+import django.db.models.deletion
+
+
+def populate_counters(apps, schema_editor):
+    """Αρχικοί μετρητές από τα υπάρχοντα τρέχοντα έγγραφα."""
+    ClientDocument = apps.get_model('accounting', 'ClientDocument')
+    DocumentFolderCounter = apps.get_model('accounting', 'DocumentFolderCounter')
+
+    rows = ClientDocument.objects.filter(is_current=True).values(
+        'client_id', 'year', 'month', 'document_category', 'file_type'
+    ).annotate(count=Count('id'), size=Sum('file_size')).order_by()
+
+    DocumentFolderCounter.objects.bulk_create(
+        (
+            DocumentFolderCounter(
+                client_id=row['client_id'], year=row['year'], month=row['month'],
+                document_category=row['document_category'], file_type=row['file_type'],
+                document_count=row['count'], total_size=row['size'] or 0,
+            )
+            for row in rows.iterator()
+        ),
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '10011_clientfileindex'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentFolderCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveIntegerField(verbose_name='Έτος')),
+                ('month', models.PositiveIntegerField(verbose_name='Μήνας')),
+                ('document_category', models.CharField(max_length=20, verbose_name='Κατηγορία')),
+                ('file_type', models.CharField(blank=True, max_length=50, verbose_name='Τύπος')),
+                ('document_count', models.PositiveIntegerField(default=0, verbose_name='Έγγραφα')),
+                ('total_size', models.BigIntegerField(default=0, verbose_name='Μέγεθος (bytes)')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Ενημερώθηκε')),
+                ('client', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='document_counters', to='accounting.clientprofile', verbose_name='Πελάτης')),
+            ],
+            options={
+                'verbose_name': 'Μετρητής Φακέλου Εγγράφων',
+                'verbose_name_plural': 'Μετρητές Φακέλων Εγγράφων',
+                'unique_together': {('client', 'year', 'month', 'document_category', 'file_type')},
+            },
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,206 @@
+# Generated migration for SearchDocument model
+# accounting/migrations/10013_searchdocument.py
+
+import logging
+import re
+import unicodedata
+from datetime import datetime, time
+
+from django.db import migrations, models, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Αντίγραφο από accounting/services/search_index.py και accounting/phone_utils.py
+# (όπως ήταν όταν γράφτηκε το migration)
+SEARCH_TABLE = 'accounting_searchdocument'
+FTS_TABLE = 'accounting_searchdocument_fts'
+BATCH_SIZE = 2000
+PHONE_FIELDS = (
+    'tilefono_oikias_1', 'tilefono_oikias_2', 'kinito_tilefono', 'tilefono_epixeirisis_1', 'tilefono_epixeirisis_2',
+)
+
+SQLITE_FTS_SQL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"text, content='{SEARCH_TABLE}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_ai AFTER INSERT ON {SEARCH_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text); END",
+    f"CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_ad AFTER DELETE ON {SEARCH_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) VALUES ('delete', old.id, old.text); END",
+    f"CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_au AFTER UPDATE ON {SEARCH_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) VALUES ('delete', old.id, old.text); "
+    f"INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text); END",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+POSTGRES_TRGM_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_text_trgm ON {SEARCH_TABLE} USING gin (text gin_trgm_ops)",
+    f"CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_digits_trgm ON {SEARCH_TABLE} USING gin (digits gin_trgm_ops)",
+]
+
+_NON_WORD = re.compile(r'[^0-9A-ZΑ-Ω]+')
+
+
+def normalize_search_text(*values):
+    text = unicodedata.normalize('NFD', ' '.join(str(value) for value in values if value))
+    text = ''.join(char for char in text if not unicodedata.combining(char)).upper()
+    words = _NON_WORD.sub(' ', text).split()
+    return f" {' '.join(words)} " if words else ''
+
+
+def normalize_phone(digits):
+    if digits.startswith('30') and len(digits) > 10:
+        digits = digits[2:]
+    elif digits.startswith('0030') and len(digits) > 12:
+        digits = digits[4:]
+    return digits[-10:] if len(digits) >= 10 else digits
+
+
+def search_digits(*values):
+    numbers = []
+    for value in values:
+        digits = re.sub(r'\D', '', str(value or ''))
+        for number in (digits, normalize_phone(digits) if len(digits) > 10 else ''):
+            if number and number not in numbers:
+                numbers.append(number)
+    return f" {' '.join(numbers)} " if numbers else ''
+
+
+def _local_midnight(value):
+    return timezone.make_aware(datetime.combine(value, time.min)) if value else None
+
+
+def _client_fields(client):
+    return {
+        'client_id': client.id,
+        'title': client.eponimia,
+        'text': normalize_search_text(client.eponimia, client.onoma, client.afm, client.email),
+        'digits': search_digits(client.afm, *(getattr(client, name) for name in PHONE_FIELDS)),
+        'is_active': client.is_active,
+        'sort_at': None,
+    }
+
+
+def _obligation_fields(obligation):
+    client = obligation.client
+    obligation_type = obligation.obligation_type
+    return {
+        'client_id': obligation.client_id,
+        'title': f'{obligation_type.name} {obligation.month:02d}/{obligation.year}',
+        'text': normalize_search_text(
+            obligation_type.name, obligation_type.code, f'{obligation.month:02d}/{obligation.year}',
+            client.eponimia, client.afm, obligation.notes,
+        ),
+        'digits': search_digits(client.afm),
+        'is_active': True,
+        'sort_at': _local_midnight(obligation.deadline),
+    }
+
+
+def _ticket_fields(ticket):
+    client = ticket.client if ticket.client_id else None
+    phone = ticket.call.phone_number if ticket.call_id else ''
+    return {
+        'client_id': ticket.client_id,
+        'title': ticket.title,
+        'text': normalize_search_text(ticket.title, ticket.description, client.eponimia if client else '', phone),
+        'digits': search_digits(phone),
+        'is_active': True,
+        'sort_at': ticket.created_at,
+    }
+
+
+def _call_fields(call):
+    client = call.client if call.client_id else None
+    return {
+        'client_id': call.client_id,
+        'title': call.phone_number,
+        'text': normalize_search_text(call.phone_number, client.eponimia if client else '', call.notes),
+        'digits': search_digits(call.phone_number),
+        'is_active': True,
+        'sort_at': call.started_at,
+    }
+
+
+# kind -> (model name, select_related, πεδία εγγράφου)
+SOURCES = {
+    'client': ('ClientProfile', (), _client_fields),
+    'obligation': ('MonthlyObligation', ('client', 'obligation_type'), _obligation_fields),
+    'ticket': ('Ticket', ('client', 'call'), _ticket_fields),
+    'call': ('VoIPCall', ('client',), _call_fields),
+}
+
+
+def install_backend(apps, schema_editor):
+    """FTS5 (SQLite) / pg_trgm indexes (PostgreSQL) και αρχικό ευρετήριο."""
+    db_connection = schema_editor.connection
+    statements = {'sqlite': SQLITE_FTS_SQL, 'postgresql': POSTGRES_TRGM_SQL}.get(db_connection.vendor, [])
+    try:
+        with transaction.atomic(using=db_connection.alias):
+            with db_connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+    except Exception as e:
+        # Χωρίς FTS5/pg_trgm η αναζήτηση γίνεται με LIKE στον πίνακα
+        logger.warning(f"Search index backend not installed ({db_connection.vendor}): {e}")
+
+    SearchDocument = apps.get_model('accounting', 'SearchDocument')
+    for kind, (model_name, related, build_fields) in SOURCES.items():
+        queryset = apps.get_model('accounting', model_name).objects.order_by()
+        if related:
+            queryset = queryset.select_related(*related)
+        documents = []
+        for obj in queryset.iterator(chunk_size=BATCH_SIZE):
+            fields = build_fields(obj)
+            fields['title'] = normalize_search_text(fields['title']).strip()[:255]
+            fields['digits'] = fields['digits'][:255]
+            documents.append(SearchDocument(kind=kind, object_id=obj.pk, **fields))
+            if len(documents) >= BATCH_SIZE:
+                SearchDocument.objects.bulk_create(documents)
+                documents = []
+        SearchDocument.objects.bulk_create(documents)
+
+
+def uninstall_backend(apps, schema_editor):
+    db_connection = schema_editor.connection
+    if db_connection.vendor == 'sqlite':
+        statements = [f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_{suffix}" for suffix in ('ai', 'ad', 'au')]
+        statements.append(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    elif db_connection.vendor == 'postgresql':
+        statements = [f"DROP INDEX IF EXISTS {SEARCH_TABLE}_{name}_trgm" for name in ('text', 'digits')]
+    else:
+        return
+    with db_connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '10012_documentfoldercounter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('client', 'Πελάτης'), ('obligation', 'Υποχρέωση'), ('ticket', 'Ticket'), ('call', 'Κλήση')], max_length=20, verbose_name='Είδος')),
+                ('object_id', models.PositiveIntegerField(verbose_name='ID Εγγραφής')),
+                ('client_id', models.IntegerField(blank=True, db_index=True, null=True, verbose_name='ID Πελάτη')),
+                ('title', models.CharField(max_length=255, verbose_name='Τίτλος')),
+                ('text', models.TextField(verbose_name='Κείμενο')),
+                ('digits', models.CharField(blank=True, max_length=255, verbose_name='Αριθμοί')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Ενεργό')),
+                ('sort_at', models.DateTimeField(blank=True, null=True, verbose_name='Ταξινόμηση')),
+            ],
+            options={
+                'verbose_name': 'Έγγραφο Αναζήτησης',
+                'verbose_name_plural': 'Ευρετήριο Αναζήτησης',
+                'unique_together': {('kind', 'object_id')},
+            },
+        ),
+        migrations.RunPython(install_backend, uninstall_backend),
+    ]
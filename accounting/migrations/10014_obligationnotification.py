@@ -0,0 +1,102 @@
+# Generated migration for ObligationNotification / NotificationRead models
+# accounting/migrations/10014_obligationnotification.py
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+import django.db.models.deletion
+
+# Αντίγραφο από accounting/services/notification_feed.py (όπως ήταν όταν γράφτηκε το migration)
+NOTIFICATION_STATUSES = ('pending', 'overdue')
+UPCOMING_DAYS = 3
+BATCH_SIZE = 2000
+
+
+def notification_type(status, deadline, today):
+    if deadline < today:
+        return 'overdue'
+    if status != 'pending':
+        return None
+    if deadline == today:
+        return 'due_today'
+    return 'upcoming'
+
+
+def populate_notifications(apps, schema_editor):
+    """Αρχικές ειδοποιήσεις για τις εκκρεμείς υποχρεώσεις."""
+    MonthlyObligation = apps.get_model('accounting', 'MonthlyObligation')
+    ObligationNotification = apps.get_model('accounting', 'ObligationNotification')
+
+    today = timezone.localdate()
+    rows = MonthlyObligation.objects.filter(
+        status__in=NOTIFICATION_STATUSES,
+        deadline__isnull=False,
+        deadline__lte=today + timedelta(days=UPCOMING_DAYS),
+    ).order_by('id').values(
+        'id', 'status', 'deadline', 'client_id', 'client__eponimia', 'obligation_type__name'
+    )
+
+    notifications = []
+    for row in rows.iterator(chunk_size=BATCH_SIZE):
+        kind = notification_type(row['status'], row['deadline'], today)
+        if kind is None:
+            continue
+        notifications.append(ObligationNotification(
+            obligation_id=row['id'],
+            client_id=row['client_id'],
+            client_name=row['client__eponimia'] or '',
+            obligation_type_name=row['obligation_type__name'] or '',
+            notification_type=kind,
+            deadline=row['deadline'],
+        ))
+        if len(notifications) >= BATCH_SIZE:
+            ObligationNotification.objects.bulk_create(notifications)
+            notifications = []
+    ObligationNotification.objects.bulk_create(notifications)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '10013_searchdocument'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ObligationNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('obligation_id', models.PositiveIntegerField(unique=True, verbose_name='ID Υποχρέωσης')),
+                ('client_id', models.IntegerField(blank=True, db_index=True, null=True, verbose_name='ID Πελάτη')),
+                ('client_name', models.CharField(blank=True, max_length=200, verbose_name='Πελάτης')),
+                ('obligation_type_name', models.CharField(blank=True, max_length=100, verbose_name='Τύπος Υποχρέωσης')),
+                ('notification_type', models.CharField(choices=[('overdue', 'Καθυστερημένη'), ('due_today', 'Λήγει Σήμερα'), ('upcoming', 'Προσεχώς')], max_length=20, verbose_name='Είδος')),
+                ('deadline', models.DateField(verbose_name='Προθεσμία')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Ενεργή')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Ενημερώθηκε')),
+            ],
+            options={
+                'verbose_name': 'Ειδοποίηση Προθεσμίας',
+                'verbose_name_plural': 'Ειδοποιήσεις Προθεσμιών',
+                'indexes': [models.Index(fields=['is_active', 'notification_type', 'deadline'], name='notif_active_type_dl_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='NotificationRead',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('read_at', models.DateTimeField(auto_now_add=True, verbose_name='Διαβάστηκε')),
+                ('notification', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reads', to='accounting.obligationnotification', verbose_name='Ειδοποίηση')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notification_reads', to=settings.AUTH_USER_MODEL, verbose_name='Χρήστης')),
+            ],
+            options={
+                'verbose_name': 'Ανάγνωση Ειδοποίησης',
+                'verbose_name_plural': 'Αναγνώσεις Ειδοποιήσεων',
+                'unique_together': {('user', 'notification')},
+            },
+        ),
+        migrations.RunPython(populate_notifications, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated migration for OverdueTransitionRun model
+# accounting/migrations/10015_overduetransitionrun.py
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '10014_obligationnotification'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OverdueTransitionRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('run_date', models.DateField(unique=True, verbose_name='Ημερομηνία')),
+                ('transitioned', models.PositiveIntegerField(default=0, verbose_name='Υποχρεώσεις')),
+                ('chunks', models.PositiveIntegerField(default=0, verbose_name='Τμήματα')),
+                ('started_at', models.DateTimeField(verbose_name='Έναρξη')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Ολοκλήρωση')),
+            ],
+            options={
+                'verbose_name': 'Μετάβαση σε Εκπρόθεσμες',
+                'verbose_name_plural': 'Μεταβάσεις σε Εκπρόθεσμες',
+                'ordering': ['-run_date'],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated migration for the notification feed cursor overlap
+# accounting/migrations/10016_obligationnotification_updated_idx.py
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '10015_overduetransitionrun'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='obligationnotification',
+            index=models.Index(fields=['updated_at'], name='notif_updated_idx'),
+        ),
+    ]
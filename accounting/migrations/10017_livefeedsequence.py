@@ -0,0 +1,25 @@
+# Generated migration for LiveFeedSequence model
+# accounting/migrations/10017_livefeedsequence.py
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '10016_obligationnotification_updated_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LiveFeedSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.PositiveBigIntegerField(default=0, verbose_name='Τελευταίο seq')),
+            ],
+            options={
+                'verbose_name': 'Seq Live Feed',
+                'verbose_name_plural': 'Seq Live Feed',
+            },
+        ),
+    ]
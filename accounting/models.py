@@ -484,10 +484,9 @@ class MonthlyObligation(models.Model):
     def save(self, *args, **kwargs):
         if self.status == 'completed' and not self.completed_date:
             self.completed_date = timezone.now().date()
-        
-        if self.status != 'completed' and self.deadline < timezone.now().date():
-            self.status = 'overdue'
-        
+
+        # Η μετάβαση pending -> overdue γίνεται από το ημερήσιο
+        # mark_overdue_obligations_task, όχι σε κάθε save
         super().save(*args, **kwargs)
     
     # === Document Management Methods ===
@@ -628,9 +627,9 @@ class EmailTemplate(models.Model):
         Render template with context variables using Django Template syntax.
         Legacy method for backwards compatibility.
         """
-        from django.template import Template, Context
-        subject_template = Template(self.subject)
-        body_template = Template(self.body_html)
+        from django.template import Context
+        from accounting.utils.email_template_cache import get_compiled_template
+        subject_template, body_template = get_compiled_template(self)
 
         rendered_subject = subject_template.render(Context(context))
         rendered_body = body_template.render(Context(context))
@@ -664,27 +663,18 @@ class EmailTemplate(models.Model):
         Get the appropriate template for an obligation.
         First tries to find a template specific to the obligation type,
         then falls back to a default template.
-        """
-        # Try to find template specific to obligation type
-        template = cls.objects.filter(
-            is_active=True,
-            obligation_type=obligation.obligation_type
-        ).first()
 
-        if template:
-            return template
-
-        # Fall back to default template (name contains "Ολοκλήρωση" or is first active)
-        template = cls.objects.filter(
-            is_active=True,
-            name__icontains='Ολοκλήρωση'
-        ).first()
-
-        if template:
-            return template
+        Uses the cached lookup table (accounting.utils.email_template_cache),
+        so repeated calls do not hit the database.
+        """
+        from accounting.utils.email_template_cache import get_template_lookup
+        return get_template_lookup().for_obligation_type(obligation.obligation_type_id)
 
-        # Last resort: any active template
-        return cls.objects.filter(is_active=True).first()
+    @classmethod
+    def get_reminder_template(cls):
+        """Active template whose name contains 'reminder' (cached)."""
+        from accounting.utils.email_template_cache import get_template_lookup
+        return get_template_lookup().reminder
 
     @staticmethod
     def get_available_variables():
@@ -789,6 +779,152 @@ class EmailLog(models.Model):
         return f"{icons.get(self.status, '?')} {self.get_status_display()}"
 
 
+class BulkCompletionJob(models.Model):
+    """
+    Εργασία μαζικής ολοκλήρωσης υποχρεώσεων με έγγραφα.
+    Το request αποθηκεύει προσωρινά (staging) τα αρχεία και η επεξεργασία
+    (έγγραφα, κατάσταση, emails) γίνεται από Celery task.
+    """
+
+    STATUS_CHOICES = [
+        ('pending', 'Σε αναμονή'),
+        ('running', 'Σε εξέλιξη'),
+        ('completed', 'Ολοκληρώθηκε'),
+        ('failed', 'Αποτυχία'),
+    ]
+
+    status = models.CharField(
+        'Κατάσταση',
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pending',
+        db_index=True
+    )
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='bulk_completion_jobs',
+        verbose_name='Χρήστης'
+    )
+
+    obligation_ids = models.JSONField('Υποχρεώσεις', default=list)
+    # {obligation_id: όνομα αρχείου στον φάκελο staging}
+    staged_files = models.JSONField('Αρχεία Staging', default=dict, blank=True)
+    staging_dir = models.CharField('Φάκελος Staging', max_length=500, blank=True)
+
+    save_to_folders = models.BooleanField('Αποθήκευση σε Φακέλους', default=True)
+    send_emails = models.BooleanField('Αποστολή Email', default=False)
+    attach_to_emails = models.BooleanField('Επισύναψη στα Email', default=False)
+    template = models.ForeignKey(
+        EmailTemplate,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name='Πρότυπο'
+    )
+
+    total = models.PositiveIntegerField('Σύνολο', default=0)
+    processed = models.PositiveIntegerField('Επεξεργάστηκαν', default=0)
+    completed_count = models.PositiveIntegerField('Ολοκληρώθηκαν', default=0)
+    results = models.JSONField('Αποτελέσματα', default=list, blank=True)
+    email_results = models.JSONField('Αποτελέσματα Email', default=dict, blank=True)
+    error_message = models.TextField('Μήνυμα Σφάλματος', blank=True)
+
+    created_at = models.DateTimeField('Δημιουργήθηκε', auto_now_add=True)
+    started_at = models.DateTimeField('Έναρξη', null=True, blank=True)
+    finished_at = models.DateTimeField('Λήξη', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Εργασία Μαζικής Ολοκλήρωσης'
+        verbose_name_plural = 'Εργασίες Μαζικής Ολοκλήρωσης'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"#{self.pk} {self.get_status_display()} ({self.processed}/{self.total})"
+
+    @property
+    def is_finished(self):
+        return self.status in ('completed', 'failed')
+
+    @property
+    def progress(self):
+        """Ποσοστό προόδου (0-100)"""
+        if not self.total:
+            return 100 if self.is_finished else 0
+        return int(self.processed * 100 / self.total)
+
+
+class ClientImportJob(models.Model):
+    """
+    Εργασία εισαγωγής πελατών από Excel.
+    Το request αποθηκεύει προσωρινά (staging) το αρχείο και η εισαγωγή
+    (ανάγνωση, έλεγχοι, upsert ανά batch) γίνεται από Celery task.
+    """
+
+    STATUS_CHOICES = BulkCompletionJob.STATUS_CHOICES
+
+    MODE_CHOICES = [
+        ('skip', 'Παράλειψη υπαρχόντων'),
+        ('update', 'Ενημέρωση υπαρχόντων'),
+        ('update_only', 'Μόνο ενημέρωση υπαρχόντων'),
+    ]
+
+    status = models.CharField(
+        'Κατάσταση',
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pending',
+        db_index=True
+    )
+    mode = models.CharField('Λειτουργία', max_length=20, choices=MODE_CHOICES, default='skip')
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='client_import_jobs',
+        verbose_name='Χρήστης'
+    )
+
+    original_filename = models.CharField('Αρχείο', max_length=255, blank=True)
+    staged_path = models.CharField('Αρχείο Staging', max_length=500, blank=True)
+
+    total_rows = models.PositiveIntegerField('Γραμμές', default=0)
+    processed = models.PositiveIntegerField('Επεξεργάστηκαν', default=0)
+    created_count = models.PositiveIntegerField('Νέοι', default=0)
+    updated_count = models.PositiveIntegerField('Ενημερώθηκαν', default=0)
+    skipped_count = models.PositiveIntegerField('Παραλείφθηκαν', default=0)
+    error_count = models.PositiveIntegerField('Σφάλματα', default=0)
+    # [{row, afm, level: 'error'|'warning', messages: [...]}]
+    report = models.JSONField('Αναφορά Γραμμών', default=list, blank=True)
+    error_message = models.TextField('Μήνυμα Σφάλματος', blank=True)
+
+    created_at = models.DateTimeField('Δημιουργήθηκε', auto_now_add=True)
+    started_at = models.DateTimeField('Έναρξη', null=True, blank=True)
+    finished_at = models.DateTimeField('Λήξη', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Εργασία Εισαγωγής Πελατών'
+        verbose_name_plural = 'Εργασίες Εισαγωγής Πελατών'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"#{self.pk} {self.original_filename} - {self.get_status_display()}"
+
+    @property
+    def is_finished(self):
+        return self.status in ('completed', 'failed')
+
+    @property
+    def progress(self):
+        """Ποσοστό προόδου (0-100)"""
+        if not self.total_rows:
+            return 100 if self.is_finished else 0
+        return min(100, int(self.processed * 100 / self.total_rows))
+
+
 class EmailAutomationRule(models.Model):
     """Κανόνες Αυτοματοποίησης Email"""
     
@@ -856,6 +992,7 @@ class ScheduledEmail(models.Model):
 
     STATUS_CHOICES = (
         ('pending', '⏳ Εκκρεμεί'),
+        ('sending', '📤 Σε αποστολή'),
         ('sent', '✅ Στάλθηκε'),
         ('failed', '❌ Απέτυχε'),
         ('cancelled', '🚫 Ακυρώθηκε'),
@@ -1413,6 +1550,35 @@ class VoIPCallLog(models.Model):
         return f"{self.call.phone_number} - {self.get_action_display()}"
 
 
+class ClientPhoneIndex(models.Model):
+    """
+    Κανονικοποιημένα τηλέφωνα πελατών για αντιστοίχιση κλήσεων VoIP.
+
+    Μία εγγραφή ανά (πελάτης, πεδίο τηλεφώνου). Ενημερώνεται από signal στο
+    save του ClientProfile και ξαναχτίζεται με `manage.py rebuild_phone_index`.
+    """
+
+    client = models.ForeignKey(
+        ClientProfile,
+        on_delete=models.CASCADE,
+        related_name='phone_index_entries',
+        verbose_name='Πελάτης'
+    )
+    field_name = models.CharField('Πεδίο', max_length=50)
+    phone = models.CharField('Κανονικοποιημένο Τηλέφωνο', max_length=20)
+
+    class Meta:
+        verbose_name = 'Ευρετήριο Τηλεφώνου'
+        verbose_name_plural = 'Ευρετήριο Τηλεφώνων'
+        unique_together = ['client', 'field_name']
+        indexes = [
+            models.Index(fields=['phone'], name='phone_index_phone_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.phone} → {self.client_id}"
+
+
 class Ticket(models.Model):
     """Αυτόματα δημιουργούμενα tickets από missed calls"""
     
@@ -1850,9 +2016,11 @@ class ClientDocument(models.Model):
         if self.obligation and self.document_category == 'general':
             self.document_category = self._get_category_from_obligation()
 
-        # Ensure folders exist
+        # INFO.txt του πελάτη με το πρώτο έγγραφο - ο φάκελος του αρχείου
+        # δημιουργείται από το storage κατά την αποθήκευση
         if self.client and not self.pk:  # Only on create
-            self._ensure_folders_exist()
+            from accounting.services.folder_provisioning import ensure_client_info
+            ensure_client_info(self.client)
 
         super().save(*args, **kwargs)
 
@@ -1877,21 +2045,6 @@ class ClientDocument(models.Model):
                 return cat
         return 'general'
 
-    def _ensure_folders_exist(self):
-        """Δημιουργία φακέλων αν δεν υπάρχουν"""
-        try:
-            client_path = os.path.join(
-                settings.MEDIA_ROOT,
-                get_client_folder(self.client)
-            )
-            year_path = os.path.join(client_path, str(self.year))
-            month_path = os.path.join(year_path, f"{self.month:02d}")
-
-            for category, _ in self.CATEGORY_CHOICES:
-                os.makedirs(os.path.join(month_path, category), exist_ok=True)
-        except Exception:
-            pass  # Fail silently - Django will create on upload
-
     @classmethod
     def check_existing(cls, client, obligation=None, category=None):
         """
@@ -1980,116 +2133,226 @@ class ClientDocument(models.Model):
         return None
 
 
-# Signals for auto-folder creation
-from django.db.models.signals import post_save
-from django.dispatch import receiver
+class ClientFileIndex(models.Model):
+    """
+    Ευρετήριο αρχείων του MEDIA_ROOT/clients (path, μέγεθος, mtime, hash).
 
-@receiver(post_save, sender=ClientProfile)
-def create_client_folders(sender, instance, created, **kwargs):
+    Ενημερώνεται σταδιακά με `manage.py refresh_file_index` (os.scandir
+    παράλληλα ανά φάκελο πελάτη). Τα ορφανά αρχεία και τα στατιστικά χώρου
+    διαβάζονται από εδώ αντί από τον δίσκο - βλ. accounting/services/file_index.py
     """
-    Auto-create folder structure για νέους πελάτες.
 
-    Χρησιμοποιεί τις ρυθμίσεις από FilingSystemSettings για:
-    - Τοποθεσία (local ή network)
-    - Μόνιμο φάκελο (00_ΜΟΝΙΜΑ)
-    - Κατηγορίες φακέλων
+    path = models.CharField('Διαδρομή', max_length=500, unique=True)
+    client_folder = models.CharField('Φάκελος Πελάτη', max_length=255, db_index=True)
+    size = models.BigIntegerField('Μέγεθος (bytes)', default=0)
+    mtime = models.FloatField('Τελευταία Τροποποίηση')
+    sha256 = models.CharField('SHA-256', max_length=64, blank=True)
+    indexed_at = models.DateTimeField('Ενημέρωση Ευρετηρίου', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Ευρετήριο Αρχείου'
+        verbose_name_plural = 'Ευρετήριο Αρχείων'
+
+    def __str__(self):
+        return self.path
+
+
+class DocumentFolderCounter(models.Model):
     """
-    if not created:
-        return
+    Μετρητές τρεχόντων εγγράφων ανά (πελάτης, έτος, μήνας, κατηγορία, τύπος).
 
-    # Λήψη ρυθμίσεων αρχειοθέτησης
-    try:
-        from settings.models import FilingSystemSettings
-        filing_settings = FilingSystemSettings.get_settings()
-        archive_root = filing_settings.get_archive_root()
-    except Exception:
-        archive_root = str(settings.MEDIA_ROOT)
-        filing_settings = None
+    Ενημερώνονται από τα signals του ClientDocument (F() increments) και
+    ξαναχτίζονται με `manage.py rebuild_document_counters`. Το browse και τα
+    στατιστικά του file manager διαβάζουν από εδώ αντί για Count() στα έγγραφα
+    - βλ. accounting/services/document_counters.py
+    """
 
-    base_path = os.path.join(archive_root, get_client_folder(instance))
+    client = models.ForeignKey(
+        ClientProfile,
+        on_delete=models.CASCADE,
+        related_name='document_counters',
+        verbose_name='Πελάτης'
+    )
+    year = models.PositiveIntegerField('Έτος')
+    month = models.PositiveIntegerField('Μήνας')
+    document_category = models.CharField('Κατηγορία', max_length=20)
+    file_type = models.CharField('Τύπος', max_length=50, blank=True)
+    document_count = models.PositiveIntegerField('Έγγραφα', default=0)
+    total_size = models.BigIntegerField('Μέγεθος (bytes)', default=0)
+    updated_at = models.DateTimeField('Ενημερώθηκε', auto_now=True)
 
-    try:
-        # === ΜΟΝΙΜΟΣ ΦΑΚΕΛΟΣ (00_ΜΟΝΙΜΑ) ===
-        if filing_settings and filing_settings.enable_permanent_folder:
-            permanent_path = os.path.join(base_path, filing_settings.permanent_folder_name)
-            for category in filing_settings.get_permanent_folder_categories():
-                os.makedirs(os.path.join(permanent_path, category), exist_ok=True)
-        else:
-            # Fallback - δημιουργία βασικών φακέλων
-            for category in ['contracts', 'registration', 'licenses']:
-                os.makedirs(os.path.join(base_path, '00_ΜΟΝΙΜΑ', category), exist_ok=True)
-
-        # === ΤΡΕΧΟΝ ΕΤΟΣ ===
-        current_year = datetime.now().year
-        year_path = os.path.join(base_path, str(current_year))
-
-        # Δημιουργία μηνιαίων φακέλων για τρέχον έτος
-        monthly_categories = (
-            filing_settings.get_monthly_folder_categories()
-            if filing_settings else
-            ['vat', 'apd', 'myf', 'payroll', 'invoices_issued', 'invoices_received', 'bank', 'general']
-        )
+    class Meta:
+        verbose_name = 'Μετρητής Φακέλου Εγγράφων'
+        verbose_name_plural = 'Μετρητές Φακέλων Εγγράφων'
+        unique_together = ['client', 'year', 'month', 'document_category', 'file_type']
 
-        for month in range(1, 13):
-            if filing_settings and filing_settings.use_greek_month_names:
-                month_name = filing_settings.get_month_folder_name(month)
-            else:
-                month_name = f"{month:02d}"
+    def __str__(self):
+        return f"{self.client_id} {self.year}/{self.month:02d} {self.document_category}: {self.document_count}"
 
-            month_path = os.path.join(year_path, month_name)
-            for category in monthly_categories:
-                os.makedirs(os.path.join(month_path, category), exist_ok=True)
 
-        # === ΕΤΗΣΙΟΣ ΦΑΚΕΛΟΣ (13_ΕΤΗΣΙΑ) ===
-        if filing_settings and filing_settings.enable_yearend_folder:
-            yearend_path = os.path.join(year_path, filing_settings.yearend_folder_name)
-            for category in filing_settings.get_yearend_folder_categories():
-                os.makedirs(os.path.join(yearend_path, category), exist_ok=True)
-        else:
-            # Fallback
-            yearend_path = os.path.join(year_path, '13_ΕΤΗΣΙΑ')
-            for category in ['e1', 'e2', 'e3', 'enfia', 'balance']:
-                os.makedirs(os.path.join(yearend_path, category), exist_ok=True)
-
-        # === INFO.txt ===
-        readme_path = os.path.join(base_path, 'INFO.txt')
-        with open(readme_path, 'w', encoding='utf-8') as f:
-            f.write(f"ΦΑΚΕΛΟΣ ΠΕΛΑΤΗ\n")
-            f.write(f"{'=' * 50}\n\n")
-            f.write(f"Επωνυμία: {instance.eponimia}\n")
-            f.write(f"ΑΦΜ: {instance.afm}\n")
-            f.write(f"ΔΟΥ: {instance.doy or '-'}\n")
-            f.write(f"Email: {instance.email or '-'}\n")
-            f.write(f"Τηλέφωνο: {instance.phone or '-'}\n")
-            f.write(f"\nΔημιουργία: {datetime.now().strftime('%d/%m/%Y %H:%M')}\n")
-            f.write(f"\n{'=' * 50}\n")
-            f.write(f"ΔΟΜΗ ΦΑΚΕΛΩΝ\n")
-            f.write(f"{'=' * 50}\n\n")
-            f.write(f"00_ΜΟΝΙΜΑ/      → Μόνιμα έγγραφα (συμβάσεις, καταστατικό)\n")
-            f.write(f"  ├─ registration/  → Ιδρυτικά έγγραφα\n")
-            f.write(f"  ├─ contracts/     → Συμβάσεις\n")
-            f.write(f"  └─ licenses/      → Άδειες & πιστοποιητικά\n\n")
-            f.write(f"YYYY/           → Φάκελος έτους\n")
-            f.write(f"  ├─ 01-12/         → Μηνιαίοι φάκελοι\n")
-            f.write(f"  │   ├─ vat/           → ΦΠΑ\n")
-            f.write(f"  │   ├─ apd/           → ΑΠΔ/ΕΦΚΑ\n")
-            f.write(f"  │   ├─ myf/           → ΜΥΦ\n")
-            f.write(f"  │   ├─ payroll/       → Μισθοδοσία\n")
-            f.write(f"  │   ├─ invoices_issued/  → Εκδοθέντα τιμολόγια\n")
-            f.write(f"  │   ├─ invoices_received/→ Ληφθέντα τιμολόγια\n")
-            f.write(f"  │   ├─ bank/          → Τραπεζικά\n")
-            f.write(f"  │   └─ general/       → Γενικά\n")
-            f.write(f"  └─ 13_ΕΤΗΣΙΑ/     → Ετήσιες δηλώσεις\n")
-            f.write(f"      ├─ e1/            → Ε1 Φόρος Εισοδήματος\n")
-            f.write(f"      ├─ e2/            → Ε2 Ακίνητα\n")
-            f.write(f"      ├─ e3/            → Ε3 Οικονομικά Στοιχεία\n")
-            f.write(f"      ├─ enfia/         → ΕΝΦΙΑ\n")
-            f.write(f"      └─ balance/       → Ισολογισμός\n")
-
-    except Exception as e:
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.error(f"Could not create folders for client {instance.afm}: {e}")
+class SearchDocument(models.Model):
+    """
+    Ευρετήριο της γενικής αναζήτησης: ένα έγγραφο ανά πελάτη, υποχρέωση,
+    ticket και κλήση, με κανονικοποιημένο κείμενο (κεφαλαία, χωρίς τόνους).
+
+    Ενημερώνεται από signals και ξαναχτίζεται με `manage.py rebuild_search_index`.
+    Στην PostgreSQL το `text` έχει GIN trigram index (pg_trgm), στην SQLite
+    πίνακα FTS5 - βλ. accounting/services/search_index.py
+    """
+
+    KIND_CHOICES = [
+        ('client', 'Πελάτης'),
+        ('obligation', 'Υποχρέωση'),
+        ('ticket', 'Ticket'),
+        ('call', 'Κλήση'),
+    ]
+
+    kind = models.CharField('Είδος', max_length=20, choices=KIND_CHOICES)
+    object_id = models.PositiveIntegerField('ID Εγγραφής')
+    client_id = models.IntegerField('ID Πελάτη', null=True, blank=True, db_index=True)
+    title = models.CharField('Τίτλος', max_length=255)
+    text = models.TextField('Κείμενο')
+    digits = models.CharField('Αριθμοί', max_length=255, blank=True)
+    is_active = models.BooleanField('Ενεργό', default=True)
+    sort_at = models.DateTimeField('Ταξινόμηση', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Έγγραφο Αναζήτησης'
+        verbose_name_plural = 'Ευρετήριο Αναζήτησης'
+        unique_together = ['kind', 'object_id']
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id}: {self.title}"
+
+
+class ObligationNotification(models.Model):
+    """
+    Ειδοποιήσεις προθεσμιών (καθυστερημένη / λήγει σήμερα / προσεχώς),
+    μία γραμμή ανά υποχρέωση.
+
+    Κάθε αλλαγή γράφει νέα γραμμή και σβήνει την προηγούμενη, ώστε το id να
+    λειτουργεί ως cursor (`id > since`, με επικάλυψη στο updated_at για
+    γραμμές που έγιναν commit αργότερα). Όταν μια υποχρέωση βγαίνει από τις
+    ειδοποιήσεις μένει γραμμή με is_active=False, για να την αφαιρέσουν οι
+    clients. Ενημερώνεται από τα signals της MonthlyObligation και από το
+    ημερήσιο refresh_notifications_task - βλ. accounting/services/notification_feed.py
+    """
+
+    TYPE_CHOICES = [
+        ('overdue', 'Καθυστερημένη'),
+        ('due_today', 'Λήγει Σήμερα'),
+        ('upcoming', 'Προσεχώς'),
+    ]
+
+    obligation_id = models.PositiveIntegerField('ID Υποχρέωσης', unique=True)
+    client_id = models.IntegerField('ID Πελάτη', null=True, blank=True, db_index=True)
+    client_name = models.CharField('Πελάτης', max_length=200, blank=True)
+    obligation_type_name = models.CharField('Τύπος Υποχρέωσης', max_length=100, blank=True)
+    notification_type = models.CharField('Είδος', max_length=20, choices=TYPE_CHOICES)
+    deadline = models.DateField('Προθεσμία')
+    is_active = models.BooleanField('Ενεργή', default=True)
+    updated_at = models.DateTimeField('Ενημερώθηκε', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Ειδοποίηση Προθεσμίας'
+        verbose_name_plural = 'Ειδοποιήσεις Προθεσμιών'
+        indexes = [
+            models.Index(fields=['is_active', 'notification_type', 'deadline'], name='notif_active_type_dl_idx'),
+            models.Index(fields=['updated_at'], name='notif_updated_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.notification_type} {self.obligation_id} ({self.deadline})"
+
+
+class NotificationRead(models.Model):
+    """Ειδοποίηση που έχει διαβάσει ένας χρήστης (χάνεται όταν αλλάξει το είδος της)."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='notification_reads',
+        verbose_name='Χρήστης'
+    )
+    notification = models.ForeignKey(
+        ObligationNotification,
+        on_delete=models.CASCADE,
+        related_name='reads',
+        verbose_name='Ειδοποίηση'
+    )
+    read_at = models.DateTimeField('Διαβάστηκε', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Ανάγνωση Ειδοποίησης'
+        verbose_name_plural = 'Αναγνώσεις Ειδοποιήσεων'
+        unique_together = ['user', 'notification']
+
+    def __str__(self):
+        return f"{self.user_id} -> {self.notification_id}"
+
+
+class OverdueTransitionRun(models.Model):
+    """
+    Ημερήσια μετάβαση pending -> overdue (μία εγγραφή ανά ημέρα).
+
+    Η μοναδική run_date εξασφαλίζει ότι η μετάβαση γίνεται μία φορά την
+    ημέρα όσες φορές κι αν τρέξει το task - βλ. mark_overdue_obligations
+    στο accounting/services/obligation_calendar.py
+    """
+
+    run_date = models.DateField('Ημερομηνία', unique=True)
+    transitioned = models.PositiveIntegerField('Υποχρεώσεις', default=0)
+    chunks = models.PositiveIntegerField('Τμήματα', default=0)
+    started_at = models.DateTimeField('Έναρξη')
+    finished_at = models.DateTimeField('Ολοκλήρωση', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Μετάβαση σε Εκπρόθεσμες'
+        verbose_name_plural = 'Μεταβάσεις σε Εκπρόθεσμες'
+        ordering = ['-run_date']
+
+    def __str__(self):
+        return f"{self.run_date}: {self.transitioned}"
+
+
+class LiveFeedSequence(models.Model):
+    """
+    Αύξων αριθμός (seq) του live feed κλήσεων/tickets (μία εγγραφή).
+
+    Το lock της γραμμής σειριοποιεί τους publishers σε κάθε cache backend
+    (και στο DatabaseCache, που δεν έχει ατομικό incr) - βλ.
+    publish_live_event στο accounting/services/live_feed.py
+    """
+
+    value = models.PositiveBigIntegerField('Τελευταίο seq', default=0)
+
+    class Meta:
+        verbose_name = 'Seq Live Feed'
+        verbose_name_plural = 'Seq Live Feed'
+
+    def __str__(self):
+        return str(self.value)
+
+
+# Signals for auto-folder creation
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+@receiver(post_save, sender=ClientProfile)
+def create_client_folders(sender, instance, created, raw=False, **kwargs):
+    """
+    Φάκελοι αρχειοθέτησης για νέους πελάτες.
+
+    Η δομή δεν δημιουργείται πλέον μέσα στο save: κάθε φάκελος δημιουργείται
+    με το πρώτο έγγραφο που γράφεται σε αυτόν (lazy). Με
+    CLIENT_FOLDERS_SKELETON_ON_CREATE ο σκελετός δημιουργείται από Celery task
+    μετά το commit - βλ. accounting/services/folder_provisioning.py
+    """
+    if not created or raw:
+        return
+
+    from accounting.services.folder_provisioning import schedule_client_folders
+    schedule_client_folders([instance.pk])
 
 
 # ============================================
@@ -2,8 +2,12 @@
 """
 accounting/phone_utils.py
 Author: ddiplas
-Version: 1.0
+Version: 1.1
 Description: Phone number normalization and client matching utilities
+
+Client matching reads the ClientPhoneIndex table (normalized number -> client),
+which is kept current by the ClientProfile post_save signal and can be rebuilt
+with `python manage.py rebuild_phone_index`.
 """
 import re
 import logging
@@ -11,6 +15,18 @@ from django.db.models import Q
 
 logger = logging.getLogger(__name__)
 
+# ClientProfile fields that hold phone numbers
+PHONE_FIELDS = [
+    'tilefono_oikias_1',
+    'tilefono_oikias_2',
+    'kinito_tilefono',
+    'tilefono_epixeirisis_1',
+    'tilefono_epixeirisis_2',
+]
+
+# Normalized numbers shorter than this are not indexed/matched
+MIN_PHONE_LENGTH = 5
+
 
 def normalize_phone(phone_number):
     """
@@ -79,11 +95,131 @@ def phone_matches(phone1, phone2):
     return norm1 == norm2
 
 
+def _phone_index_entries(client_id, values):
+    """
+    Build ClientPhoneIndex rows for a client.
+
+    Args:
+        client_id: ClientProfile id
+        values: dict field name -> raw phone value
+
+    Returns:
+        List of unsaved ClientPhoneIndex instances
+    """
+    from .models import ClientPhoneIndex
+
+    entries = []
+    for field_name in PHONE_FIELDS:
+        normalized = normalize_phone(values.get(field_name))
+        if len(normalized) >= MIN_PHONE_LENGTH:
+            entries.append(ClientPhoneIndex(client_id=client_id, field_name=field_name, phone=normalized))
+    return entries
+
+
+def index_client_phones(client):
+    """
+    Refresh the ClientPhoneIndex rows of a single client.
+
+    Args:
+        client: ClientProfile instance
+    """
+    from .models import ClientPhoneIndex
+
+    entries = _phone_index_entries(
+        client.pk,
+        {field_name: getattr(client, field_name) for field_name in PHONE_FIELDS}
+    )
+
+    ClientPhoneIndex.objects.filter(client_id=client.pk).delete()
+    if entries:
+        ClientPhoneIndex.objects.bulk_create(entries)
+
+
+def index_clients_phones(client_ids, batch_size=2000):
+    """
+    Refresh the ClientPhoneIndex rows of many clients with bulk queries
+    (for bulk_create/update paths that bypass the post_save signal).
+
+    Args:
+        client_ids: ClientProfile ids
+        batch_size: Rows per bulk_create chunk
+    """
+    from .models import ClientProfile, ClientPhoneIndex
+
+    client_ids = list(client_ids)
+    if not client_ids:
+        return 0
+
+    entries = []
+    for row in ClientProfile.objects.filter(id__in=client_ids).values('id', *PHONE_FIELDS):
+        entries.extend(_phone_index_entries(row['id'], row))
+
+    ClientPhoneIndex.objects.filter(client_id__in=client_ids).delete()
+    ClientPhoneIndex.objects.bulk_create(entries, batch_size=batch_size)
+    return len(entries)
+
+
+def rebuild_phone_index(batch_size=2000):
+    """
+    Rebuild the whole ClientPhoneIndex table from ClientProfile.
+
+    Args:
+        batch_size: Rows per bulk_create chunk
+
+    Returns:
+        Number of index rows written
+    """
+    from django.db import transaction
+    from .models import ClientProfile, ClientPhoneIndex
+
+    total = 0
+    with transaction.atomic():
+        ClientPhoneIndex.objects.all().delete()
+
+        entries = []
+        for row in ClientProfile.objects.values('id', *PHONE_FIELDS).iterator(chunk_size=batch_size):
+            entries.extend(_phone_index_entries(row['id'], row))
+            if len(entries) >= batch_size:
+                ClientPhoneIndex.objects.bulk_create(entries)
+                total += len(entries)
+                entries = []
+
+        if entries:
+            ClientPhoneIndex.objects.bulk_create(entries)
+            total += len(entries)
+
+    logger.info(f"Phone index rebuilt: {total} entries")
+    return total
+
+
+def build_phone_lookup():
+    """
+    Load the phone index of active clients into a dict.
+
+    Used for batch matching, where one query replaces one lookup per call.
+    When several clients share a number, the lowest client id wins
+    (same rule as find_client_by_phone).
+
+    Returns:
+        dict normalized phone -> client id
+    """
+    from .models import ClientPhoneIndex
+
+    lookup = {}
+    rows = ClientPhoneIndex.objects.filter(
+        client__is_active=True
+    ).order_by('-client_id').values_list('phone', 'client_id')
+
+    for phone, client_id in rows.iterator(chunk_size=5000):
+        lookup[phone] = client_id
+    return lookup
+
+
 def find_client_by_phone(phone_number):
     """
     Find a ClientProfile by phone number.
 
-    Searches across all phone fields:
+    Searches across all phone fields (via ClientPhoneIndex):
     - tilefono_oikias_1, tilefono_oikias_2 (home)
     - kinito_tilefono (mobile)
     - tilefono_epixeirisis_1, tilefono_epixeirisis_2 (business)
@@ -94,33 +230,25 @@ def find_client_by_phone(phone_number):
     Returns:
         ClientProfile instance if found, None otherwise
     """
-    from .models import ClientProfile
+    from .models import ClientPhoneIndex
 
     normalized = normalize_phone(phone_number)
 
-    if not normalized or len(normalized) < 5:
+    if not normalized or len(normalized) < MIN_PHONE_LENGTH:
         # Too short to be a valid phone number
         return None
 
     logger.debug(f"Searching for client with normalized phone: {normalized}")
 
-    # Get all active clients
-    clients = ClientProfile.objects.filter(is_active=True)
+    entry = ClientPhoneIndex.objects.filter(
+        phone=normalized,
+        client__is_active=True
+    ).select_related('client').order_by('client_id').first()
 
-    # Check each client's phone numbers
-    for client in clients:
-        phone_fields = [
-            client.tilefono_oikias_1,
-            client.tilefono_oikias_2,
-            client.kinito_tilefono,
-            client.tilefono_epixeirisis_1,
-            client.tilefono_epixeirisis_2,
-        ]
-
-        for field_value in phone_fields:
-            if field_value and phone_matches(field_value, phone_number):
-                logger.info(f"Found client {client.id} ({client.eponimia}) for phone {phone_number}")
-                return client
+    if entry:
+        client = entry.client
+        logger.info(f"Found client {client.id} ({client.eponimia}) for phone {phone_number}")
+        return client
 
     logger.debug(f"No client found for phone: {phone_number}")
     return None
@@ -144,7 +272,7 @@ def find_clients_by_phone_query(phone_number):
 
     normalized = normalize_phone(phone_number)
 
-    if not normalized or len(normalized) < 5:
+    if not normalized or len(normalized) < MIN_PHONE_LENGTH:
         return ClientProfile.objects.none()
 
     # Search with the normalized number and partial matches
@@ -160,24 +288,26 @@ def find_clients_by_phone_query(phone_number):
     )
 
 
-def auto_match_call(call, save=True):
+def auto_match_call(call, save=True, client=None):
     """
     Attempt to auto-match a VoIP call to a client by phone number.
 
     Args:
         call: VoIPCall instance
         save: If True, save the call after matching
+        client: Already resolved ClientProfile (skips the index lookup)
 
     Returns:
         ClientProfile if matched, None otherwise
     """
     from .models import VoIPCallLog
 
-    if call.client is not None:
-        # Already matched
-        return call.client
+    if client is None:
+        if call.client is not None:
+            # Already matched
+            return call.client
 
-    client = find_client_by_phone(call.phone_number)
+        client = find_client_by_phone(call.phone_number)
 
     if client:
         call.client = client
@@ -203,13 +333,15 @@ def batch_auto_match_calls(dry_run=False):
     """
     Auto-match all unmatched VoIP calls to clients.
 
+    Loads the phone index once and matches every call with a dict lookup.
+
     Args:
         dry_run: If True, don't save changes, just report what would be matched
 
     Returns:
         dict with statistics: {'matched': int, 'unmatched': int, 'details': list}
     """
-    from .models import VoIPCall
+    from .models import ClientProfile, VoIPCall
 
     unmatched_calls = VoIPCall.objects.filter(client__isnull=True)
 
@@ -220,21 +352,32 @@ def batch_auto_match_calls(dry_run=False):
         'details': []
     }
 
-    for call in unmatched_calls:
-        client = find_client_by_phone(call.phone_number)
+    if not stats['total']:
+        return stats
+
+    lookup = build_phone_lookup()
+    matches = []
 
-        if client:
-            stats['matched'] += 1
-            stats['details'].append({
-                'call_id': call.id,
-                'phone': call.phone_number,
-                'matched_client': client.eponimia,
-                'client_id': client.id
-            })
-
-            if not dry_run:
-                auto_match_call(call, save=True)
+    for call in unmatched_calls.iterator(chunk_size=2000):
+        client_id = lookup.get(normalize_phone(call.phone_number))
+        if client_id:
+            matches.append((call, client_id))
         else:
             stats['unmatched'] += 1
 
+    clients = ClientProfile.objects.in_bulk({client_id for _, client_id in matches})
+
+    for call, client_id in matches:
+        client = clients[client_id]
+        stats['matched'] += 1
+        stats['details'].append({
+            'call_id': call.id,
+            'phone': call.phone_number,
+            'matched_client': client.eponimia,
+            'client_id': client.id
+        })
+
+        if not dry_run:
+            auto_match_call(call, save=True, client=client)
+
     return stats
@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+"""
+accounting/services/bulk_completion.py
+Description: Μαζική ολοκλήρωση υποχρεώσεων με έγγραφα ως background job.
+
+Το HTTP request μόνο αποθηκεύει τα αρχεία σε φάκελο staging και δημιουργεί
+ένα BulkCompletionJob. Το Celery task (process_bulk_completion_job) κάνει:
+1. Αποθήκευση εγγράφων (ClientDocument)
+2. Μαζική ενημέρωση κατάστασης (ένα UPDATE)
+3. Αποστολή email με ένα ανοιχτό SMTP connection (BulkEmailSender)
+   και bulk_create των EmailLog
+"""
+import logging
+import os
+import shutil
+
+from django.conf import settings
+from django.core.files import File
+from django.utils import timezone
+
+from accounting.models import (
+    BulkCompletionJob, ClientDocument, EmailLog, EmailTemplate, MonthlyObligation
+)
+from accounting.services.notification_feed import sync_obligation_notifications
+from accounting.utils.stats_cache import invalidate_stats_cache
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_EXTENSIONS = ['.pdf', '.doc', '.docx', '.xls', '.xlsx', '.jpg', '.jpeg', '.png']
+MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+
+# Κάθε πόσα βήματα ενημερώνεται η πρόοδος / γράφονται τα EmailLog
+PROGRESS_BATCH_SIZE = 25
+
+
+def get_staging_root():
+    return getattr(
+        settings, 'BULK_COMPLETE_STAGING_DIR',
+        os.path.join(settings.MEDIA_ROOT, 'staging', 'bulk_complete')
+    )
+
+
+def _document_category(obligation):
+    category = 'general'
+    if obligation.obligation_type:
+        type_code = obligation.obligation_type.code.upper()
+        if 'ΦΠΑ' in type_code:
+            category = 'vat'
+        elif 'ΜΥΦ' in type_code:
+            category = 'myf'
+        elif 'ΑΠΔ' in type_code:
+            category = 'payroll'
+        elif 'Ε1' in type_code or 'Ε3' in type_code:
+            category = 'tax'
+    return category
+
+
+def stage_bulk_completion(user, obligation_ids, files, save_to_folders=True,
+                          send_emails=False, attach_to_emails=False, template=None):
+    """
+    Δημιουργεί BulkCompletionJob και αποθηκεύει τα αρχεία (file_{obligation_id})
+    στον φάκελο staging. Αρχεία με μη επιτρεπτή κατάληξη/μέγεθος αγνοούνται.
+
+    Returns:
+        BulkCompletionJob (status='pending')
+    """
+    job = BulkCompletionJob.objects.create(
+        created_by=user,
+        obligation_ids=[int(obligation_id) for obligation_id in obligation_ids],
+        save_to_folders=save_to_folders,
+        send_emails=send_emails,
+        attach_to_emails=attach_to_emails,
+        template=template,
+    )
+    if not save_to_folders:
+        return job
+
+    staging_dir = os.path.join(get_staging_root(), str(job.pk))
+    staged_files = {}
+    for obligation_id in job.obligation_ids:
+        uploaded_file = files.get(f'file_{obligation_id}')
+        if not uploaded_file:
+            continue
+        ext = os.path.splitext(uploaded_file.name)[1].lower()
+        if ext not in ALLOWED_EXTENSIONS or uploaded_file.size > MAX_FILE_SIZE:
+            continue
+
+        os.makedirs(staging_dir, exist_ok=True)
+        staged_name = f'{obligation_id}{ext}'
+        with open(os.path.join(staging_dir, staged_name), 'wb') as destination:
+            for chunk in uploaded_file.chunks():
+                destination.write(chunk)
+        staged_files[str(obligation_id)] = {
+            'staged_name': staged_name,
+            'original_name': os.path.basename(uploaded_file.name),
+        }
+
+    if staged_files:
+        job.staged_files = staged_files
+        job.staging_dir = staging_dir
+        job.save(update_fields=['staged_files', 'staging_dir'])
+    return job
+
+
+def run_bulk_completion_job(job_id):
+    """
+    Εκτελεί το BulkCompletionJob. Καλείται από το Celery task
+    (ή συγχρονικά αν δεν είναι διαθέσιμος ο broker).
+    """
+    job = BulkCompletionJob.objects.select_related('created_by', 'template').get(pk=job_id)
+    if job.status != 'pending':
+        logger.info(f"Bulk completion job #{job.pk} already {job.status}")
+        return job
+
+    job.status = 'running'
+    job.started_at = timezone.now()
+    job.save(update_fields=['status', 'started_at'])
+
+    try:
+        obligations = list(
+            MonthlyObligation.objects.filter(
+                id__in=job.obligation_ids,
+                status__in=['pending', 'overdue']
+            ).select_related('client', 'obligation_type')
+        )
+        job.total = len(obligations) * (2 if job.send_emails else 1)
+        job.save(update_fields=['total'])
+
+        documents = _persist_documents(job, obligations)
+        _complete_obligations(job, obligations)
+
+        email_sent_ids = set()
+        if job.send_emails:
+            job.email_results = _send_emails(job, obligations, documents, email_sent_ids)
+
+        job.results = [
+            {
+                'obligation_id': obligation.id,
+                'client': obligation.client.eponimia,
+                'document_id': documents[obligation.id].id if obligation.id in documents else None,
+                'email_sent': obligation.id in email_sent_ids,
+            }
+            for obligation in obligations
+        ]
+        job.completed_count = len(obligations)
+        job.processed = job.total
+        job.status = 'completed'
+        job.finished_at = timezone.now()
+        job.save()
+    except Exception as e:
+        logger.exception(f"Bulk completion job #{job.pk} failed")
+        job.status = 'failed'
+        job.error_message = str(e)
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'error_message', 'finished_at'])
+        return job
+
+    if job.staging_dir:
+        shutil.rmtree(job.staging_dir, ignore_errors=True)
+
+    logger.info(f"✅ Bulk completion job #{job.pk}: {job.completed_count} υποχρεώσεις ολοκληρώθηκαν")
+    return job
+
+
+def _update_progress(job, processed):
+    job.processed = processed
+    BulkCompletionJob.objects.filter(pk=job.pk).update(processed=processed)
+
+
+def _persist_documents(job, obligations):
+    """Αποθήκευση των staged αρχείων ως ClientDocument. Επιστρέφει {obligation_id: document}."""
+    documents = {}
+    for index, obligation in enumerate(obligations, start=1):
+        staged = job.staged_files.get(str(obligation.id))
+        if staged:
+            path = os.path.join(job.staging_dir, staged['staged_name'])
+            with open(path, 'rb') as staged_file:
+                document = ClientDocument(
+                    client=obligation.client,
+                    obligation=obligation,
+                    original_filename=staged['original_name'],
+                    document_category=_document_category(obligation),
+                    description=f'Υποχρέωση {obligation.obligation_type.name} {obligation.month:02d}/{obligation.year}',
+                    uploaded_by=job.created_by,
+                )
+                document.file = File(staged_file, name=staged['original_name'])
+                document.save()
+            documents[obligation.id] = document
+
+        if index % PROGRESS_BATCH_SIZE == 0:
+            _update_progress(job, index)
+    return documents
+
+
+def _complete_obligations(job, obligations):
+    """Ένα UPDATE για όλες τις υποχρεώσεις αντί για save() ανά υποχρέωση."""
+    today = timezone.now().date()
+    MonthlyObligation.objects.filter(
+        id__in=[obligation.id for obligation in obligations]
+    ).update(
+        status='completed',
+        completed_date=today,
+        completed_by=job.created_by,
+        updated_at=timezone.now(),
+    )
+    # Το queryset.update() δεν στέλνει signals
+    invalidate_stats_cache()
+    sync_obligation_notifications([obligation.id for obligation in obligations])
+
+    for obligation in obligations:
+        obligation.status = 'completed'
+        obligation.completed_date = today
+        obligation.completed_by = job.created_by
+    _update_progress(job, len(obligations))
+
+
+def _send_emails(job, obligations, documents, email_sent_ids):
+    """
+    Αποστολή email για τις ολοκληρωμένες υποχρεώσεις με ένα SMTP connection.
+    Τα EmailLog γράφονται με bulk_create ανά PROGRESS_BATCH_SIZE.
+    """
+    from accounting.services.email_service import EmailService
+    from accounting.services.email_utils import BulkEmailSender
+
+    email_results = {'sent': 0, 'failed': 0, 'skipped': 0, 'details': []}
+    user = job.created_by
+
+    db_settings, from_email, from_name, smtp_config = EmailService._get_email_settings()
+    reply_to = db_settings.reply_to if db_settings and db_settings.reply_to else None
+    email_backend = getattr(settings, 'EMAIL_BACKEND', '')
+    is_local_backend = email_backend.endswith(('console.EmailBackend', 'locmem.EmailBackend'))
+    connection = EmailService._get_email_connection(smtp_config) if smtp_config else None
+
+    pending_logs = []
+    processed = len(obligations)
+
+    def add_detail(obligation, detail_status, message):
+        email_results[detail_status] += 1
+        email_results['details'].append({
+            'obligation_id': obligation.id,
+            'client': obligation.client.eponimia,
+            'status': detail_status,
+            'message': message,
+        })
+
+    handled = 0
+    try:
+        with BulkEmailSender(use_pool=True, use_rate_limit=not is_local_backend,
+                             connection=connection) as sender:
+            for obligation in obligations:
+                processed += 1
+                handled += 1
+                client = obligation.client
+
+                if not client.email:
+                    add_detail(obligation, 'skipped', 'Ο πελάτης δεν έχει email')
+                else:
+                    template = job.template or EmailTemplate.get_template_for_obligation(obligation)
+                    if not template:
+                        add_detail(obligation, 'failed', 'Δεν βρέθηκε πρότυπο email')
+                    else:
+                        attachments = []
+                        document = documents.get(obligation.id)
+                        if job.attach_to_emails and document and document.file:
+                            attachments.append(document.file)
+
+                        subject, body = EmailService.render_template(
+                            template=template,
+                            obligation=obligation,
+                            user=user
+                        )
+                        email_log = EmailLog(
+                            recipient_email=client.email,
+                            recipient_name=client.eponimia,
+                            client=client,
+                            obligation=obligation,
+                            template_used=template,
+                            subject=subject,
+                            body=body,
+                            status='sent',
+                            sent_by=user,
+                        )
+                        try:
+                            email = EmailService._prepare_email_message(
+                                recipient_email=client.email,
+                                subject=subject,
+                                body=body,
+                                attachments=attachments,
+                                from_email=from_email,
+                                from_name=from_name,
+                                reply_to=reply_to,
+                            )
+                            sender.send(email)
+                            email_sent_ids.add(obligation.id)
+                            add_detail(obligation, 'sent', f'Στάλθηκε στο {client.email}')
+                        except Exception as e:
+                            logger.error(f"❌ Failed to send email to {client.email}: {e}")
+                            email_log.status = 'failed'
+                            email_log.error_message = str(e)
+                            add_detail(obligation, 'failed', str(e))
+                        pending_logs.append(email_log)
+
+                if processed % PROGRESS_BATCH_SIZE == 0:
+                    EmailLog.objects.bulk_create(pending_logs)
+                    pending_logs = []
+                    _update_progress(job, processed)
+    except Exception as e:
+        # Π.χ. αποτυχία σύνδεσης SMTP - οι υποχρεώσεις παραμένουν ολοκληρωμένες
+        logger.error(f"❌ Bulk completion job #{job.pk}: email sending stopped: {e}")
+        for obligation in obligations[handled:]:
+            add_detail(obligation, 'failed', str(e))
+
+    EmailLog.objects.bulk_create(pending_logs)
+    return email_results
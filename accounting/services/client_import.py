@@ -0,0 +1,590 @@
+# -*- coding: utf-8 -*-
+"""
+accounting/services/client_import.py
+Description: Εισαγωγή πελατών από Excel σε batches.
+
+1. Ανάγνωση με openpyxl read_only (γραμμή-γραμμή, χωρίς να φορτώνεται
+   ολόκληρο το workbook στη μνήμη)
+2. Έλεγχοι ανά batch: ΑΦΜ (μορφή και check digit), ημερομηνίες, email, IBAN,
+   μήκος πεδίων, διπλότυπα μέσα στο αρχείο και υπάρχοντες πελάτες με ένα
+   query ανά batch
+3. Upsert με bulk_create(update_conflicts=True) στο afm
+4. Ό,τι κάνουν τα post_save signals του ClientProfile (ClientObligation,
+   ευρετήριο τηλεφώνων, φάκελοι, stats cache) γίνεται μαζικά
+
+Χρησιμοποιείται από το import_clients_csv API (ClientImportJob μέσω Celery)
+και από το management command import_clients.
+"""
+import logging
+import os
+import shutil
+from datetime import date, datetime
+from itertools import islice
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import DatabaseError, models, transaction
+from django.utils import timezone
+
+from accounting.models import ClientImportJob, ClientObligation, ClientProfile, ObligationProfile
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+
+# Excel headers (όπως στο template) -> πεδία ClientProfile
+FIELD_MAPPING = {
+    'Α.Φ.Μ.': 'afm',
+    'Δ.Ο.Υ.': 'doy',
+    'Επωνυμία/Επώνυμο': 'eponimia',
+    'Όνομα': 'onoma',
+    'Όνομα Πατρός': 'onoma_patros',
+    'Αριθμός Ταυτότητας': 'arithmos_taftotitas',
+    'Είδος Ταυτότητας': 'eidos_taftotitas',
+    'Προσωπικός Αριθμός': 'prosopikos_arithmos',
+    'Α.Μ.Κ.Α.': 'amka',
+    'Α.Μ. Ι.Κ.Α.': 'am_ika',
+    'Αριθμός Γ.Ε.ΜΗ.': 'arithmos_gemi',
+    'Αριθμός Δ.ΥΠ.Α': 'arithmos_dypa',
+    'Ημ. Γέννησης': 'imerominia_gennisis',
+    'Ημ. Γάμου': 'imerominia_gamou',
+    'Φύλο': 'filo',
+    'Διεύθυνση Κατοικίας': 'diefthinsi_katoikias',
+    'Αριθμός': 'arithmos_katoikias',
+    'Πόλη Κατοικίας': 'poli_katoikias',
+    'Δήμος Κατοικίας': 'dimos_katoikias',
+    'Νομός Κατοικίας': 'nomos_katoikias',
+    'T.K. Κατοικίας': 'tk_katoikias',
+    'Τηλέφωνο Οικίας 1': 'tilefono_oikias_1',
+    'Τηλέφωνο Οικίας 2': 'tilefono_oikias_2',
+    'Κινητό τηλέφωνο': 'kinito_tilefono',
+    'Διεύθυνση Επιχείρησης': 'diefthinsi_epixeirisis',
+    'Αριθμός Επιχείρησης': 'arithmos_epixeirisis',
+    'Πόλη Επιχείρησης': 'poli_epixeirisis',
+    'Δήμος Επιχείρησης': 'dimos_epixeirisis',
+    'Νομός Επιχείρησης': 'nomos_epixeirisis',
+    'Τ.Κ. Επιχείρησης': 'tk_epixeirisis',
+    'Τηλέφωνο Επιχείρησης 1': 'tilefono_epixeirisis_1',
+    'Τηλέφωνο Επιχείρησης 2': 'tilefono_epixeirisis_2',
+    'Email': 'email',
+    'Τράπεζα': 'trapeza',
+    'IBAN': 'iban',
+    'Είδος Υπόχρεου': 'eidos_ipoxreou',
+    'Κατηγορία Βιβλίων': 'katigoria_vivlion',
+    'Νομική Μορφή': 'nomiki_morfi',
+    'Αγρότης': 'agrotis',
+    'Ημ/νία Έναρξης Εργασιών': 'imerominia_enarksis',
+    'Όνομα Χρήστη Taxis Net': 'onoma_xristi_taxisnet',
+    'Κωδικός Taxis Net': 'kodikos_taxisnet',
+    'Όνομα Χρήστη Ι.Κ.Α. Εργοδότη': 'onoma_xristi_ika_ergodoti',
+    'Κωδικός Ι.Κ.Α. Εργοδότη': 'kodikos_ika_ergodoti',
+    'Όνομα Χρήστη Γ.Ε.ΜΗ.': 'onoma_xristi_gemi',
+    'Κωδικός Γ.Ε.ΜΗ.': 'kodikos_gemi',
+    'Α.Φ.Μ Συζύγου/Μ.Σ.Σ.': 'afm_sizigou',
+    'Α.Φ.Μ. Φορέας': 'afm_foreas',
+    'ΑΜ ΚΛΕΙΔΙ': 'am_klidi',
+}
+FIELD_LABELS = {field_name: header for header, field_name in FIELD_MAPPING.items()}
+
+DATE_FIELDS = ('imerominia_gennisis', 'imerominia_gamou', 'imerominia_enarksis')
+DATE_FORMATS = ['%d/%m/%Y', '%d-%m-%Y', '%Y-%m-%d', '%d.%m.%Y', '%d/%m/%y']
+EMPTY_VALUES = ('ΚΕΝΟ', 'EMPTY', '-', 'N/A')
+
+EIDOS_MAPPING = {
+    'ΙΔΙΩΤΗΣ': 'individual',
+    'ΕΠΑΓΓΕΛΜΑΤΙΑΣ': 'professional',
+    'ΕΤΑΙΡΕΙΑ': 'company',
+    'INDIVIDUAL': 'individual',
+    'PROFESSIONAL': 'professional',
+    'COMPANY': 'company',
+}
+KATIGORIA_MAPPING = {
+    'Α': 'A',
+    'Β': 'B',
+    'Γ': 'C',
+    'ΧΩΡΙΣ': 'none',
+    'A': 'A',
+    'B': 'B',
+    'C': 'C',
+    'NONE': 'none',
+}
+TRUE_VALUES = ('ΝΑΙ', 'NAI', 'YES', 'TRUE', '1', 'Ν')
+
+# Η 2η γραμμή του template είναι παράδειγμα με ΑΦΜ 123456...
+EXAMPLE_AFM_PREFIX = '123456'
+
+
+class ClientImportError(Exception):
+    """Το αρχείο δεν μπορεί να εισαχθεί (π.χ. δεν είναι Excel ή λείπουν τα headers)."""
+
+
+def get_staging_root():
+    return getattr(
+        settings, 'CLIENT_IMPORT_STAGING_DIR',
+        os.path.join(settings.MEDIA_ROOT, 'staging', 'client_import')
+    )
+
+
+def afm_checksum_ok(afm):
+    """Έλεγχος check digit ΑΦΜ (9 ψηφία)."""
+    total = sum(int(afm[i]) * (2 ** (8 - i)) for i in range(8))
+    return (total % 11) % 10 == int(afm[8])
+
+
+def _parse_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+
+    value_str = str(value).strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value_str, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f'Μη έγκυρη ημερομηνία "{value_str}"')
+
+
+def clean_value(value, field_name):
+    """
+    Καθαρισμός και μετατροπή τιμής κελιού.
+    Επιστρέφει None για κενό κελί, ValueError για τιμή που δεν μετατρέπεται.
+    """
+    if value is None:
+        return None
+
+    if isinstance(value, str):
+        value = value.strip()
+        if value == '' or value.upper() in EMPTY_VALUES:
+            return None
+    elif isinstance(value, float) and value.is_integer():
+        # Αριθμητικά κελιά (ΑΦΜ, τηλέφωνα, Τ.Κ.) χωρίς ".0"
+        value = int(value)
+
+    if field_name == 'afm':
+        # Σε αριθμητικό κελί χάνονται τα αρχικά μηδενικά
+        if isinstance(value, int) and not isinstance(value, bool):
+            return f'{value:09d}'
+        return str(value).strip()
+
+    if field_name == 'eidos_ipoxreou':
+        return EIDOS_MAPPING.get(str(value).strip().upper(), 'professional')
+
+    if field_name == 'katigoria_vivlion':
+        return KATIGORIA_MAPPING.get(str(value).strip().upper(), '')
+
+    if field_name == 'agrotis':
+        if isinstance(value, bool):
+            return value
+        return str(value).upper() in TRUE_VALUES
+
+    if field_name == 'filo':
+        value_upper = str(value).upper()
+        if value_upper in ['Μ', 'M', 'ΑΝΔΡΑΣ', 'MALE', 'MAN']:
+            return 'M'
+        if value_upper in ['Γ', 'F', 'ΓΥΝΑΙΚΑ', 'FEMALE', 'WOMAN']:
+            return 'F'
+        return ''
+
+    if field_name in DATE_FIELDS:
+        return _parse_date(value)
+
+    return str(value)
+
+
+class ClientWorkbook:
+    """
+    Excel πελατών ανοιχτό σε read_only mode.
+    Οι γραμμές διαβάζονται μία-μία από το XML του φύλλου.
+    """
+
+    def __init__(self, path):
+        import openpyxl
+
+        try:
+            self.workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        except Exception as e:
+            raise ClientImportError(f'Σφάλμα κατά την ανάγνωση του αρχείου: {e}')
+
+        self.sheet = self.workbook.active
+        self._rows = self.sheet.iter_rows(values_only=True)
+        header = next(self._rows, None) or ()
+        self.columns = {
+            index: FIELD_MAPPING[str(cell).strip()]
+            for index, cell in enumerate(header)
+            if cell is not None and str(cell).strip() in FIELD_MAPPING
+        }
+        if 'afm' not in self.columns.values():
+            self.close()
+            raise ClientImportError('Δεν βρέθηκαν έγκυρα headers. Χρησιμοποιήστε το template.')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.workbook.close()
+
+    @property
+    def fields(self):
+        return list(self.columns.values())
+
+    @property
+    def row_count(self):
+        """Γραμμές δεδομένων σύμφωνα με το dimension του φύλλου (εκτίμηση για την πρόοδο)."""
+        return max((self.sheet.max_row or 1) - 1, 0)
+
+    def rows(self):
+        """
+        Yields (row_num, data, errors). Κενές γραμμές και η γραμμή
+        παραδείγματος του template παραλείπονται.
+        """
+        for row_num, values in enumerate(self._rows, start=2):
+            data = {}
+            errors = []
+            has_data = False
+            for index, field_name in self.columns.items():
+                value = values[index] if index < len(values) else None
+                if value is not None and str(value).strip():
+                    has_data = True
+                try:
+                    value = clean_value(value, field_name)
+                except ValueError as e:
+                    errors.append(f'{FIELD_LABELS[field_name]}: {e}')
+                    continue
+                if value is not None:
+                    data[field_name] = value
+
+            if not has_data:
+                continue
+            if row_num == 2 and str(data.get('afm', '')).startswith(EXAMPLE_AFM_PREFIX):
+                continue
+            yield row_num, data, errors
+
+
+def _char_field_lengths():
+    return {
+        field.name: field.max_length
+        for field in ClientProfile._meta.concrete_fields
+        if isinstance(field, models.CharField) and field.max_length
+    }
+
+
+def validate_batch(rows, seen_afms, max_lengths):
+    """
+    Έλεγχοι ενός batch γραμμών.
+
+    Args:
+        rows: [(row_num, data, errors)] από το ClientWorkbook.rows()
+        seen_afms: {afm: row_num} των έγκυρων γραμμών μέχρι τώρα (ενημερώνεται)
+        max_lengths: {field: max_length} των CharField
+
+    Returns:
+        (valid, report): valid = [(row_num, data)], report = εγγραφές αναφοράς
+    """
+    valid = []
+    report = []
+    for row_num, data, errors in rows:
+        errors = list(errors)
+        warnings = []
+
+        afm = data.get('afm', '')
+        if not afm:
+            errors.append('Λείπει το ΑΦΜ')
+        elif len(afm) != 9 or not afm.isdigit():
+            errors.append(f'Μη έγκυρο ΑΦΜ "{afm}" (πρέπει να είναι 9 ψηφία)')
+        else:
+            if afm in seen_afms:
+                errors.append(f'Διπλότυπο ΑΦΜ στο αρχείο (γραμμή {seen_afms[afm]})')
+            # Όπως και στη φόρμα πελάτη: προειδοποίηση, όχι απόρριψη
+            if not afm_checksum_ok(afm):
+                warnings.append(f'Το ΑΦΜ {afm} δεν περνά τον έλεγχο check digit')
+
+        if not data.get('eponimia'):
+            errors.append('Λείπει η επωνυμία')
+
+        if data.get('email'):
+            try:
+                validate_email(data['email'])
+            except ValidationError:
+                errors.append(f'Άκυρο email: {data["email"]}')
+
+        if data.get('iban'):
+            iban = data['iban'].replace(' ', '')
+            if not iban.startswith('GR') or len(iban) != 27:
+                errors.append(f'Άκυρο IBAN: {data["iban"]} (πρέπει να ξεκινά με GR και να έχει 27 χαρακτήρες)')
+
+        for field_name, value in data.items():
+            max_length = max_lengths.get(field_name)
+            if max_length and isinstance(value, str) and len(value) > max_length:
+                errors.append(f'{FIELD_LABELS[field_name]}: έως {max_length} χαρακτήρες')
+
+        if errors:
+            report.append({'row': row_num, 'afm': afm, 'level': 'error', 'messages': errors + warnings})
+            continue
+        if warnings:
+            report.append({'row': row_num, 'afm': afm, 'level': 'warning', 'messages': warnings})
+
+        seen_afms[afm] = row_num
+        valid.append((row_num, data))
+    return valid, report
+
+
+def _create_client_obligations(client_ids):
+    """Μαζική εκδοχή του signal auto_create_client_obligation για νέους πελάτες."""
+    ClientObligation.objects.bulk_create(
+        [ClientObligation(client_id=client_id, is_active=True) for client_id in client_ids],
+        ignore_conflicts=True
+    )
+
+    profile_name = getattr(settings, 'AUTO_CLIENT_OBLIGATION_PROFILE', None)
+    if not profile_name:
+        return
+    profile = ObligationProfile.objects.filter(name=profile_name).first()
+    if profile is None:
+        logger.warning(f"Default profile '{profile_name}' not found. ClientObligation created without profile.")
+        return
+
+    Through = ClientObligation.obligation_profiles.through
+    Through.objects.bulk_create(
+        [
+            Through(clientobligation_id=obligation_id, obligationprofile_id=profile.id)
+            for obligation_id in ClientObligation.objects.filter(
+                client_id__in=client_ids
+            ).values_list('id', flat=True)
+        ],
+        ignore_conflicts=True
+    )
+
+
+def _save_batch(valid, fields, mode, dry_run):
+    """
+    Upsert ενός batch. Κενά κελιά δεν σβήνουν υπάρχουσες τιμές.
+
+    Returns:
+        (created, updated, skipped)
+    """
+    from accounting.phone_utils import PHONE_FIELDS, index_clients_phones
+    from accounting.services.document_counters import invalidate_document_counters_cache
+    from accounting.services.search_index import index_search_documents, reindex_client_documents
+    from accounting.services.folder_provisioning import schedule_client_folders
+    from accounting.services.notification_feed import sync_clients_notifications
+
+    other_fields = [field_name for field_name in fields if field_name != 'afm']
+    existing = {
+        row['afm']: row
+        for row in ClientProfile.objects.filter(
+            afm__in=[data['afm'] for _, data in valid]
+        ).values('id', 'afm', *other_fields)
+    }
+
+    clients = []
+    created_afms = []
+    updated_ids = []
+    skipped = 0
+    for _, data in valid:
+        current = existing.get(data['afm'])
+        if current is None:
+            if mode == 'update_only':
+                skipped += 1
+                continue
+            values = data
+            created_afms.append(data['afm'])
+        else:
+            if mode == 'skip':
+                skipped += 1
+                continue
+            values = {field_name: current[field_name] for field_name in other_fields}
+            values.update({key: value for key, value in data.items() if value not in (None, '')})
+            updated_ids.append(current['id'])
+        clients.append(ClientProfile(**values))
+
+    if dry_run or not clients:
+        return len(created_afms), len(updated_ids), skipped
+
+    with transaction.atomic():
+        if mode == 'skip':
+            ClientProfile.objects.bulk_create(clients, ignore_conflicts=True)
+        else:
+            ClientProfile.objects.bulk_create(
+                clients,
+                update_conflicts=True,
+                unique_fields=['afm'],
+                update_fields=other_fields + ['updated_at'],
+            )
+
+        # Το bulk_create δεν στέλνει post_save
+        created_ids = list(
+            ClientProfile.objects.filter(afm__in=created_afms).values_list('id', flat=True)
+        )
+        if created_ids and getattr(settings, 'AUTO_CREATE_CLIENT_OBLIGATION', True):
+            _create_client_obligations(created_ids)
+        if set(fields) & set(PHONE_FIELDS):
+            index_clients_phones(created_ids + updated_ids)
+        index_search_documents('client', created_ids + updated_ids)
+        reindex_client_documents(updated_ids)
+        sync_clients_notifications(updated_ids)
+        schedule_client_folders(created_ids)
+        if created_ids or updated_ids:
+            # Επωνυμία/ΑΦΜ στο browse των εγγράφων (και στο ETag του)
+            transaction.on_commit(invalidate_document_counters_cache)
+
+    return len(created_afms), len(updated_ids), skipped
+
+
+def import_clients(path, mode='update', dry_run=False, batch_size=None, on_progress=None):
+    """
+    Εισαγωγή πελατών από Excel.
+
+    Args:
+        path: Διαδρομή αρχείου .xlsx
+        mode: 'skip' (μόνο νέοι), 'update' (νέοι + ενημέρωση), 'update_only'
+        dry_run: Μόνο έλεγχοι και μέτρηση, χωρίς εγγραφή στη βάση
+        on_progress: callable(stats) μετά από κάθε batch
+
+    Returns:
+        dict: total_rows, processed, created, updated, skipped, errors, warnings, report
+
+    Raises:
+        ClientImportError: Μη αναγνώσιμο αρχείο ή χωρίς έγκυρα headers
+    """
+    batch_size = batch_size or getattr(settings, 'CLIENT_IMPORT_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    max_lengths = _char_field_lengths()
+    seen_afms = {}
+    report = []
+    stats = {
+        'total_rows': 0, 'processed': 0, 'created': 0, 'updated': 0,
+        'skipped': 0, 'errors': 0, 'warnings': 0,
+    }
+
+    with ClientWorkbook(path) as workbook:
+        stats['total_rows'] = workbook.row_count
+        fields = workbook.fields
+        rows = workbook.rows()
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+
+            valid, batch_report = validate_batch(batch, seen_afms, max_lengths)
+            if valid:
+                try:
+                    created, updated, skipped = _save_batch(valid, fields, mode, dry_run)
+                except DatabaseError as e:
+                    logger.error(f"Client import batch (γραμμές {batch[0][0]}-{batch[-1][0]}) failed: {e}")
+                    batch_report.extend(
+                        {'row': row_num, 'afm': data['afm'], 'level': 'error',
+                         'messages': [f'Σφάλμα αποθήκευσης: {e}']}
+                        for row_num, data in valid
+                    )
+                    created = updated = skipped = 0
+                stats['created'] += created
+                stats['updated'] += updated
+                stats['skipped'] += skipped
+
+            report.extend(sorted(batch_report, key=lambda entry: entry['row']))
+            stats['processed'] += len(batch)
+            if on_progress:
+                on_progress(stats)
+
+    stats['total_rows'] = stats['processed']
+    stats['errors'] = sum(1 for entry in report if entry['level'] == 'error')
+    stats['warnings'] = len(report) - stats['errors']
+    stats['report'] = report
+
+    if not dry_run and (stats['created'] or stats['updated']):
+        from accounting.utils.stats_cache import invalidate_stats_cache
+        transaction.on_commit(invalidate_stats_cache)
+
+    return stats
+
+
+def stage_client_import(user, uploaded_file, mode):
+    """
+    Δημιουργεί ClientImportJob και αποθηκεύει το αρχείο στον φάκελο staging.
+
+    Raises:
+        ClientImportError: Το αρχείο δεν ανοίγει ή δεν έχει έγκυρα headers
+            (το job διαγράφεται)
+    """
+    job = ClientImportJob.objects.create(
+        created_by=user,
+        mode=mode,
+        original_filename=os.path.basename(uploaded_file.name)[:255],
+    )
+    staging_dir = os.path.join(get_staging_root(), str(job.pk))
+    os.makedirs(staging_dir, exist_ok=True)
+    path = os.path.join(staging_dir, 'clients.xlsx')
+    with open(path, 'wb') as destination:
+        for chunk in uploaded_file.chunks():
+            destination.write(chunk)
+
+    try:
+        with ClientWorkbook(path) as workbook:
+            job.total_rows = workbook.row_count
+    except ClientImportError:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        job.delete()
+        raise
+
+    job.staged_path = path
+    job.save(update_fields=['total_rows', 'staged_path'])
+    return job
+
+
+def run_client_import_job(job_id):
+    """
+    Εκτελεί το ClientImportJob. Καλείται από το Celery task
+    (ή συγχρονικά αν δεν είναι διαθέσιμος ο broker).
+    """
+    job = ClientImportJob.objects.get(pk=job_id)
+    if job.status != 'pending':
+        logger.info(f"Client import job #{job.pk} already {job.status}")
+        return job
+
+    job.status = 'running'
+    job.started_at = timezone.now()
+    job.save(update_fields=['status', 'started_at'])
+
+    def on_progress(stats):
+        ClientImportJob.objects.filter(pk=job.pk).update(
+            processed=stats['processed'],
+            total_rows=max(stats['total_rows'], stats['processed']),
+            created_count=stats['created'],
+            updated_count=stats['updated'],
+            skipped_count=stats['skipped'],
+        )
+
+    try:
+        stats = import_clients(job.staged_path, mode=job.mode, on_progress=on_progress)
+    except Exception as e:
+        logger.exception(f"Client import job #{job.pk} failed")
+        job.status = 'failed'
+        job.error_message = str(e)
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'error_message', 'finished_at'])
+        return job
+    finally:
+        if job.staged_path:
+            shutil.rmtree(os.path.dirname(job.staged_path), ignore_errors=True)
+
+    job.total_rows = stats['total_rows']
+    job.processed = stats['processed']
+    job.created_count = stats['created']
+    job.updated_count = stats['updated']
+    job.skipped_count = stats['skipped']
+    job.error_count = stats['errors']
+    job.report = stats['report']
+    job.status = 'completed'
+    job.finished_at = timezone.now()
+    job.save()
+
+    logger.info(
+        f"✅ Client import job #{job.pk}: {job.created_count} νέοι, "
+        f"{job.updated_count} ενημερώσεις, {job.error_count} σφάλματα"
+    )
+    return job
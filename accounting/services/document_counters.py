@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""
+accounting/services/document_counters.py
+Description: Μετρητές εγγράφων ανά φάκελο (DocumentFolderCounter) για το file manager.
+
+- apply_document_change: +1/-1 στον μετρητή του φακέλου (F() update) από τα
+  signals του ClientDocument. Μετρώνται μόνο τα τρέχοντα (is_current) έγγραφα.
+- rebuild_document_counters: πλήρης επανυπολογισμός (όλοι ή κάποιοι πελάτες),
+  για τα bulk updates που παρακάμπτουν τα signals.
+- folder_tree / document_totals: browse και στατιστικά με ένα query στους
+  μετρητές, cached ανά έκδοση. Η έκδοση αλλάζει στο commit κάθε αλλαγής
+  και χρησιμοποιείται και ως ETag.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DOCUMENTS_VERSION_KEY = 'accounting:documents:version'
+BUCKET_FIELDS = ('client_id', 'year', 'month', 'document_category', 'file_type')
+
+
+# ============================================
+# ΕΚΔΟΣΗ (cache keys / ETag)
+# ============================================
+
+def get_documents_version():
+    """Τρέχουσα έκδοση των μετρητών ή None αν το cache δεν είναι διαθέσιμο."""
+    try:
+        version = cache.get(DOCUMENTS_VERSION_KEY)
+        if version is None:
+            version = time.time_ns()
+            # add: δεν πατάει έκδοση που όρισε ταυτόχρονα άλλη διεργασία
+            cache.add(DOCUMENTS_VERSION_KEY, version, None)
+            version = cache.get(DOCUMENTS_VERSION_KEY, version)
+        return version
+    except Exception as e:
+        logger.warning(f"Documents version unavailable: {e}")
+        return None
+
+
+def invalidate_document_counters_cache():
+    """Νέα έκδοση: ακυρώνει τα cached browse/stats και τα ETag."""
+    try:
+        cache.set(DOCUMENTS_VERSION_KEY, time.time_ns(), None)
+    except Exception as e:
+        logger.warning(f"Could not invalidate documents cache: {e}")
+
+
+def get_cached_tree(name, parts, compute):
+    """Όπως το get_cached_stats, αλλά με την έκδοση των μετρητών εγγράφων."""
+    version = get_documents_version()
+    if version is None:
+        return compute()
+
+    key = ':'.join(['accounting:documents', str(version), name] + [str(p) for p in parts])
+    try:
+        data = cache.get(key)
+    except Exception as e:
+        logger.warning(f"Documents cache unavailable: {e}")
+        return compute()
+
+    if data is None:
+        data = compute()
+        try:
+            cache.set(key, data, getattr(settings, 'CACHE_TTL_STATS', 60))
+        except Exception as e:
+            logger.warning(f"Could not cache {name}: {e}")
+    return data
+
+
+# ============================================
+# ΕΝΗΜΕΡΩΣΗ ΜΕΤΡΗΤΩΝ
+# ============================================
+
+def document_bucket(values):
+    """(client_id, year, month, category, file_type, size) ή None αν δεν μετράει."""
+    if not values.get('is_current') or not values.get('year') or not values.get('month'):
+        return None
+    return (
+        values['client_id'], values['year'], values['month'],
+        values['document_category'] or 'general', values['file_type'] or '',
+        values['file_size'] or 0,
+    )
+
+
+def _bump(bucket, delta):
+    from accounting.models import DocumentFolderCounter
+
+    key = dict(zip(BUCKET_FIELDS, bucket[:5]))
+    size = bucket[5] * delta
+    counters = DocumentFolderCounter.objects.filter(**key)
+    updated = counters.update(
+        document_count=F('document_count') + delta,
+        total_size=F('total_size') + size,
+        updated_at=timezone.now(),
+    )
+    if updated:
+        if delta < 0:
+            counters.filter(document_count__lte=0).delete()
+        return
+
+    if delta > 0:
+        try:
+            with transaction.atomic():
+                DocumentFolderCounter.objects.create(document_count=delta, total_size=size, **key)
+        except IntegrityError:
+            # Δημιουργήθηκε ταυτόχρονα από άλλο request
+            counters.update(
+                document_count=F('document_count') + delta,
+                total_size=F('total_size') + size,
+                updated_at=timezone.now(),
+            )
+
+
+def apply_document_change(old_bucket, new_bucket):
+    """Μεταφορά ενός εγγράφου από τον παλιό στον νέο φάκελο (οποιοδήποτε μπορεί να είναι None)."""
+    if old_bucket == new_bucket:
+        return
+    if old_bucket is not None:
+        _bump(old_bucket, -1)
+    if new_bucket is not None:
+        _bump(new_bucket, 1)
+    transaction.on_commit(invalidate_document_counters_cache)
+
+
+def rebuild_document_counters(client_ids=None, batch_size=2000):
+    """
+    Επανυπολογισμός μετρητών από τα ClientDocument (ένα GROUP BY).
+
+    Args:
+        client_ids: μόνο αυτοί οι πελάτες (default: όλοι)
+
+    Returns:
+        int: πλήθος μετρητών
+    """
+    from accounting.models import ClientDocument, DocumentFolderCounter
+
+    documents = ClientDocument.objects.filter(is_current=True)
+    counters = DocumentFolderCounter.objects.all()
+    if client_ids is not None:
+        documents = documents.filter(client_id__in=client_ids)
+        counters = counters.filter(client_id__in=client_ids)
+
+    rows = documents.values(*BUCKET_FIELDS).annotate(
+        count=Count('id'), size=Sum('file_size')
+    ).order_by()
+
+    with transaction.atomic():
+        counters.delete()
+        DocumentFolderCounter.objects.bulk_create(
+            (
+                DocumentFolderCounter(
+                    client_id=row['client_id'], year=row['year'], month=row['month'],
+                    document_category=row['document_category'], file_type=row['file_type'],
+                    document_count=row['count'], total_size=row['size'] or 0,
+                )
+                for row in rows.iterator()
+            ),
+            batch_size=batch_size,
+        )
+        transaction.on_commit(invalidate_document_counters_cache)
+
+    return counters.count()
+
+
+# ============================================
+# ΑΝΑΓΝΩΣΗ
+# ============================================
+
+def folder_tree(client_id=None, year=None):
+    """
+    Ένα επίπεδο του δέντρου browse από τους μετρητές:
+    πελάτες -> έτη πελάτη -> μήνες έτους.
+    """
+    from accounting.models import DocumentFolderCounter
+
+    def compute():
+        counters = DocumentFolderCounter.objects.all()
+        if client_id is None:
+            rows = counters.values('client_id', 'client__eponimia', 'client__afm').annotate(
+                document_count=Sum('document_count')
+            ).order_by('client__eponimia')
+            return [{
+                'id': row['client_id'],
+                'eponimia': row['client__eponimia'],
+                'afm': row['client__afm'],
+                'document_count': row['document_count'],
+            } for row in rows]
+
+        counters = counters.filter(client_id=client_id)
+        if year is None:
+            return list(counters.values('year').annotate(count=Sum('document_count')).order_by('-year'))
+        return list(
+            counters.filter(year=year).values('month').annotate(count=Sum('document_count')).order_by('month')
+        )
+
+    return get_cached_tree('browse', (client_id, year), compute)
+
+
+def document_totals(top_file_types=10):
+    """Σύνολο, μέγεθος, ανά κατηγορία και ανά τύπο τρεχόντων εγγράφων - ένα query."""
+    from accounting.models import DocumentFolderCounter
+
+    def compute():
+        total_documents = total_size = 0
+        by_category, by_file_type = {}, {}
+        rows = DocumentFolderCounter.objects.values('document_category', 'file_type').annotate(
+            count=Sum('document_count'), size=Sum('total_size')
+        ).order_by()
+        for row in rows:
+            total_documents += row['count']
+            total_size += row['size'] or 0
+            by_category[row['document_category']] = by_category.get(row['document_category'], 0) + row['count']
+            by_file_type[row['file_type']] = by_file_type.get(row['file_type'], 0) + row['count']
+
+        return {
+            'total_documents': total_documents,
+            'total_size': total_size,
+            'by_category': [
+                {'document_category': category, 'count': count}
+                for category, count in sorted(by_category.items(), key=lambda item: -item[1])
+            ],
+            'by_file_type': [
+                {'file_type': file_type, 'count': count}
+                for file_type, count in sorted(by_file_type.items(), key=lambda item: -item[1])
+            ][:top_file_types],
+        }
+
+    return get_cached_tree('totals', (top_file_types,), compute)
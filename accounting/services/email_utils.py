@@ -454,31 +454,38 @@ class BulkEmailSender:
                 sender.send(email)
     """
 
-    def __init__(self, use_pool: bool = True, use_rate_limit: bool = True):
+    def __init__(self, use_pool: bool = True, use_rate_limit: bool = True, connection=None,
+                 rate_limiter: RateLimiter = None):
         """
         Initialize bulk sender.
 
         Args:
             use_pool: Whether to use connection pooling
             use_rate_limit: Whether to apply rate limiting
+            connection: Optional dedicated connection (e.g. SMTP settings from
+                        the database), kept open for the whole batch instead of the pool
+            rate_limiter: Optional limiter instance (e.g. fetched once by the caller
+                          before starting worker threads, so they don't hit the database)
         """
-        self.use_pool = use_pool
+        self.use_pool = use_pool and connection is None
         self.use_rate_limit = use_rate_limit
-        self._connection = None
+        self._connection = connection
         self._pool = None
-        self._rate_limiter = None
+        self._rate_limiter = rate_limiter if use_rate_limit else None
         self._sent_count = 0
         self._failed_count = 0
 
     def __enter__(self):
-        if self.use_pool:
+        if self._connection is not None:
+            self._connection.open()
+        elif self.use_pool:
             self._pool = get_connection_pool()
             self._connection = self._pool.get_connection()
         else:
             self._connection = get_connection(fail_silently=False)
             self._connection.open()
 
-        if self.use_rate_limit:
+        if self.use_rate_limit and self._rate_limiter is None:
             self._rate_limiter = get_rate_limiter()
 
         return self
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""
+accounting/services/file_index.py
+Description: Μόνιμο ευρετήριο αρχείων πελατών (ClientFileIndex).
+
+- refresh_file_index: os.scandir παράλληλα ανά φάκελο πελάτη (ένα stat ανά
+  αρχείο) και σταδιακή ενημέρωση της βάσης - γράφονται μόνο τα νέα, τα
+  αλλαγμένα και τα διαγραμμένα αρχεία. Προαιρετικά SHA-256 μόνο για όσα
+  δεν έχουν hash (νέα/αλλαγμένα).
+- orphan_files / storage_summary: ορφανά αρχεία και στατιστικά χώρου από
+  το ευρετήριο, χωρίς πρόσβαση στον δίσκο.
+"""
+import hashlib
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db.models import Count, Max, Sum
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+CLIENTS_DIR = 'clients'
+SYSTEM_FILES = {'INFO.txt', '.DS_Store', 'Thumbs.db'}
+BATCH_SIZE = 500
+
+
+def _scan_client_folder(clients_root, folder):
+    """
+    Όλα τα αρχεία ενός φακέλου πελάτη: {σχετικό path με /: (size, mtime)}.
+    Τρέχει σε worker thread - δεν αγγίζει τη βάση.
+    """
+    files, errors = {}, 0
+    stack = [(os.path.join(clients_root, folder), f'{CLIENTS_DIR}/{folder}')]
+    while stack:
+        path, rel_path = stack.pop()
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    entry_rel = f'{rel_path}/{entry.name}'
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append((entry.path, entry_rel))
+                    elif entry.name not in SYSTEM_FILES and entry.is_file(follow_symlinks=False):
+                        stat = entry.stat(follow_symlinks=False)
+                        files[entry_rel] = (stat.st_size, stat.st_mtime)
+        except OSError as e:
+            errors += 1
+            logger.warning(f"Could not scan {path}: {e}")
+    return folder, files, errors
+
+
+def _sync_folder(folder, files, stats):
+    """Σύγκριση με το ευρετήριο ενός φακέλου και bulk create/update/delete."""
+    from accounting.models import ClientFileIndex
+
+    existing = {
+        path: (pk, size, mtime)
+        for pk, path, size, mtime in ClientFileIndex.objects.filter(
+            client_folder=folder
+        ).values_list('id', 'path', 'size', 'mtime')
+    }
+
+    now = timezone.now()
+    created, changed = [], []
+    for path, (size, mtime) in files.items():
+        current = existing.pop(path, None)
+        if current is None:
+            created.append(ClientFileIndex(path=path, client_folder=folder, size=size, mtime=mtime))
+        elif current[1] != size or current[2] != mtime:
+            changed.append(ClientFileIndex(
+                id=current[0], size=size, mtime=mtime, sha256='', indexed_at=now
+            ))
+
+    ClientFileIndex.objects.bulk_create(created, batch_size=BATCH_SIZE)
+    ClientFileIndex.objects.bulk_update(
+        changed, ['size', 'mtime', 'sha256', 'indexed_at'], batch_size=BATCH_SIZE
+    )
+    stale_ids = [pk for pk, _, _ in existing.values()]
+    for start in range(0, len(stale_ids), BATCH_SIZE):
+        ClientFileIndex.objects.filter(id__in=stale_ids[start:start + BATCH_SIZE]).delete()
+
+    stats['files'] += len(files)
+    stats['created'] += len(created)
+    stats['updated'] += len(changed)
+    stats['deleted'] += len(stale_ids)
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _hash_entry(media_root, pk, path):
+    try:
+        return pk, file_sha256(os.path.join(media_root, path))
+    except OSError as e:
+        logger.warning(f"Could not hash {path}: {e}")
+        return pk, ''
+
+
+def _hash_missing(pool, media_root, folders, stats):
+    """SHA-256 για όσες εγγραφές δεν έχουν (νέα ή αλλαγμένα αρχεία)."""
+    from accounting.models import ClientFileIndex
+
+    queryset = ClientFileIndex.objects.filter(sha256='')
+    if folders is not None:
+        queryset = queryset.filter(client_folder__in=folders)
+
+    pending = list(queryset.values_list('id', 'path'))
+    for start in range(0, len(pending), BATCH_SIZE):
+        chunk = pending[start:start + BATCH_SIZE]
+        hashed = [
+            ClientFileIndex(id=pk, sha256=digest)
+            for pk, digest in pool.map(lambda item: _hash_entry(media_root, *item), chunk)
+            if digest
+        ]
+        ClientFileIndex.objects.bulk_update(hashed, ['sha256'], batch_size=BATCH_SIZE)
+        stats['hashed'] += len(hashed)
+        stats['errors'] += len(chunk) - len(hashed)
+
+
+def refresh_file_index(media_root=None, folders=None, workers=None, with_hash=False):
+    """
+    Σταδιακή ενημέρωση του ευρετηρίου από το MEDIA_ROOT/clients.
+
+    Args:
+        folders: μόνο αυτοί οι φάκελοι πελατών (default: όλοι)
+        workers: παράλληλα scandir (default: settings.FILE_INDEX_WORKERS ή 8)
+        with_hash: SHA-256 για νέα/αλλαγμένα αρχεία
+
+    Returns:
+        dict: folders, files, created, updated, deleted, hashed, errors, duration
+    """
+    from accounting.models import ClientFileIndex
+
+    started = time.monotonic()
+    media_root = str(media_root or settings.MEDIA_ROOT)
+    clients_root = os.path.join(media_root, CLIENTS_DIR)
+    workers = workers or getattr(settings, 'FILE_INDEX_WORKERS', 8)
+    stats = {
+        'folders': 0, 'files': 0, 'created': 0, 'updated': 0, 'deleted': 0,
+        'hashed': 0, 'errors': 0, 'duration': 0.0,
+    }
+
+    try:
+        with os.scandir(clients_root) as entries:
+            disk_folders = [entry.name for entry in entries if entry.is_dir(follow_symlinks=False)]
+    except FileNotFoundError:
+        disk_folders = []
+    if folders is not None:
+        folders = set(folders)
+        disk_folders = [folder for folder in disk_folders if folder in folders]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        scans = pool.map(lambda folder: _scan_client_folder(clients_root, folder), disk_folders)
+        # Οι εγγραφές στη βάση γίνονται στο κύριο thread, ανά φάκελο
+        for folder, files, errors in scans:
+            _sync_folder(folder, files, stats)
+            stats['folders'] += 1
+            stats['errors'] += errors
+
+        # Φάκελοι πελατών που δεν υπάρχουν πλέον στον δίσκο
+        gone = ClientFileIndex.objects.exclude(client_folder__in=disk_folders)
+        if folders is not None:
+            gone = gone.filter(client_folder__in=folders)
+        stats['deleted'] += gone.delete()[0]
+
+        if with_hash:
+            _hash_missing(pool, media_root, folders, stats)
+
+    stats['duration'] = round(time.monotonic() - started, 2)
+    logger.info(
+        f"File index refreshed: {stats['folders']} folders, {stats['files']} files "
+        f"(+{stats['created']} ~{stats['updated']} -{stats['deleted']}) in {stats['duration']}s"
+    )
+    return stats
+
+
+def orphan_files(older_than_days=None):
+    """Αρχεία του ευρετηρίου που δεν αντιστοιχούν σε ClientDocument."""
+    from accounting.models import ClientDocument, ClientFileIndex
+
+    queryset = ClientFileIndex.objects.exclude(
+        path__in=ClientDocument.objects.exclude(file='').values('file')
+    )
+    if older_than_days:
+        queryset = queryset.filter(mtime__lte=time.time() - older_than_days * 86400)
+    return queryset
+
+
+def storage_summary(top=10):
+    """Σύνολα χώρου, ορφανά και μεγαλύτεροι φάκελοι πελατών από το ευρετήριο."""
+    from accounting.models import ClientFileIndex
+
+    totals = ClientFileIndex.objects.aggregate(
+        files=Count('id'), size=Sum('size'), indexed_at=Max('indexed_at')
+    )
+    orphans = orphan_files().aggregate(files=Count('id'), size=Sum('size'))
+    by_client_folder = (
+        ClientFileIndex.objects.values('client_folder')
+        .annotate(files=Count('id'), size=Sum('size'))
+        .order_by('-size')[:top]
+    )
+    return {
+        'files': totals['files'],
+        'size': totals['size'] or 0,
+        'indexed_at': totals['indexed_at'],
+        'orphan_files': orphans['files'],
+        'orphan_size': orphans['size'] or 0,
+        'by_client_folder': list(by_client_folder),
+    }
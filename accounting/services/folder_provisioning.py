@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+"""
+accounting/services/folder_provisioning.py
+Description: Δημιουργία φακέλων αρχειοθέτησης πελατών (lazy + batched).
+
+Οι φάκελοι δεν δημιουργούνται πλέον όλοι στο save του ClientProfile:
+- Lazy: κάθε έγγραφο γράφεται στον φάκελό του και το storage δημιουργεί μόνο
+  αυτόν (FileSystemStorage.save -> os.makedirs του parent). Το INFO.txt του
+  πελάτη γράφεται στο πρώτο έγγραφο.
+- Batched: ο FolderProvisioner δημιουργεί τον σκελετό (00_ΜΟΝΙΜΑ, μήνες,
+  13_ΕΤΗΣΙΑ) για πολλούς πελάτες με ένα os.makedirs ανά φάκελο-φύλλο και
+  χωρίς επανάληψη για φακέλους που ήδη ξέρει ότι υπάρχουν. Χρησιμοποιείται από
+  το init_filing_system (π.χ. αλλαγή έτους) και, αν είναι ενεργό το
+  CLIENT_FOLDERS_SKELETON_ON_CREATE, από Celery task μετά το commit.
+"""
+import logging
+import os
+import threading
+from datetime import datetime
+
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PERMANENT_FOLDER = '00_ΜΟΝΙΜΑ'
+DEFAULT_YEAREND_FOLDER = '13_ΕΤΗΣΙΑ'
+DEFAULT_PERMANENT_CATEGORIES = ['contracts', 'registration', 'licenses']
+DEFAULT_MONTHLY_CATEGORIES = [
+    'vat', 'apd', 'myf', 'payroll', 'invoices_issued', 'invoices_received', 'bank', 'general'
+]
+DEFAULT_YEAREND_CATEGORIES = ['e1', 'e2', 'e3', 'enfia', 'balance']
+
+# Πελάτες (pk) με INFO.txt σε αυτή τη διεργασία (αποφυγή stat σε κάθε έγγραφο)
+_info_written = set()
+_info_lock = threading.Lock()
+
+
+class FolderLayout:
+    """Δομή φακέλων από τις FilingSystemSettings (διαβάζονται μία φορά)."""
+
+    def __init__(self, filing_settings=None, archive_root=None):
+        self.filing_settings = filing_settings
+        self.archive_root = archive_root or str(settings.MEDIA_ROOT)
+
+    @classmethod
+    def from_settings(cls):
+        try:
+            from settings.models import FilingSystemSettings
+            filing_settings = FilingSystemSettings.get_settings()
+            return cls(filing_settings, filing_settings.get_archive_root())
+        except Exception:
+            return cls()
+
+    def client_root(self, client):
+        from accounting.models import get_client_folder
+        return os.path.join(self.archive_root, get_client_folder(client))
+
+    def permanent_dirs(self, client):
+        filing_settings = self.filing_settings
+        if filing_settings and filing_settings.enable_permanent_folder:
+            name = filing_settings.permanent_folder_name
+            categories = filing_settings.get_permanent_folder_categories()
+        else:
+            name, categories = DEFAULT_PERMANENT_FOLDER, DEFAULT_PERMANENT_CATEGORIES
+        base = os.path.join(self.client_root(client), name)
+        return [os.path.join(base, category) for category in categories]
+
+    def year_dirs(self, client, year):
+        filing_settings = self.filing_settings
+        year_path = os.path.join(self.client_root(client), str(year))
+
+        monthly_categories = (
+            filing_settings.get_monthly_folder_categories()
+            if filing_settings else DEFAULT_MONTHLY_CATEGORIES
+        )
+        paths = []
+        for month in range(1, 13):
+            if filing_settings and filing_settings.use_greek_month_names:
+                month_name = filing_settings.get_month_folder_name(month)
+            else:
+                month_name = f"{month:02d}"
+            month_path = os.path.join(year_path, month_name)
+            paths.extend(os.path.join(month_path, category) for category in monthly_categories)
+
+        if filing_settings and filing_settings.enable_yearend_folder:
+            yearend_path = os.path.join(year_path, filing_settings.yearend_folder_name)
+            yearend_categories = filing_settings.get_yearend_folder_categories()
+        else:
+            yearend_path = os.path.join(year_path, DEFAULT_YEAREND_FOLDER)
+            yearend_categories = DEFAULT_YEAREND_CATEGORIES
+        paths.extend(os.path.join(yearend_path, category) for category in yearend_categories)
+        return paths
+
+
+def write_client_info(client_root, client):
+    """INFO.txt με τα στοιχεία και τη δομή φακέλων του πελάτη."""
+    os.makedirs(client_root, exist_ok=True)
+    with open(os.path.join(client_root, 'INFO.txt'), 'w', encoding='utf-8') as f:
+        f.write("ΦΑΚΕΛΟΣ ΠΕΛΑΤΗ\n")
+        f.write(f"{'=' * 50}\n\n")
+        f.write(f"Επωνυμία: {client.eponimia}\n")
+        f.write(f"ΑΦΜ: {client.afm}\n")
+        f.write(f"ΔΟΥ: {client.doy or '-'}\n")
+        f.write(f"Email: {client.email or '-'}\n")
+        f.write(f"Τηλέφωνο: {client.kinito_tilefono or client.tilefono_epixeirisis_1 or '-'}\n")
+        f.write(f"\nΔημιουργία: {datetime.now().strftime('%d/%m/%Y %H:%M')}\n")
+        f.write(f"\n{'=' * 50}\n")
+        f.write("ΔΟΜΗ ΦΑΚΕΛΩΝ\n")
+        f.write(f"{'=' * 50}\n\n")
+        f.write("00_ΜΟΝΙΜΑ/      → Μόνιμα έγγραφα (συμβάσεις, καταστατικό)\n")
+        f.write("  ├─ registration/  → Ιδρυτικά έγγραφα\n")
+        f.write("  ├─ contracts/     → Συμβάσεις\n")
+        f.write("  └─ licenses/      → Άδειες & πιστοποιητικά\n\n")
+        f.write("YYYY/           → Φάκελος έτους\n")
+        f.write("  ├─ 01-12/         → Μηνιαίοι φάκελοι\n")
+        f.write("  │   ├─ vat/           → ΦΠΑ\n")
+        f.write("  │   ├─ apd/           → ΑΠΔ/ΕΦΚΑ\n")
+        f.write("  │   ├─ myf/           → ΜΥΦ\n")
+        f.write("  │   ├─ payroll/       → Μισθοδοσία\n")
+        f.write("  │   ├─ invoices_issued/  → Εκδοθέντα τιμολόγια\n")
+        f.write("  │   ├─ invoices_received/→ Ληφθέντα τιμολόγια\n")
+        f.write("  │   ├─ bank/          → Τραπεζικά\n")
+        f.write("  │   └─ general/       → Γενικά\n")
+        f.write("  └─ 13_ΕΤΗΣΙΑ/     → Ετήσιες δηλώσεις\n")
+        f.write("      ├─ e1/            → Ε1 Φόρος Εισοδήματος\n")
+        f.write("      ├─ e2/            → Ε2 Ακίνητα\n")
+        f.write("      ├─ e3/            → Ε3 Οικονομικά Στοιχεία\n")
+        f.write("      ├─ enfia/         → ΕΝΦΙΑ\n")
+        f.write("      └─ balance/       → Ισολογισμός\n")
+
+
+def ensure_client_info(client, layout=None):
+    """
+    Lazy INFO.txt: γράφεται στο πρώτο έγγραφο του πελάτη.
+    Ένας έλεγχος ύπαρξης ανά πελάτη και διεργασία.
+    """
+    if client.pk in _info_written:
+        return False
+
+    client_root = (layout or FolderLayout.from_settings()).client_root(client)
+    written = False
+    try:
+        if not os.path.exists(os.path.join(client_root, 'INFO.txt')):
+            write_client_info(client_root, client)
+            written = True
+    except OSError as e:
+        logger.error(f"Could not write INFO.txt for client {client.afm}: {e}")
+        return False
+
+    with _info_lock:
+        _info_written.add(client.pk)
+    return written
+
+
+class FolderProvisioner:
+    """
+    Μαζική δημιουργία φακέλων.
+
+    Κάθε φάκελος-φύλλο ζητείται με ένα os.makedirs (που δημιουργεί και τους
+    γονείς), ή με ένα os.mkdir όταν ο γονέας είναι ήδη γνωστός. Φάκελοι που
+    δημιουργήθηκαν ή βρέθηκαν σε αυτό το run - και οι γονείς τους - δεν
+    ξαναζητούνται.
+
+    stats: requested, makedirs, skipped, info_files, errors
+    """
+
+    def __init__(self, layout=None, dry_run=False):
+        self.layout = layout or FolderLayout.from_settings()
+        self.dry_run = dry_run
+        self._known = set()
+        self.stats = {'requested': 0, 'makedirs': 0, 'skipped': 0, 'info_files': 0, 'errors': 0}
+
+    def ensure_dir(self, path):
+        self.stats['requested'] += 1
+        if path in self._known:
+            self.stats['skipped'] += 1
+            return False
+
+        if self.dry_run:
+            if os.path.isdir(path):
+                self.stats['skipped'] += 1
+                self._known.add(path)
+                return False
+        else:
+            try:
+                if os.path.dirname(path) in self._known:
+                    # Γνωστός γονέας: ένα mkdir, χωρίς τους ελέγχους του makedirs
+                    try:
+                        os.mkdir(path)
+                    except FileExistsError:
+                        pass
+                else:
+                    os.makedirs(path, exist_ok=True)
+            except OSError as e:
+                self.stats['errors'] += 1
+                logger.error(f"Could not create folder {path}: {e}")
+                return False
+        self.stats['makedirs'] += 1
+
+        # Οι γονείς υπάρχουν πλέον κι αυτοί
+        while path and path not in self._known:
+            self._known.add(path)
+            path = os.path.dirname(path)
+        return True
+
+    def provision_client(self, client, years=(), permanent=True, info=True):
+        """Σκελετός φακέλων ενός πελάτη για τα δοσμένα έτη."""
+        paths = self.layout.permanent_dirs(client) if permanent else []
+        for year in years:
+            paths.extend(self.layout.year_dirs(client, year))
+        for path in paths:
+            self.ensure_dir(path)
+
+        if info and not self.dry_run:
+            client_root = self.layout.client_root(client)
+            try:
+                if not os.path.exists(os.path.join(client_root, 'INFO.txt')):
+                    write_client_info(client_root, client)
+                    self.stats['info_files'] += 1
+            except OSError as e:
+                self.stats['errors'] += 1
+                logger.error(f"Could not write INFO.txt for client {client.afm}: {e}")
+        return self.stats
+
+    def provision(self, clients, years=(), permanent=True, info=True):
+        for client in clients:
+            self.provision_client(client, years=years, permanent=permanent, info=info)
+        return self.stats
+
+
+def provision_client_folders(client_ids, years=None):
+    """
+    Σκελετός φακέλων για πολλούς πελάτες (default: τρέχον έτος).
+    Καλείται από το Celery task provision_client_folders_task.
+    """
+    from accounting.models import ClientProfile
+
+    years = years or [datetime.now().year]
+    provisioner = FolderProvisioner()
+    clients = ClientProfile.objects.filter(id__in=client_ids).only(
+        'id', 'afm', 'eponimia', 'doy', 'email', 'kinito_tilefono', 'tilefono_epixeirisis_1'
+    )
+    stats = provisioner.provision(clients.iterator(chunk_size=500), years=years)
+    logger.info(
+        f"Provisioned folders for {len(client_ids)} clients: "
+        f"{stats['makedirs']} makedirs, {stats['info_files']} INFO.txt, {stats['errors']} errors"
+    )
+    return stats
+
+
+def _queue_client_folders(client_ids):
+    try:
+        from accounting.tasks import provision_client_folders_task
+        provision_client_folders_task.delay(client_ids)
+    except Exception as e:
+        # Χωρίς broker: συγχρονικά, αλλά πάντα μετά το commit
+        logger.warning(f"Could not queue folder provisioning, running synchronously: {e}")
+        provision_client_folders(client_ids)
+
+
+def schedule_client_folders(client_ids):
+    """
+    Σκελετός φακέλων για νέους πελάτες, αν είναι ενεργό το
+    CLIENT_FOLDERS_SKELETON_ON_CREATE: ένα task για όλους τους πελάτες,
+    μετά το commit. Αλλιώς δεν γίνεται τίποτα - οι φάκελοι δημιουργούνται
+    με το πρώτο έγγραφο.
+    """
+    client_ids = list(client_ids)
+    if not client_ids or not getattr(settings, 'CLIENT_FOLDERS_SKELETON_ON_CREATE', False):
+        return
+    transaction.on_commit(lambda: _queue_client_folders(client_ids))
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+accounting/services/live_feed.py
+Description: Live feed κλήσεων/tickets για το dashboard (Server-Sent Events).
+
+Τα signals των VoIPCall/Ticket γράφουν ένα μικρό delta ανά αλλαγή στο
+cache, με αύξοντα αριθμό (seq). Οι ανοιχτοί browsers διαβάζουν μόνο από
+το cache - N dashboards κοστίζουν ένα DB read ανά event (στο signal),
+όχι N polls. Το seq χρησιμοποιείται και ως ETag για conditional GET.
+
+Το seq δίνεται από τη γραμμή LiveFeedSequence (select_for_update), όχι
+από cache.incr: το DatabaseCache (fallback χωρίς Redis) δεν έχει ατομικό
+incr και δύο publishers θα έπαιρναν το ίδιο seq.
+
+Τα events κρατούνται LIVE_FEED_EVENT_TTL δευτερόλεπτα· όποιος μείνει πιο
+πίσω παίρνει `reset` και ξαναφορτώνει τις λίστες του.
+"""
+import json
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+LIVE_SEQ_KEY = 'accounting:live:seq'
+LIVE_EVENT_KEY = 'accounting:live:event:{}'
+LIVE_FEED_MAX_EVENTS = 200
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# ============================================
+# DELTAS
+# ============================================
+
+def call_delta(call):
+    """Τα πεδία μιας κλήσης που χρειάζονται οι λίστες του dashboard."""
+    return {
+        'id': call.id,
+        'call_id': call.call_id,
+        'phone_number': call.phone_number,
+        'direction': call.direction,
+        'status': call.status,
+        'resolution': call.resolution,
+        'duration_seconds': call.duration_seconds,
+        'started_at': call.started_at.isoformat() if call.started_at else None,
+        'ended_at': call.ended_at.isoformat() if call.ended_at else None,
+        'client_id': call.client_id,
+        'client_name': call.client.eponimia if call.client_id else None,
+    }
+
+
+def ticket_delta(ticket):
+    """Τα πεδία ενός ticket που χρειάζονται οι λίστες και τα toasts."""
+    call = ticket.call if ticket.call_id else None
+    return {
+        'id': ticket.id,
+        'title': ticket.title,
+        'status': ticket.status,
+        'priority': ticket.priority,
+        'is_open': ticket.is_open,
+        'client_id': ticket.client_id,
+        'client_name': ticket.client.eponimia if ticket.client_id else None,
+        'call_id': ticket.call_id,
+        'phone_number': call.phone_number if call else None,
+        'created_at': ticket.created_at.isoformat() if ticket.created_at else None,
+    }
+
+
+# ============================================
+# PUBLISH / READ
+# ============================================
+
+def publish_live_event(kind, action, data):
+    """
+    Προσθήκη event στο feed.
+
+    Args:
+        kind: 'call' ή 'ticket'
+        action: 'created', 'updated', 'deleted' ή 'bulk_updated'
+        data: delta (dict)
+
+    Returns:
+        int | None: seq του event (None αν το cache ή η βάση δεν είναι διαθέσιμα)
+    """
+    from accounting.models import LiveFeedSequence
+
+    try:
+        LiveFeedSequence.objects.get_or_create(pk=1)
+        with transaction.atomic():
+            # Το lock κρατιέται ως το commit: τα events και το LIVE_SEQ_KEY
+            # γράφονται με τη σειρά των seq, χωρίς να γυρίζει πίσω το seq
+            sequence = LiveFeedSequence.objects.select_for_update().get(pk=1)
+            sequence.value = F('value') + 1
+            sequence.save(update_fields=['value'])
+            sequence.refresh_from_db(fields=['value'])
+            seq = sequence.value
+
+            cache.set(LIVE_EVENT_KEY.format(seq), {
+                'id': seq,
+                'type': kind,
+                'action': action,
+                'data': data,
+                'at': timezone.now().isoformat(),
+            }, _setting('LIVE_FEED_EVENT_TTL', 600))
+            cache.set(LIVE_SEQ_KEY, seq, None)
+        return seq
+    except Exception as e:
+        logger.warning(f"Could not publish live {kind} event: {e}")
+        return None
+
+
+def current_seq():
+    """Τελευταίο seq (0 αν δεν υπάρχει ακόμα event ή cache)."""
+    try:
+        return cache.get(LIVE_SEQ_KEY, 0)
+    except Exception as e:
+        logger.warning(f"Live feed unavailable: {e}")
+        return 0
+
+
+def events_since(since):
+    """
+    Events μετά το `since`.
+
+    Returns:
+        tuple: (seq, events, reset) - seq είναι το τελευταίο event που
+        επιστράφηκε· reset=True όταν ο client έμεινε πίσω (ή άλλαξε το
+        cache) και πρέπει να ξαναφορτώσει τις λίστες.
+    """
+    seq = current_seq()
+    if since == seq:
+        return seq, [], False
+    if since > seq or seq - since > LIVE_FEED_MAX_EVENTS:
+        return seq, [], True
+
+    keys = [LIVE_EVENT_KEY.format(n) for n in range(since + 1, seq + 1)]
+    try:
+        found = cache.get_many(keys)
+    except Exception as e:
+        logger.warning(f"Live feed unavailable: {e}")
+        return since, [], False
+
+    events = []
+    for key in keys:
+        if key not in found:
+            # Έληξε (ο client έμεινε πίσω) ή γράφεται ακόμα - στο επόμενο poll
+            return (seq, [], True) if not events else (events[-1]['id'], events, False)
+        events.append(found[key])
+    return seq, events, False
+
+
+# ============================================
+# SERVER-SENT EVENTS
+# ============================================
+
+def format_sse(event_id, event, data):
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def event_stream(last_id):
+    """
+    Generator για StreamingHttpResponse (text/event-stream).
+
+    Διαβάζει μόνο το cache κάθε LIVE_FEED_POLL_INTERVAL δευτερόλεπτα και
+    κλείνει μετά από LIVE_FEED_MAX_SECONDS ώστε να ελευθερώνεται ο worker·
+    ο browser ξανασυνδέεται με Last-Event-ID και συνεχίζει από εκεί.
+    """
+    poll_interval = _setting('LIVE_FEED_POLL_INTERVAL', 1)
+    heartbeat = _setting('LIVE_FEED_HEARTBEAT', 15)
+    max_seconds = _setting('LIVE_FEED_MAX_SECONDS', 55)
+
+    started = last_beat = time.monotonic()
+    yield "retry: 3000\n\n"
+    yield format_sse(last_id, 'hello', {'seq': last_id})
+
+    while True:
+        seq, events, reset = events_since(last_id)
+        if reset:
+            yield format_sse(seq, 'reset', {'seq': seq})
+        for event in events:
+            yield format_sse(event['id'], event['type'], event)
+        if events or reset:
+            last_id = seq
+            last_beat = time.monotonic()
+        elif time.monotonic() - last_beat >= heartbeat:
+            yield ": keep-alive\n\n"
+            last_beat = time.monotonic()
+        if time.monotonic() - started >= max_seconds:
+            return
+        time.sleep(poll_interval)
@@ -0,0 +1,412 @@
+# -*- coding: utf-8 -*-
+"""
+accounting/services/notification_feed.py
+Description: Αποθηκευμένες ειδοποιήσεις προθεσμιών (ObligationNotification)
+για το /api/v1/notifications/.
+
+- sync_obligation_notifications: συγχρονισμός συγκεκριμένων υποχρεώσεων
+  (signals της MonthlyObligation και bulk paths που τα παρακάμπτουν).
+- refresh_notification_feed: ημερήσια μετάβαση προσεχώς -> σήμερα ->
+  καθυστερημένη (και πλήρης επανέλεγχος όλων των ειδοποιήσεων).
+- notification_feed: snapshot ή μόνο οι αλλαγές μετά από cursor, με
+  read/unread ανά χρήστη.
+
+Κάθε αλλαγή γράφει νέα γραμμή, οπότε το μέγιστο id είναι ο cursor και μαζί
+με τον cursor αναγνώσεων του χρήστη δίνει το ETag - το polling που δεν
+βρίσκει αλλαγές κοστίζει δύο indexed MAX() και απαντά 304.
+
+Τα ids δεν ακολουθούν τη σειρά των commits: μια γραμμή με μικρότερο id
+μπορεί να γίνει ορατή αφού ο client έχει ήδη πάρει μεγαλύτερο cursor. Γι'
+αυτό κάθε commit αλλάζει την έκδοση του feed (μέρος του ETag) και το delta
+ξαναδιαβάζει τις γραμμές των τελευταίων CURSOR_OVERLAP κάτω από τον cursor.
+"""
+import logging
+import time
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, Count, IntegerField, Max, Q, Value, When
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+NOTIFICATION_STATUSES = ('pending', 'overdue')
+UPCOMING_DAYS = 3
+SNAPSHOT_LIMIT = 100
+BATCH_SIZE = 500
+
+# Πρέπει να ξεπερνά τη μεγαλύτερη transaction που γράφει ειδοποιήσεις
+CURSOR_OVERLAP = timedelta(minutes=5)
+FEED_VERSION_KEY = 'accounting:notifications:version'
+
+TYPE_ORDER = ('overdue', 'due_today', 'upcoming')
+PRIORITY = {'overdue': 'high', 'due_today': 'medium', 'upcoming': 'low'}
+ICON = {'overdue': 'overdue', 'due_today': 'warning', 'upcoming': 'calendar'}
+
+_FIELDS = ('client_id', 'client_name', 'obligation_type_name', 'notification_type', 'deadline')
+
+
+def _models(obligation_model=None, notification_model=None, read_model=None):
+    """Τα μοντέλα της εφαρμογής ή τα ιστορικά μοντέλα ενός migration."""
+    from accounting.models import MonthlyObligation, NotificationRead, ObligationNotification
+
+    return (
+        obligation_model or MonthlyObligation,
+        notification_model or ObligationNotification,
+        read_model or NotificationRead,
+    )
+
+
+# ============================================
+# ΕΙΔΟΣ ΕΙΔΟΠΟΙΗΣΗΣ
+# ============================================
+
+def notification_type(status, deadline, today):
+    """
+    Είδος ειδοποίησης μιας υποχρέωσης σήμερα (ή None).
+
+    Καθυστερημένες: εκκρεμείς/overdue με παρελθούσα προθεσμία.
+    Σήμερα / προσεχώς (UPCOMING_DAYS ημέρες): μόνο εκκρεμείς.
+    """
+    if status not in NOTIFICATION_STATUSES or deadline is None:
+        return None
+    if deadline < today:
+        return 'overdue'
+    if status != 'pending':
+        return None
+    if deadline == today:
+        return 'due_today'
+    if deadline <= today + timedelta(days=UPCOMING_DAYS):
+        return 'upcoming'
+    return None
+
+
+def _expected_fields(row, today):
+    kind = notification_type(row['status'], row['deadline'], today)
+    if kind is None:
+        return None
+    return {
+        'client_id': row['client_id'],
+        'client_name': row['client__eponimia'] or '',
+        'obligation_type_name': row['obligation_type__name'] or '',
+        'notification_type': kind,
+        'deadline': row['deadline'],
+    }
+
+
+# ============================================
+# ΣΥΓΧΡΟΝΙΣΜΟΣ
+# ============================================
+
+def _bump_feed_version():
+    try:
+        cache.set(FEED_VERSION_KEY, time.time_ns(), None)
+    except Exception as e:
+        logger.warning(f"Could not bump notification feed version: {e}")
+
+
+def feed_version():
+    """Έκδοση του feed - αλλάζει σε κάθε commit που γράφει ειδοποιήσεις ή αναγνώσεις."""
+    try:
+        return cache.get(FEED_VERSION_KEY, 0)
+    except Exception as e:
+        logger.warning(f"Notification feed version unavailable: {e}")
+        return 0
+
+
+def _sync_chunk(obligation_ids, today, models):
+    MonthlyObligation, ObligationNotification, NotificationRead = models
+
+    rows = MonthlyObligation.objects.filter(pk__in=obligation_ids).order_by().values(
+        'id', 'status', 'deadline', 'client_id', 'client__eponimia', 'obligation_type__name'
+    )
+    expected = {row['id']: _expected_fields(row, today) for row in rows}
+    current = {
+        notification.obligation_id: notification
+        for notification in ObligationNotification.objects.filter(obligation_id__in=obligation_ids)
+    }
+
+    to_write = []
+    keep_reads = []
+    for obligation_id in obligation_ids:
+        fields = expected.get(obligation_id)
+        existing = current.get(obligation_id)
+        if fields is None:
+            if existing is None or not existing.is_active:
+                continue
+            # Tombstone: οι clients αφαιρούν την ειδοποίηση με το επόμενο delta
+            fields = {name: getattr(existing, name) for name in _FIELDS}
+            to_write.append(ObligationNotification(obligation_id=obligation_id, is_active=False, **fields))
+            continue
+        if existing is not None and existing.is_active:
+            if all(getattr(existing, name) == value for name, value in fields.items()):
+                continue
+            if existing.notification_type == fields['notification_type']:
+                # Π.χ. αλλαγή ονόματος πελάτη: η ειδοποίηση μένει διαβασμένη
+                keep_reads.append(existing.id)
+        to_write.append(ObligationNotification(obligation_id=obligation_id, **fields))
+
+    if not to_write:
+        return 0
+
+    written_ids = [notification.obligation_id for notification in to_write]
+    with transaction.atomic():
+        reads = list(
+            NotificationRead.objects.filter(notification_id__in=keep_reads).values_list(
+                'notification__obligation_id', 'user_id'
+            )
+        ) if keep_reads else []
+        ObligationNotification.objects.filter(obligation_id__in=written_ids).delete()
+        ObligationNotification.objects.bulk_create(to_write)
+        if reads:
+            # Το bulk_create δεν επιστρέφει ids σε όλες τις βάσεις (MySQL)
+            new_ids = dict(
+                ObligationNotification.objects.filter(
+                    obligation_id__in={obligation_id for obligation_id, _ in reads}
+                ).values_list('obligation_id', 'id')
+            )
+            NotificationRead.objects.bulk_create([
+                NotificationRead(user_id=user_id, notification_id=new_ids[obligation_id])
+                for obligation_id, user_id in reads
+            ])
+        transaction.on_commit(_bump_feed_version)
+    return len(to_write)
+
+
+def sync_obligation_notifications(obligation_ids, today=None, **models):
+    """
+    Ενημέρωση των ειδοποιήσεων συγκεκριμένων υποχρεώσεων.
+
+    Γράφει μόνο όσες άλλαξαν· υποχρεώσεις που ολοκληρώθηκαν ή διαγράφηκαν
+    αφήνουν tombstone (is_active=False).
+
+    Returns:
+        int: Ειδοποιήσεις που γράφτηκαν
+    """
+    today = today or timezone.localdate()
+    models = _models(**models)
+    obligation_ids = sorted({int(obligation_id) for obligation_id in obligation_ids})
+    total = 0
+    for offset in range(0, len(obligation_ids), BATCH_SIZE):
+        total += _sync_chunk(obligation_ids[offset:offset + BATCH_SIZE], today, models)
+    return total
+
+
+def refresh_notification_feed(today=None, **models):
+    """
+    Επανέλεγχος όλων των ειδοποιήσεων για τη σημερινή ημερομηνία.
+
+    Υποψήφιες είναι οι εκκρεμείς/overdue υποχρεώσεις με προθεσμία έως
+    UPCOMING_DAYS ημέρες μπροστά, συν όσες έχουν ήδη ενεργή ειδοποίηση
+    (για να φύγουν αν δεν ισχύουν πια).
+
+    Returns:
+        int: Ειδοποιήσεις που γράφτηκαν
+    """
+    today = today or timezone.localdate()
+    MonthlyObligation, ObligationNotification, _ = _models(**models)
+
+    candidates = set(
+        MonthlyObligation.objects.filter(
+            status__in=NOTIFICATION_STATUSES,
+            deadline__lte=today + timedelta(days=UPCOMING_DAYS),
+        ).order_by().values_list('id', flat=True).iterator(chunk_size=2000)
+    )
+    candidates.update(
+        ObligationNotification.objects.filter(is_active=True).values_list('obligation_id', flat=True)
+    )
+    written = sync_obligation_notifications(candidates, today=today, **models)
+    if written:
+        logger.info(f"Notification feed refreshed: {written} notifications written")
+    return written
+
+
+def sync_client_notifications(client):
+    """Ειδοποιήσεις με παλιό όνομα πελάτη (μετά από αλλαγή επωνυμίας)."""
+    from accounting.models import ObligationNotification
+
+    stale = ObligationNotification.objects.filter(client_id=client.pk, is_active=True).exclude(
+        client_name=client.eponimia
+    ).values_list('obligation_id', flat=True)
+    return sync_obligation_notifications(stale)
+
+
+def sync_clients_notifications(client_ids):
+    """Όπως το sync_client_notifications, για πολλούς πελάτες (bulk import χωρίς post_save)."""
+    from accounting.models import ObligationNotification
+
+    client_ids = list(client_ids)
+    if not client_ids:
+        return 0
+    active = ObligationNotification.objects.filter(client_id__in=client_ids, is_active=True).values_list(
+        'obligation_id', flat=True
+    )
+    return sync_obligation_notifications(active)
+
+
+def sync_obligation_type_notifications(obligation_type):
+    """Ειδοποιήσεις με παλιό όνομα τύπου υποχρέωσης."""
+    from accounting.models import MonthlyObligation, ObligationNotification
+
+    stale = ObligationNotification.objects.filter(
+        is_active=True,
+        obligation_id__in=MonthlyObligation.objects.filter(obligation_type=obligation_type).values('id'),
+    ).exclude(obligation_type_name=obligation_type.name).values_list('obligation_id', flat=True)
+    return sync_obligation_notifications(stale)
+
+
+# ============================================
+# ΑΝΑΓΝΩΣΗ
+# ============================================
+
+def feed_cursors(user):
+    """(cursor ειδοποιήσεων, cursor αναγνώσεων του χρήστη) - δύο indexed MAX()."""
+    from accounting.models import NotificationRead, ObligationNotification
+
+    cursor = ObligationNotification.objects.aggregate(cursor=Max('id'))['cursor'] or 0
+    read_cursor = NotificationRead.objects.filter(user=user).aggregate(cursor=Max('id'))['cursor'] or 0
+    return cursor, read_cursor
+
+
+def feed_etag(cursor, read_cursor, today, version=0):
+    # Η ημερομηνία μπαίνει γιατί τα μηνύματα μετρούν ημέρες από σήμερα
+    return f'"notif-{today:%Y%m%d}-{cursor}-{read_cursor}-{version}"'
+
+
+def _changed_since(since, cursor):
+    """
+    Γραμμές μετά τον cursor, συν όσες γράφτηκαν έως CURSOR_OVERLAP πριν από
+    την τελευταία γραμμή που είχε δει ο client (commit μετά το προηγούμενο poll).
+    """
+    from accounting.models import ObligationNotification
+
+    changed = Q(id__gt=since)
+    seen_at = ObligationNotification.objects.filter(id__lte=since).order_by('-id').values_list(
+        'updated_at', flat=True
+    ).first()
+    if seen_at is not None:
+        changed |= Q(updated_at__gte=seen_at - CURSOR_OVERLAP)
+    return ObligationNotification.objects.filter(changed, id__lte=cursor).order_by('id')
+
+
+def serialize_notification(notification, today, is_read=False):
+    """Η μορφή του παλιού /api/notifications/, με id = ID υποχρέωσης."""
+    kind = notification.notification_type
+    type_name = notification.obligation_type_name or 'Υποχρέωση'
+    client_name = notification.client_name or 'Πελάτης'
+    if kind == 'overdue':
+        title = f'Καθυστερημένη: {type_name}'
+        message = f'{client_name} - {(today - notification.deadline).days} μέρες καθυστέρηση'
+    elif kind == 'due_today':
+        title = f'Λήγει Σήμερα: {type_name}'
+        message = client_name
+    else:
+        title = f'Προσεχώς: {type_name}'
+        message = f'{client_name} - σε {max((notification.deadline - today).days, 0)} μέρες'
+    return {
+        'id': notification.obligation_id,
+        'type': kind,
+        'priority': PRIORITY[kind],
+        'title': title,
+        'message': message,
+        'deadline': notification.deadline.isoformat(),
+        'client_id': notification.client_id,
+        'client_name': notification.client_name,
+        'icon': ICON[kind],
+        'is_read': is_read,
+        'is_active': notification.is_active,
+    }
+
+
+def notification_counts(user):
+    from accounting.models import NotificationRead, ObligationNotification
+
+    counts = ObligationNotification.objects.filter(is_active=True).aggregate(
+        count=Count('id'),
+        overdue_count=Count('id', filter=Q(notification_type='overdue')),
+        today_count=Count('id', filter=Q(notification_type='due_today')),
+    )
+    read = NotificationRead.objects.filter(user=user, notification__is_active=True).count()
+    counts['unread_count'] = counts['count'] - read
+    return counts
+
+
+def notification_feed(user, since=None, read_since=None, today=None, limit=SNAPSHOT_LIMIT):
+    """
+    Ειδοποιήσεις του χρήστη.
+
+    Χωρίς `since` (ή με cursor που δεν αναγνωρίζεται) επιστρέφει snapshot
+    των ενεργών ειδοποιήσεων (καθυστερημένες, σήμερα, προσεχώς - κατά
+    προθεσμία). Με `since` μόνο όσες γράφτηκαν μετά (και όσες ξαναδιαβάζονται
+    από το CURSOR_OVERLAP), μαζί με tombstones (is_active=False), και στο
+    `read` τα IDs υποχρεώσεων που διαβάστηκαν μετά το `read_since` (π.χ.
+    από άλλη καρτέλα).
+
+    Returns:
+        dict: notifications, read, cursor, read_cursor, full + counts
+    """
+    from accounting.models import NotificationRead, ObligationNotification
+
+    today = today or timezone.localdate()
+    cursor, read_cursor = feed_cursors(user)
+    full = since is None or since > cursor
+
+    if full:
+        rank = Case(
+            *[When(notification_type=kind, then=Value(index)) for index, kind in enumerate(TYPE_ORDER)],
+            output_field=IntegerField(),
+        )
+        notifications = list(
+            ObligationNotification.objects.filter(is_active=True).order_by(rank, 'deadline', 'id')[:limit]
+        )
+        read = []
+    else:
+        notifications = list(_changed_since(since, cursor))
+        read = []
+        if read_since is not None and read_since < read_cursor:
+            read = list(
+                NotificationRead.objects.filter(user=user, id__gt=read_since).values_list(
+                    'notification__obligation_id', flat=True
+                )
+            )
+
+    read_ids = set(
+        NotificationRead.objects.filter(
+            user=user, notification_id__in=[notification.id for notification in notifications]
+        ).values_list('notification_id', flat=True)
+    ) if notifications else set()
+
+    return {
+        'notifications': [
+            serialize_notification(notification, today, notification.id in read_ids)
+            for notification in notifications
+        ],
+        'read': read,
+        'cursor': cursor,
+        'read_cursor': read_cursor,
+        'full': full,
+        **notification_counts(user),
+    }
+
+
+def mark_notifications_read(user, obligation_ids=None):
+    """
+    Σήμανση ενεργών ειδοποιήσεων ως διαβασμένων (όλων αν obligation_ids=None).
+
+    Returns:
+        int: Νέες αναγνώσεις
+    """
+    from accounting.models import NotificationRead, ObligationNotification
+
+    notifications = ObligationNotification.objects.filter(is_active=True).exclude(reads__user=user)
+    if obligation_ids is not None:
+        notifications = notifications.filter(obligation_id__in=obligation_ids)
+    reads = [
+        NotificationRead(user=user, notification_id=notification_id)
+        for notification_id in notifications.values_list('id', flat=True)
+    ]
+    NotificationRead.objects.bulk_create(reads, ignore_conflicts=True)
+    if reads:
+        transaction.on_commit(_bump_feed_version)
+    return len(reads)
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+accounting/services/obligation_calendar.py
+Description: Ημερολόγιο υποχρεώσεων - σύνοψη ανά ημέρα και λεπτομέρειες ημέρας.
+
+- calendar_summary: μετρητές ανά ημέρα/κατάσταση/τύπο με ένα GROUP BY,
+  cached μέσω του stats cache (ακυρώνεται από τα signals των υποχρεώσεων).
+- calendar_day_queryset: οι υποχρεώσεις μίας ημέρας, για σελιδοποίηση.
+- mark_overdue_obligations: pending -> overdue για όσες πέρασε η προθεσμία,
+  μία φορά την ημέρα με UPDATE ανά chunk. Είναι το μόνο σημείο που κάνει
+  τη μετάβαση (ούτε το save() ούτε τα reads)· μέχρι να τρέξει, τα reads
+  υπολογίζουν την «πραγματική» κατάσταση με effective_status().
+"""
+import logging
+from calendar import monthrange
+from datetime import date, timedelta
+
+from django.db.models import Case, CharField, Count, F, Value, When
+from django.utils import timezone
+
+from accounting.models import MonthlyObligation, OverdueTransitionRun
+from accounting.utils.stats_cache import get_cached_stats, invalidate_stats_cache
+
+logger = logging.getLogger(__name__)
+
+CALENDAR_STATUSES = ('pending', 'completed', 'overdue', 'in_progress', 'cancelled')
+OVERDUE_BATCH_SIZE = 1000
+OVERDUE_RUN_STALE_AFTER = timedelta(hours=1)
+
+
+def effective_status(today=None):
+    """Κατάσταση όπως θα είναι μετά το mark_overdue_obligations (pending με παρελθούσα προθεσμία -> overdue)."""
+    today = today or timezone.localdate()
+    return Case(
+        When(status='pending', deadline__lt=today, then=Value('overdue')),
+        default=F('status'),
+        output_field=CharField(),
+    )
+
+
+def calendar_queryset(first_day, last_day, client_id=None, type_id=None, status=None, today=None):
+    """Υποχρεώσεις του διαστήματος με annotation `calendar_status` και τα προαιρετικά φίλτρα."""
+    queryset = MonthlyObligation.objects.filter(
+        deadline__gte=first_day,
+        deadline__lte=last_day,
+    ).annotate(calendar_status=effective_status(today))
+
+    if client_id:
+        queryset = queryset.filter(client_id=client_id)
+    if type_id:
+        queryset = queryset.filter(obligation_type_id=type_id)
+    if status:
+        queryset = queryset.filter(calendar_status=status)
+    return queryset
+
+
+def _empty_counts():
+    counts = {'total': 0}
+    counts.update((status, 0) for status in CALENDAR_STATUSES)
+    return counts
+
+
+def calendar_summary(year, month, client_id=None, type_id=None, status=None):
+    """
+    Μετρητές ημερολογίου ενός μήνα.
+
+    Returns:
+        dict: {'days': {'15': {'total', <status>..., 'types': [{'code', 'name', 'count'}]}},
+               'summary': {'total', <status>...}}
+    """
+    today = timezone.localdate()
+
+    def compute():
+        first_day = date(year, month, 1)
+        last_day = date(year, month, monthrange(year, month)[1])
+        rows = calendar_queryset(
+            first_day, last_day, client_id=client_id, type_id=type_id, status=status, today=today
+        ).values(
+            'deadline', 'calendar_status', 'obligation_type__code', 'obligation_type__name'
+        ).annotate(count=Count('id')).order_by()
+
+        days = {}
+        summary = _empty_counts()
+        for row in rows:
+            day = days.setdefault(str(row['deadline'].day), dict(_empty_counts(), types={}))
+            day['total'] += row['count']
+            summary['total'] += row['count']
+            if row['calendar_status'] in CALENDAR_STATUSES:
+                day[row['calendar_status']] += row['count']
+                summary[row['calendar_status']] += row['count']
+
+            code = row['obligation_type__code']
+            entry = day['types'].setdefault(code, {'code': code, 'name': row['obligation_type__name'], 'count': 0})
+            entry['count'] += row['count']
+
+        for day in days.values():
+            day['types'] = sorted(day['types'].values(), key=lambda entry: (-entry['count'], entry['code']))
+
+        return {'days': days, 'summary': summary}
+
+    # Η ημερομηνία στο key: το effective status αλλάζει με την ημέρα
+    return get_cached_stats('calendar', (year, month, client_id, type_id, status, today), compute)
+
+
+def calendar_day_queryset(day, client_id=None, type_id=None, status=None):
+    """Οι υποχρεώσεις μίας ημέρας, ταξινομημένες για σελιδοποίηση."""
+    return calendar_queryset(
+        day, day, client_id=client_id, type_id=type_id, status=status
+    ).select_related('client', 'obligation_type').order_by('client__eponimia', 'obligation_type__priority', 'id')
+
+
+def _claim_overdue_run(today, force):
+    """
+    Η εγγραφή της ημέρας, αν αυτή η εκτέλεση πρέπει να κάνει τη μετάβαση.
+
+    None αν η μετάβαση έγινε ήδη σήμερα ή τρέχει σε άλλον worker
+    (εκτός αν κόλλησε για πάνω από OVERDUE_RUN_STALE_AFTER).
+    """
+    now = timezone.now()
+    run, created = OverdueTransitionRun.objects.get_or_create(run_date=today, defaults={'started_at': now})
+    if created:
+        return run
+
+    claimable = OverdueTransitionRun.objects.filter(pk=run.pk)
+    if not force:
+        claimable = claimable.filter(finished_at__isnull=True, started_at__lt=now - OVERDUE_RUN_STALE_AFTER)
+    if not claimable.update(started_at=now, finished_at=None):
+        return None
+    run.refresh_from_db()
+    return run
+
+
+def mark_overdue_obligations(today=None, force=False, batch_size=OVERDUE_BATCH_SIZE):
+    """
+    Μετάβαση pending -> overdue για υποχρεώσεις με παρελθούσα προθεσμία,
+    μία φορά την ημέρα (OverdueTransitionRun), με UPDATE ανά batch_size ids
+    ώστε να μην κλειδώνεται όλος ο πίνακας σε ένα transaction.
+
+    Args:
+        force: ξανά, ακόμη κι αν έχει ήδη γίνει σήμερα
+
+    Returns:
+        OverdueTransitionRun | None: η εγγραφή της ημέρας, None αν παραλείφθηκε
+    """
+    today = today or timezone.localdate()
+    run = _claim_overdue_run(today, force)
+    if run is None:
+        logger.info(f"Overdue transition for {today} already done - skipping")
+        return None
+
+    candidates = MonthlyObligation.objects.filter(status='pending', deadline__lt=today).order_by('id')
+    transitioned = chunks = last_id = 0
+    while True:
+        ids = list(candidates.filter(id__gt=last_id).values_list('id', flat=True)[:batch_size])
+        if not ids:
+            break
+        transitioned += MonthlyObligation.objects.filter(id__in=ids, status='pending').update(
+            status='overdue', updated_at=timezone.now()
+        )
+        chunks += 1
+        last_id = ids[-1]
+
+    if transitioned:
+        # Το update() παρακάμπτει τα signals
+        invalidate_stats_cache()
+        logger.info(f"Marked {transitioned} obligations as overdue ({chunks} chunks)")
+
+    run.transitioned += transitioned
+    run.chunks += chunks
+    run.finished_at = timezone.now()
+    run.save(update_fields=['transitioned', 'chunks', 'finished_at'])
+    return run
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+accounting/services/reminder_digest.py
+Description: Υπενθυμίσεις υποχρεώσεων που λήγουν - ένα email ανά πελάτη (digest).
+
+1. Ένα query για τις υποχρεώσεις της εβδομάδας, ομαδοποίηση ανά πελάτη
+2. Render ενός μηνύματος ανά πελάτη (πρότυπο 'reminder' από το cache)
+3. Αποστολή με ένα connection από το EmailConnectionPool και τον κοινό RateLimiter
+4. bulk_create των ScheduledEmail και των συνδέσεων με τις υποχρεώσεις
+"""
+import logging
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.utils import timezone
+from django.utils.html import strip_tags
+
+from accounting.models import EmailTemplate, MonthlyObligation, ScheduledEmail
+
+logger = logging.getLogger(__name__)
+
+REMINDER_DAYS_AHEAD = 7
+LOG_BATCH_SIZE = 500
+
+
+class ReminderMessage:
+    """Ένα μήνυμα υπενθύμισης: πελάτης, υποχρεώσεις και το EmailMessage."""
+
+    def __init__(self, client, obligations, subject, body, email):
+        self.client = client
+        self.obligations = obligations
+        self.subject = subject
+        self.body = body
+        self.email = email
+        self.status = 'pending'
+        self.error_message = ''
+
+
+def get_due_obligations(today=None, days=REMINDER_DAYS_AHEAD):
+    """Εκκρεμείς υποχρεώσεις που λήγουν από σήμερα έως +days ημέρες."""
+    today = today or timezone.now().date()
+    return MonthlyObligation.objects.filter(
+        deadline__gte=today,
+        deadline__lte=today + timedelta(days=days),
+        status='pending'
+    ).select_related('client', 'obligation_type').order_by('client_id', 'deadline', 'id')
+
+
+def group_obligations(obligations, digest=True):
+    """
+    Ομαδοποίηση σε λίστες [(client, [obligations])].
+    Με digest=False κάθε υποχρέωση είναι ξεχωριστό μήνυμα (παλιά συμπεριφορά).
+    """
+    if not digest:
+        return [(obligation.client, [obligation]) for obligation in obligations]
+
+    groups = OrderedDict()
+    for obligation in obligations:
+        groups.setdefault(obligation.client_id, (obligation.client, []))[1].append(obligation)
+    return list(groups.values())
+
+
+def render_reminder(client, obligations, template, today):
+    """
+    Returns (subject, body, is_html).
+
+    Το πρότυπο δέχεται τις μεταβλητές μιας υποχρέωσης (client_name, obligation_name,
+    deadline, days_left - για πολλές υποχρεώσεις η πλησιέστερη προθεσμία) και τη
+    λίστα `obligations` για templates τύπου digest.
+    """
+    items = [
+        {
+            'name': obligation.obligation_type.name,
+            'period': f'{obligation.month:02d}/{obligation.year}',
+            'deadline': obligation.deadline.strftime('%d/%m/%Y'),
+            'days_left': (obligation.deadline - today).days,
+        }
+        for obligation in obligations
+    ]
+    first = items[0]
+
+    if template:
+        context = {
+            'client_name': client.eponimia,
+            'obligation_name': ', '.join(item['name'] for item in items),
+            'deadline': first['deadline'],
+            'days_left': first['days_left'],
+            'obligations': items,
+        }
+        subject, body = template.render(context)
+        return subject, body, True
+
+    if len(items) == 1:
+        subject = f"⏰ Υπενθύμιση: Υποχρέωση {first['name']}"
+        body = f"Καλημέρα {client.eponimia},\n\nΥπενθύμιση: Η υποχρέωση '{first['name']}' λήγει στις {first['deadline']}.\n\nΜε εκτίμηση"
+        return subject, body, False
+
+    lines = '\n'.join(f"- {item['name']} ({item['period']}): {item['deadline']}" for item in items)
+    subject = f"⏰ Υπενθύμιση: {len(items)} υποχρεώσεις λήγουν σύντομα"
+    body = f"Καλημέρα {client.eponimia},\n\nΥπενθύμιση για τις υποχρεώσεις που λήγουν:\n{lines}\n\nΜε εκτίμηση"
+    return subject, body, False
+
+
+def build_reminder_messages(groups, template, today=None, from_email=None):
+    """Δημιουργεί ένα ReminderMessage ανά ομάδα. Πελάτες χωρίς email παραλείπονται."""
+    today = today or timezone.now().date()
+    from_email = from_email or settings.DEFAULT_FROM_EMAIL
+    messages = []
+    for client, obligations in groups:
+        if not client.email:
+            logger.warning(f"Client {client.afm} has no email - skipping")
+            continue
+        subject, body, is_html = render_reminder(client, obligations, template, today)
+        if is_html:
+            email = EmailMultiAlternatives(subject, strip_tags(body), from_email, [client.email])
+            email.attach_alternative(body, 'text/html')
+        else:
+            email = EmailMultiAlternatives(subject, body, from_email, [client.email])
+        messages.append(ReminderMessage(client, obligations, subject, body, email))
+    return messages
+
+
+def send_reminder_messages(messages, connection=None, use_rate_limit=None):
+    """
+    Αποστολή με ένα ανοιχτό connection (BulkEmailSender).
+    Χωρίς `connection` χρησιμοποιείται το EmailConnectionPool.
+    """
+    from accounting.services.email_utils import BulkEmailSender
+
+    if use_rate_limit is None:
+        email_backend = getattr(settings, 'EMAIL_BACKEND', '')
+        use_rate_limit = not email_backend.endswith(('console.EmailBackend', 'locmem.EmailBackend'))
+
+    try:
+        with BulkEmailSender(use_pool=True, use_rate_limit=use_rate_limit,
+                             connection=connection) as sender:
+            for message in messages:
+                try:
+                    sender.send(message.email)
+                    message.status = 'sent'
+                except Exception as e:
+                    logger.error(f"❌ Error sending reminder to {message.client.email}: {e}")
+                    message.status = 'failed'
+                    message.error_message = str(e)
+    except Exception as e:
+        # Π.χ. αποτυχία σύνδεσης SMTP
+        logger.error(f"❌ Reminder sending stopped: {e}")
+        for message in messages:
+            if message.status == 'pending':
+                message.status = 'failed'
+                message.error_message = str(e)
+    return messages
+
+
+def log_reminder_messages(messages, template):
+    """ScheduledEmail ανά μήνυμα και οι υποχρεώσεις του, με bulk_create."""
+    now = timezone.now()
+    scheduled_emails = ScheduledEmail.objects.bulk_create([
+        ScheduledEmail(
+            recipient_email=message.client.email,
+            recipient_name=message.client.eponimia,
+            client=message.client,
+            template=template,
+            subject=message.subject,
+            body_html=message.body,
+            send_at=now,
+            status=message.status,
+            sent_at=now if message.status == 'sent' else None,
+            error_message=message.error_message,
+        )
+        for message in messages
+    ], batch_size=LOG_BATCH_SIZE)
+
+    # Σε backends χωρίς RETURNING (π.χ. MySQL) δεν έχουμε ids για το M2M
+    if scheduled_emails and scheduled_emails[0].pk is not None:
+        Through = ScheduledEmail.obligations.through
+        Through.objects.bulk_create([
+            Through(scheduledemail_id=scheduled_email.pk, monthlyobligation_id=obligation.pk)
+            for scheduled_email, message in zip(scheduled_emails, messages)
+            for obligation in message.obligations
+        ], batch_size=LOG_BATCH_SIZE)
+    return scheduled_emails
+
+
+def send_obligation_reminder_digest(today=None, days=REMINDER_DAYS_AHEAD, digest=True, connection=None):
+    """
+    Στέλνει τις υπενθυμίσεις και επιστρέφει στατιστικά:
+    obligations, messages, sent, failed, skipped, seconds, per_second.
+    """
+    started = time.perf_counter()
+    today = today or timezone.now().date()
+
+    obligations = list(get_due_obligations(today, days))
+    groups = group_obligations(obligations, digest=digest)
+    template = EmailTemplate.get_reminder_template()
+    if not template:
+        logger.warning("No reminder template found - using default message")
+
+    messages = build_reminder_messages(groups, template, today)
+    if messages:
+        send_reminder_messages(messages, connection=connection)
+        log_reminder_messages(messages, template)
+
+    elapsed = time.perf_counter() - started
+    sent = sum(1 for message in messages if message.status == 'sent')
+    stats = {
+        'obligations': len(obligations),
+        'messages': len(messages),
+        'sent': sent,
+        'failed': len(messages) - sent,
+        'skipped': len(groups) - len(messages),
+        'seconds': round(elapsed, 3),
+        'per_second': round(sent / elapsed, 1) if elapsed else 0,
+    }
+    logger.info(
+        f"✅ Obligation reminders: {stats['sent']}/{stats['messages']} emails "
+        f"για {stats['obligations']} υποχρεώσεις σε {stats['seconds']}s ({stats['per_second']}/s)"
+    )
+    return stats
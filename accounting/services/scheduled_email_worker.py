@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+"""
+accounting/services/scheduled_email_worker.py
+Description: Αποστολή των προγραμματισμένων email (ScheduledEmail) σε batches.
+
+1. Claim: select_for_update(skip_locked=True) + status='sending' σε σύντομη
+   transaction, ώστε δύο παράλληλα runs του beat να μη στέλνουν τα ίδια email
+2. Προετοιμασία μηνυμάτων στο κύριο thread (ένα query για τα συνημμένα,
+   cache των bytes ανά ClientDocument)
+3. Αποστολή από ThreadPoolExecutor - κάθε thread με BulkEmailSender πάνω στο
+   κοινό EmailConnectionPool και τον κοινό RateLimiter (χωρίς πρόσβαση στη βάση)
+4. bulk_update των ScheduledEmail και bulk_create των EmailLog
+"""
+import logging
+import mimetypes
+import os
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.db import transaction
+from django.utils import timezone
+
+from accounting.models import ClientDocument, EmailLog, ScheduledEmail
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 50
+# Μετά από τόσα λεπτά ένα 'sending' θεωρείται εγκαταλελειμμένο (π.χ. kill του worker)
+DEFAULT_CLAIM_TIMEOUT_MINUTES = 30
+DEFAULT_ATTACHMENT_CACHE_BYTES = 50 * 1024 * 1024
+
+
+class AttachmentCache:
+    """
+    Bytes συνημμένων ανά ClientDocument για όλη τη διάρκεια ενός run.
+    Πάνω από max_bytes τα αρχεία διαβάζονται χωρίς να αποθηκεύονται.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_ATTACHMENT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = {}
+        self._lock = threading.Lock()
+
+    def get(self, document):
+        """Returns (filename, content, mimetype) for a ClientDocument."""
+        with self._lock:
+            item = self._items.get(document.pk)
+            if item is not None:
+                self.hits += 1
+                return item
+
+        path = document.file.path
+        with open(path, 'rb') as attachment_file:
+            content = attachment_file.read()
+        filename = os.path.basename(path)
+        item = (filename, content, mimetypes.guess_type(filename)[0] or 'application/octet-stream')
+
+        with self._lock:
+            self.misses += 1
+            if self.size + len(content) <= self.max_bytes:
+                self._items[document.pk] = item
+                self.size += len(content)
+        return item
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def release_stale_claims(now=None):
+    """Επαναφέρει σε 'pending' τα email που έμειναν 'sending' από run που σταμάτησε."""
+    now = now or timezone.now()
+    timeout = _setting('SCHEDULED_EMAIL_CLAIM_TIMEOUT_MINUTES', DEFAULT_CLAIM_TIMEOUT_MINUTES)
+    released = ScheduledEmail.objects.filter(
+        status='sending',
+        updated_at__lt=now - timedelta(minutes=timeout)
+    ).update(status='pending', updated_at=now)
+    if released:
+        logger.warning(f"Released {released} stale scheduled email claims")
+    return released
+
+
+def claim_due_emails(batch_size, due_before=None):
+    """
+    Κλειδώνει έως batch_size εκκρεμή email (send_at <= due_before) και τα μαρκάρει 'sending'.
+    Γραμμές κλειδωμένες από άλλο worker παραλείπονται (skip_locked).
+
+    Το claim σφραγίζεται με την τρέχουσα ώρα (όχι με το due_before) ώστε ένα
+    μακρύ run να μη θεωρηθεί stale από το release_stale_claims άλλου worker.
+    """
+    due_before = due_before or timezone.now()
+    with transaction.atomic():
+        ids = list(
+            ScheduledEmail.objects.select_for_update(skip_locked=True)
+            .filter(status='pending', send_at__lte=due_before)
+            .order_by('send_at', 'id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if ids:
+            ScheduledEmail.objects.filter(id__in=ids).update(status='sending', updated_at=timezone.now())
+
+    return list(
+        ScheduledEmail.objects.filter(id__in=ids)
+        .select_related('client', 'template', 'created_by')
+        .order_by('send_at', 'id')
+    )
+
+
+def _documents_by_email(scheduled_emails):
+    """{scheduled_email_id: [ClientDocument]} με δύο queries για όλο το batch."""
+    Through = ScheduledEmail.obligations.through
+    obligation_ids = defaultdict(list)
+    for email_id, obligation_id in Through.objects.filter(
+        scheduledemail_id__in=[email.id for email in scheduled_emails]
+    ).values_list('scheduledemail_id', 'monthlyobligation_id'):
+        obligation_ids[email_id].append(obligation_id)
+
+    documents_by_obligation = defaultdict(list)
+    all_obligation_ids = {pk for ids in obligation_ids.values() for pk in ids}
+    if all_obligation_ids:
+        documents = ClientDocument.objects.filter(
+            obligation_id__in=all_obligation_ids, is_current=True
+        ).exclude(file='').order_by('-uploaded_at')
+        for document in documents:
+            documents_by_obligation[document.obligation_id].append(document)
+
+    return {
+        email_id: [doc for obligation_id in ids for doc in documents_by_obligation[obligation_id]]
+        for email_id, ids in obligation_ids.items()
+    }
+
+
+def build_message(scheduled_email, documents, attachment_cache):
+    """
+    EmailMessage για ένα ScheduledEmail.
+    Πολλαπλοί παραλήπτες: αποστολή στον εαυτό μας με όλους σε BCC.
+    """
+    recipients = scheduled_email.get_recipients_list()
+    if not recipients:
+        raise ValueError("Δεν βρέθηκαν έγκυρες διευθύνσεις email")
+
+    if len(recipients) > 1:
+        email = EmailMessage(
+            subject=scheduled_email.subject,
+            body=scheduled_email.body_html,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[settings.DEFAULT_FROM_EMAIL],
+            bcc=recipients,
+        )
+    else:
+        email = EmailMessage(
+            subject=scheduled_email.subject,
+            body=scheduled_email.body_html,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=recipients,
+        )
+    email.content_subtype = 'html'
+
+    for document in documents:
+        try:
+            email.attach(*attachment_cache.get(document))
+        except Exception as attach_err:
+            logger.warning(f"Could not attach file for email #{scheduled_email.id}: {attach_err}")
+    return email
+
+
+def _send_chunk(items, rate_limiter, use_rate_limit):
+    """Τρέχει σε worker thread: αποστολή με ένα pooled connection. Χωρίς queries."""
+    from accounting.services.email_utils import BulkEmailSender
+
+    results = []
+    try:
+        with BulkEmailSender(use_pool=True, use_rate_limit=use_rate_limit,
+                             rate_limiter=rate_limiter) as sender:
+            for scheduled_email, email in items:
+                try:
+                    sender.send(email)
+                    results.append((scheduled_email, None))
+                except Exception as e:
+                    results.append((scheduled_email, str(e)))
+    except Exception as e:
+        # Αποτυχία σύνδεσης - ό,τι δεν στάλθηκε αποτυγχάνει
+        done = {scheduled_email.id for scheduled_email, _ in results}
+        results.extend(
+            (scheduled_email, str(e)) for scheduled_email, _ in items
+            if scheduled_email.id not in done
+        )
+    return results
+
+
+def send_batch(scheduled_emails, attachment_cache, max_workers):
+    """Στέλνει το batch παράλληλα και ενημερώνει ScheduledEmail/EmailLog μαζικά."""
+    from accounting.services.email_utils import get_rate_limiter
+
+    email_backend = _setting('EMAIL_BACKEND', '')
+    use_rate_limit = not email_backend.endswith(('console.EmailBackend', 'locmem.EmailBackend'))
+    rate_limiter = get_rate_limiter() if use_rate_limit else None
+
+    documents = _documents_by_email(scheduled_emails)
+    results = []
+    items = []
+    for scheduled_email in scheduled_emails:
+        try:
+            items.append((
+                scheduled_email,
+                build_message(scheduled_email, documents.get(scheduled_email.id, []), attachment_cache)
+            ))
+        except Exception as e:
+            results.append((scheduled_email, str(e)))
+
+    workers = max(1, min(max_workers, len(items)))
+    if workers == 1:
+        results.extend(_send_chunk(items, rate_limiter, use_rate_limit))
+    else:
+        chunks = [items[index::workers] for index in range(workers)]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='scheduled-email') as executor:
+            for chunk_results in executor.map(
+                lambda chunk: _send_chunk(chunk, rate_limiter, use_rate_limit), chunks
+            ):
+                results.extend(chunk_results)
+
+    now = timezone.now()
+    logs = []
+    for scheduled_email, error in results:
+        if error is None:
+            scheduled_email.status = 'sent'
+            scheduled_email.sent_at = now
+            logger.info(f"✅ Scheduled email #{scheduled_email.id} sent to {scheduled_email.recipient_count} recipient(s)")
+        else:
+            scheduled_email.status = 'failed'
+            scheduled_email.error_message = error
+            logger.error(f"❌ Failed to send scheduled email #{scheduled_email.id}: {error}")
+        scheduled_email.updated_at = now
+        logs.append(EmailLog(
+            recipient_email=scheduled_email.recipient_email,
+            recipient_name=scheduled_email.recipient_name,
+            client=scheduled_email.client,
+            template_used=scheduled_email.template,
+            subject=scheduled_email.subject,
+            body=scheduled_email.body_html,
+            status='sent' if error is None else 'failed',
+            error_message=error or '',
+            sent_by=scheduled_email.created_by,
+        ))
+
+    ScheduledEmail.objects.bulk_update(
+        [scheduled_email for scheduled_email, _ in results],
+        ['status', 'sent_at', 'error_message', 'updated_at']
+    )
+    EmailLog.objects.bulk_create(logs)
+    return results
+
+
+def process_due_scheduled_emails(batch_size=None, max_workers=None):
+    """
+    Στέλνει όλα τα εκκρεμή email που έχουν λήξει, batch-by-batch.
+
+    Returns:
+        dict: sent, failed, recipients, batches, attachment_cache_hits
+    """
+    batch_size = batch_size or _setting('SCHEDULED_EMAIL_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    max_workers = max_workers or _setting(
+        'SCHEDULED_EMAIL_WORKERS', _setting('EMAIL_POOL_MAX_CONNECTIONS', 3)
+    )
+    attachment_cache = AttachmentCache(
+        _setting('SCHEDULED_EMAIL_ATTACHMENT_CACHE_BYTES', DEFAULT_ATTACHMENT_CACHE_BYTES)
+    )
+
+    now = timezone.now()
+    release_stale_claims(now)
+
+    stats = {'sent': 0, 'failed': 0, 'recipients': 0, 'batches': 0}
+    while True:
+        # Μόνο όσα ήταν ήδη due στην αρχή - όχι ατέρμονο run
+        scheduled_emails = claim_due_emails(batch_size, now)
+        if not scheduled_emails:
+            break
+        stats['batches'] += 1
+        for scheduled_email, error in send_batch(scheduled_emails, attachment_cache, max_workers):
+            if error is None:
+                stats['sent'] += 1
+                stats['recipients'] += scheduled_email.recipient_count
+            else:
+                stats['failed'] += 1
+
+    stats['attachment_cache_hits'] = attachment_cache.hits
+    return stats
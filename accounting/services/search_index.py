@@ -0,0 +1,400 @@
+# -*- coding: utf-8 -*-
+"""
+accounting/services/search_index.py
+Description: Ευρετήριο γενικής αναζήτησης (SearchDocument) για το /api/v1/search/.
+
+- normalize_search_text: κεφαλαία χωρίς τόνους/διαλυτικά, ώστε
+  «Παπαδόπουλος», «ΠΑΠΑΔΟΠΟΥΛΟΣ» και «papadopoulos» να ταιριάζουν.
+- index_object / remove_object: συγχρονισμός ενός εγγράφου από τα signals.
+- index_search_documents / rebuild_search_index: για bulk paths που
+  παρακάμπτουν τα signals και για πλήρη επανακατασκευή.
+- search_documents: ένα ranked query για όλες τις κατηγορίες (top N ανά
+  κατηγορία με window function).
+
+Backends: PostgreSQL με pg_trgm (GIN trigram index, substring αναζήτηση),
+SQLite με FTS5 (prefix αναζήτηση λέξεων), αλλιώς LIKE στο κανονικοποιημένο
+κείμενο του ευρετηρίου.
+"""
+import logging
+import re
+import unicodedata
+from datetime import datetime, time
+
+from django.db import connection, transaction
+from django.db.models import Case, F, IntegerField, Q, Value, When, Window
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from accounting.phone_utils import PHONE_FIELDS, normalize_phone
+
+logger = logging.getLogger(__name__)
+
+SEARCH_KINDS = ('client', 'obligation', 'ticket', 'call')
+SEARCH_TABLE = 'accounting_searchdocument'
+FTS_TABLE = 'accounting_searchdocument_fts'
+BATCH_SIZE = 500
+
+_NON_WORD = re.compile(r'[^0-9A-ZΑ-Ω]+')
+_fts_available = {}
+
+
+# ============================================
+# ΚΑΝΟΝΙΚΟΠΟΙΗΣΗ
+# ============================================
+
+def normalize_search_text(*values):
+    """
+    Λέξεις χωρίς τόνους, σε κεφαλαία, χωρισμένες με ένα κενό.
+
+    Το αποτέλεσμα έχει κενό στην αρχή και στο τέλος, ώστε το
+    `contains(' ΠΑΠ')` να σημαίνει «λέξη που ξεκινά με ΠΑΠ».
+    """
+    text = unicodedata.normalize('NFD', ' '.join(str(value) for value in values if value))
+    text = ''.join(char for char in text if not unicodedata.combining(char)).upper()
+    words = _NON_WORD.sub(' ', text).split()
+    return f" {' '.join(words)} " if words else ''
+
+
+def search_digits(*values):
+    """Αριθμητικά πεδία (ΑΦΜ, τηλέφωνα) μόνο με ψηφία, για substring αναζήτηση."""
+    numbers = []
+    for value in values:
+        digits = re.sub(r'\D', '', str(value or ''))
+        for number in (digits, normalize_phone(digits) if len(digits) > 10 else ''):
+            if number and number not in numbers:
+                numbers.append(number)
+    return f" {' '.join(numbers)} " if numbers else ''
+
+
+def _local_midnight(value):
+    return timezone.make_aware(datetime.combine(value, time.min)) if value else None
+
+
+# ============================================
+# ΕΓΓΡΑΦΑ
+# ============================================
+
+def _client_fields(client):
+    return {
+        'client_id': client.id,
+        'title': client.eponimia,
+        'text': normalize_search_text(client.eponimia, client.onoma, client.afm, client.email),
+        'digits': search_digits(client.afm, *(getattr(client, name) for name in PHONE_FIELDS)),
+        'is_active': client.is_active,
+        'sort_at': None,
+    }
+
+
+def _obligation_fields(obligation):
+    client = obligation.client
+    obligation_type = obligation.obligation_type
+    return {
+        'client_id': obligation.client_id,
+        'title': f'{obligation_type.name} {obligation.month:02d}/{obligation.year}',
+        'text': normalize_search_text(
+            obligation_type.name, obligation_type.code, f'{obligation.month:02d}/{obligation.year}',
+            client.eponimia, client.afm, obligation.notes,
+        ),
+        'digits': search_digits(client.afm),
+        'is_active': True,
+        'sort_at': _local_midnight(obligation.deadline),
+    }
+
+
+def _ticket_fields(ticket):
+    client = ticket.client if ticket.client_id else None
+    phone = ticket.call.phone_number if ticket.call_id else ''
+    return {
+        'client_id': ticket.client_id,
+        'title': ticket.title,
+        'text': normalize_search_text(
+            ticket.title, ticket.description, client.eponimia if client else '', phone,
+        ),
+        'digits': search_digits(phone),
+        'is_active': True,
+        'sort_at': ticket.created_at,
+    }
+
+
+def _call_fields(call):
+    client = call.client if call.client_id else None
+    return {
+        'client_id': call.client_id,
+        'title': call.phone_number,
+        'text': normalize_search_text(call.phone_number, client.eponimia if client else '', call.notes),
+        'digits': search_digits(call.phone_number),
+        'is_active': True,
+        'sort_at': call.started_at,
+    }
+
+
+# kind -> (model name, select_related, πεδία εγγράφου)
+SOURCES = {
+    'client': ('ClientProfile', (), _client_fields),
+    'obligation': ('MonthlyObligation', ('client', 'obligation_type'), _obligation_fields),
+    'ticket': ('Ticket', ('client', 'call'), _ticket_fields),
+    'call': ('VoIPCall', ('client',), _call_fields),
+}
+KIND_BY_MODEL = {model_name.lower(): kind for kind, (model_name, _, _) in SOURCES.items()}
+
+
+def document_fields(kind, obj):
+    """Τα πεδία του SearchDocument για μία εγγραφή."""
+    fields = SOURCES[kind][2](obj)
+    fields['title'] = normalize_search_text(fields['title']).strip()[:255]
+    fields['digits'] = fields['digits'][:255]
+    return fields
+
+
+def build_documents(kind, objects, document_model):
+    """Μη αποθηκευμένα SearchDocument για τις εγγραφές."""
+    for obj in objects:
+        yield document_model(kind=kind, object_id=obj.pk, **document_fields(kind, obj))
+
+
+def _source_queryset(kind):
+    from django.apps import apps
+
+    model_name, related, _ = SOURCES[kind]
+    queryset = apps.get_model('accounting', model_name).objects.order_by()
+    return queryset.select_related(*related) if related else queryset
+
+
+# ============================================
+# ΣΥΓΧΡΟΝΙΣΜΟΣ
+# ============================================
+
+def index_object(instance):
+    """
+    Ενημέρωση του εγγράφου μίας εγγραφής (post_save).
+
+    Όταν αλλάζει το όνομα/ΑΦΜ ενός πελάτη ενημερώνονται και τα έγγραφα
+    των υποχρεώσεων, tickets και κλήσεών του.
+    """
+    from accounting.models import SearchDocument
+
+    kind = KIND_BY_MODEL[instance._meta.model_name]
+    fields = document_fields(kind, instance)
+    document = SearchDocument.objects.filter(kind=kind, object_id=instance.pk).first()
+    if document is None:
+        SearchDocument.objects.create(kind=kind, object_id=instance.pk, **fields)
+        return
+
+    changed = [name for name, value in fields.items() if getattr(document, name) != value]
+    if not changed:
+        # π.χ. αλλαγή κατάστασης υποχρέωσης - το κείμενο μένει ίδιο
+        return
+    text_changed = document.text != fields['text']
+    for name in changed:
+        setattr(document, name, fields[name])
+    document.save(update_fields=changed)
+
+    if kind == 'client' and text_changed:
+        reindex_client_documents([instance.pk])
+
+
+def remove_object(instance):
+    """Διαγραφή του εγγράφου μίας εγγραφής (post_delete)."""
+    from accounting.models import SearchDocument
+
+    kind = KIND_BY_MODEL[instance._meta.model_name]
+    SearchDocument.objects.filter(kind=kind, object_id=instance.pk).delete()
+    if kind == 'client':
+        # Tickets/κλήσεις μένουν με client=NULL (SET_NULL χωρίς signal)
+        reindex_client_documents([instance.pk])
+
+
+def index_search_documents(kind, object_ids):
+    """
+    Επανεγγραφή των εγγράφων συγκεκριμένων εγγραφών με bulk queries
+    (για bulk_create/update που δεν στέλνουν signals). Εγγραφές που δεν
+    υπάρχουν πια αφαιρούνται από το ευρετήριο.
+
+    Returns:
+        int: Έγγραφα που γράφτηκαν
+    """
+    from accounting.models import SearchDocument
+
+    object_ids = list(object_ids)
+    total = 0
+    for offset in range(0, len(object_ids), BATCH_SIZE):
+        chunk = object_ids[offset:offset + BATCH_SIZE]
+        documents = list(build_documents(kind, _source_queryset(kind).filter(pk__in=chunk), SearchDocument))
+        with transaction.atomic():
+            SearchDocument.objects.filter(kind=kind, object_id__in=chunk).delete()
+            SearchDocument.objects.bulk_create(documents)
+        total += len(documents)
+    return total
+
+
+def reindex_client_documents(client_ids):
+    """Έγγραφα (εκτός των ίδιων των πελατών) που περιέχουν στοιχεία των πελατών."""
+    from accounting.models import SearchDocument
+
+    client_ids = list(client_ids)
+    if not client_ids:
+        return
+    rows = SearchDocument.objects.filter(client_id__in=client_ids).exclude(kind='client').values_list(
+        'kind', 'object_id'
+    )
+    by_kind = {}
+    for kind, object_id in rows:
+        by_kind.setdefault(kind, []).append(object_id)
+    for kind, object_ids in by_kind.items():
+        index_search_documents(kind, object_ids)
+
+
+def rebuild_search_index(kinds=None, batch_size=BATCH_SIZE):
+    """
+    Πλήρης επανακατασκευή του ευρετηρίου (όλα ή κάποια είδη).
+
+    Returns:
+        int: Έγγραφα που γράφτηκαν
+    """
+    from accounting.models import SearchDocument
+
+    total = 0
+    with transaction.atomic():
+        for kind in kinds or SEARCH_KINDS:
+            SearchDocument.objects.filter(kind=kind).delete()
+            documents = []
+            for document in build_documents(kind, _source_queryset(kind).iterator(chunk_size=batch_size), SearchDocument):
+                documents.append(document)
+                if len(documents) >= batch_size:
+                    SearchDocument.objects.bulk_create(documents)
+                    total += len(documents)
+                    documents = []
+            SearchDocument.objects.bulk_create(documents)
+            total += len(documents)
+
+    logger.info(f"Search index rebuilt: {total} documents")
+    return total
+
+
+# ============================================
+# BACKENDS
+# ============================================
+
+SQLITE_FTS_SQL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"text, content='{SEARCH_TABLE}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_ai AFTER INSERT ON {SEARCH_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text); END",
+    f"CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_ad AFTER DELETE ON {SEARCH_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) VALUES ('delete', old.id, old.text); END",
+    f"CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_au AFTER UPDATE ON {SEARCH_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) VALUES ('delete', old.id, old.text); "
+    f"INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text); END",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+POSTGRES_TRGM_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_text_trgm ON {SEARCH_TABLE} USING gin (text gin_trgm_ops)",
+    f"CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_digits_trgm ON {SEARCH_TABLE} USING gin (digits gin_trgm_ops)",
+]
+
+
+def install_search_backend(db_connection):
+    """
+    FTS5 (SQLite) ή trigram indexes (PostgreSQL) για το ευρετήριο.
+    Αν δεν υποστηρίζονται, η αναζήτηση γίνεται με LIKE στον πίνακα.
+    """
+    statements = {'sqlite': SQLITE_FTS_SQL, 'postgresql': POSTGRES_TRGM_SQL}.get(db_connection.vendor)
+    if not statements:
+        return False
+    try:
+        with transaction.atomic(using=db_connection.alias):
+            with db_connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+    except Exception as e:
+        logger.warning(f"Search index backend not installed ({db_connection.vendor}): {e}")
+        return False
+    finally:
+        _fts_available.pop(db_connection.alias, None)
+    return True
+
+
+def uninstall_search_backend(db_connection):
+    if db_connection.vendor == 'sqlite':
+        statements = [f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_{suffix}" for suffix in ('ai', 'ad', 'au')]
+        statements.append(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    elif db_connection.vendor == 'postgresql':
+        statements = [f"DROP INDEX IF EXISTS {SEARCH_TABLE}_{name}_trgm" for name in ('text', 'digits')]
+    else:
+        return
+    with db_connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+    _fts_available.pop(db_connection.alias, None)
+
+
+def _has_fts():
+    if connection.alias not in _fts_available:
+        _fts_available[connection.alias] = FTS_TABLE in connection.introspection.table_names()
+    return _fts_available[connection.alias]
+
+
+def _text_match(tokens):
+    """Κάθε λέξη του query πρέπει να ταιριάζει (AND)."""
+    if connection.vendor == 'postgresql':
+        # Substring - το GIN trigram index καλύπτει και το '%...%'
+        return Q(*(Q(text__contains=token) for token in tokens))
+    if connection.vendor == 'sqlite' and _has_fts():
+        expression = ' '.join(f'"{token}"*' for token in tokens)
+        return Q(id__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [expression]))
+    return Q(*(Q(text__contains=f' {token}') for token in tokens))
+
+
+# ============================================
+# ΑΝΑΖΗΤΗΣΗ
+# ============================================
+
+def search_documents(query, limit=5):
+    """
+    Top `limit` αποτελέσματα ανά κατηγορία με ένα query.
+
+    Κατάταξη: ο τίτλος ξεκινά με το query, μετά λέξη που ξεκινά με το
+    query, μετά οποιοδήποτε ταίριασμα· ισοβαθμίες με πιο πρόσφατο πρώτο.
+
+    Returns:
+        dict: kind -> [object_id, ...] με τη σειρά κατάταξης
+    """
+    from accounting.models import SearchDocument
+
+    results = {kind: [] for kind in SEARCH_KINDS}
+    tokens = normalize_search_text(query).split()
+    if not tokens:
+        return results
+
+    phrase = ' '.join(tokens)
+    matches = _text_match(tokens)
+    ranks = [
+        When(title__startswith=phrase, then=Value(3)),
+        When(text__contains=f' {phrase}', then=Value(2)),
+    ]
+
+    digits = re.sub(r'\D', '', query)
+    if len(digits) >= 2 and re.fullmatch(r'[\d\s+\-().]+', query):
+        if len(digits) > 10:
+            digits = normalize_phone(digits)
+        matches |= Q(digits__contains=digits)
+        ranks.insert(0, When(digits__contains=f' {digits}', then=Value(3)))
+
+    documents = SearchDocument.objects.filter(matches).exclude(kind='client', is_active=False).annotate(
+        rank=Case(*ranks, default=Value(1), output_field=IntegerField()),
+    ).annotate(
+        position=Window(
+            RowNumber(),
+            partition_by=[F('kind')],
+            order_by=[F('rank').desc(), F('sort_at').desc(nulls_last=True), F('title').asc()],
+        ),
+    )
+
+    for kind, object_id in documents.filter(position__lte=limit).order_by('kind', 'position').values_list(
+        'kind', 'object_id'
+    ):
+        results[kind].append(object_id)
+    return results
@@ -5,9 +5,15 @@ Signals for accounting app.
 Handles:
 - Ticket-call relationship cleanup
 - Auto-creation of ClientObligation for new clients
+- Phone index maintenance for VoIP caller matching
+- Invalidation of the cached dashboard/reports statistics
+- Document folder counters for the file manager browse/stats
+- Live call/ticket feed for the dashboard (Server-Sent Events)
+- Global search index (SearchDocument)
 """
 import logging
-from django.db.models.signals import pre_delete, post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, pre_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.conf import settings
 
@@ -70,6 +76,31 @@ def auto_create_client_obligation(sender, instance, created, **kwargs):
         logger.error(f"Error creating ClientObligation for {instance.eponimia}: {e}")
 
 
+# ============================================
+# PHONE INDEX (VoIP caller matching)
+# ============================================
+
+@receiver(post_save, sender='accounting.ClientProfile')
+def update_client_phone_index(sender, instance, raw=False, update_fields=None, **kwargs):
+    """
+    Ενημέρωση του ClientPhoneIndex όταν αλλάζουν τα τηλέφωνα του πελάτη.
+
+    Η διαγραφή πελάτη καλύπτεται από το CASCADE του ForeignKey.
+    """
+    if raw:
+        return
+
+    from accounting.phone_utils import PHONE_FIELDS, index_client_phones
+
+    if update_fields is not None and not set(update_fields) & set(PHONE_FIELDS):
+        return
+
+    try:
+        index_client_phones(instance)
+    except Exception as e:
+        logger.error(f"Error updating phone index for {instance.afm}: {e}")
+
+
 @receiver(pre_delete, sender='accounting.Ticket')
 def cleanup_orphan_call_on_ticket_delete(sender, instance, **kwargs):
     """
@@ -92,3 +123,234 @@ def cleanup_orphan_call_on_ticket_delete(sender, instance, **kwargs):
                 logger.info(f"Call {call.call_id}: ticket_created reset to False")
         except Exception as e:
             logger.warning(f"Could not update call on ticket delete: {e}")
+
+
+# ============================================
+# STATS CACHE INVALIDATION
+# ============================================
+
+@receiver(post_save, sender='accounting.MonthlyObligation')
+@receiver(post_delete, sender='accounting.MonthlyObligation')
+@receiver(post_save, sender='accounting.ClientProfile')
+@receiver(post_delete, sender='accounting.ClientProfile')
+def invalidate_stats_on_change(sender, raw=False, **kwargs):
+    """
+    Ακύρωση των cached stats (dashboard/reports) όταν αλλάζουν
+    υποχρεώσεις ή πελάτες. Γίνεται στο commit ώστε να μην ξανα-cacheαριστούν
+    δεδομένα πριν ολοκληρωθεί η transaction.
+    """
+    if raw:
+        return
+    from accounting.utils.stats_cache import invalidate_stats_cache
+    transaction.on_commit(invalidate_stats_cache)
+
+
+# ============================================
+# DOCUMENT FOLDER COUNTERS (file manager)
+# ============================================
+
+DOCUMENT_BUCKET_FIELDS = (
+    'client_id', 'year', 'month', 'document_category', 'file_type', 'file_size', 'is_current'
+)
+
+
+@receiver(pre_save, sender='accounting.ClientDocument')
+def remember_document_bucket(sender, instance, raw=False, **kwargs):
+    """Ο φάκελος όπου μετρούσε το έγγραφο πριν το save (για updates)."""
+    instance._counter_bucket = None
+    if raw or instance.pk is None:
+        return
+
+    from accounting.services.document_counters import document_bucket
+
+    values = sender.objects.filter(pk=instance.pk).values(*DOCUMENT_BUCKET_FIELDS).first()
+    if values:
+        instance._counter_bucket = document_bucket(values)
+
+
+@receiver(post_save, sender='accounting.ClientDocument')
+@receiver(post_delete, sender='accounting.ClientDocument')
+def update_document_counters(sender, instance, raw=False, **kwargs):
+    """
+    Ενημέρωση του DocumentFolderCounter (-1 στον παλιό φάκελο, +1 στον νέο).
+
+    Τα bulk updates (QuerySet.update) παρακάμπτουν τα signals και πρέπει να
+    καλούν rebuild_document_counters για τους πελάτες που αγγίζουν.
+    """
+    if raw:
+        return
+
+    from accounting.services.document_counters import apply_document_change, document_bucket
+
+    deleted = 'created' not in kwargs
+    try:
+        current = document_bucket({field: getattr(instance, field) for field in DOCUMENT_BUCKET_FIELDS})
+        if deleted:
+            apply_document_change(current, None)
+        else:
+            apply_document_change(getattr(instance, '_counter_bucket', None), current)
+    except Exception as e:
+        logger.error(f"Error updating document counters for document {instance.pk}: {e}")
+
+
+@receiver(post_save, sender='accounting.ClientProfile')
+@receiver(post_delete, sender='accounting.ClientProfile')
+def invalidate_document_tree_on_client_change(sender, raw=False, **kwargs):
+    """Η λίστα πελατών του browse δείχνει επωνυμία/ΑΦΜ - νέα έκδοση στο commit."""
+    if raw:
+        return
+    from accounting.services.document_counters import invalidate_document_counters_cache
+    transaction.on_commit(invalidate_document_counters_cache)
+
+
+# ============================================
+# LIVE FEED (calls / tickets)
+# ============================================
+
+@receiver(post_save, sender='accounting.VoIPCall')
+@receiver(post_save, sender='accounting.Ticket')
+@receiver(post_delete, sender='accounting.VoIPCall')
+@receiver(post_delete, sender='accounting.Ticket')
+def publish_live_feed_event(sender, instance, raw=False, **kwargs):
+    """
+    Delta της κλήσης/ticket στο live feed μετά το commit. Καλύπτει και το
+    fritz_webhook και το API του fritz_monitor (save() σε VoIPCall).
+    """
+    if raw:
+        return
+
+    from accounting.services.live_feed import call_delta, publish_live_event, ticket_delta
+
+    kind = 'call' if sender._meta.model_name == 'voipcall' else 'ticket'
+    if 'created' not in kwargs:
+        action, data = 'deleted', {'id': instance.pk}
+    else:
+        action = 'created' if kwargs['created'] else 'updated'
+        try:
+            data = call_delta(instance) if kind == 'call' else ticket_delta(instance)
+        except Exception as e:
+            logger.error(f"Error building live {kind} event for {instance.pk}: {e}")
+            return
+
+    transaction.on_commit(lambda: publish_live_event(kind, action, data))
+
+
+# ============================================
+# SEARCH INDEX (global search)
+# ============================================
+
+@receiver(post_save, sender='accounting.ClientProfile')
+@receiver(post_save, sender='accounting.MonthlyObligation')
+@receiver(post_save, sender='accounting.Ticket')
+@receiver(post_save, sender='accounting.VoIPCall')
+def update_search_document(sender, instance, raw=False, **kwargs):
+    """Ενημέρωση του SearchDocument της εγγραφής (και των εξαρτώμενων, για πελάτες)."""
+    if raw:
+        return
+
+    from accounting.services.search_index import index_object
+
+    try:
+        index_object(instance)
+    except Exception as e:
+        logger.error(f"Error updating search index for {sender.__name__} {instance.pk}: {e}")
+
+
+@receiver(post_delete, sender='accounting.ClientProfile')
+@receiver(post_delete, sender='accounting.MonthlyObligation')
+@receiver(post_delete, sender='accounting.Ticket')
+@receiver(post_delete, sender='accounting.VoIPCall')
+def remove_search_document(sender, instance, **kwargs):
+    from accounting.services.search_index import remove_object
+
+    try:
+        remove_object(instance)
+    except Exception as e:
+        logger.error(f"Error removing {sender.__name__} {instance.pk} from search index: {e}")
+
+
+@receiver(post_save, sender='accounting.ObligationType')
+def reindex_obligations_on_type_change(sender, instance, created, raw=False, **kwargs):
+    """Το όνομα/κωδικός του τύπου είναι μέρος του κειμένου των υποχρεώσεων."""
+    if raw or created:
+        return
+
+    from accounting.models import MonthlyObligation
+    from accounting.services.search_index import index_search_documents
+
+    try:
+        index_search_documents(
+            'obligation', MonthlyObligation.objects.filter(obligation_type=instance).values_list('id', flat=True)
+        )
+    except Exception as e:
+        logger.error(f"Error reindexing obligations of type {instance.pk}: {e}")
+
+
+# ============================================
+# NOTIFICATION FEED (ειδοποιήσεις προθεσμιών)
+# ============================================
+
+@receiver(post_save, sender='accounting.MonthlyObligation')
+@receiver(post_delete, sender='accounting.MonthlyObligation')
+def update_obligation_notification(sender, instance, raw=False, **kwargs):
+    """Νέα ειδοποίηση (ή tombstone) όταν αλλάζει κατάσταση/προθεσμία υποχρέωσης."""
+    if raw:
+        return
+
+    from accounting.services.notification_feed import sync_obligation_notifications
+
+    try:
+        sync_obligation_notifications([instance.pk])
+    except Exception as e:
+        logger.error(f"Error updating notification for obligation {instance.pk}: {e}")
+
+
+@receiver(post_save, sender='accounting.ClientProfile')
+def update_client_notifications(sender, instance, created, raw=False, **kwargs):
+    """Η επωνυμία του πελάτη είναι αποθηκευμένη στις ειδοποιήσεις."""
+    if raw or created:
+        return
+
+    from accounting.services.notification_feed import sync_client_notifications
+
+    try:
+        sync_client_notifications(instance)
+    except Exception as e:
+        logger.error(f"Error updating notifications of client {instance.pk}: {e}")
+
+
+@receiver(post_save, sender='accounting.ObligationType')
+def update_obligation_type_notifications(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return
+
+    from accounting.services.notification_feed import sync_obligation_type_notifications
+
+    try:
+        sync_obligation_type_notifications(instance)
+    except Exception as e:
+        logger.error(f"Error updating notifications of obligation type {instance.pk}: {e}")
+
+
+# ============================================
+# EMAIL TEMPLATE CACHE INVALIDATION
+# ============================================
+
+@receiver(post_save, sender='accounting.EmailTemplate')
+@receiver(post_delete, sender='accounting.EmailTemplate')
+@receiver(post_save, sender='accounting.ObligationType')
+@receiver(post_delete, sender='accounting.ObligationType')
+def invalidate_email_templates_on_change(sender, raw=False, **kwargs):
+    """
+    Ακύρωση του cache προτύπων email (compiled templates και πίνακας
+    επιλογής ανά τύπο υποχρέωσης). Η διαγραφή ObligationType κάνει SET_NULL
+    στα πρότυπα χωρίς signal, γι' αυτό παρακολουθείται κι αυτό.
+    """
+    if raw:
+        return
+    from accounting.utils.email_template_cache import (
+        clear_local_email_template_cache, invalidate_email_template_cache
+    )
+    # Η τρέχουσα διεργασία βλέπει αμέσως την αλλαγή, οι υπόλοιπες μετά το commit
+    clear_local_email_template_cache()
+    transaction.on_commit(invalidate_email_template_cache)
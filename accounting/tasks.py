@@ -8,11 +8,10 @@ from celery import shared_task
 from django.utils import timezone
 from django.core.mail import send_mail
 from django.template.loader import render_to_string
-from django.utils.html import strip_tags
 from django.contrib.auth.models import User
 from django.conf import settings
 from datetime import timedelta
-from .models import VoIPCall, Ticket, VoIPCallLog, MonthlyObligation, EmailTemplate, ScheduledEmail
+from .models import VoIPCall, Ticket, VoIPCallLog, MonthlyObligation
 import logging
 
 logger = logging.getLogger(__name__)
@@ -192,91 +191,30 @@ def create_ticket_for_answered_call(self, call_id, user_id=None):
 # ============================================
 
 @shared_task
-def send_obligation_reminders():
+def send_obligation_reminders(digest=None):
     """
     Αυτόματα emails αναμνήσεων για υποχρεώσεις
     Στέλνεται: Κάθε weekday 9:00 AM
     Λήπτες: Πελάτες με υποχρεώσεις που λήγουν τις επόμενες 7 ημέρες
+
+    digest=True (default: settings.OBLIGATION_REMINDER_DIGEST): ένα email ανά
+    πελάτη με όλες τις υποχρεώσεις του. Η αποστολή γίνεται με pooled SMTP
+    connection και τα ScheduledEmail γράφονται με bulk_create.
     """
+    from accounting.services.reminder_digest import send_obligation_reminder_digest
+
+    if digest is None:
+        digest = getattr(settings, 'OBLIGATION_REMINDER_DIGEST', True)
+
     try:
-        today = timezone.now().date()
-        week_end = today + timedelta(days=7)
-        
-        # Find obligations due this week
-        pending_obligations = MonthlyObligation.objects.filter(
-            deadline__gte=today,
-            deadline__lte=week_end,
-            status='pending'
-        ).select_related('client', 'obligation_type')
-        
-        if not pending_obligations.exists():
+        stats = send_obligation_reminder_digest(digest=digest)
+        if not stats['obligations']:
             logger.info("No obligations due this week - skipping reminder")
-            return f"No reminders sent (0 obligations due)"
-        
-        sent_count = 0
-        
-        for obligation in pending_obligations:
-            try:
-                client = obligation.client
-                
-                # Skip if no email
-                if not client.email:
-                    logger.warning(f"Client {client.afm} has no email - skipping")
-                    continue
-                
-                # Get template (look for 'obligation reminder' template)
-                template = EmailTemplate.objects.filter(
-                    name__icontains='reminder',
-                    is_active=True
-                ).first()
-                
-                if not template:
-                    logger.warning("No reminder template found - using default message")
-                    # Use default message
-                    subject = f"⏰ Υπενθύμιση: Υποχρέωση {obligation.obligation_type.name}"
-                    body = f"Καλημέρα {client.eponimia},\n\nΥπενθύμιση: Η υποχρέωση '{obligation.obligation_type.name}' λήγει στις {obligation.deadline.strftime('%d/%m/%Y')}.\n\nΜε εκτίμηση"
-                else:
-                    # Render template
-                    context = {
-                        'client_name': client.eponimia,
-                        'obligation_name': obligation.obligation_type.name,
-                        'deadline': obligation.deadline.strftime('%d/%m/%Y'),
-                        'days_left': (obligation.deadline - today).days,
-                    }
-                    subject, body = template.render(context)
-                
-                # Send email
-                send_mail(
-                    subject=subject,
-                    message=strip_tags(body),
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[client.email],
-                    html_message=body if template else None,
-                    fail_silently=False,
-                )
-                
-                # Log email
-                ScheduledEmail.objects.create(
-                    recipient_email=client.email,
-                    recipient_name=client.eponimia,
-                    client=client,
-                    template=template,
-                    subject=subject,
-                    body_html=body,
-                    send_at=timezone.now(),
-                    status='sent',
-                    sent_at=timezone.now(),
-                )
-                
-                sent_count += 1
-                logger.info(f"✅ Reminder sent to {client.email} for obligation {obligation.obligation_type.name}")
-                
-            except Exception as e:
-                logger.error(f"❌ Error sending reminder for obligation #{obligation.id}: {e}")
-                continue
-        
-        logger.info(f"✅ Obligation reminders sent: {sent_count}/{pending_obligations.count()}")
-        return f"Sent {sent_count} obligation reminders"
+            return "No reminders sent (0 obligations due)"
+        return (
+            f"Sent {stats['sent']} obligation reminders "
+            f"({stats['obligations']} obligations, {stats['per_second']}/s)"
+        )
         
     except Exception as exc:
         logger.error(f"❌ Error in send_obligation_reminders: {exc}")
@@ -505,8 +443,12 @@ def process_scheduled_emails():
     Process and send scheduled emails that are due.
 
     Runs: Every 5 minutes via Celery Beat
-    Action: Finds all ScheduledEmail with status='pending' and send_at <= now()
-            Sends each email using BCC for multiple recipients and updates status
+    Action: Claims pending ScheduledEmail with send_at <= now() in batches
+            (select_for_update(skip_locked=True) -> status 'sending'), so
+            overlapping runs never send the same email twice. Each batch is sent
+            by a bounded thread pool over the shared EmailConnectionPool and
+            EmailLog entries are written with bulk_create.
+            See accounting/services/scheduled_email_worker.py
 
     Supports:
         - Single recipient: sends directly to recipient
@@ -515,118 +457,17 @@ def process_scheduled_emails():
     Returns:
         str: Summary of processed emails
     """
-    from django.core.mail import EmailMessage
+    from accounting.services.scheduled_email_worker import process_due_scheduled_emails
 
-    now = timezone.now()
-
-    # Find all pending emails that are due
-    pending_emails = ScheduledEmail.objects.filter(
-        status='pending',
-        send_at__lte=now
-    ).select_related('client', 'template').prefetch_related('obligations')
-
-    if not pending_emails.exists():
+    stats = process_due_scheduled_emails()
+    if not stats['batches']:
         logger.debug("No scheduled emails to process")
         return "No scheduled emails to process"
 
-    sent_count = 0
-    failed_count = 0
-    total_recipients = 0
-
-    for scheduled_email in pending_emails:
-        try:
-            # Get list of recipient emails (supports comma/newline separated)
-            recipients = scheduled_email.get_recipients_list()
-            recipient_count = len(recipients)
-
-            if not recipients:
-                logger.warning(f"Scheduled email #{scheduled_email.id} has no valid recipients")
-                scheduled_email.mark_as_failed("Δεν βρέθηκαν έγκυρες διευθύνσεις email")
-                failed_count += 1
-                continue
-
-            logger.info(f"Processing scheduled email #{scheduled_email.id} to {recipient_count} recipient(s)")
-
-            # Create email message
-            # For multiple recipients: send to self with BCC to all recipients
-            # For single recipient: send directly
-            if recipient_count > 1:
-                # BCC mode: send to self, BCC to all recipients
-                email = EmailMessage(
-                    subject=scheduled_email.subject,
-                    body=scheduled_email.body_html,
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    to=[settings.DEFAULT_FROM_EMAIL],  # Send to self
-                    bcc=recipients,  # All recipients in BCC
-                )
-            else:
-                # Single recipient mode: send directly
-                email = EmailMessage(
-                    subject=scheduled_email.subject,
-                    body=scheduled_email.body_html,
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    to=recipients,
-                )
-
-            email.content_subtype = 'html'
-
-            # Attach files from obligations
-            attachments = scheduled_email.get_attachments()
-            for attachment in attachments:
-                try:
-                    if hasattr(attachment, 'path'):
-                        email.attach_file(attachment.path)
-                except Exception as attach_err:
-                    logger.warning(f"Could not attach file for email #{scheduled_email.id}: {attach_err}")
-
-            # Send email
-            email.send(fail_silently=False)
-
-            # Mark as sent
-            scheduled_email.mark_as_sent()
-            sent_count += 1
-            total_recipients += recipient_count
-
-            if recipient_count > 1:
-                logger.info(f"✅ Scheduled email #{scheduled_email.id} sent via BCC to {recipient_count} recipients")
-            else:
-                logger.info(f"✅ Scheduled email #{scheduled_email.id} sent to {recipients[0]}")
-
-            # Create EmailLog entry for tracking
-            from accounting.models import EmailLog
-            EmailLog.objects.create(
-                recipient_email=scheduled_email.recipient_email,
-                recipient_name=scheduled_email.recipient_name,
-                client=scheduled_email.client,
-                template_used=scheduled_email.template,
-                subject=scheduled_email.subject,
-                body=scheduled_email.body_html,
-                status='sent',
-                sent_by=scheduled_email.created_by
-            )
-
-        except Exception as e:
-            # Mark as failed
-            scheduled_email.mark_as_failed(str(e))
-            failed_count += 1
-
-            logger.error(f"❌ Failed to send scheduled email #{scheduled_email.id}: {e}")
-
-            # Create EmailLog entry for tracking the failure
-            from accounting.models import EmailLog
-            EmailLog.objects.create(
-                recipient_email=scheduled_email.recipient_email,
-                recipient_name=scheduled_email.recipient_name,
-                client=scheduled_email.client,
-                template_used=scheduled_email.template,
-                subject=scheduled_email.subject,
-                body=scheduled_email.body_html,
-                status='failed',
-                error_message=str(e),
-                sent_by=scheduled_email.created_by
-            )
-
-    result = f"Processed scheduled emails: {sent_count} sent ({total_recipients} recipients), {failed_count} failed"
+    result = (
+        f"Processed scheduled emails: {stats['sent']} sent ({stats['recipients']} recipients), "
+        f"{stats['failed']} failed"
+    )
     logger.info(f"✅ {result}")
     return result
 
@@ -752,4 +593,125 @@ def retry_failed_emails(self):
 
     result = f"Retried {retried} emails, {succeeded} succeeded"
     logger.info(f"✅ {result}")
-    return result
\ No newline at end of file
+    return result
+
+# ============================================
+# TASK 8: BULK COMPLETE WITH DOCUMENTS
+# ============================================
+
+@shared_task
+def process_bulk_completion_job(job_id):
+    """
+    Εκτέλεση μαζικής ολοκλήρωσης υποχρεώσεων με έγγραφα.
+
+    Triggered by: bulk_complete_with_documents API (το request μόνο κάνει staging)
+    Action: Αποθήκευση εγγράφων, μαζική ενημέρωση κατάστασης, αποστολή email
+    Progress: BulkCompletionJob (GET /api/v1/obligations/bulk-complete-jobs/<id>/)
+    """
+    from accounting.services.bulk_completion import run_bulk_completion_job
+
+    job = run_bulk_completion_job(job_id)
+    return {
+        'job_id': job.id,
+        'status': job.status,
+        'completed_count': job.completed_count,
+    }
+
+
+# ============================================
+# TASK 9: CLIENT IMPORT
+# ============================================
+
+@shared_task
+def process_client_import_job(job_id):
+    """
+    Εισαγωγή πελατών από Excel.
+
+    Triggered by: import_clients_csv API (το request μόνο κάνει staging του αρχείου)
+    Action: Ανάγνωση read_only, έλεγχοι και upsert ανά batch
+    Progress: ClientImportJob (GET /api/v1/import/clients/jobs/<id>/)
+    """
+    from accounting.services.client_import import run_client_import_job
+
+    job = run_client_import_job(job_id)
+    return {
+        'job_id': job.id,
+        'status': job.status,
+        'created_count': job.created_count,
+        'updated_count': job.updated_count,
+        'error_count': job.error_count,
+    }
+
+
+# ============================================
+# TASK 10: CLIENT FOLDER PROVISIONING
+# ============================================
+
+@shared_task
+def provision_client_folders_task(client_ids, years=None):
+    """
+    Σκελετός φακέλων αρχειοθέτησης για νέους πελάτες.
+
+    Triggered by: post_save ClientProfile / import πελατών, μόνο με
+    CLIENT_FOLDERS_SKELETON_ON_CREATE (αλλιώς οι φάκελοι δημιουργούνται
+    με το πρώτο έγγραφο)
+    """
+    from accounting.services.folder_provisioning import provision_client_folders
+
+    return provision_client_folders(client_ids, years=years)
+
+
+# ============================================
+# TASK 11: FILE INDEX REFRESH
+# ============================================
+
+@shared_task
+def refresh_file_index_task(with_hash=False):
+    """
+    Σταδιακή ενημέρωση του ευρετηρίου αρχείων πελατών (ClientFileIndex).
+
+    Scheduled: Κάθε βράδυ στις 02:30 (βλ. CELERY_BEAT_SCHEDULE)
+    Used by: cleanup_orphan_files --no-refresh, FileManagerStatsView
+    """
+    from accounting.services.file_index import refresh_file_index
+
+    return refresh_file_index(with_hash=with_hash)
+
+
+# ============================================
+# TASK 12: OVERDUE OBLIGATIONS
+# ============================================
+
+@shared_task
+def mark_overdue_obligations_task():
+    """
+    Μετάβαση pending -> overdue για υποχρεώσεις με παρελθούσα προθεσμία.
+
+    Scheduled: Κάθε ώρα στο :05 (βλ. CELERY_BEAT_SCHEDULE) - η μετάβαση
+    γίνεται μία φορά την ημέρα, οι υπόλοιπες εκτελέσεις απλώς καλύπτουν
+    την περίπτωση που ο worker έλειπε τα μεσάνυχτα.
+    Αντικαθιστά το UPDATE που έκαναν τα reads και το MonthlyObligation.save()
+    """
+    from accounting.services.obligation_calendar import mark_overdue_obligations
+
+    run = mark_overdue_obligations()
+    if run is None:
+        return {'updated': 0, 'skipped': True}
+    return {'updated': run.transitioned, 'chunks': run.chunks, 'run_date': run.run_date.isoformat()}
+
+
+# ============================================
+# TASK 13: NOTIFICATION FEED
+# ============================================
+
+@shared_task
+def refresh_notifications_task():
+    """
+    Ημερήσια μετάβαση ειδοποιήσεων (προσεχώς -> σήμερα -> καθυστερημένη).
+
+    Scheduled: Κάθε βράδυ στις 00:10 (βλ. CELERY_BEAT_SCHEDULE)
+    Used by: /api/v1/notifications/ (βλ. services/notification_feed.py)
+    """
+    from accounting.services.notification_feed import refresh_notification_feed
+
+    return {'written': refresh_notification_feed()}
@@ -53,6 +53,7 @@ from .api_email import (
     complete_and_notify,
     bulk_complete_with_notify,
     bulk_complete_with_documents,
+    bulk_complete_job_status,
     email_history,
     email_settings,
     email_settings_test,
@@ -70,7 +71,8 @@ from .api_gsis import (
     gsis_settings_update,
     gsis_test_connection,
 )
-from .api_notifications import notifications_list
+from .api_notifications import notifications_list, notifications_mark_read
+from .api_live import live_feed, live_events
 from .api_users import (
     user_list,
     user_create,
@@ -83,6 +85,7 @@ from .api_export_import import (
     export_clients_csv,
     export_clients_template,
     import_clients_csv,
+    import_clients_job_status,
     export_obligation_types_csv,
     export_obligation_profiles_csv,
     export_client_obligations_csv,
@@ -267,6 +270,13 @@ urlpatterns = [
     # NOTIFICATIONS API (v1) - JWT authenticated
     # ============================================
     path("api/v1/notifications/", notifications_list, name="api_v1_notifications"),
+    path("api/v1/notifications/read/", notifications_mark_read, name="api_v1_notifications_read"),
+
+    # ============================================
+    # LIVE FEED API (v1) - κλήσεις/tickets (SSE + fallback)
+    # ============================================
+    path("api/v1/live/feed/", live_feed, name="api_v1_live_feed"),
+    path("api/v1/live/events/", live_events, name="api_v1_live_events"),
 
     # ============================================
     # GSIS API (v1) - Αναζήτηση στοιχείων με ΑΦΜ
@@ -297,6 +307,7 @@ urlpatterns = [
     path("api/v1/obligations/<int:obligation_id>/complete-and-notify/", complete_and_notify, name="api_v1_complete_and_notify"),
     path("api/v1/obligations/bulk-complete-notify/", bulk_complete_with_notify, name="api_v1_bulk_complete_notify"),
     path("api/v1/obligations/bulk-complete-with-documents/", bulk_complete_with_documents, name="api_v1_bulk_complete_with_documents"),
+    path("api/v1/obligations/bulk-complete-jobs/<int:job_id>/", bulk_complete_job_status, name="api_v1_bulk_complete_job_status"),
 
     # REST ROUTER
     path("api/", include(router.urls)),
@@ -377,6 +388,7 @@ urlpatterns = [
     path("api/v1/export/clients/csv/", export_clients_csv, name="api_export_clients_csv"),
     path("api/v1/export/clients/template/", export_clients_template, name="api_export_clients_template"),
     path("api/v1/import/clients/csv/", import_clients_csv, name="api_import_clients_csv"),
+    path("api/v1/import/clients/jobs/<int:job_id>/", import_clients_job_status, name="api_import_clients_job_status"),
 
     # Obligation Types & Profiles Export
     path("api/v1/export/obligation-types/csv/", export_obligation_types_csv, name="api_export_obligation_types_csv"),
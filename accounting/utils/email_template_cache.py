@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+accounting/utils/email_template_cache.py
+Description: Process-local cache για τα EmailTemplate.
+
+- Compiled django Templates (subject/body) ανά (id, updated_at), ώστε το
+  EmailTemplate.render() να μην κάνει parse σε κάθε κλήση.
+- Πίνακας επιλογής προτύπου (obligation_type_id -> template, default
+  'Ολοκλήρωση', 'reminder', πρώτο ενεργό) που χτίζεται με ένα query.
+  Σε μαζικές αποστολές δεν γίνεται κανένα query για πρότυπα.
+
+Τα signals των EmailTemplate/ObligationType καθαρίζουν το cache της τρέχουσας
+διεργασίας και αλλάζουν έναν αριθμό έκδοσης στο Django cache· οι υπόλοιπες
+διεργασίες (gunicorn workers, Celery) τον ελέγχουν το πολύ κάθε
+EMAIL_TEMPLATE_CACHE_CHECK_INTERVAL δευτερόλεπτα.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+EMAIL_TEMPLATE_VERSION_KEY = 'accounting:email_templates:version'
+
+COMPLETION_TEMPLATE_NAME = 'Ολοκλήρωση'
+REMINDER_TEMPLATE_NAME = 'reminder'
+
+_lock = threading.Lock()
+_compiled = {}
+_state = {'lookup': None, 'version': None, 'checked_at': 0.0}
+
+
+class TemplateLookup:
+    """Ενεργά πρότυπα ανά κριτήριο επιλογής (βλ. EmailTemplate.get_template_for_obligation)."""
+
+    def __init__(self, templates):
+        self.by_obligation_type = {}
+        self.completion = None
+        self.reminder = None
+        self.first_active = templates[0] if templates else None
+
+        # Τα templates έρχονται με τη σειρά του Meta.ordering (name),
+        # όπως και τα .first() των αρχικών queries
+        for template in templates:
+            name = template.name.casefold()
+            if template.obligation_type_id is not None:
+                self.by_obligation_type.setdefault(template.obligation_type_id, template)
+            if self.completion is None and COMPLETION_TEMPLATE_NAME.casefold() in name:
+                self.completion = template
+            if self.reminder is None and REMINDER_TEMPLATE_NAME in name:
+                self.reminder = template
+
+    def for_obligation_type(self, obligation_type_id):
+        return (
+            self.by_obligation_type.get(obligation_type_id)
+            or self.completion
+            or self.first_active
+        )
+
+
+def _check_interval():
+    return getattr(settings, 'EMAIL_TEMPLATE_CACHE_CHECK_INTERVAL', 30)
+
+
+def _shared_version():
+    try:
+        return cache.get(EMAIL_TEMPLATE_VERSION_KEY, 0)
+    except Exception as e:
+        logger.warning(f"Email template cache version unavailable: {e}")
+        return None
+
+
+def clear_local_email_template_cache():
+    """Καθαρίζει μόνο το cache της τρέχουσας διεργασίας."""
+    with _lock:
+        _compiled.clear()
+        _state['lookup'] = None
+        _state['version'] = None
+        _state['checked_at'] = 0.0
+
+
+def get_template_lookup():
+    """Επιστρέφει τον TemplateLookup, χτίζοντάς τον (ένα query) αν χρειάζεται."""
+    from accounting.models import EmailTemplate
+
+    now = time.monotonic()
+    lookup = _state['lookup']
+    if lookup is not None and now - _state['checked_at'] < _check_interval():
+        return lookup
+
+    version = _shared_version()
+    if lookup is not None and version == _state['version']:
+        _state['checked_at'] = now
+        return lookup
+
+    if lookup is not None:
+        # Άλλη διεργασία άλλαξε πρότυπα - τα compiled είναι πιθανώς παλιά
+        with _lock:
+            _compiled.clear()
+
+    lookup = TemplateLookup(list(EmailTemplate.objects.filter(is_active=True)))
+    with _lock:
+        _state['lookup'] = lookup
+        _state['version'] = version
+        _state['checked_at'] = now
+    return lookup
+
+
+def get_compiled_template(email_template):
+    """
+    Επιστρέφει (subject_template, body_template) ως compiled django Templates.
+    Μη αποθηκευμένα πρότυπα γίνονται compile χωρίς cache.
+    """
+    from django.template import Template
+
+    if email_template.pk is None or email_template.updated_at is None:
+        return Template(email_template.subject), Template(email_template.body_html)
+
+    key = (email_template.pk, email_template.updated_at)
+    source = (email_template.subject, email_template.body_html)
+    cached = _compiled.get(key)
+    # Έλεγχος κειμένου: το instance μπορεί να έχει αλλαγές που δεν έχουν αποθηκευτεί
+    if cached is None or cached[0] != source:
+        cached = (source, (Template(source[0]), Template(source[1])))
+        with _lock:
+            _compiled[key] = cached
+    return cached[1]
+
+
+def invalidate_email_template_cache():
+    """Καθαρίζει το τοπικό cache και ειδοποιεί τις υπόλοιπες διεργασίες."""
+    clear_local_email_template_cache()
+    try:
+        cache.set(EMAIL_TEMPLATE_VERSION_KEY, time.time_ns(), None)
+    except Exception as e:
+        logger.warning(f"Could not invalidate email template cache: {e}")
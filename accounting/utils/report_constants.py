@@ -94,7 +94,7 @@ def get_date_range(period: str):
     Returns:
         Tuple of (start_date, end_date) or (None, None) for 'all'
     """
-    today = timezone.now().date()
+    today = timezone.localdate()
 
     if period == 'today':
         return today, today
@@ -128,7 +128,7 @@ def get_previous_period_range(period: str, current_start, current_end):
     Returns:
         Tuple of (prev_start, prev_end)
     """
-    today = timezone.now().date()
+    today = timezone.localdate()
 
     if period == 'today':
         prev_start = prev_end = today - timedelta(days=1)
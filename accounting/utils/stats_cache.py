@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+accounting/utils/stats_cache.py
+Description: Short-TTL cache for the dashboard/reports statistics endpoints.
+
+Τα keys περιέχουν έναν αριθμό έκδοσης· το invalidate_stats_cache() αλλάζει
+την έκδοση ώστε όλα τα αποθηκευμένα stats (κάθε period/ημέρα) να
+αγνοηθούν μαζί. Καλείται από τα signals των MonthlyObligation/ClientProfile.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+STATS_CACHE_VERSION_KEY = 'accounting:stats:version'
+
+
+def _stats_ttl():
+    return getattr(settings, 'CACHE_TTL_STATS', 60)
+
+
+def get_cached_stats(name, parts, compute):
+    """
+    Επιστρέφει τα stats `name` από το cache ή τα υπολογίζει με compute().
+
+    Args:
+        name: Όνομα endpoint (π.χ. 'reports_stats')
+        parts: Tuple με ό,τι επηρεάζει το αποτέλεσμα (period, ημερομηνία, ...)
+        compute: Callable που επιστρέφει dict με τα stats
+    """
+    try:
+        version = cache.get(STATS_CACHE_VERSION_KEY, 0)
+        key = ':'.join(['accounting:stats', str(version), name] + [str(p) for p in parts])
+        data = cache.get(key)
+    except Exception as e:
+        logger.warning(f"Stats cache unavailable: {e}")
+        return compute()
+
+    if data is None:
+        data = compute()
+        try:
+            cache.set(key, data, _stats_ttl())
+        except Exception as e:
+            logger.warning(f"Could not cache {name}: {e}")
+    return data
+
+
+def invalidate_stats_cache():
+    """Ακυρώνει όλα τα cached stats (νέα έκδοση keys)."""
+    try:
+        cache.set(STATS_CACHE_VERSION_KEY, time.time_ns(), None)
+    except Exception as e:
+        logger.warning(f"Could not invalidate stats cache: {e}")
@@ -20,6 +20,7 @@ import json
 from ..models import (
     ClientProfile, MonthlyObligation, VoIPCallLog
 )
+from ..phone_utils import find_client_by_phone
 
 
 # ============================================
@@ -192,15 +193,7 @@ def _process_grouped_obligations(obligation_ids, files, notes, group_num, user):
 
 def _match_client_by_phone_standalone(phone_number):
     """Match phone number to client (standalone function for webhook)"""
-    clean_number = phone_number.replace(" ", "").replace("-", "")
-
-    return ClientProfile.objects.filter(
-        Q(tilefono_oikias_1__icontains=clean_number) |
-        Q(tilefono_oikias_2__icontains=clean_number) |
-        Q(kinito_tilefono__icontains=clean_number) |
-        Q(tilefono_epixeirisis_1__icontains=clean_number) |
-        Q(tilefono_epixeirisis_2__icontains=clean_number)
-    ).first()
+    return find_client_by_phone(phone_number)
 
 
 def _format_voip_call(call):
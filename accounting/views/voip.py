@@ -16,7 +16,7 @@ from django.contrib.admin.views.decorators import staff_member_required
 from django.utils import timezone
 from django.db.models import Count, Q
 from django.http import JsonResponse, HttpResponse
-from django.views.decorators.http import require_POST, require_http_methods
+from django.views.decorators.http import condition, require_POST, require_http_methods
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.cache import cache_page
 from django.middleware.csrf import get_token
@@ -35,9 +35,11 @@ import csv
 
 from ..permissions import IsVoIPMonitor, IsLocalRequest
 from ..models import (
-    ClientProfile, VoIPCall, VoIPCallLog, Ticket
+    VoIPCall, VoIPCallLog, Ticket
 )
 from ..serializers import VoIPCallSerializer, VoIPCallLogSerializer
+from ..phone_utils import find_client_by_phone
+from ..services.live_feed import current_seq, publish_live_event
 
 from .helpers import (
     _match_client_by_phone_standalone,
@@ -231,7 +233,7 @@ def fritz_webhook(request):
 
 @staff_member_required
 @require_http_methods(["GET"])
-@cache_page(5)  # Cache for 5 seconds
+@condition(etag_func=lambda request: f"voip-calls-{current_seq()}")  # 304 όσο δεν άλλαξε κλήση
 def voip_calls_api(request):
     """
     Real-time API for VoIP calls with AJAX support
@@ -342,6 +344,17 @@ class VoIPCallViewSet(viewsets.ModelViewSet):
     ordering_fields = ['started_at', 'duration_seconds']
     ordering = ['-started_at']
 
+    def create(self, request, *args, **kwargs):
+        """
+        Idempotent ως προς το call_id: το outbox του fritz_monitor ξαναστέλνει
+        ένα create αν χάθηκε η απάντηση - επιστρέφεται η υπάρχουσα κλήση.
+        """
+        call_id = request.data.get('call_id')
+        existing = VoIPCall.objects.filter(call_id=call_id).first() if call_id else None
+        if existing:
+            return Response(self.get_serializer(existing).data, status=status.HTTP_200_OK)
+        return super().create(request, *args, **kwargs)
+
     def perform_create(self, serializer):
         """Create call and auto-match client"""
         voip_call = serializer.save()
@@ -362,15 +375,7 @@ class VoIPCallViewSet(viewsets.ModelViewSet):
 
     def _match_client_by_phone(self, phone_number):
         """Match phone number to client"""
-        clean_number = phone_number.replace(" ", "").replace("-", "")
-
-        return ClientProfile.objects.filter(
-            Q(tilefono_oikias_1__icontains=clean_number) |
-            Q(tilefono_oikias_2__icontains=clean_number) |
-            Q(kinito_tilefono__icontains=clean_number) |
-            Q(tilefono_epixeirisis_1__icontains=clean_number) |
-            Q(tilefono_epixeirisis_2__icontains=clean_number)
-        ).first()
+        return find_client_by_phone(phone_number)
 
     def perform_update(self, serializer):
         """Update call and create ticket if requested"""
@@ -666,6 +671,8 @@ def voip_bulk_action(request):
         if action == 'resolution':
             if value in ['pending', 'closed', 'follow_up', '']:
                 updated = VoIPCall.objects.filter(id__in=call_ids).update(resolution=value)
+                # Το update() δεν περνά από signals - ενημέρωση live feed εδώ
+                publish_live_event('call', 'bulk_updated', {'ids': call_ids, 'resolution': value})
             else:
                 return JsonResponse({
                     'success': False,
@@ -675,6 +682,7 @@ def voip_bulk_action(request):
         elif action == 'status':
             if value in ['active', 'completed', 'missed', 'failed']:
                 updated = VoIPCall.objects.filter(id__in=call_ids).update(status=value)
+                publish_live_event('call', 'bulk_updated', {'ids': call_ids, 'status': value})
             else:
                 return JsonResponse({
                     'success': False,
@@ -1,6 +1,4 @@
-from tendo.singleton import SingleInstanceException
 from django.apps import AppConfig
-from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 
 
@@ -9,12 +7,3 @@ class AnalyticsConfig(AppConfig):
     label = 'analytics'
     verbose_name = _('Analytics')
     default_auto_field = 'django.db.models.AutoField'
-    
-    def ready(self):
-        if not settings.TESTING:
-            from analytics.utils.monthly_snapshot_saving import MonthlySnapshotSaving
-            try:
-                self.mss = MonthlySnapshotSaving()      # NOQA
-                self.mss.start()
-            except SingleInstanceException:
-                pass
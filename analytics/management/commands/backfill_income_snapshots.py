@@ -0,0 +1,61 @@
+"""
+Computes and saves Income Summary snapshots of historical months
+in one batch.
+
+Usage:
+    python manage.py backfill_income_snapshots --from 2025-01 --to 2025-12
+    python manage.py backfill_income_snapshots --from 2025-01 --department 3
+"""
+from datetime import datetime
+
+from django.contrib.auth.models import Group
+from django.core.management.base import BaseCommand, CommandError
+
+from analytics.utils.monthly_snapshot_saving import save_month_snapshots
+from common.utils.helpers import get_today
+
+
+def parse_month(value):
+    try:
+        return datetime.strptime(value, '%Y-%m').date()
+    except ValueError:
+        raise CommandError(f"Invalid month '{value}', expected YYYY-MM")
+
+
+class Command(BaseCommand):
+    help = 'Save Income Summary snapshots of historical months'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--from', dest='first_month', required=True,
+            help='First month (YYYY-MM)',
+        )
+        parser.add_argument(
+            '--to', dest='last_month',
+            help='Last month (YYYY-MM, default: current month)',
+        )
+        parser.add_argument(
+            '--department', type=int, action='append',
+            help='Department id (can be repeated, default: all departments)',
+        )
+
+    def handle(self, *args, **options):
+        first_month = parse_month(options['first_month'])
+        last_month = parse_month(options['last_month']) \
+            if options['last_month'] else get_today().replace(day=1)
+        if first_month > last_month:
+            raise CommandError("--from must not be later than --to")
+
+        departments = None
+        if options['department']:
+            departments = Group.objects.filter(
+                id__in=options['department'], department__isnull=False
+            )
+            if len(departments) != len(set(options['department'])):
+                raise CommandError("Unknown department id")
+
+        snapshots = save_month_snapshots(first_month, last_month, departments)
+        self.stdout.write(self.style.SUCCESS(
+            f"Saved {len(snapshots)} income snapshots "
+            f"({first_month:%Y-%m} - {last_month:%Y-%m})"
+        ))
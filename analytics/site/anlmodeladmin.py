@@ -6,11 +6,12 @@ from django.db.models.query import QuerySet
 from django.http.response import HttpResponseRedirect
 from django.template.response import TemplateResponse
 from django.urls import path
-from django.utils.safestring import mark_safe
 from django.utils.timezone import localtime, now
-from django.utils.translation import gettext_lazy as _
 
+from analytics.utils.helpers import get_chart_data
+from analytics.utils.helpers import get_date_header
 from analytics.utils.helpers import get_item_list
+from analytics.utils.helpers import get_payment_header
 from crm.site import crmmodeladmin
 
 
@@ -81,26 +82,14 @@ class AnlModelAdmin(crmmodeladmin.CrmModelAdmin):
 
     @staticmethod
     def add_chart_data(response: TemplateResponse, title: str, param, max_value) -> None:
-        aa = {
-            'title': title,
-            'data': ({
-                'period': x['period'],
-                'total': round(x['total']) or 0,
-                'pct':
-                    (int(round((x['total'] or 0)) / max_value * 100)) or 2
-                    if max_value else 2,
-            } for x in param)
-        }
-        response.context_data['charts'].append(aa)
+        response.context_data['charts'].append(
+            get_chart_data(title, param, max_value)
+        )
 
     @staticmethod
     def get_payment_header():
-        return mark_safe(
-            f'<i class="material-icons" title={_("Payments")} style="color: var(--body-quiet-color)">payments</i>'
-        )
+        return get_payment_header()
 
     @staticmethod
     def get_date_header():
-        return mark_safe(
-            '<i class="material-icons" title="{}" style="color: var(--body-quiet-color)">today</i>'.format(_("Payment date"))
-        )
+        return get_date_header()
@@ -0,0 +1,32 @@
+import logging
+from celery import shared_task
+from django.core.mail import mail_admins
+from django.utils import timezone
+
+from analytics.utils.monthly_snapshot_saving import is_last_day_of_month
+from analytics.utils.monthly_snapshot_saving import save_snapshots
+from common.utils.helpers import get_today
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def save_monthly_income_snapshots(force=False):
+    """Save Income Summary snapshots for all departments
+    on the last day of every month (scheduled by Celery Beat)."""
+    if not force and not is_last_day_of_month(get_today()):
+        return 0
+    try:
+        snapshots = save_snapshots()
+    except Exception as e:
+        logger.exception("Monthly income snapshots failed")
+        mail_admins(
+            "Exception: save_monthly_income_snapshots",
+            f'''
+            \nException time: {timezone.now()}
+            \nException: {e}''',
+            fail_silently=True,
+        )
+        raise
+    logger.info(f"Saved {len(snapshots)} income snapshots")
+    return len(snapshots)
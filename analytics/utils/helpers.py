@@ -18,6 +18,8 @@ from django.db.models import Subquery
 from django.db.models import Sum
 from django.db.models import When
 from django.core.handlers.wsgi import WSGIRequest
+from django.utils.safestring import mark_safe
+from django.utils.translation import gettext_lazy as _
 
 from common.utils.helpers import get_today
 from crm.models import Currency
@@ -40,6 +42,14 @@ class GroupConcat(Aggregate, ABC):
 
 
 def get_currency_info(request: WSGIRequest) -> Tuple[str, str, str]:
+    rate_field_name = request.session.get('rate_field_name', 'rate_to_marketing_currency')
+    currency_name, button_title = get_rate_currency_info(rate_field_name)
+    return currency_name, rate_field_name, button_title
+
+
+def get_rate_currency_info(rate_field_name: str) -> Tuple[str, str]:
+    """Returns the currency name and the switching button title
+    for the rate field name (without a request)."""
     currencies = Currency.objects.filter(
         Q(is_marketing_currency=True) | Q(is_state_currency=True)
     )
@@ -53,7 +63,6 @@ def get_currency_info(request: WSGIRequest) -> Tuple[str, str, str]:
     except Currency.DoesNotExist:
         state_currency = Currency.objects.first()
 
-    rate_field_name = request.session.get('rate_field_name', 'rate_to_marketing_currency')
     button_title = f"{marketing_currency.name} > {state_currency.name}"
     if rate_field_name == 'rate_to_marketing_currency':
         current_currency = marketing_currency
@@ -62,7 +71,7 @@ def get_currency_info(request: WSGIRequest) -> Tuple[str, str, str]:
         button_title = f"{state_currency.name} > {marketing_currency.name}"
     if marketing_currency == state_currency:
         button_title = ''
-    return current_currency.name, rate_field_name, button_title
+    return current_currency.name, button_title
 
 
 def get_current_currency_amount(payment_queryset: QuerySet,
@@ -139,3 +148,28 @@ def get_item_list(queryset: QuerySet, date) -> list:
             item_list.insert(i, {'period': date, 'total': 0})
         date = date + relativedelta(months=1)
     return item_list
+
+
+def get_chart_data(title: str, param, max_value) -> dict:
+    return {
+        'title': title,
+        'data': [{
+            'period': x['period'],
+            'total': round(x['total']) or 0,
+            'pct':
+                (int(round((x['total'] or 0)) / max_value * 100)) or 2
+                if max_value else 2,
+        } for x in param]
+    }
+
+
+def get_payment_header():
+    return mark_safe(
+        f'<i class="material-icons" title={_("Payments")} style="color: var(--body-quiet-color)">payments</i>'
+    )
+
+
+def get_date_header():
+    return mark_safe(
+        '<i class="material-icons" title="{}" style="color: var(--body-quiet-color)">today</i>'.format(_("Payment date"))
+    )
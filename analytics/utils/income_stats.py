@@ -0,0 +1,381 @@
+from datetime import date
+from dateutil.relativedelta import relativedelta
+from django.db import connection
+from django.db.models import Exists
+from django.db.models import F
+from django.db.models import FloatField
+from django.db.models import OuterRef
+from django.db.models import Q
+from django.db.models import Subquery
+from django.db.models import Sum
+from django.db.models import Value as V  # NOQA
+from django.db.models.functions import Coalesce
+from django.db.models.functions import Trunc
+from django.db.models.query import QuerySet
+from django.urls import reverse
+from django.utils.dateformat import DateFormat
+from django.utils.safestring import mark_safe
+from django.utils.translation import gettext_lazy as _
+
+from analytics.utils.helpers import get_amount_in_currency
+from analytics.utils.helpers import get_chart_data
+from analytics.utils.helpers import get_current_currency_amount
+from analytics.utils.helpers import get_date_header
+from analytics.utils.helpers import get_payment_header
+from analytics.utils.helpers import GroupConcat
+from common.utils.helpers import LEADERS
+from crm.models import Output
+from crm.models import Payment
+from crm.models import Rate
+from crm.utils.helpers import get_products_header
+from crm.utils.helpers import get_owner_header
+
+PAYMENT_ICON = '<i class="material-icons" style="font-size: 17px;vertical-align: middle;">swap_calls</i>'
+
+
+def get_monthly_income(deals: QuerySet, rate_field_name: str,
+                       first_month: date, last_month: date) -> dict:
+    """Returns received income of the deals per month
+    ({first day of month: amount}) in one query."""
+    rate = Rate.objects.filter(
+        currency=OuterRef('currency'),
+        payment_date=OuterRef('payment_date')
+    )
+    values = Payment.objects.filter(
+        deal__in=deals,
+        status=Payment.RECEIVED,
+        payment_date__gte=first_month,
+        payment_date__lt=last_month + relativedelta(months=1),
+    ).annotate(
+        period=Trunc('payment_date', 'month')
+    ).values('period').annotate(
+        total=Sum(get_amount_in_currency(rate, rate_field_name))
+    ).order_by('period')
+    return {x['period']: x['total'] or 0 for x in values}
+
+
+def get_month_series(monthly: dict, last_month: date, months: int = 12) -> list:
+    month = last_month + relativedelta(months=-(months - 1))
+    series = []
+    for _i in range(months):
+        series.append({'period': month, 'total': monthly.get(month, 0)})
+        month += relativedelta(months=1)
+    return series
+
+
+def build_income_context(queryset: QuerySet, as_of: date, currency_code: str,
+                         rate_field_name: str, monthly: dict = None,
+                         expected: bool = True) -> dict:
+    """
+    Income Summary data (charts, tables and summary) for the deals
+    on the as_of date.
+    monthly - precomputed get_monthly_income() result covering
+    the 24 months up to as_of (used for batches of snapshots).
+    expected - add the tables of the expected income.
+    """
+    current_month = as_of.replace(day=1)
+    if monthly is None:
+        monthly = get_monthly_income(
+            queryset, rate_field_name,
+            current_month + relativedelta(months=-23), current_month
+        )
+    charts = []
+    income_over_time = get_month_series(monthly, current_month)
+    income_previous_period_over_time = get_month_series(
+        monthly, current_month + relativedelta(months=-12)
+    )
+    income_max = max(
+        x['total'] for x in income_over_time + income_previous_period_over_time
+    )
+    current_period_total = round(
+        sum(x['total'] for x in income_over_time), 2)
+    previous_period_total = sum(
+        x['total'] for x in income_previous_period_over_time
+    )
+    delta = round(current_period_total - previous_period_total, 2)
+    signed_number = ("+" if delta > 0 else "") + str(delta)
+    title = _(
+        'Income monthly (total amount for the current period: {} {} ({}))'
+    ).format(current_period_total, currency_code, signed_number)
+    charts.append(get_chart_data(title, income_over_time, income_max))
+    title = _('Income monthly in the previous period') + \
+        f' ({currency_code})'
+    charts.append(get_chart_data(
+        title, income_previous_period_over_time, income_max
+    ))
+
+    data_tables = [
+        get_payments_received_table(
+            queryset, as_of, currency_code, rate_field_name
+        )
+    ]
+    if expected:
+        for status, title in (
+                (Payment.GUARANTEED, _('Guaranteed income')),
+                (Payment.HIGH_PROBABILITY, _('High probability income')),
+                (Payment.LOW_PROBABILITY, _('Low probability income')),
+        ):
+            data_tables.append(get_expected_income_table(
+                queryset, status, title, as_of,
+                currency_code, rate_field_name
+            ))
+
+    # income averaged over the year --------
+    income_over_year = [
+        {
+            'period': item['period'],
+            'total': sum(
+                x['total'] for x in get_month_series(monthly, item['period'])
+            )
+        }
+        for item in income_over_time
+    ]
+    max_value = max(x['total'] for x in income_over_year)
+    title = _('Income averaged over the year ({}).').format(currency_code)
+    charts.append(get_chart_data(title, income_over_year, max_value))
+
+    # summary data --------
+    total_won_deals = queryset.filter(
+        closing_reason__success_reason=True,
+        active=False,
+        closing_date__gt=as_of + relativedelta(months=-12),
+        closing_date__lte=as_of,
+    ).count()
+    average_income = round(current_period_total / 12)
+    summary = {
+        _('Total won deals'): total_won_deals,
+        _('Average won deals a month'): round(total_won_deals / 12, 1),
+        _('Average income amount a month'): f"{average_income} {currency_code}"
+    }
+    return {
+        'charts': charts,
+        'data_tables': data_tables,
+        'summary': summary,
+    }
+
+
+def get_payments_received_table(queryset: QuerySet, as_of: date,
+                                 currency_code: str, rate_field_name: str) -> dict:
+    title = _("Payments received")
+    payment_this_month_qs = Payment.objects.filter(
+        deal__in=queryset,
+        status=Payment.RECEIVED,
+        payment_date__month=as_of.month,
+        payment_date__year=as_of.year,
+    ).select_related(
+        'deal__contact__company__country', 'deal__lead',
+        'deal__owner', 'deal__co_owner'
+    ).order_by("payment_date")
+    payment_this_month_qs, total_amount = get_current_currency_amount(
+        payment_this_month_qs, rate_field_name
+    )
+    rep_title = Payment._meta.get_field('through_representation').verbose_name  # NOQA
+    table = {
+        'title': f'{title} ({DateFormat(as_of).format("M Y")})',
+        'headers': (
+            get_payment_header(), get_products_header(),
+            _("Amount"), get_date_header(),
+            _('Order'), get_owner_header(),
+        ),
+        'body': [
+            (
+                get_payment_link(p.deal),
+                get_products(p.deal),
+                mark_safe(
+                    f'<span title="{rep_title}" style="color: var(--orange-fg)">'
+                    f'{round(p.value, 2)} {currency_code}{PAYMENT_ICON}</span>'
+                ) if p.through_representation
+                else f'{round(p.value, 2)} {currency_code}',
+                p.payment_date,
+                p.order_number or LEADERS,
+                f'{p.deal.owner}, {p.deal.co_owner}'
+                if p.deal.co_owner else p.deal.owner
+            )
+            for p in payment_this_month_qs
+        ]
+    }
+    table['footers'] = (
+        mark_safe(f'<b>{_("Total amount")}</b>'),
+        LEADERS,
+        mark_safe(
+            f"<b>{total_amount or '0.00'} {currency_code}</b>"
+        )
+    )
+    return table
+
+
+def get_expected_income_table(queryset: QuerySet, status: str, title: str,
+                              as_of: date, currency_code: str,
+                              rate_field_name: str) -> dict:
+    next_month = (as_of + relativedelta(months=+1)).month
+    next_month_date = (as_of + relativedelta(months=+1)).replace(day=1)
+    next2_month = (as_of + relativedelta(months=+2)).month
+    next3_month_date = (as_of + relativedelta(months=+3)).replace(day=1)
+    rep_title = Payment._meta.get_field('through_representation').verbose_name  # NOQA
+
+    deals_qs = queryset.filter(
+        payment__payment_date__lt=next3_month_date,
+        payment__status=status
+    ).distinct()
+
+    payments = Payment.objects.filter(
+        deal=OuterRef('pk'),
+        status=status
+    ).order_by().values('deal')
+
+    rate = Rate.objects.filter(
+        currency=OuterRef('currency'),
+        payment_date=OuterRef('payment_date')
+    )
+    current_month_sum = payments.annotate(
+        value=Sum(
+            get_amount_in_currency(rate, rate_field_name),
+            filter=Q(payment_date__lt=next_month_date)
+        ),
+    )
+    current_month_through_rep = payments.filter(
+        payment_date__lt=next_month_date,
+        through_representation=True
+    )
+    next_month_sum = payments.annotate(
+        value=Sum(
+            F('amount') * F(f'currency__{rate_field_name}'),
+            filter=Q(payment_date__month=next_month),
+        ),
+    )
+    next_month_through_rep = payments.filter(
+        payment_date__month=next_month,
+        through_representation=True
+    )
+    next2_month_sum = payments.annotate(
+        value=Sum(
+            F('amount') * F(f'currency__{rate_field_name}'),
+            filter=Q(payment_date__month=next2_month),
+        ),
+    )
+    next2_month_through_rep = payments.filter(
+        payment_date__month=next2_month,
+        through_representation=True
+    )
+    annotate_params = {
+        "current_month_sum": Subquery(current_month_sum.values('value')),
+        "current_month_through_rep": Exists(current_month_through_rep),
+        "next_month_sum": Subquery(next_month_sum.values('value')),
+        "next_month_through_rep": Exists(next_month_through_rep),
+        "next2_month_sum": Subquery(next2_month_sum.values('value')),
+        "next2_month_through_rep": Exists(next2_month_through_rep),
+    }
+    if connection.vendor == 'mysql':    # for compatibility with postgresql
+        annotate_params['orders'] = Subquery(
+            payments.annotate(orders=GroupConcat(
+                'order_number')).values('orders')
+        )
+    deals = deals_qs.annotate(**annotate_params)
+    table = {
+        'title': title,
+        'headers': (
+            get_payment_header(),
+            get_products_header(),
+            DateFormat(as_of).format('M Y'),
+            DateFormat(
+                as_of + relativedelta(months=+1)
+            ).format('M Y'),
+            DateFormat(
+                as_of + relativedelta(months=+2)
+            ).format('M Y'),
+            _('Order'),
+            get_owner_header(),
+        ),
+        'body': []
+    }
+    total = deals.aggregate(
+        current_month_amount=Sum('current_month_sum'),
+        next_month_amount=Sum('next_month_sum'),
+        next2_month_amount=Sum('next2_month_sum'),
+        sum=Coalesce(
+            Sum('current_month_sum'),
+            V(0),
+            output_field=FloatField()
+        ) + Coalesce(
+            Sum('next_month_sum'),
+            V(0),
+            output_field=FloatField()
+        ) + Coalesce(
+            Sum('next2_month_sum'),
+            V(0),
+            output_field=FloatField()
+        )
+    )
+    for d in deals:
+        if connection.vendor != 'mysql':    # for compatibility with postgresql
+            order_number = Payment.objects.filter(
+                deal=d,
+                status=status,
+                order_number__isnull=False
+            ).values_list('order_number', flat=True)
+            d.orders = ", ".join(order_number) if order_number else ''
+
+        row = (
+            get_payment_link(d),
+            get_products(d),
+            format_sum(d.current_month_sum, currency_code,
+                       d.current_month_through_rep, rep_title, PAYMENT_ICON),
+            format_sum(d.next_month_sum, currency_code,
+                       d.next_month_through_rep, rep_title, PAYMENT_ICON),
+            format_sum(d.next2_month_sum, currency_code,
+                       d.next2_month_through_rep, rep_title, PAYMENT_ICON),
+            d.orders if d.orders else LEADERS,
+            f'{d.owner}, {d.co_owner}' if d.co_owner else d.owner
+        )
+        table['body'].append(row)
+
+    title = _("Total amount")
+    table['footers'] = (
+        mark_safe(f'<b>{title}</b>'),
+        "",
+        mark_safe(
+            f"<b>{round(total['current_month_amount'], 2)} {currency_code}</b>"
+        ) if total['current_month_amount'] else LEADERS,
+        mark_safe(
+            f"<b>{round(total['next_month_amount'], 2)} {currency_code}</b>"
+        ) if total['next_month_amount'] else LEADERS,
+        mark_safe(
+            f"<b>{round(total['next2_month_amount'], 2)} {currency_code}</b>"
+        ) if total['next2_month_amount'] else LEADERS,
+        '',
+        mark_safe(
+            f"<b>{round(total['sum'], 2) if total['sum'] else '0.00'} {currency_code}</b>"
+        ),
+    )
+    return table
+
+
+def format_sum(sum, currency_code, through_rep, rep_title, icon):
+    if not sum:
+        return LEADERS
+    return mark_safe(
+        f'<span title="{rep_title}" style="color: var(--orange-fg)">'
+        f'{round(sum, 2)} {currency_code}{icon}</span>'
+        ) if through_rep else f'{round(sum, 2)} {currency_code}'
+
+
+def get_payment_link(deal):
+    if deal.contact:
+        value_str = f'{deal.contact.company}, {deal.contact.company.country}'
+    else:
+        if deal.lead.company_name:
+            value_str = deal.lead.company_name
+        else:
+            value_str = deal.lead.first_name
+    deal_url = f'{reverse("site:crm_deal_change", args=(deal.id,))}#Payments'
+    return mark_safe(
+        f'<a href="{deal_url}" target="_blank">{value_str}</a>'
+    )
+
+
+def get_products(deal):
+    products = ', '.join([
+        f'{otp.product} - {otp.quantity}{otp.pcs}'
+        for otp in Output.objects.filter(deal=deal)
+    ])
+    return products or LEADERS
@@ -1,86 +1,116 @@
-import calendar
-import time
-import threading
-from tendo.singleton import SingleInstance
-from unittest import skip
-from django.conf import settings
-from django.core.mail import mail_admins
-from django.db import connection
-from django.test import Client
-from django.test import override_settings
-from django.test import TestCase
-from django.utils import timezone
-from django.urls import reverse
-
-from analytics.models import IncomeStat
-from analytics.models import IncomeStatSnapshot
-from common.utils.helpers import get_manager_departments
-from common.utils.helpers import USER_MODEL
-
-
-class MonthlySnapshotSaving(threading.Thread, SingleInstance):
-    """Save Snapshot for all departments at the end of last day of every month"""
-
-    def __init__(self, *args, **kwargs):
-        threading.Thread.__init__(self, *args, **kwargs)
-        self.daemon = True
-        if settings.TESTING:
-            SingleInstance.__init__(self, flavor_id='MonthlySnapshotSaving_test')
-        else:
-            SingleInstance.__init__(self, flavor_id='MonthlySnapshotSaving')
-
-    def run(self):
-        ss = SaveSnapshot()
-        while True:
-            now = timezone.localtime(timezone.now())
-            last_day = calendar.monthrange(now.year, now.month)[1]
-            save_dt = now.replace(
-                day=last_day,
-                hour=23,
-                minute=0,
-                second=0,
-                microsecond=0
-            )
-            secs = (save_dt - now).total_seconds()
-            if secs > 0:
-                connection.close()
-                time.sleep(secs)
-                try:
-                    ss.save_snapshots()
-                except Exception as e:
-                    mail_admins(
-                        "Exception: MonthlySnapshotSaving",
-                        f'''
-                        \nException time: {now}
-                        \nException: {e}''',
-                        fail_silently=False,
-                    )
-            connection.close()
-            time.sleep(3600)    # one hour
-
-
-@skip("This is not a test")
-class SaveSnapshot(TestCase):
-    """Save Snapshot for all departments"""
-
-    @override_settings(
-        SECURE_HSTS_SECONDS=0,
-        SECURE_SSL_REDIRECT=False,
-        SECURE_HSTS_PRELOAD=False
-    )
-    def save_snapshots(self) -> None:
-        self.client = Client(SERVER_NAME='localhost')
-        user = USER_MODEL.objects.filter(is_superuser=True).first()
-        self.client.force_login(user)
-        departments = get_manager_departments()
-        for dep in departments:
-            url = reverse("site:analytics_incomestat_changelist")
-            response = self.client.get(
-                url + f'?department={dep.id}',
-                HTTP_ACCEPT_LANGUAGE=settings.LANGUAGE_CODE
-            )
-            snapshot = IncomeStatSnapshot(
-                department_id=dep.id,
-                webpage=response.context_data['snapshot'],
-            )
-            snapshot.save()
+import calendar
+from datetime import date
+from datetime import datetime
+from datetime import time
+from dateutil.relativedelta import relativedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils import translation
+
+from analytics.models import IncomeStat
+from analytics.models import IncomeStatSnapshot
+from analytics.utils.helpers import get_rate_currency_info
+from analytics.utils.income_stats import build_income_context
+from analytics.utils.income_stats import get_monthly_income
+from common.utils.helpers import get_manager_departments
+from common.utils.helpers import get_today
+
+SNAPSHOT_RATE_FIELD_NAME = 'rate_to_marketing_currency'
+SNAPSHOT_TEMPLATE = 'analytics/income_snapshot.html'
+
+
+def is_last_day_of_month(day: date) -> bool:
+    return day.day == calendar.monthrange(day.year, day.month)[1]
+
+
+def save_snapshots(departments=None) -> list:
+    """Save the Income Summary snapshot of the current month
+    for all departments (or the given ones)."""
+    return save_month_snapshots(
+        get_today().replace(day=1), get_today().replace(day=1),
+        departments
+    )
+
+
+def save_month_snapshots(first_month: date, last_month: date,
+                         departments=None) -> list:
+    """
+    Computes and saves the Income Summary snapshots of every month
+    from first_month to last_month (backfill) in one batch.
+    Previously saved automatic snapshots of these months are replaced.
+    """
+    today = get_today()
+    first_month = first_month.replace(day=1)
+    last_month = min(last_month, today).replace(day=1)
+    months = []
+    month = first_month
+    while month <= last_month:
+        months.append(month)
+        month += relativedelta(months=1)
+    if departments is None:
+        departments = get_manager_departments()
+    departments = list(departments)
+    if not months or not departments:
+        return []
+
+    currency_code, _button_title = get_rate_currency_info(SNAPSHOT_RATE_FIELD_NAME)
+    snapshots = []
+    with translation.override(settings.LANGUAGE_CODE):
+        for dep in departments:
+            deals = IncomeStat.objects.filter(department_id=dep.id)
+            monthly = get_monthly_income(
+                deals, SNAPSHOT_RATE_FIELD_NAME,
+                first_month + relativedelta(months=-23), last_month
+            )
+            for month in months:
+                as_of = min(
+                    month.replace(
+                        day=calendar.monthrange(month.year, month.month)[1]),
+                    today
+                )
+                context = build_income_context(
+                    deals, as_of, currency_code, SNAPSHOT_RATE_FIELD_NAME,
+                    monthly=monthly,
+                    # expected income is known only for the current state
+                    expected=month == today.replace(day=1)
+                )
+                context.update({
+                    'page_title': IncomeStat._meta.verbose_name_plural,
+                    'department': dep,
+                    'today': as_of,
+                })
+                snapshots.append(IncomeStatSnapshot(
+                    department_id=dep.id,
+                    webpage=render_to_string(SNAPSHOT_TEMPLATE, context),
+                    creation_date=get_snapshot_datetime(as_of),
+                ))
+
+    replaced = Q()
+    for month in months:
+        replaced |= Q(
+            creation_date__gte=get_month_start(month),
+            creation_date__lt=get_month_start(month + relativedelta(months=1)),
+        )
+    with transaction.atomic():
+        # snapshots saved by users have modified_by
+        IncomeStatSnapshot.objects.filter(
+            replaced,
+            department__in=departments,
+            owner__isnull=True,
+            modified_by__isnull=True,
+        ).delete()
+        IncomeStatSnapshot.objects.bulk_create(snapshots)
+    return snapshots
+
+
+def get_month_start(month: date) -> datetime:
+    return timezone.make_aware(datetime.combine(month, time.min))
+
+
+def get_snapshot_datetime(as_of: date) -> datetime:
+    if as_of == get_today():
+        return timezone.now()
+    return timezone.make_aware(datetime.combine(as_of, time(23)))
@@ -1,6 +1,6 @@
-import pandas as pd
 from pathlib import Path
 from typing import Union
+from django.http import FileResponse
 from django.http import HttpResponse
 from django.http import HttpResponseNotFound
 from django.conf import settings
@@ -12,6 +12,8 @@ from django.utils.formats import date_format
 
 from common.utils.helpers import get_today
 from common.utils.helpers import get_verbose_name
+from common.utils.streaming_export import DEFAULT_CHUNK_SIZE
+from common.utils.streaming_export import write_xlsx
 from crm.models import Company
 from crm.models import Contact
 from crm.models import Deal
@@ -57,88 +59,101 @@ def export_selected_objects(request: WSGIRequest,
 
     file_path = get_file_path(request.user.username, queryset)
     columns_data = get_columns_data()
-    datadict = get_datadict(
-        request,
-        columns_data[content_type.id],
-        queryset=queryset
+    columns = columns_data[content_type.id]
+    write_xlsx(
+        file_path,
+        get_headers(columns, queryset.model),
+        get_rows(request, columns, queryset=queryset),
+        header_format={'bold': True, 'border': 1},
+        freeze_header=False,
     )
-    save_to_excel(datadict, file_path)
     return get_export_response(file_path)
 
 
 def save_to_excel(datadict: dict, file_path: Path) -> None:
-    df = pd.DataFrame(datadict)
-    df = df.replace('nan', '')
-    df = df.replace('None', '')
-    writer = pd.ExcelWriter(file_path, engine='xlsxwriter')
-    df.to_excel(writer, 'Sheet1', index=False, na_rep=' ')
-    writer.close()
+    write_xlsx(
+        file_path,
+        list(datadict),
+        zip(*datadict.values()),
+        header_format={'bold': True, 'border': 1},
+        freeze_header=False,
+    )
 
 
 def get_export_response(file_path: Path) -> Union[HttpResponse, HttpResponseNotFound]:
     if file_path.exists():
-        with open(file_path, 'rb') as fh:
-            response = HttpResponse(fh.read(), content_type="application/vnd.ms-excel")
-            response['Content-Disposition'] = 'inline; filename=' + file_path.name
-            return response
+        response = FileResponse(open(file_path, 'rb'), content_type="application/vnd.ms-excel")
+        response['Content-Disposition'] = 'inline; filename=' + file_path.name
+        return response
 
     return HttpResponseNotFound()
 
 
+def get_headers(columns, model) -> list:
+    if model == Task:
+        return [get_verbose_name(model, attr) for attr in columns]
+    return list(columns)
+
+
+def get_rows(request: WSGIRequest, columns, obj=None, queryset: QuerySet = None):
+    """Yield one row per object in a single pass over the queryset."""
+    model = _get_model(obj, queryset)
+    if queryset is not None and 'industry' in columns:
+        queryset = queryset.prefetch_related('industry')
+    for o in _get_object_iterator(request, obj, queryset):
+        yield [_get_value(o, attr, model) for attr in columns]
+
+
 def get_datadict(request: WSGIRequest, columns,
                  obj=None, queryset: QuerySet = None) -> dict:
-    datadict = dict()
     model = _get_model(obj, queryset)
-    for attr in columns:
-        objects = _get_object_iterator(request, obj, queryset)
-    
-        value_list = []
-        for o in objects:
-            if attr == 'industry':
-                name_list = []
-                for ind in o.industry.all():
-                    name_list.append(ind.name)
-                value = ",".join(name_list)
-            else:
-                if '__' in attr:
-                    attrs = attr.split('__')
-                    rel_o = getattr(o, attrs[0])
-                    if rel_o:
-                        value = getattr(rel_o, attrs[1])
-                    else:
-                        value =''
-                else:
-                    value = getattr(o, attr)
-
-            if attr in ('birth_date', 'was_in_touch', 'lead_time'):
-                value = str(value)
-            elif attr == 'creation_date':
-                if model == Task:
-                    value = date_format(
-                        o.creation_date.date(),
-                        format="SHORT_DATE_FORMAT",
-                        use_l10n=True
-                    )
-                else:
-                    value = str(o.creation_date.date()) if value else ''
-
-            value_list.append(value)
-        
-        if model == Task:
-            attr = get_verbose_name(model, attr)
-        datadict[attr] = value_list
+    datadict = {attr: [] for attr in columns}
+    for o in _get_object_iterator(request, obj, queryset):
+        for attr in columns:
+            datadict[attr].append(_get_value(o, attr, model))
+    if model == Task:
+        datadict = {
+            get_verbose_name(model, attr): values for attr, values in datadict.items()
+        }
     return datadict
 
 
+def _get_value(o, attr: str, model):
+    if attr == 'industry':
+        value = ",".join(ind.name for ind in o.industry.all())
+    elif '__' in attr:
+        attrs = attr.split('__')
+        rel_o = getattr(o, attrs[0])
+        value = getattr(rel_o, attrs[1]) if rel_o else ''
+    else:
+        value = getattr(o, attr)
+
+    if attr in ('birth_date', 'was_in_touch', 'lead_time'):
+        value = str(value)
+    elif attr == 'creation_date':
+        if model == Task:
+            value = date_format(
+                o.creation_date.date(),
+                format="SHORT_DATE_FORMAT",
+                use_l10n=True
+            )
+        else:
+            value = str(o.creation_date.date()) if value else ''
+
+    if value is None or value == 'None':
+        value = ''
+    return value
+
+
 def _get_object_iterator(request: WSGIRequest, obj,
                          queryset: QuerySet) -> QuerySet:
     if obj:
         if request.user.is_superuser:
-            objects = obj.objects.all().iterator()
+            objects = obj.objects.all().iterator(chunk_size=DEFAULT_CHUNK_SIZE)
         else:
-            objects = obj.objects.filter(owner=request.user).iterator()
+            objects = obj.objects.filter(owner=request.user).iterator(chunk_size=DEFAULT_CHUNK_SIZE)
     elif queryset:
-        objects = queryset.iterator()
+        objects = queryset.iterator(chunk_size=DEFAULT_CHUNK_SIZE)
     else:
         raise RuntimeError('Error: either object or queryset does not received')
     return objects
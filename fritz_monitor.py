@@ -2,8 +2,8 @@
 """
 fritz_monitor.py - PRODUCTION VERSION
 Author: ddiplas
-Version: 3.5 - Fixed DISCONNECT event parsing
-Date: 2025-12-06
+Version: 4.0 - asyncio monitor with durable outbox
+Date: 2026-10-16
 
 FIXES:
 - Proper timezone-aware datetime handling
@@ -12,17 +12,32 @@ FIXES:
 - API Key authentication via X-API-Key header
 - Now loads FRITZ_API_TOKEN from .env file (same as Django)
 - Fixed parsing of DISCONNECT events (different format than RING/CALL)
+
+4.0:
+- asyncio: line-framed StreamReader (one event per line, not per recv chunk)
+- Events go to a durable SQLite outbox first and are delivered by a
+  background dispatcher through an aiohttp session (keep-alive connections,
+  several requests in flight). A slow or down CRM no longer blocks the
+  Fritz!Box socket - the outbox replays in order when the CRM is back
+- Latency/backlog metrics: periodic log + JSON on http://127.0.0.1:9112/metrics
+- Replay mode for recorded CallMonitor traces:
+  python fritz_monitor.py --replay trace.txt [--speed 0]
 """
 
-import socket
-import re
-import logging
-import requests
+import argparse
+import asyncio
 import json
-from datetime import datetime, timezone as dt_timezone
-from typing import Optional, Dict, Any
-import time
+import logging
 import os
+import sqlite3
+import statistics
+import tempfile
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timezone as dt_timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiohttp
 
 # ============================================
 # ENVIRONMENT LOADING - Must be BEFORE any os.environ.get()
@@ -50,11 +65,12 @@ _DEFAULT_TOKEN = 'change-this-token-in-production'
 
 class Config:
     # Fritz!Box
-    FRITZ_HOST = 'fritz.box'
-    FRITZ_PORT = 1012
+    FRITZ_HOST = os.environ.get('FRITZ_HOST', 'fritz.box')
+    FRITZ_PORT = int(os.environ.get('FRITZ_PORT', '1012'))
+    RECONNECT_DELAY = 5
 
     # CRM API
-    CRM_BASE_URL = 'http://127.0.0.1:8000/accounting/api'
+    CRM_BASE_URL = os.environ.get('FRITZ_CRM_BASE_URL', 'http://127.0.0.1:8000/accounting/api')
     # API Key for authentication with CRM API
     # Set via environment variable or .env file: FRITZ_API_TOKEN=your-secret-key
     FRITZ_API_TOKEN = os.environ.get('FRITZ_API_TOKEN', _DEFAULT_TOKEN)
@@ -73,13 +89,25 @@ class Config:
             else:
                 logger.info(f"✅ API token loaded from environment: {masked}")
 
-    # Timeouts & Retries
-    API_TIMEOUT = 30
-    API_MAX_RETRIES = 3
+    # HTTP: timeout ανά request, requests σε πτήση (keep-alive connections)
+    API_TIMEOUT = 10
+    HTTP_CONNECTIONS = 4
+
+    # Outbox: SQLite αρχείο, batch ανά γύρο, backoff όταν το CRM δεν απαντά
+    OUTBOX_PATH = os.environ.get(
+        'FRITZ_OUTBOX_PATH',
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fritz_outbox.sqlite3')
+    )
+    DISPATCH_BATCH = 100
     RETRY_DELAY = 2
+    RETRY_MAX_DELAY = 60
+    CALL_MAPPING_DAYS = 7
 
-    # Statistics
+    # Statistics / metrics (METRICS_PORT=0: χωρίς HTTP endpoint)
     STATS_INTERVAL = 600
+    METRICS_HOST = os.environ.get('FRITZ_METRICS_HOST', '127.0.0.1')
+    METRICS_PORT = int(os.environ.get('FRITZ_METRICS_PORT', '9112'))
+    LATENCY_WINDOW = 500
 
 # ============================================
 # HELPER FUNCTIONS
@@ -92,17 +120,188 @@ def format_datetime(dt: datetime) -> str:
     """Format datetime as ISO string with timezone"""
     return dt.isoformat()
 
+def parse_fritz_timestamp(value: str) -> Optional[datetime]:
+    """Fritz!Box timestamp (dd.mm.yy HH:MM:SS, τοπική ώρα) -> timezone-aware UTC"""
+    try:
+        return datetime.strptime(value, '%d.%m.%y %H:%M:%S').astimezone(dt_timezone.utc)
+    except ValueError:
+        return None
+
+def parse_call_event(line: str) -> Optional[dict]:
+    """
+    Parse Fritz!Box call event.
+
+    Fritz!Box CallMonitor formats:
+    - RING:       timestamp;RING;connId;caller;called;lineId;
+    - CALL:       timestamp;CALL;connId;extension;called;lineId;
+    - CONNECT:    timestamp;CONNECT;connId;extension;number;
+    - DISCONNECT: timestamp;DISCONNECT;connId;duration;
+    """
+    parts = line.strip().rstrip(';').split(';')
+
+    if len(parts) < 4:
+        return None
+
+    timestamp, event, connection_id = parts[0], parts[1], parts[2]
+
+    if event == 'RING':
+        # RING: timestamp;RING;connId;caller;called;lineId
+        if len(parts) >= 5:
+            return {'event': event, 'timestamp': timestamp, 'connection_id': connection_id,
+                    'caller': parts[3], 'called': parts[4]}
+
+    elif event == 'CALL':
+        # CALL: timestamp;CALL;connId;extension;called;lineId
+        if len(parts) >= 5:
+            return {'event': event, 'timestamp': timestamp, 'connection_id': connection_id,
+                    'caller': parts[3], 'called': parts[4]}
+
+    elif event == 'CONNECT':
+        # CONNECT: timestamp;CONNECT;connId;extension;number
+        return {'event': event, 'timestamp': timestamp, 'connection_id': connection_id}
+
+    elif event == 'DISCONNECT':
+        # DISCONNECT: timestamp;DISCONNECT;connId;duration
+        duration = int(parts[3]) if len(parts) > 3 and parts[3].isdigit() else 0
+        return {'event': event, 'timestamp': timestamp, 'connection_id': connection_id, 'duration': duration}
+
+    logger.debug(f"Unknown event format: {line}")
+    return None
+
+# ============================================
+# DURABLE OUTBOX (SQLite)
+# ============================================
+class Outbox:
+    """
+    Τα events γράφονται εδώ πριν σταλούν στο CRM και διαγράφονται μόνο όταν
+    το CRM απαντήσει. Μετά από restart ή downtime του CRM στέλνονται ξανά με
+    τη σειρά που γράφτηκαν (ανά κλήση: πρώτα το create, μετά τα updates).
+
+    Ο πίνακας calls κρατάει το id της κλήσης στο CRM (από την απάντηση του
+    create) για τα PATCH που ακολουθούν.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            call_id TEXT NOT NULL,
+            action TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            last_error TEXT NOT NULL DEFAULT ''
+        );
+        CREATE INDEX IF NOT EXISTS outbox_status_id ON outbox (status, id);
+        CREATE TABLE IF NOT EXISTS calls (
+            call_id TEXT PRIMARY KEY,
+            crm_id INTEGER NOT NULL,
+            created_at REAL NOT NULL
+        );
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        # Autocommit: κάθε event είναι στον δίσκο πριν επιστρέψει το enqueue
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=FULL')
+        self.conn.executescript(self.SCHEMA)
+        self.conn.execute(
+            'DELETE FROM calls WHERE created_at < ?',
+            (time.time() - Config.CALL_MAPPING_DAYS * 86400,)
+        )
+
+    def close(self):
+        self.conn.close()
+
+    def enqueue(self, call_id: str, action: str, payload: Dict) -> int:
+        cursor = self.conn.execute(
+            'INSERT INTO outbox (call_id, action, payload, created_at) VALUES (?, ?, ?, ?)',
+            (call_id, action, json.dumps(payload), time.time())
+        )
+        return cursor.lastrowid
+
+    def pending(self, limit: int = Config.DISPATCH_BATCH) -> List[Dict]:
+        rows = self.conn.execute(
+            "SELECT * FROM outbox WHERE status = 'pending' ORDER BY id LIMIT ?", (limit,)
+        ).fetchall()
+        return [dict(row, payload=json.loads(row['payload'])) for row in rows]
+
+    def ack(self, entry_id: int):
+        self.conn.execute('DELETE FROM outbox WHERE id = ?', (entry_id,))
+
+    def retry_later(self, entry_id: int, error: str):
+        self.conn.execute(
+            'UPDATE outbox SET attempts = attempts + 1, last_error = ? WHERE id = ?', (error, entry_id)
+        )
+
+    def fail(self, entry_id: int, error: str):
+        """Μόνιμο σφάλμα (4xx): μένει στο αρχείο για έλεγχο, δεν ξαναστέλνεται."""
+        self.conn.execute(
+            "UPDATE outbox SET status = 'failed', attempts = attempts + 1, last_error = ? WHERE id = ?",
+            (error, entry_id)
+        )
+
+    def set_crm_id(self, call_id: str, crm_id: int):
+        self.conn.execute(
+            'INSERT OR REPLACE INTO calls (call_id, crm_id, created_at) VALUES (?, ?, ?)',
+            (call_id, crm_id, time.time())
+        )
+
+    def crm_id(self, call_id: str) -> Optional[int]:
+        row = self.conn.execute('SELECT crm_id FROM calls WHERE call_id = ?', (call_id,)).fetchone()
+        return row['crm_id'] if row else None
+
+    def backlog(self) -> Tuple[int, Optional[float]]:
+        """(πλήθος pending, created_at του παλαιότερου)"""
+        row = self.conn.execute(
+            "SELECT COUNT(*) AS pending, MIN(created_at) AS oldest FROM outbox WHERE status = 'pending'"
+        ).fetchone()
+        return row['pending'], row['oldest']
+
+    def failed_count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM outbox WHERE status = 'failed'").fetchone()[0]
+
 # ============================================
-# API CLIENT με RETRY LOGIC
+# API CLIENT (aiohttp)
 # ============================================
 class CRMAPIClient:
+    """CRM API μέσω ενός aiohttp session: keep-alive connections, έως HTTP_CONNECTIONS requests σε πτήση."""
+
+    def __init__(self, base_url: str = Config.CRM_BASE_URL, token: str = Config.FRITZ_API_TOKEN):
+        self.base_url = base_url.rstrip('/')
+        self.token = token
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    async def start(self):
+        self.session = aiohttp.ClientSession(
+            headers={'Content-Type': 'application/json', 'X-API-Key': self.token},
+            timeout=aiohttp.ClientTimeout(total=Config.API_TIMEOUT),
+            connector=aiohttp.TCPConnector(limit=Config.HTTP_CONNECTIONS, keepalive_timeout=60),
+        )
+
+    async def close(self):
+        if self.session:
+            await self.session.close()
+
+    async def request(self, method: str, endpoint: str, data: Optional[Dict] = None) -> Tuple[int, Any]:
+        """(HTTP status, JSON body ή None). Σφάλματα δικτύου/timeout γίνονται raise."""
+        async with self.session.request(method, f"{self.base_url}/{endpoint}", json=data) as response:
+            try:
+                body = await response.json(content_type=None)
+            except ValueError:
+                body = None
+            return response.status, body
+
+# ============================================
+# METRICS
+# ============================================
+class MonitorMetrics:
+    """Μετρητές κλήσεων και παράδοσης στο CRM (latency event -> CRM, backlog outbox)."""
+
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'Content-Type': 'application/json',
-            'X-API-Key': Config.FRITZ_API_TOKEN,
-        })
-        
         self.stats = {
             'total_calls': 0,
             'answered': 0,
@@ -114,79 +313,45 @@ class CRMAPIClient:
             'last_call_time': None,
             'active_calls': 0
         }
-    
-    def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, 
-                     retries: int = Config.API_MAX_RETRIES) -> Optional[Dict]:
-        """Make API request with retry logic"""
-        url = f"{Config.CRM_BASE_URL}/{endpoint}"
-        
-        for attempt in range(retries):
-            try:
-                if method == 'POST':
-                    response = self.session.post(url, json=data, timeout=Config.API_TIMEOUT)
-                elif method == 'PATCH':
-                    response = self.session.patch(url, json=data, timeout=Config.API_TIMEOUT)
-                elif method == 'GET':
-                    response = self.session.get(url, timeout=Config.API_TIMEOUT)
-                else:
-                    raise ValueError(f"Unsupported method: {method}")
-                
-                response.raise_for_status()
-                return response.json()
-                
-            except requests.exceptions.Timeout:
-                logger.warning(f"⏰ Timeout on attempt {attempt + 1}/{retries}")
-                if attempt < retries - 1:
-                    time.sleep(Config.RETRY_DELAY)
-                    continue
-                logger.error(f"❌ Failed after {retries} attempts: Timeout")
-                self.stats['errors'] += 1
-                return None
-                
-            except requests.exceptions.RequestException as e:
-                logger.error(f"❌ Request failed: {e}")
-                if attempt < retries - 1:
-                    time.sleep(Config.RETRY_DELAY)
-                    continue
-                self.stats['errors'] += 1
-                return None
-        
-        return None
-    
-    def create_call(self, call_data: Dict) -> Optional[Dict]:
-        """Create new call record"""
-        result = self._make_request('POST', 'voip-calls/', call_data)
-        if result:
-            logger.info(f"✅ Call created in CRM: #{result.get('id')} - {result.get('client_name', 'Unknown')}")
-        else:
-            logger.error(f"❌ Failed to create call in CRM")
-            logger.error(f"Payload: {call_data}")
-        return result
-    
-    def update_call(self, call_id: str, update_data: Dict) -> Optional[Dict]:
-        """Update existing call record"""
-        result = self._make_request('PATCH', f'voip-calls/{call_id}/', update_data)
-        if result:
-            logger.info(f"✅ Call updated in CRM: #{call_id} → {update_data.get('status')}")
-            if update_data.get('create_ticket'):
-                self.stats['tickets_created'] += 1
-                logger.info(f"🎫 Smart ticket will be created for follow-up")
-        else:
-            logger.error(f"❌ Failed to update call status")
-            logger.error(f"Payload: {update_data}")
-        return result
-    
-    def print_stats(self):
+        self.delivered = 0
+        self.retries = 0
+        self.failed = 0
+        self.latencies = deque(maxlen=Config.LATENCY_WINDOW)
+
+    def record_delivery(self, created_at: float):
+        self.delivered += 1
+        self.latencies.append(max(0.0, time.time() - created_at))
+
+    def snapshot(self, outbox: Optional[Outbox] = None) -> Dict:
+        latencies = sorted(self.latencies)
+        data = {key: value for key, value in self.stats.items() if key not in ('start_time', 'last_call_time')}
+        data.update({
+            'uptime_seconds': int((get_now() - self.stats['start_time']).total_seconds()),
+            'last_call_time': format_datetime(self.stats['last_call_time']) if self.stats['last_call_time'] else None,
+            'delivered': self.delivered,
+            'retries': self.retries,
+            'latency_p50_ms': round(statistics.median(latencies) * 1000, 1) if latencies else None,
+            'latency_p95_ms': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 1)
+            if latencies else None,
+        })
+        if outbox is not None:
+            pending, oldest = outbox.backlog()
+            data['backlog'] = pending
+            data['backlog_age_seconds'] = round(time.time() - oldest, 1) if oldest else 0
+            data['failed'] = outbox.failed_count()
+        return data
+
+    def print_stats(self, outbox: Optional[Outbox] = None):
         """Print current statistics"""
-        uptime = get_now() - self.stats['start_time']
-        hours, remainder = divmod(int(uptime.total_seconds()), 3600)
+        data = self.snapshot(outbox)
+        hours, remainder = divmod(data['uptime_seconds'], 3600)
         minutes, _ = divmod(remainder, 60)
-        
+
         last_call = "Never"
         if self.stats['last_call_time']:
             delta = get_now() - self.stats['last_call_time']
             last_call = f"{int(delta.total_seconds())}s ago"
-        
+
         logger.info("=" * 60)
         logger.info(f"📊 STATISTICS - Uptime: {hours}h {minutes}m")
         logger.info(f"Total Calls: {self.stats['total_calls']}")
@@ -196,235 +361,408 @@ class CRMAPIClient:
         logger.info(f"Active Calls: {self.stats['active_calls']}")
         logger.info(f"🎫 Tickets Created: {self.stats['tickets_created']}")
         logger.info(f"CRM Errors: {self.stats['errors']}")
+        logger.info(f"📬 Delivered: {self.delivered} | Backlog: {data.get('backlog', 0)} "
+                    f"({data.get('backlog_age_seconds', 0)}s) | Failed: {data.get('failed', 0)}")
+        logger.info(f"⏱️ Latency p50/p95: {data['latency_p50_ms']} / {data['latency_p95_ms']} ms")
         logger.info(f"Last Call: {last_call}")
         logger.info("=" * 60)
 
+# ============================================
+# OUTBOX DISPATCHER
+# ============================================
+class OutboxDispatcher:
+    """
+    Στέλνει τα pending events του outbox στο CRM.
+
+    Ανά γύρο παίρνει έως DISPATCH_BATCH events: τα events της ίδιας κλήσης
+    στέλνονται σειριακά, διαφορετικές κλήσεις παράλληλα. Σε σφάλμα δικτύου ή
+    5xx η κλήση σταματά εκεί και ο γύρος επαναλαμβάνεται με backoff.
+    """
+
+    def __init__(self, outbox: Outbox, api, metrics: MonitorMetrics):
+        self.outbox = outbox
+        self.api = api
+        self.metrics = metrics
+        self._wakeup = asyncio.Event()
+        self._backoff = Config.RETRY_DELAY
+
+    def notify(self):
+        self._wakeup.set()
+
+    async def run(self):
+        # Ό,τι έμεινε από την προηγούμενη εκτέλεση
+        self.notify()
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while True:
+                delivered, blocked = await self.dispatch_once()
+                if blocked:
+                    self.metrics.retries += 1
+                    logger.warning(f"⏳ CRM unavailable - retrying outbox in {self._backoff}s")
+                    await asyncio.sleep(self._backoff)
+                    self._backoff = min(self._backoff * 2, Config.RETRY_MAX_DELAY)
+                    continue
+                self._backoff = Config.RETRY_DELAY
+                if not delivered:
+                    break
+
+    async def dispatch_once(self) -> Tuple[int, bool]:
+        """Ένας γύρος: (events που ολοκληρώθηκαν, αν κάποια κλήση έμεινε πίσω)"""
+        chains = OrderedDict()
+        for entry in self.outbox.pending(Config.DISPATCH_BATCH):
+            chains.setdefault(entry['call_id'], []).append(entry)
+        if not chains:
+            return 0, False
+
+        results = await asyncio.gather(*(self._deliver_chain(entries) for entries in chains.values()))
+        return sum(done for done, _ in results), any(blocked for _, blocked in results)
+
+    async def _deliver_chain(self, entries: List[Dict]) -> Tuple[int, bool]:
+        done = 0
+        for entry in entries:
+            try:
+                finished = await self._deliver(entry)
+            except Exception as e:
+                self.outbox.retry_later(entry['id'], str(e) or e.__class__.__name__)
+                self.metrics.stats['errors'] += 1
+                logger.error(f"❌ Request failed: {e!r}")
+                return done, True
+            if not finished:
+                return done, True
+            done += 1
+        return done, False
+
+    async def _deliver(self, entry: Dict) -> bool:
+        """True αν το event ολοκληρώθηκε (ack ή μόνιμο σφάλμα), False για retry."""
+        call_id, payload = entry['call_id'], entry['payload']
+
+        if entry['action'] == 'create':
+            status, body = await self.api.request('POST', 'voip-calls/', payload)
+            if 200 <= status < 300 and body and body.get('id'):
+                self.outbox.set_crm_id(call_id, body['id'])
+                logger.info(f"✅ Call created in CRM: #{body['id']} - {body.get('client_name') or 'Unknown'}")
+                logger.info(f"NEW|{payload['phone_number']}|{body.get('client_name') or 'Unknown'}|"
+                            f"{payload['direction']}|active")
+                return self._ack(entry)
+        else:
+            crm_id = self.outbox.crm_id(call_id)
+            if crm_id is None:
+                return self._fail(entry, 'No CRM id for call (create failed)')
+            status, body = await self.api.request('PATCH', f'voip-calls/{crm_id}/', payload)
+            if 200 <= status < 300:
+                logger.info(f"✅ Call updated in CRM: #{crm_id} → {payload.get('status')}")
+                if payload.get('create_ticket'):
+                    self.metrics.stats['tickets_created'] += 1
+                    logger.info(f"🎫 Smart ticket will be created for follow-up")
+                return self._ack(entry)
+
+        if status >= 500 or status in (408, 429):
+            self.outbox.retry_later(entry['id'], f'HTTP {status}')
+            self.metrics.stats['errors'] += 1
+            logger.warning(f"⏰ CRM returned {status} for {entry['action']} {call_id}")
+            return False
+        return self._fail(entry, f'HTTP {status}: {body}')
+
+    def _ack(self, entry: Dict) -> bool:
+        self.outbox.ack(entry['id'])
+        self.metrics.record_delivery(entry['created_at'])
+        return True
+
+    def _fail(self, entry: Dict, error: str) -> bool:
+        self.outbox.fail(entry['id'], error)
+        self.metrics.failed += 1
+        self.metrics.stats['errors'] += 1
+        logger.error(f"❌ Dropped {entry['action']} for call {entry['call_id']}: {error}")
+        logger.error(f"Payload: {entry['payload']}")
+        return True
+
 # ============================================
 # VOIP MONITOR
 # ============================================
 class VoIPMonitor:
-    def __init__(self):
-        self.api = CRMAPIClient()
+    """
+    Διαβάζει τα events του Fritz!Box CallMonitor (μία γραμμή = ένα event) και
+    γράφει τις αλλαγές κλήσεων στο outbox. Δεν περιμένει ποτέ το CRM.
+    """
+
+    def __init__(self, outbox: Optional[Outbox] = None, api=None, use_event_time: bool = False):
+        self.outbox = outbox or Outbox(Config.OUTBOX_PATH)
+        self.api = api or CRMAPIClient()
+        self.metrics = MonitorMetrics()
+        self.dispatcher = OutboxDispatcher(self.outbox, self.api, self.metrics)
         self.active_calls = {}
-        self.last_stats_time = get_now()
-    
-    def connect_fritz(self) -> socket.socket:
-        """Connect to Fritz!Box CallMonitor"""
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.connect((Config.FRITZ_HOST, Config.FRITZ_PORT))
-        logger.info(f"✅ Connected to Fritz!Box at {Config.FRITZ_HOST}:{Config.FRITZ_PORT}")
-        return sock
-    
+        # Replay: ώρα από το timestamp του event αντί για την τρέχουσα
+        self.use_event_time = use_event_time
+
+    @property
+    def stats(self) -> Dict:
+        return self.metrics.stats
+
     def parse_call_event(self, line: str) -> Optional[dict]:
-        """
-        Parse Fritz!Box call event.
-
-        Fritz!Box CallMonitor formats:
-        - RING:       timestamp;RING;connId;caller;called;lineId;
-        - CALL:       timestamp;CALL;connId;extension;called;lineId;
-        - CONNECT:    timestamp;CONNECT;connId;extension;number;
-        - DISCONNECT: timestamp;DISCONNECT;connId;duration;
-        """
-        parts = line.strip().rstrip(';').split(';')
-
-        if len(parts) < 4:
+        return parse_call_event(line)
+
+    def generate_call_id(self, connection_id: str, now: datetime) -> str:
+        """Generate unique call_id with timestamp"""
+        return f"{connection_id}_{int(now.timestamp())}"
+
+    def enqueue(self, call_id: str, action: str, payload: Dict):
+        self.outbox.enqueue(call_id, action, payload)
+        self.dispatcher.notify()
+
+    def process_line(self, line: str) -> Optional[dict]:
+        """Ένα event του CallMonitor -> αλλαγή κατάστασης + εγγραφή στο outbox"""
+        parsed = self.parse_call_event(line)
+        if not parsed:
             return None
 
-        timestamp, event, connection_id = parts[0], parts[1], parts[2]
+        now = get_now()
+        if self.use_event_time:
+            now = parse_fritz_timestamp(parsed['timestamp']) or now
+
+        event = parsed['event']
+        connection_id = parsed['connection_id']
 
         if event == 'RING':
-            # RING: timestamp;RING;connId;caller;called;lineId
-            if len(parts) >= 5:
-                return {'event': event, 'connection_id': connection_id, 'caller': parts[3], 'called': parts[4]}
-
+            self.handle_ring(connection_id, parsed['caller'], parsed['called'], now)
         elif event == 'CALL':
-            # CALL: timestamp;CALL;connId;extension;called;lineId
-            if len(parts) >= 5:
-                return {'event': event, 'connection_id': connection_id, 'caller': parts[3], 'called': parts[4]}
-
+            self.handle_outgoing_call(connection_id, parsed['called'], now)
         elif event == 'CONNECT':
-            # CONNECT: timestamp;CONNECT;connId;extension;number
-            return {'event': event, 'connection_id': connection_id}
-
+            self.handle_connect(connection_id)
         elif event == 'DISCONNECT':
-            # DISCONNECT: timestamp;DISCONNECT;connId;duration
-            duration = int(parts[3]) if len(parts) > 3 and parts[3].isdigit() else 0
-            return {'event': event, 'connection_id': connection_id, 'duration': duration}
+            self.handle_disconnect(connection_id, now)
+        return parsed
 
-        logger.debug(f"Unknown event format: {line}")
-        return None
-    
-    def generate_call_id(self, connection_id: str) -> str:
-        """Generate unique call_id with timestamp"""
-        timestamp = int(get_now().timestamp())
-        return f"{connection_id}_{timestamp}"
-    
-    def handle_ring(self, connection_id: str, caller: str, called: str):
-        """Handle incoming call ring"""
-        logger.info(f"📞 INCOMING RING: {caller} → {called}")
-        
-        now = get_now()
-        call_id = self.generate_call_id(connection_id)
-        call_data = {
+    def _start_call(self, connection_id: str, phone_number: str, direction: str, now: datetime):
+        call_id = self.generate_call_id(connection_id, now)
+        self.enqueue(call_id, 'create', {
             'call_id': call_id,
-            'phone_number': caller,
-            'direction': 'incoming',
+            'phone_number': phone_number,
+            'direction': direction,
             'status': 'active',
             'started_at': format_datetime(now)  # ← Timezone-aware!
+        })
+        self.active_calls[connection_id] = {
+            'call_id': call_id,
+            'phone_number': phone_number,
+            'direction': direction,
+            'started_at': now,  # Store as datetime object
+            'status': 'active'
         }
-        
-        result = self.api.create_call(call_data)
-        if result:
-            self.active_calls[connection_id] = {
-                'id': result.get('id'),
-                'call_id': call_id,
-                'phone_number': caller,
-                'client_name': result.get('client_name', 'Unknown'),
-                'direction': 'incoming',
-                'started_at': now,  # Store as datetime object
-                'status': 'active'
-            }
-            self.api.stats['total_calls'] += 1
-            self.api.stats['active_calls'] += 1
-            self.api.stats['last_call_time'] = now
-            
-            logger.info(f"NEW|{caller}|{self.active_calls[connection_id]['client_name']}|incoming|active")
-            
-            # Print stats every 10 minutes
-            if (get_now() - self.last_stats_time).total_seconds() >= Config.STATS_INTERVAL:
-                self.api.print_stats()
-                self.last_stats_time = get_now()
-    
+        self.stats['total_calls'] += 1
+        self.stats['active_calls'] += 1
+        self.stats['last_call_time'] = now
+
+    def handle_ring(self, connection_id: str, caller: str, called: str, now: datetime):
+        """Handle incoming call ring"""
+        logger.info(f"📞 INCOMING RING: {caller} → {called}")
+        self._start_call(connection_id, caller, 'incoming', now)
+
+    def handle_outgoing_call(self, connection_id: str, called: str, now: datetime):
+        """Handle outgoing call"""
+        logger.info(f"📞 OUTGOING CALL: → {called}")
+        self._start_call(connection_id, called, 'outgoing', now)
+        self.stats['outgoing'] += 1
+
     def handle_connect(self, connection_id: str):
         """Handle call answered"""
         if connection_id in self.active_calls:
             call = self.active_calls[connection_id]
-            update_data = {
-                'status': 'completed'
-            }
-            self.api.update_call(call['id'], update_data)
+            self.enqueue(call['call_id'], 'update', {'status': 'completed'})
             call['status'] = 'completed'
-            self.api.stats['answered'] += 1
+            self.stats['answered'] += 1
             logger.info(f"✅ CALL CONNECTED: {call['phone_number']}")
-    
-    def handle_disconnect(self, connection_id: str):
+
+    def handle_disconnect(self, connection_id: str, now: datetime):
         """Handle call ended - Smart ticket creation"""
         if connection_id not in self.active_calls:
             return
-        
-        call = self.active_calls[connection_id]
-        now = get_now()
+
+        call = self.active_calls.pop(connection_id)
         duration = int((now - call['started_at']).total_seconds())
-        
+
         # CRITICAL: Only create ticket if call was MISSED
         if call['status'] == 'active':
             # Call was never answered → MISSED
-            update_data = {
+            self.enqueue(call['call_id'], 'update', {
                 'status': 'missed',
                 'create_ticket': True,  # ✅ Χρειάζεται follow-up!
                 'ended_at': format_datetime(now)  # ← Timezone-aware!
-            }
-            self.api.update_call(call['id'], update_data)
-            self.api.stats['missed'] += 1
+            })
+            self.stats['missed'] += 1
             logger.warning(f"❌ Call MISSED: {call['phone_number']} (rang {duration}s)")
             logger.info(f"END|{call['phone_number']}|MISSED|{duration}s|{call['direction']}")
-        
         else:
             # Call was answered → COMPLETED
-            update_data = {
+            self.enqueue(call['call_id'], 'update', {
                 'status': 'completed',
                 'create_ticket': False,  # ✅ Λύθηκε στο τηλέφωνο!
                 'ended_at': format_datetime(now)  # ← Timezone-aware!
-            }
-            self.api.update_call(call['id'], update_data)
+            })
             logger.info(f"✅ Call COMPLETED: {call['phone_number']} (duration: {duration}s)")
-            logger.info(f"✅ No ticket needed - issue resolved on call")
             logger.info(f"END|{call['phone_number']}|COMPLETED|{duration}s|{call['direction']}")
-        
-        self.api.stats['active_calls'] -= 1
-        del self.active_calls[connection_id]
-    
-    def handle_outgoing_call(self, connection_id: str, called: str):
-        """Handle outgoing call"""
-        logger.info(f"📞 OUTGOING CALL: → {called}")
-        
-        now = get_now()
-        call_id = self.generate_call_id(connection_id)
-        call_data = {
-            'call_id': call_id,
-            'phone_number': called,
-            'direction': 'outgoing',
-            'status': 'active',
-            'started_at': format_datetime(now)  # ← Timezone-aware!
-        }
-        
-        result = self.api.create_call(call_data)
-        if result:
-            self.active_calls[connection_id] = {
-                'id': result.get('id'),
-                'call_id': call_id,
-                'phone_number': called,
-                'client_name': result.get('client_name', 'Unknown'),
-                'direction': 'outgoing',
-                'started_at': now,  # Store as datetime object
-                'status': 'active'
-            }
-            self.api.stats['total_calls'] += 1
-            self.api.stats['outgoing'] += 1
-            self.api.stats['active_calls'] += 1
-            self.api.stats['last_call_time'] = now
-            logger.info(f"NEW|{called}|{self.active_calls[connection_id]['client_name']}|outgoing|active")
-    
-    def run(self):
+
+        self.stats['active_calls'] -= 1
+
+    async def read_events(self, reader: asyncio.StreamReader):
+        """Line-framed ανάγνωση: ένα event ανά γραμμή, ανεξάρτητα από το πώς έρχονται τα TCP chunks"""
+        while True:
+            line = await reader.readline()
+            if not line:
+                raise ConnectionError('Fritz!Box closed the connection')
+            text = line.decode('utf-8', errors='replace').strip()
+            if text:
+                self.process_line(text)
+
+    async def _stats_loop(self):
+        while True:
+            await asyncio.sleep(Config.STATS_INTERVAL)
+            self.metrics.print_stats(self.outbox)
+
+    async def _serve_metrics(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """GET /metrics -> JSON (ό,τι κι αν ζητηθεί, απαντάει με τα metrics)"""
+        try:
+            await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), timeout=5)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError):
+            pass
+        body = json.dumps(self.metrics.snapshot(self.outbox)).encode('utf-8')
+        writer.write(
+            b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n'
+            b'Content-Length: ' + str(len(body)).encode() + b'\r\nConnection: close\r\n\r\n' + body
+        )
+        await writer.drain()
+        writer.close()
+
+    async def start_background(self) -> List[asyncio.Task]:
+        """CRM session, dispatcher, stats και metrics endpoint"""
+        await self.api.start()
+        tasks = [
+            asyncio.create_task(self.dispatcher.run()),
+            asyncio.create_task(self._stats_loop()),
+        ]
+        if Config.METRICS_PORT:
+            server = await asyncio.start_server(self._serve_metrics, Config.METRICS_HOST, Config.METRICS_PORT)
+            tasks.append(asyncio.create_task(server.serve_forever()))
+            logger.info(f"📈 Metrics: http://{Config.METRICS_HOST}:{Config.METRICS_PORT}/metrics")
+        return tasks
+
+    async def stop_background(self, tasks: List[asyncio.Task]):
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.api.close()
+
+    async def drain(self, timeout: Optional[float] = None) -> bool:
+        """Περιμένει να αδειάσει το outbox (True) ή να λήξει το timeout (False)"""
+        started = time.monotonic()
+        while self.outbox.backlog()[0]:
+            if timeout is not None and time.monotonic() - started > timeout:
+                return False
+            self.dispatcher.notify()
+            await asyncio.sleep(0.05)
+        return True
+
+    async def run(self, host: str = Config.FRITZ_HOST, port: int = Config.FRITZ_PORT, reconnect: bool = True):
         """Main monitoring loop"""
         logger.info("=" * 60)
-        logger.info("🚀 Fritz!Box VoIP Monitor - PRODUCTION v3.5")
-        logger.info(f"Fritz: {Config.FRITZ_HOST}:{Config.FRITZ_PORT}")
+        logger.info("🚀 Fritz!Box VoIP Monitor - PRODUCTION v4.0 (asyncio)")
+        logger.info(f"Fritz: {host}:{port}")
         logger.info(f"CRM: {Config.CRM_BASE_URL}/voip-calls/")
         logger.info(f"🔐 API Auth: X-API-Key header enabled")
         Config.log_token_status()  # Show token configuration status
+        logger.info(f"📬 Outbox: {self.outbox.path} (backlog: {self.outbox.backlog()[0]})")
         logger.info(f"🎫 Smart Tickets: Only for MISSED calls")
         logger.info(f"⏰ Timezone: UTC (timezone-aware)")
         logger.info("=" * 60)
-        
-        while True:
-            try:
-                logger.info("🚀 Starting VoIP Monitor...")
-                sock = self.connect_fritz()
-                
-                while True:
-                    data = sock.recv(1024).decode('utf-8').strip()
-                    if not data:
-                        continue
-
-                    parsed = self.parse_call_event(data)
-                    if not parsed:
-                        continue
-
-                    event = parsed['event']
-                    connection_id = parsed['connection_id']
-
-                    if event == 'RING':
-                        self.handle_ring(connection_id, parsed['caller'], parsed['called'])
-                    elif event == 'CALL':
-                        self.handle_outgoing_call(connection_id, parsed['called'])
-                    elif event == 'CONNECT':
-                        self.handle_connect(connection_id)
-                    elif event == 'DISCONNECT':
-                        self.handle_disconnect(connection_id)
-            
-            except KeyboardInterrupt:
-                logger.info("\n👋 Shutting down gracefully...")
-                self.api.print_stats()
-                break
-            except Exception as e:
-                logger.error(f"❌ Error: {e}")
-                logger.info("🔄 Reconnecting in 5 seconds...")
-                time.sleep(5)
+
+        tasks = await self.start_background()
+        try:
+            while True:
+                try:
+                    logger.info("🚀 Starting VoIP Monitor...")
+                    reader, writer = await asyncio.open_connection(host, port)
+                    logger.info(f"✅ Connected to Fritz!Box at {host}:{port}")
+                    try:
+                        await self.read_events(reader)
+                    finally:
+                        writer.close()
+                except (OSError, ConnectionError) as e:
+                    if not reconnect:
+                        logger.info(f"🔌 Event stream ended: {e}")
+                        break
+                    logger.error(f"❌ Error: {e}")
+                    logger.info(f"🔄 Reconnecting in {Config.RECONNECT_DELAY} seconds...")
+                    await asyncio.sleep(Config.RECONNECT_DELAY)
+            if not reconnect:
+                await self.drain()
+        finally:
+            await self.stop_background(tasks)
+            self.metrics.print_stats(self.outbox)
+
+# ============================================
+# REPLAY (recorded CallMonitor traces)
+# ============================================
+async def serve_trace(lines: List[str], speed: float = 0.0, chunk_size: int = 7) -> asyncio.AbstractServer:
+    """
+    Τοπικός «Fritz!Box» που στέλνει ένα καταγεγραμμένο trace και κλείνει.
+
+    Τα bytes γράφονται σε κομμάτια chunk_size (όχι ανά γραμμή), ώστε να
+    ελέγχεται το framing. speed > 0: αναπαραγωγή των χρόνων του trace
+    επιταχυμένη κατά speed, 0: όσο πιο γρήγορα γίνεται.
+    """
+    async def handle(reader, writer):
+        previous = None
+        for line in lines:
+            parsed = parse_call_event(line)
+            when = parse_fritz_timestamp(parsed['timestamp']) if parsed else None
+            if speed and previous and when:
+                await asyncio.sleep(max(0.0, (when - previous).total_seconds()) / speed)
+            previous = when or previous
+
+            data = (line.rstrip('\r\n') + '\r\n').encode('utf-8')
+            for start in range(0, len(data), chunk_size):
+                writer.write(data[start:start + chunk_size])
+                await writer.drain()
+        writer.close()
+
+    return await asyncio.start_server(handle, '127.0.0.1', 0)
+
+
+def read_trace(path: str) -> List[str]:
+    """Γραμμές trace (κενές και σχόλια # αγνοούνται)"""
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+
+async def replay(trace_path: str, speed: float = 0.0, outbox_path: Optional[str] = None, api=None) -> Dict:
+    """Αναπαραγωγή ενός trace μέσω του monitor· επιστρέφει τα metrics όταν αδειάσει το outbox"""
+    outbox_path = outbox_path or os.path.join(tempfile.mkdtemp(prefix='fritz-replay-'), 'outbox.sqlite3')
+    monitor = VoIPMonitor(outbox=Outbox(outbox_path), api=api, use_event_time=True)
+    server = await serve_trace(read_trace(trace_path), speed=speed)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        await monitor.run('127.0.0.1', port, reconnect=False)
+    finally:
+        server.close()
+        await server.wait_closed()
+    return monitor.metrics.snapshot(monitor.outbox)
 
 # ============================================
 # MAIN
 # ============================================
 if __name__ == '__main__':
-    monitor = VoIPMonitor()
-    monitor.run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Fritz!Box CallMonitor -> CRM')
+    parser.add_argument('--replay', metavar='TRACE', help='Replay a recorded CallMonitor trace instead of the Fritz!Box')
+    parser.add_argument('--speed', type=float, default=0.0, help='Replay speed factor (0: as fast as possible)')
+    parser.add_argument('--outbox', help='Outbox SQLite file (default: FRITZ_OUTBOX_PATH, temporary for --replay)')
+    args = parser.parse_args()
+
+    try:
+        if args.replay:
+            print(json.dumps(asyncio.run(replay(args.replay, args.speed, args.outbox)), indent=2))
+        else:
+            if args.outbox:
+                Config.OUTBOX_PATH = args.outbox
+            asyncio.run(VoIPMonitor().run())
+    except KeyboardInterrupt:
+        logger.info("\n👋 Shutting down gracefully... (pending events stay in the outbox)")
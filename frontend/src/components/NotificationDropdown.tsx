@@ -1,13 +1,20 @@
 import { useState, useRef, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
-import { Bell, AlertCircle, Clock, Calendar, X, RefreshCw } from 'lucide-react';
-import { useNotifications, type Notification } from '../hooks/useNotifications';
+import { Bell, AlertCircle, Clock, Calendar, X, RefreshCw, CheckCheck } from 'lucide-react';
+import {
+  useNotifications,
+  useMarkNotificationsRead,
+  useReloadNotifications,
+  type Notification,
+} from '../hooks/useNotifications';
 
 export default function NotificationDropdown() {
   const [isOpen, setIsOpen] = useState(false);
   const dropdownRef = useRef<HTMLDivElement>(null);
   const navigate = useNavigate();
-  const { data, isLoading, refetch, isRefetching } = useNotifications();
+  const { data, isLoading, isRefetching } = useNotifications();
+  const markRead = useMarkNotificationsRead();
+  const reload = useReloadNotifications();
 
   // Close dropdown when clicking outside
   useEffect(() => {
@@ -23,11 +30,12 @@ export default function NotificationDropdown() {
 
   const handleNotificationClick = (notification: Notification) => {
     setIsOpen(false);
+    if (!notification.is_read) markRead.mutate([notification.id]);
     // Navigate to obligations page with client filter
     navigate(`/obligations?client=${notification.client_id}`);
   };
 
-  const count = data?.count || 0;
+  const unreadCount = data?.unread_count || 0;
   const notifications = data?.notifications || [];
   const overdueCount = data?.overdue_count || 0;
   const todayCount = data?.today_count || 0;
@@ -66,9 +74,9 @@ export default function NotificationDropdown() {
       >
         <Bell size={20} className="text-gray-600" />
         {/* Notification badge - only show if there are notifications */}
-        {count > 0 && (
+        {unreadCount > 0 && (
           <span className="absolute -top-0.5 -right-0.5 min-w-[18px] h-[18px] px-1 bg-red-500 text-white text-xs font-medium rounded-full flex items-center justify-center">
-            {count > 99 ? '99+' : count}
+            {unreadCount > 99 ? '99+' : unreadCount}
           </span>
         )}
       </button>
@@ -90,8 +98,18 @@ export default function NotificationDropdown() {
               </div>
             </div>
             <div className="flex items-center gap-2">
+              {unreadCount > 0 && (
+                <button
+                  onClick={() => markRead.mutate(undefined)}
+                  className="p-1.5 hover:bg-gray-200 rounded transition-colors"
+                  title="Σήμανση όλων ως αναγνωσμένων"
+                  disabled={markRead.isPending}
+                >
+                  <CheckCheck size={14} className="text-gray-500" />
+                </button>
+              )}
               <button
-                onClick={() => refetch()}
+                onClick={() => reload()}
                 className="p-1.5 hover:bg-gray-200 rounded transition-colors"
                 title="Ανανέωση"
                 disabled={isRefetching}
@@ -134,7 +152,7 @@ export default function NotificationDropdown() {
                         {getIcon(notification.type)}
                       </div>
                       <div className="flex-1 min-w-0">
-                        <p className="text-sm font-medium text-gray-900 truncate">
+                        <p className={`text-sm text-gray-900 truncate ${notification.is_read ? 'font-normal' : 'font-semibold'}`}>
                           {notification.title}
                         </p>
                         <p className="text-xs text-gray-600 mt-0.5 line-clamp-2">
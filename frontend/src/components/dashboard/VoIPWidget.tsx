@@ -2,15 +2,15 @@ import { Link } from 'react-router-dom';
 import { Phone, PhoneIncoming, PhoneOutgoing, PhoneMissed, Ticket, ArrowRight, RefreshCw } from 'lucide-react';
 import { useCalls } from '../../hooks/useVoIP';
 import { useTickets } from '../../hooks/useTickets';
-import { useEffect, useState, useRef } from 'react';
+import { useLiveFeed } from '../../hooks/useLiveFeed';
+import { useEffect, useRef } from 'react';
 import { useToast } from '../Toast';
 
 /**
  * VoIP Dashboard Widget
- * Shows today's call statistics and open tickets with auto-refresh
+ * Shows today's call statistics and open tickets, updated live from the server feed
  */
 export default function VoIPWidget() {
-  const [lastRefresh, setLastRefresh] = useState(new Date());
   const { addToast } = useToast();
   const previousTicketIds = useRef<Set<number>>(new Set());
 
@@ -21,7 +21,6 @@ export default function VoIPWidget() {
   const {
     data: callsData,
     isLoading: callsLoading,
-    refetch: refetchCalls
   } = useCalls({
     date_from: today,
     date_to: today,
@@ -32,22 +31,13 @@ export default function VoIPWidget() {
   const {
     data: ticketsData,
     isLoading: ticketsLoading,
-    refetch: refetchTickets
   } = useTickets({
     open_only: true,
     page_size: 5
   });
 
-  // Auto-refresh every 30 seconds
-  useEffect(() => {
-    const interval = setInterval(() => {
-      refetchCalls();
-      refetchTickets();
-      setLastRefresh(new Date());
-    }, 30000);
-
-    return () => clearInterval(interval);
-  }, [refetchCalls, refetchTickets]);
+  // Live updates (shared feed connection) - refreshes/patches the calls & tickets queries
+  const { lastEventAt: lastRefresh } = useLiveFeed();
 
   // Detect new missed call tickets and show toast
   useEffect(() => {
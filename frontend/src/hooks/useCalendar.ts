@@ -1,5 +1,6 @@
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import apiClient from '../api/client';
+import type { PaginatedResponse } from '../types';
 
 // Types for calendar data
 export interface CalendarObligation {
@@ -13,6 +14,12 @@ export interface CalendarObligation {
   notes: string;
 }
 
+export interface CalendarTypeCount {
+  code: string;
+  name: string;
+  count: number;
+}
+
 export interface CalendarDay {
   total: number;
   pending: number;
@@ -20,7 +27,7 @@ export interface CalendarDay {
   overdue: number;
   in_progress: number;
   cancelled: number;
-  obligations: CalendarObligation[];
+  types: CalendarTypeCount[];
 }
 
 export interface CalendarSummary {
@@ -47,6 +54,21 @@ export interface CalendarFilters {
 }
 
 const CALENDAR_KEY = 'calendar';
+const CALENDAR_DAY_PAGE_SIZE = 25;
+
+function calendarFilterParams(filters?: CalendarFilters): Record<string, string | number> {
+  const params: Record<string, string | number> = {};
+  if (filters?.client_id) {
+    params.client_id = filters.client_id;
+  }
+  if (filters?.type_id) {
+    params.type_id = filters.type_id;
+  }
+  if (filters?.status) {
+    params.status = filters.status;
+  }
+  return params;
+}
 
 /**
  * Hook to fetch calendar data for a specific month/year
@@ -59,23 +81,8 @@ export function useCalendar(month: number, year: number, filters?: CalendarFilte
   return useQuery({
     queryKey: [CALENDAR_KEY, month, year, filters],
     queryFn: async () => {
-      const params: Record<string, string | number> = {
-        month,
-        year,
-      };
-
-      if (filters?.client_id) {
-        params.client_id = filters.client_id;
-      }
-      if (filters?.type_id) {
-        params.type_id = filters.type_id;
-      }
-      if (filters?.status) {
-        params.status = filters.status;
-      }
-
       const response = await apiClient.get<CalendarData>('/api/v1/obligations/calendar/', {
-        params,
+        params: { month, year, ...calendarFilterParams(filters) },
       });
       return response.data;
     },
@@ -83,6 +90,34 @@ export function useCalendar(month: number, year: number, filters?: CalendarFilte
   });
 }
 
+/**
+ * Hook to fetch the obligations of one calendar day (paginated)
+ *
+ * @param date - Day as YYYY-MM-DD, or null to skip fetching
+ * @param filters - Same filters as the month view
+ * @param page - Page number (1-based)
+ */
+export function useCalendarDay(date: string | null, filters?: CalendarFilters, page: number = 1) {
+  return useQuery({
+    queryKey: [CALENDAR_KEY, 'day', date, filters, page],
+    queryFn: async () => {
+      const response = await apiClient.get<PaginatedResponse<CalendarObligation>>(
+        '/api/v1/obligations/calendar/day/',
+        {
+          params: { date, page, page_size: CALENDAR_DAY_PAGE_SIZE, ...calendarFilterParams(filters) },
+        }
+      );
+      return response.data;
+    },
+    enabled: date !== null,
+    staleTime: 1000 * 60 * 2,
+  });
+}
+
+export function calendarDayPages(total: number): number {
+  return Math.max(1, Math.ceil(total / CALENDAR_DAY_PAGE_SIZE));
+}
+
 // Greek month names
 export const GREEK_MONTH_NAMES = [
   'Ιανουάριος',
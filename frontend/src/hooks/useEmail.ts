@@ -215,9 +215,14 @@ export interface BulkCompleteWithDocumentsRequest {
 }
 
 export interface BulkCompleteWithDocumentsResult {
+  job_id: number;
+  status: 'pending' | 'running' | 'completed' | 'failed';
+  is_finished: boolean;
+  progress: number;
   success: boolean;
   message: string;
   completed_count: number;
+  error_message?: string;
   results: Array<{
     obligation_id: number;
     client: string;
@@ -237,6 +242,8 @@ export interface BulkCompleteWithDocumentsResult {
   };
 }
 
+const BULK_JOB_POLL_INTERVAL_MS = 1500;
+
 export function useBulkCompleteWithDocuments() {
   const queryClient = useQueryClient();
 
@@ -264,6 +271,8 @@ export function useBulkCompleteWithDocuments() {
         formData.append('template_id', String(data.templateId));
       }
 
+      // The server only stages the files and returns a job (202);
+      // processing runs in the background, so poll until it finishes.
       const response = await apiClient.post<BulkCompleteWithDocumentsResult>(
         '/api/v1/obligations/bulk-complete-with-documents/',
         formData,
@@ -273,7 +282,19 @@ export function useBulkCompleteWithDocuments() {
           },
         }
       );
-      return response.data;
+
+      let job = response.data;
+      while (!job.is_finished) {
+        await new Promise((resolve) => setTimeout(resolve, BULK_JOB_POLL_INTERVAL_MS));
+        const statusResponse = await apiClient.get<BulkCompleteWithDocumentsResult>(
+          `/api/v1/obligations/bulk-complete-jobs/${job.job_id}/`
+        );
+        job = statusResponse.data;
+      }
+      if (!job.success) {
+        throw new Error(job.message);
+      }
+      return job;
     },
     onSuccess: () => {
       queryClient.invalidateQueries({ queryKey: ['obligations'] });
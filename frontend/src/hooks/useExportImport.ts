@@ -14,6 +14,23 @@ interface ImportResponse {
   message: string;
 }
 
+interface ClientImportJobResponse extends ImportResponse {
+  job_id: number;
+  status: 'pending' | 'running' | 'completed' | 'failed';
+  is_finished: boolean;
+  progress: number;
+  error_count: number;
+  error_message?: string;
+  report: Array<{
+    row: number;
+    afm: string;
+    level: 'error' | 'warning';
+    messages: string[];
+  }>;
+}
+
+const IMPORT_JOB_POLL_INTERVAL_MS = 1500;
+
 // ============================================
 // EXPORT FUNCTIONS (direct download)
 // ============================================
@@ -140,13 +157,15 @@ export async function downloadClientObligationsCSV() {
 export function useImportClients() {
   const queryClient = useQueryClient();
 
-  return useMutation<ImportResponse, Error, { file: File; mode: 'skip' | 'update' }>({
+  return useMutation<ClientImportJobResponse, Error, { file: File; mode: 'skip' | 'update' }>({
     mutationFn: async ({ file, mode }) => {
       const formData = new FormData();
       formData.append('file', file);
       formData.append('mode', mode);
 
-      const response = await apiClient.post<ImportResponse>(
+      // The server only stages the file and returns a job (202);
+      // the import runs in the background, so poll until it finishes.
+      const response = await apiClient.post<ClientImportJobResponse>(
         '/api/v1/import/clients/csv/',
         formData,
         {
@@ -155,7 +174,19 @@ export function useImportClients() {
           },
         }
       );
-      return response.data;
+
+      let job = response.data;
+      while (!job.is_finished) {
+        await new Promise((resolve) => setTimeout(resolve, IMPORT_JOB_POLL_INTERVAL_MS));
+        const statusResponse = await apiClient.get<ClientImportJobResponse>(
+          `/api/v1/import/clients/jobs/${job.job_id}/`
+        );
+        job = statusResponse.data;
+      }
+      if (!job.success) {
+        throw new Error(job.message);
+      }
+      return job;
     },
     onSuccess: () => {
       queryClient.invalidateQueries({ queryKey: ['clients'] });
@@ -0,0 +1,298 @@
+import { useEffect, useState } from 'react';
+import { useQueryClient, type QueryClient } from '@tanstack/react-query';
+import type { CallsListResponse, VoIPCallFull } from '../types';
+
+const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000/accounting';
+
+// Query keys που ενημερώνει το feed (ίδια με useVoIP / useTickets)
+const CALLS_KEY = 'calls';
+const CALLS_STATS_KEY = 'calls-stats';
+const TICKETS_KEY = 'tickets';
+const TICKETS_STATS_KEY = 'tickets-stats';
+
+// SSE μόνο όταν ο server τρέχει με ASGI/threaded workers (LIVE_FEED_SSE_ENABLED)
+const SSE_ENABLED = import.meta.env.VITE_LIVE_FEED_SSE === 'true';
+const RECONNECT_DELAY = 3000;
+const POLL_INTERVAL = 10000;
+
+// ============================================
+// TYPES
+// ============================================
+export interface LiveCallDelta {
+  id: number;
+  call_id: string;
+  phone_number: string;
+  direction: VoIPCallFull['direction'];
+  status: VoIPCallFull['status'];
+  resolution: VoIPCallFull['resolution'] | '';
+  duration_seconds: number;
+  started_at: string | null;
+  ended_at: string | null;
+  client_id: number | null;
+  client_name: string | null;
+}
+
+export interface LiveTicketDelta {
+  id: number;
+  title: string;
+  status: string;
+  priority: string;
+  is_open: boolean;
+  client_id: number | null;
+  client_name: string | null;
+  call_id: number | null;
+  phone_number: string | null;
+  created_at: string | null;
+}
+
+export interface LiveEvent {
+  id: number;
+  type: 'call' | 'ticket';
+  action: 'created' | 'updated' | 'deleted' | 'bulk_updated';
+  data: Partial<LiveCallDelta> & Partial<LiveTicketDelta> & Record<string, unknown>;
+  at: string;
+}
+
+export type LiveFeedMode = 'connecting' | 'stream' | 'polling';
+
+// ============================================
+// CACHE UPDATES
+// ============================================
+
+/**
+ * Ενημέρωση μιας κλήσης μέσα στις λίστες που είναι ήδη στο cache.
+ * Επιστρέφει false αν η κλήση δεν βρέθηκε ή άλλαξε κατάσταση (άλλαξαν τα stats).
+ */
+function patchCall(queryClient: QueryClient, delta: Partial<LiveCallDelta>): boolean {
+  let patched = false;
+  let statusChanged = false;
+
+  queryClient.setQueriesData<CallsListResponse>({ queryKey: [CALLS_KEY] }, (old) => {
+    if (!old?.results) return old;
+    const index = old.results.findIndex((call) => call.id === delta.id);
+    if (index === -1) return old;
+
+    const current = old.results[index];
+    statusChanged = statusChanged || current.status !== delta.status;
+    patched = true;
+
+    const results = [...old.results];
+    results[index] = {
+      ...current,
+      status: delta.status ?? current.status,
+      resolution: delta.resolution || undefined,
+      duration_seconds: delta.duration_seconds ?? current.duration_seconds,
+      ended_at: delta.ended_at ?? current.ended_at,
+      client: delta.client_id
+        ? { id: delta.client_id, eponimia: delta.client_name ?? '', afm: current.client?.afm ?? '' }
+        : current.client,
+    };
+    return { ...old, results };
+  });
+
+  return patched && !statusChanged;
+}
+
+function applyEvent(queryClient: QueryClient, event: LiveEvent) {
+  if (event.type === 'call') {
+    if (event.action === 'updated' && patchCall(queryClient, event.data)) {
+      return;
+    }
+    queryClient.invalidateQueries({ queryKey: [CALLS_KEY] });
+    queryClient.invalidateQueries({ queryKey: [CALLS_STATS_KEY] });
+  } else {
+    queryClient.invalidateQueries({ queryKey: [TICKETS_KEY] });
+    queryClient.invalidateQueries({ queryKey: [TICKETS_STATS_KEY] });
+  }
+}
+
+function resetAll(queryClient: QueryClient) {
+  [CALLS_KEY, CALLS_STATS_KEY, TICKETS_KEY, TICKETS_STATS_KEY].forEach((key) =>
+    queryClient.invalidateQueries({ queryKey: [key] })
+  );
+}
+
+// ============================================
+// TRANSPORT
+// ============================================
+
+function authHeaders(): Record<string, string> {
+  const token = localStorage.getItem('accessToken');
+  return token ? { Authorization: `Bearer ${token}` } : {};
+}
+
+/**
+ * Ανάγνωση text/event-stream μέσω fetch (το EventSource δεν στέλνει Authorization header).
+ */
+async function readStream(
+  lastId: number | null,
+  signal: AbortSignal,
+  onMessage: (id: number, event: string, data: unknown) => void
+) {
+  const headers: Record<string, string> = { Accept: 'text/event-stream', ...authHeaders() };
+  if (lastId !== null) headers['Last-Event-ID'] = String(lastId);
+
+  const response = await fetch(`${API_BASE_URL}/api/v1/live/feed/`, { headers, signal });
+  if (!response.ok || !response.body) {
+    throw new Error(`Live feed unavailable (${response.status})`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) return;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary = buffer.indexOf('\n\n');
+    while (boundary !== -1) {
+      const block = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf('\n\n');
+
+      let id: number | null = null;
+      let event = 'message';
+      let data = '';
+      for (const line of block.split('\n')) {
+        if (line.startsWith('id: ')) id = Number(line.slice(4));
+        else if (line.startsWith('event: ')) event = line.slice(7);
+        else if (line.startsWith('data: ')) data += line.slice(6);
+      }
+      if (id !== null && data) onMessage(id, event, JSON.parse(data));
+    }
+  }
+}
+
+// ============================================
+// SHARED CONNECTION
+// ============================================
+
+type Listener = (mode: LiveFeedMode, eventAt?: Date) => void;
+
+// Μία σύνδεση ανά καρτέλα, όσα components κι αν χρησιμοποιούν το hook
+const listeners = new Set<Listener>();
+let currentMode: LiveFeedMode = 'connecting';
+let stopConnection: (() => void) | null = null;
+
+function notify(mode: LiveFeedMode, eventAt?: Date) {
+  currentMode = mode;
+  listeners.forEach((listener) => listener(mode, eventAt));
+}
+
+function startConnection(queryClient: QueryClient): () => void {
+  const controller = new AbortController();
+  let lastId: number | null = null;
+  let etag: string | null = null;
+  let timer: ReturnType<typeof setTimeout> | undefined;
+
+  const handle = (id: number, name: string, data: unknown) => {
+    lastId = id;
+    if (name === 'reset') {
+      resetAll(queryClient);
+    } else if (name === 'call' || name === 'ticket') {
+      applyEvent(queryClient, data as LiveEvent);
+    } else {
+      return;
+    }
+    notify(currentMode, new Date());
+  };
+
+  const poll = async () => {
+    try {
+      const headers: Record<string, string> = authHeaders();
+      if (etag) headers['If-None-Match'] = etag;
+      const since = lastId !== null ? `?since=${lastId}` : '';
+      const response = await fetch(`${API_BASE_URL}/api/v1/live/events/${since}`, {
+        headers,
+        signal: controller.signal,
+      });
+      if (response.ok) {
+        etag = response.headers.get('ETag');
+        const body: { seq: number; events: LiveEvent[]; reset: boolean } = await response.json();
+        if (body.reset && lastId !== null) handle(body.seq, 'reset', body);
+        body.events.forEach((event) => handle(event.id, event.type, event));
+        lastId = body.seq;
+      }
+    } catch {
+      if (controller.signal.aborted) return;
+    }
+    timer = setTimeout(poll, POLL_INTERVAL);
+  };
+
+  const connect = async () => {
+    try {
+      notify('stream');
+      await readStream(lastId, controller.signal, handle);
+      // Ο server κλείνει το stream περιοδικά - συνέχεια από το lastId
+      timer = setTimeout(connect, RECONNECT_DELAY);
+    } catch {
+      if (controller.signal.aborted) return;
+      if (lastId === null) {
+        notify('polling');
+        poll();
+      } else {
+        timer = setTimeout(connect, RECONNECT_DELAY);
+      }
+    }
+  };
+
+  if (SSE_ENABLED && typeof ReadableStream !== 'undefined') {
+    connect();
+  } else {
+    notify('polling');
+    poll();
+  }
+
+  return () => {
+    controller.abort();
+    clearTimeout(timer);
+  };
+}
+
+// ============================================
+// HOOK
+// ============================================
+
+/**
+ * Live feed κλήσεων/tickets.
+ * Ενημερώνει τα react-query caches με τα deltas του server μέσω conditional GET
+ * (If-None-Match -> 304). Με VITE_LIVE_FEED_SSE=true χρησιμοποιεί SSE και
+ * γυρίζει σε polling αν το stream δεν είναι διαθέσιμο.
+ * Όλα τα components μοιράζονται την ίδια σύνδεση.
+ * Με enabled=false δεν ανοίγει σύνδεση (π.χ. παύση live ενημέρωσης).
+ */
+export function useLiveFeed(enabled = true) {
+  const queryClient = useQueryClient();
+  const [mode, setMode] = useState<LiveFeedMode>(currentMode);
+  const [lastEventAt, setLastEventAt] = useState(new Date());
+
+  useEffect(() => {
+    if (!enabled) return;
+
+    const listener: Listener = (nextMode, eventAt) => {
+      setMode(nextMode);
+      if (eventAt) setLastEventAt(eventAt);
+    };
+    listeners.add(listener);
+    if (stopConnection) {
+      setMode(currentMode);
+    } else {
+      stopConnection = startConnection(queryClient);
+    }
+
+    return () => {
+      listeners.delete(listener);
+      if (listeners.size === 0 && stopConnection) {
+        stopConnection();
+        stopConnection = null;
+        currentMode = 'connecting';
+      }
+    };
+  }, [queryClient, enabled]);
+
+  return { mode, lastEventAt };
+}
+
+export default useLiveFeed;
@@ -1,4 +1,4 @@
-import { useQuery } from '@tanstack/react-query';
+import { useMutation, useQuery, useQueryClient } from '@tanstack/react-query';
 import apiClient from '../api/client';
 
 // Notification types
@@ -12,6 +12,8 @@ export interface Notification {
   client_id: number;
   client_name: string;
   icon: string;
+  is_read: boolean;
+  is_active: boolean;
 }
 
 export interface NotificationsResponse {
@@ -19,18 +21,73 @@ export interface NotificationsResponse {
   count: number;
   overdue_count: number;
   today_count: number;
+  unread_count: number;
+  cursor: number;
+  read_cursor: number;
+  etag: string | null;
+}
+
+interface NotificationFeedResponse extends Omit<NotificationsResponse, 'etag'> {
+  full: boolean;
+  read: number[];
+}
+
+const NOTIFICATIONS_KEY = ['notifications'];
+const TYPE_ORDER: Record<Notification['type'], number> = { overdue: 0, due_today: 1, upcoming: 2 };
+
+const byTypeAndDeadline = (a: Notification, b: Notification) =>
+  TYPE_ORDER[a.type] - TYPE_ORDER[b.type] || a.deadline.localeCompare(b.deadline) || a.id - b.id;
+
+/**
+ * Εφαρμογή των αλλαγών (delta) στις ειδοποιήσεις που έχουμε ήδη.
+ * Οι ειδοποιήσεις με is_active=false έχουν αφαιρεθεί στον server.
+ */
+function applyDelta(previous: Notification[], body: NotificationFeedResponse): Notification[] {
+  const byId = new Map(previous.map((notification) => [notification.id, notification]));
+  body.notifications.forEach((notification) => {
+    if (notification.is_active) {
+      byId.set(notification.id, notification);
+    } else {
+      byId.delete(notification.id);
+    }
+  });
+  const read = new Set(body.read);
+  return [...byId.values()]
+    .map((notification) => (read.has(notification.id) ? { ...notification, is_read: true } : notification))
+    .sort(byTypeAndDeadline);
 }
 
 /**
  * Hook to fetch dashboard notifications
- * Polls every 2 minutes for updates
+ * Polls every 2 minutes for changes since the last cursor (304 when nothing changed)
  */
 export function useNotifications() {
+  const queryClient = useQueryClient();
+
   return useQuery<NotificationsResponse>({
-    queryKey: ['notifications'],
+    queryKey: NOTIFICATIONS_KEY,
     queryFn: async () => {
-      const response = await apiClient.get('api/notifications/');
-      return response.data;
+      const previous = queryClient.getQueryData<NotificationsResponse>(NOTIFICATIONS_KEY);
+      const response = await apiClient.get<NotificationFeedResponse>('api/v1/notifications/', {
+        params: previous ? { since: previous.cursor, read_since: previous.read_cursor } : undefined,
+        headers: previous?.etag ? { 'If-None-Match': previous.etag } : undefined,
+        validateStatus: (status) => (status >= 200 && status < 300) || status === 304,
+      });
+      if (response.status === 304 && previous) {
+        return previous;
+      }
+
+      const body = response.data;
+      return {
+        notifications: body.full || !previous ? body.notifications : applyDelta(previous.notifications, body),
+        count: body.count,
+        overdue_count: body.overdue_count,
+        today_count: body.today_count,
+        unread_count: body.unread_count,
+        cursor: body.cursor,
+        read_cursor: body.read_cursor,
+        etag: (response.headers['etag'] as string | undefined) ?? null,
+      };
     },
     staleTime: 1000 * 60 * 2, // 2 minutes
     refetchInterval: 1000 * 60 * 2, // Poll every 2 minutes
@@ -38,4 +95,41 @@ export function useNotifications() {
   });
 }
 
+/**
+ * Πλήρης επαναφόρτωση (snapshot) αντί για delta - για το κουμπί ανανέωσης
+ */
+export function useReloadNotifications() {
+  const queryClient = useQueryClient();
+  return () => queryClient.resetQueries({ queryKey: NOTIFICATIONS_KEY });
+}
+
+/**
+ * Σήμανση ειδοποιήσεων ως διαβασμένων (ids = IDs υποχρεώσεων, χωρίς ids = όλες)
+ */
+export function useMarkNotificationsRead() {
+  const queryClient = useQueryClient();
+
+  return useMutation({
+    mutationFn: async (ids?: number[]) => {
+      const response = await apiClient.post<{ marked: number; unread_count: number }>(
+        'api/v1/notifications/read/',
+        ids ? { ids } : { all: true }
+      );
+      return response.data;
+    },
+    onSuccess: (data, ids) => {
+      const marked = ids ? new Set(ids) : null;
+      queryClient.setQueryData<NotificationsResponse>(NOTIFICATIONS_KEY, (previous) =>
+        previous && {
+          ...previous,
+          unread_count: data.unread_count,
+          notifications: previous.notifications.map((notification) =>
+            !marked || marked.has(notification.id) ? { ...notification, is_read: true } : notification
+          ),
+        }
+      );
+    },
+  });
+}
+
 export default useNotifications;
@@ -17,6 +17,8 @@ import {
 } from 'lucide-react';
 import {
   useCalendar,
+  useCalendarDay,
+  calendarDayPages,
   useCompleteObligation,
   GREEK_MONTH_NAMES,
   GREEK_DAY_NAMES,
@@ -28,6 +30,7 @@ import {
 } from '../hooks/useCalendar';
 import type {
   CalendarDay as CalendarDayType,
+  CalendarFilters,
   CalendarObligation,
 } from '../hooks/useCalendar';
 import { useClients } from '../hooks/useClients';
@@ -96,20 +99,20 @@ function CalendarDayCell({ day, isCurrentMonth, isToday: isTodayDay, dayData, on
               )}
             </div>
 
-            {/* Show first 2 obligations on larger screens */}
+            {/* Show first 2 obligation types on larger screens */}
             <div className="hidden md:block space-y-0.5">
-              {dayData.obligations.slice(0, 2).map((obl) => (
+              {dayData.types.slice(0, 2).map((type) => (
                 <div
-                  key={obl.id}
-                  className={`text-xs truncate px-1 py-0.5 rounded ${getStatusColor(obl.status)}`}
-                  title={`${obl.client_name} - ${obl.type_name}`}
+                  key={type.code}
+                  className="text-xs truncate px-1 py-0.5 rounded text-gray-700 bg-gray-100"
+                  title={type.name}
                 >
-                  {obl.type_code}
+                  {type.code}{type.count > 1 ? ` ×${type.count}` : ''}
                 </div>
               ))}
-              {dayData.obligations.length > 2 && (
+              {dayData.types.length > 2 && (
                 <div className="text-xs text-gray-500">
-                  +{dayData.obligations.length - 2} ακόμη
+                  +{dayData.types.slice(2).reduce((sum, type) => sum + type.count, 0)} ακόμη
                 </div>
               )}
             </div>
@@ -127,6 +130,7 @@ interface DayDetailModalProps {
   month: number;
   year: number;
   dayData?: CalendarDayType;
+  filters: CalendarFilters;
   onQuickComplete: (id: number) => void;
   onFullComplete: (obligation: CalendarObligation) => void;
   isCompleting: boolean;
@@ -139,10 +143,22 @@ function DayDetailModal({
   month,
   year,
   dayData,
+  filters,
   onQuickComplete,
   onFullComplete,
   isCompleting,
 }: DayDetailModalProps) {
+  // Obligations of the day are fetched only while the modal is open
+  const [page, setPage] = useState(1);
+  const date = `${year}-${String(month).padStart(2, '0')}-${String(day).padStart(2, '0')}`;
+  const { data: dayPage, isLoading: isDayLoading } = useCalendarDay(isOpen ? date : null, filters, page);
+  const obligations = dayPage?.results ?? [];
+  const pages = calendarDayPages(dayPage?.count ?? 0);
+
+  useEffect(() => {
+    setPage(1);
+  }, [date, filters]);
+
   // Handle escape key to close modal
   useEffect(() => {
     const handleEscape = (e: KeyboardEvent) => {
@@ -203,7 +219,9 @@ function DayDetailModal({
 
           {/* Content */}
           <div className="p-4 overflow-y-auto max-h-[65vh]">
-            {dayData && dayData.obligations.length > 0 ? (
+            {isDayLoading ? (
+              <div className="text-center py-12 text-gray-500">Φόρτωση...</div>
+            ) : dayData && obligations.length > 0 ? (
               <>
                 {/* Summary badges */}
                 <div className="flex flex-wrap gap-2 mb-4 pb-4 border-b border-gray-200">
@@ -238,7 +256,7 @@ function DayDetailModal({
 
                 {/* Obligations list */}
                 <div className="space-y-3">
-                  {dayData.obligations.map((obl: CalendarObligation) => (
+                  {obligations.map((obl: CalendarObligation) => (
                     <div
                       key={obl.id}
                       className={`p-4 rounded-lg border transition-all ${
@@ -339,6 +357,31 @@ function DayDetailModal({
                     </div>
                   ))}
                 </div>
+
+                {/* Pagination */}
+                {pages > 1 && (
+                  <div className="flex items-center justify-between mt-4 pt-4 border-t border-gray-200">
+                    <button
+                      onClick={() => setPage(page - 1)}
+                      disabled={page <= 1}
+                      className="flex items-center gap-1 px-3 py-1.5 text-sm text-gray-700 bg-gray-100 hover:bg-gray-200 rounded-lg disabled:opacity-50 disabled:cursor-not-allowed"
+                    >
+                      <ChevronLeft size={16} />
+                      Προηγούμενη
+                    </button>
+                    <span className="text-sm text-gray-500">
+                      Σελίδα {page} από {pages}
+                    </span>
+                    <button
+                      onClick={() => setPage(page + 1)}
+                      disabled={page >= pages}
+                      className="flex items-center gap-1 px-3 py-1.5 text-sm text-gray-700 bg-gray-100 hover:bg-gray-200 rounded-lg disabled:opacity-50 disabled:cursor-not-allowed"
+                    >
+                      Επόμενη
+                      <ChevronRight size={16} />
+                    </button>
+                  </div>
+                )}
               </>
             ) : (
               <div className="text-center py-12">
@@ -840,6 +883,7 @@ export default function Calendar() {
         dayData={
           selectedDay ? calendarData?.days[String(selectedDay)] : undefined
         }
+        filters={filters}
         onQuickComplete={handleQuickComplete}
         onFullComplete={handleFullComplete}
         isCompleting={quickCompleteMutation.isPending}
@@ -1,4 +1,4 @@
-import { useState, useCallback, useEffect } from 'react';
+import { useState, useCallback } from 'react';
 import { Link } from 'react-router-dom';
 import {
   Phone,
@@ -20,6 +20,7 @@ import {
   Trash2,
 } from 'lucide-react';
 import { Button } from '../components';
+import { useLiveFeed } from '../hooks/useLiveFeed';
 import { useCalls, useMatchCallToClient, useCreateTicketFromCall, useSearchClientsForMatch, useDeleteCall, type CallsFilters } from '../hooks/useVoIP';
 import type { VoIPCallFull } from '../types';
 import {
@@ -27,9 +28,6 @@ import {
   CALL_STATUS_COLORS as STATUS_COLORS,
 } from '../constants';
 
-// Auto-refresh interval in milliseconds (30 seconds)
-const AUTO_REFRESH_INTERVAL = 30000;
-
 export default function Calls() {
   // Filters state
   const [filters, setFilters] = useState<CallsFilters>({
@@ -39,9 +37,8 @@ export default function Calls() {
   const [showFilters, setShowFilters] = useState(false);
   const [searchInput, setSearchInput] = useState('');
 
-  // Auto-refresh state
+  // Live updates state
   const [autoRefresh, setAutoRefresh] = useState(true);
-  const [secondsUntilRefresh, setSecondsUntilRefresh] = useState(AUTO_REFRESH_INTERVAL / 1000);
 
   // Modal states
   const [matchModalOpen, setMatchModalOpen] = useState(false);
@@ -51,36 +48,12 @@ export default function Calls() {
   // Data fetching
   const { data, isLoading, isError, refetch, isFetching } = useCalls(filters);
 
-  // Auto-refresh effect
-  useEffect(() => {
-    if (!autoRefresh) return;
-
-    // Countdown timer
-    const countdownInterval = setInterval(() => {
-      setSecondsUntilRefresh((prev) => {
-        if (prev <= 1) {
-          return AUTO_REFRESH_INTERVAL / 1000;
-        }
-        return prev - 1;
-      });
-    }, 1000);
-
-    // Refresh interval
-    const refreshInterval = setInterval(() => {
-      refetch();
-      setSecondsUntilRefresh(AUTO_REFRESH_INTERVAL / 1000);
-    }, AUTO_REFRESH_INTERVAL);
-
-    return () => {
-      clearInterval(countdownInterval);
-      clearInterval(refreshInterval);
-    };
-  }, [autoRefresh, refetch]);
+  // Live updates (SSE) - changed calls are patched into the list without refetching
+  const { lastEventAt } = useLiveFeed(autoRefresh);
 
   // Manual refresh handler
   const handleManualRefresh = useCallback(() => {
     refetch();
-    setSecondsUntilRefresh(AUTO_REFRESH_INTERVAL / 1000);
   }, [refetch]);
 
   // Handlers
@@ -136,7 +109,7 @@ export default function Calls() {
             Ιστορικό κλήσεων και VoIP ενσωμάτωση
             {autoRefresh && (
               <span className="ml-2 text-xs text-blue-500">
-                • Αυτόματη ανανέωση σε {secondsUntilRefresh}s
+                • Live · {lastEventAt.toLocaleTimeString('el-GR', { hour: '2-digit', minute: '2-digit', second: '2-digit' })}
               </span>
             )}
           </p>
@@ -211,6 +211,19 @@ export interface FileManagerStats {
   collections_count: number;
   by_category: { document_category: string; count: number }[];
   by_file_type: { file_type: string; count: number }[];
+  storage?: FileManagerStorage;
+}
+
+// Disk usage from the file index (refresh_file_index)
+export interface FileManagerStorage {
+  files: number;
+  size: number;
+  size_display: string;
+  indexed_at: string | null;
+  orphan_files: number;
+  orphan_size: number;
+  orphan_size_display: string;
+  by_client_folder: { client_folder: string; files: number; size: number }[];
 }
 
 // Browse response types
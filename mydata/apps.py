@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class MydataConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'mydata'
+
+    def ready(self):
+        # Import signals to register them
+        import mydata.signals  # noqa: F401
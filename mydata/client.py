@@ -7,16 +7,19 @@ Enhanced version με:
 - Retry logic με exponential backoff
 - Rate limiting (2 req/sec)
 - RequestVatInfo με pagination
-- Proper XML parsing
+- Streaming XML parsing (iterparse-style, σταθερή μνήμη ανά σελίδα)
 """
 
+import re
 import requests
 import xml.etree.ElementTree as ET
+import xml.parsers.expat
 from datetime import datetime, timedelta, date
 from typing import List, Dict, Optional, Generator, Any, Union
 from dataclasses import dataclass
 from decimal import Decimal
 import logging
+import threading
 import time
 import functools
 
@@ -56,6 +59,11 @@ class MyDataServerError(MyDataAPIError):
     pass
 
 
+class MyDataResponseError(MyDataAPIError):
+    """Μη έγκυρη ή κομμένη XML απάντηση"""
+    pass
+
+
 class MyDataCredentialsNotFoundError(Exception):
     """Ο πελάτης δεν έχει myDATA credentials"""
     def __init__(self, client_afm: str):
@@ -166,23 +174,184 @@ def retry_with_backoff(
 
 class RateLimiter:
     """
-    Simple rate limiter για API calls.
+    Thread-safe rate limiter για API calls.
     Default: 2 requests per second
+
+    Κάθε κλήση του wait() κλείνει το επόμενο ελεύθερο slot υπό lock και
+    κοιμάται εκτός lock, οπότε ένα instance μπορεί να μοιράζεται ανάμεσα σε
+    πολλούς MyDataClient/threads ως κοινός (global) προϋπολογισμός requests.
     """
     def __init__(self, requests_per_second: float = 2.0):
         self.min_interval = 1.0 / requests_per_second
         self.last_request_time = 0.0
+        self._lock = threading.Lock()
 
-    def wait(self):
-        """Wait if needed to respect rate limit"""
-        now = time.time()
-        elapsed = now - self.last_request_time
+    def wait(self) -> float:
+        """
+        Wait if needed to respect rate limit.
 
-        if elapsed < self.min_interval:
-            sleep_time = self.min_interval - elapsed
+        Returns:
+            Χρόνος αναμονής σε δευτερόλεπτα
+        """
+        with self._lock:
+            now = time.time()
+            slot = max(now, self.last_request_time + self.min_interval)
+            self.last_request_time = slot
+
+        sleep_time = slot - now
+        if sleep_time > 0:
             time.sleep(sleep_time)
+        return sleep_time
+
+
+# =============================================================================
+# STREAMING XML PARSING
+# =============================================================================
+
+# Μέγεθος chunk για response.iter_content() στα streaming requests
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Πρώτο opening tag του εγγράφου (παραλείπει <?xml ...?> και <!-- -->)
+_FIRST_TAG_RE = re.compile(rb'<(?![?!])([^\s/>]+)[\s/>]')
+
+
+def _local_name(tag: str) -> str:
+    """Local name ενός tag χωρίς το {namespace}"""
+    return tag.rsplit('}', 1)[-1]
+
+
+class StreamingXMLParser:
+    """
+    Incremental XML parser πάνω σε chunks (π.χ. response.iter_content()).
+
+    Κάνει yield κάθε element με local name στο `tags` μόλις κλείσει και το
+    αποδεσμεύει αμέσως μετά, οπότε η μνήμη δεν εξαρτάται από το μέγεθος της
+    απάντησης. Οι WCF απαντήσεις (<string>HTML-encoded XML</string>)
+    ξετυλίγονται επίσης σε streaming: ο εξωτερικός expat parser αποκωδικοποιεί
+    τα entities ανά chunk και τροφοδοτεί απευθείας τον εσωτερικό parser.
+
+    Σφάλματα XML γίνονται raise ως ET.ParseError.
+    """
+
+    # Πόσα bytes διαβάζουμε το πολύ για να βρούμε το root tag
+    SNIFF_LIMIT = 4096
+
+    def __init__(self, tags):
+        self.tags = frozenset(tags)
+        self.bytes_read = 0
+
+    def iter_elements(self, chunks) -> Generator[ET.Element, None, None]:
+        self.bytes_read = 0
+        self._parser = ET.XMLPullParser(events=('start', 'end'))
+        self._stack: List[ET.Element] = []
+        self._local_names: Dict[str, str] = {}
+        self._wrapper = None
+        self._wrapper_depth = 0
+        self._inner_started = False
+
+        head = b''
+        feed = None
+        for chunk in chunks:
+            if not chunk:
+                continue
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            self.bytes_read += len(chunk)
+
+            if feed is None:
+                # Αναμονή μέχρι να φανεί το root tag (wrapped ή όχι)
+                head += chunk
+                match = _FIRST_TAG_RE.search(head)
+                if not match and len(head) < self.SNIFF_LIMIT:
+                    continue
+                wrapped = bool(match) and match.group(1).split(b':')[-1] == b'string'
+                feed = self._init_wrapper() if wrapped else self._parser.feed
+                chunk, head = head, b''
+
+            yield from self._feed(feed, chunk)
+
+        if feed is None:
+            if not head.strip():
+                return  # Κενή απάντηση
+            feed = self._parser.feed
+            yield from self._feed(feed, head)
+
+        try:
+            if self._wrapper is not None:
+                self._wrapper.Parse(b'', True)
+                if not self._inner_started:
+                    return  # Κενό <string/> wrapper
+            self._parser.close()
+        except xml.parsers.expat.ExpatError as e:
+            raise ET.ParseError(str(e))
+        yield from self._drain()
+
+    def _init_wrapper(self):
+        """Expat parser για το WCF <string> wrapper"""
+        wrapper = xml.parsers.expat.ParserCreate()
+
+        def start(name, attrs):
+            self._wrapper_depth += 1
+
+        def end(name):
+            self._wrapper_depth -= 1
+
+        def data(text):
+            if self._wrapper_depth != 1:
+                return
+            if not self._inner_started:
+                # Το <?xml ...?> του εσωτερικού εγγράφου πρέπει να είναι στην αρχή
+                text = text.lstrip()
+                if not text:
+                    return
+                self._inner_started = True
+            self._parser.feed(text)
+
+        wrapper.StartElementHandler = start
+        wrapper.EndElementHandler = end
+        wrapper.CharacterDataHandler = data
+        self._wrapper = wrapper
+        return lambda chunk: wrapper.Parse(chunk, False)
+
+    def _feed(self, feed, chunk) -> Generator[ET.Element, None, None]:
+        try:
+            feed(chunk)
+        except xml.parsers.expat.ExpatError as e:
+            raise ET.ParseError(str(e))
+        yield from self._drain()
+
+    def _drain(self) -> Generator[ET.Element, None, None]:
+        stack = self._stack
+        names = self._local_names
+        for event, elem in self._parser.read_events():
+            if event == 'start':
+                stack.append(elem)
+                continue
 
-        self.last_request_time = time.time()
+            stack.pop()
+            tag = elem.tag
+            name = names.get(tag)
+            if name is None:
+                name = names[tag] = _local_name(tag)
+            if name not in self.tags:
+                continue
+
+            yield elem
+
+            # Αποδέσμευση: καθαρισμός και αποκοπή από τον γονέα
+            elem.clear()
+            if stack:
+                stack[-1].remove(elem)
+
+
+def _collect(generator: Generator) -> tuple:
+    """Εξαντλεί generator και επιστρέφει (items, return value)"""
+    items = []
+    while True:
+        try:
+            items.append(next(generator))
+        except StopIteration as stop:
+            return items, stop.value
 
 
 # =============================================================================
@@ -228,7 +397,9 @@ class MyDataClient:
         user_id: str,
         subscription_key: str,
         is_sandbox: bool = False,
-        requests_per_second: float = 2.0
+        requests_per_second: float = 2.0,
+        shared_rate_limiter: Optional[RateLimiter] = None,
+        base_url: Optional[str] = None
     ):
         """
         Αρχικοποίηση client.
@@ -238,6 +409,8 @@ class MyDataClient:
             subscription_key: Το subscription key από την AADE
             is_sandbox: True για testing environment
             requests_per_second: Rate limit (default: 2 req/sec)
+            shared_rate_limiter: Κοινός RateLimiter για πολλούς clients (global budget)
+            base_url: Override του API URL (π.χ. local stub server για tests)
         """
         if not user_id or not subscription_key:
             raise ValueError("user_id και subscription_key είναι υποχρεωτικά")
@@ -245,10 +418,17 @@ class MyDataClient:
         self.user_id = user_id
         self.subscription_key = subscription_key
         self.is_sandbox = is_sandbox
-        self.base_url = self.SANDBOX_BASE_URL if is_sandbox else self.PROD_BASE_URL
+        if base_url:
+            self.base_url = base_url.rstrip('/')
+        else:
+            self.base_url = self.SANDBOX_BASE_URL if is_sandbox else self.PROD_BASE_URL
 
-        # Rate limiter
+        # Rate limiters: per-client + optional shared global budget
         self.rate_limiter = RateLimiter(requests_per_second)
+        self.shared_rate_limiter = shared_rate_limiter
+
+        # Latency (seconds) κάθε HTTP request, για metrics
+        self.request_latencies: List[float] = []
 
         # Session με default headers
         self.session = requests.Session()
@@ -304,26 +484,23 @@ class MyDataClient:
                 response_text=error_text
             )
 
-    @retry_with_backoff()
-    def _make_request(
+    def _send_request(
         self,
         method: str,
         endpoint: str,
+        stream: bool = False,
         **kwargs
-    ) -> Union[str, Dict]:
+    ) -> requests.Response:
         """
-        Helper για API requests με retry και rate limiting.
-
-        Args:
-            method: HTTP method (GET, POST, etc.)
-            endpoint: API endpoint (π.χ. '/RequestVatInfo')
-            **kwargs: Extra arguments για requests
+        Εκτέλεση HTTP request με rate limiting και έλεγχο status.
 
-        Returns:
-            Response text (XML) ή dict (JSON)
+        Με stream=True το body δεν διαβάζεται· ο caller το καταναλώνει με
+        response.iter_content() και το κλείνει με response.close().
         """
         # Rate limiting
         self.rate_limiter.wait()
+        if self.shared_rate_limiter is not None:
+            self.shared_rate_limiter.wait()
 
         url = f"{self.base_url}{endpoint}"
 
@@ -332,27 +509,24 @@ class MyDataClient:
             logger.debug(f"  Params: {kwargs['params']}")
 
         try:
+            started = time.perf_counter()
             response = self.session.request(
                 method,
                 url,
                 timeout=30,  # 30 second timeout
+                stream=stream,
                 **kwargs
             )
+            self.request_latencies.append(time.perf_counter() - started)
 
-            self._raise_for_status(response)
+            try:
+                self._raise_for_status(response)
+            except MyDataAPIError:
+                response.close()
+                raise
 
             logger.info(f"myDATA API: {method} {endpoint} - Status {response.status_code}")
-
-            if not response.content:
-                return {}
-
-            content_type = response.headers.get('Content-Type', '')
-
-            if 'json' in content_type.lower():
-                return response.json()
-            else:
-                # Return raw text (XML)
-                return response.text
+            return response
 
         except requests.exceptions.Timeout:
             logger.error(f"myDATA API Timeout: {method} {endpoint}")
@@ -361,6 +535,53 @@ class MyDataClient:
             logger.error(f"myDATA API Network Error: {method} {endpoint} - {str(e)}")
             raise
 
+    @retry_with_backoff()
+    def _make_request(
+        self,
+        method: str,
+        endpoint: str,
+        **kwargs
+    ) -> Union[str, Dict]:
+        """
+        Helper για API requests με retry και rate limiting.
+
+        Args:
+            method: HTTP method (GET, POST, etc.)
+            endpoint: API endpoint (π.χ. '/RequestVatInfo')
+            **kwargs: Extra arguments για requests
+
+        Returns:
+            Response text (XML) ή dict (JSON)
+        """
+        response = self._send_request(method, endpoint, **kwargs)
+
+        if not response.content:
+            return {}
+
+        content_type = response.headers.get('Content-Type', '')
+
+        if 'json' in content_type.lower():
+            return response.json()
+        else:
+            # Return raw text (XML)
+            return response.text
+
+    @retry_with_backoff()
+    def _stream_request(
+        self,
+        method: str,
+        endpoint: str,
+        **kwargs
+    ) -> requests.Response:
+        """
+        Όπως το _make_request, αλλά επιστρέφει το response με stream=True
+        ώστε το XML να γίνεται parse όσο φτάνουν τα bytes.
+
+        Το retry καλύπτει τη σύνδεση και τα headers· σφάλμα δικτύου στη μέση
+        του body δεν επαναλαμβάνεται (τα records έχουν ήδη γίνει yield).
+        """
+        return self._send_request(method, endpoint, stream=True, **kwargs)
+
     @staticmethod
     def _format_date(d: Union[date, datetime, None]) -> Optional[str]:
         """Format date to dd/MM/yyyy"""
@@ -376,6 +597,13 @@ class MyDataClient:
         if not date_str:
             return None
 
+        # Γρήγορη διαδρομή για ISO (YYYY-MM-DD[THH:MM:SS]) που επιστρέφει η ΑΑΔΕ
+        if date_str[4:5] == '-':
+            try:
+                return date.fromisoformat(date_str[:10])
+            except ValueError:
+                pass
+
         # Try different formats (including ISO datetime with T)
         for fmt in ('%Y-%m-%d', '%Y-%m-%dT%H:%M:%S', '%d/%m/%Y', '%d-%m-%Y'):
             try:
@@ -477,16 +705,26 @@ class MyDataClient:
 
             logger.info(f"RequestVatInfo - Page {page}, fetched so far: {total_fetched}")
 
-            response = self._make_request('GET', '/RequestVatInfo', params=params)
-
-            # Parse XML response
-            records, pagination = self._parse_vat_info_response(response)
+            response = self._stream_request('GET', '/RequestVatInfo', params=params)
 
-            for record in records:
-                total_fetched += 1
-                yield record
-
-            logger.info(f"RequestVatInfo - Page {page} returned {len(records)} records")
+            # Streaming parse: τα records γίνονται yield όσο φτάνουν τα bytes
+            page_records = 0
+            parser = self.iter_vat_info_xml(response.iter_content(chunk_size=STREAM_CHUNK_SIZE))
+            try:
+                while True:
+                    try:
+                        record = next(parser)
+                    except StopIteration as stop:
+                        pagination = stop.value
+                        break
+                    page_records += 1
+                    total_fetched += 1
+                    yield record
+            finally:
+                parser.close()
+                response.close()
+
+            logger.info(f"RequestVatInfo - Page {page} returned {page_records} records")
 
             # Check if there are more pages
             if not pagination.has_more:
@@ -497,186 +735,179 @@ class MyDataClient:
             next_partition_key = pagination.next_partition_key
             next_row_key = pagination.next_row_key
 
-    def _parse_vat_info_response(
-        self,
-        response: str
-    ) -> tuple[List[VatInfoRecord], PaginationInfo]:
+    def iter_vat_info_xml(self, chunks) -> Generator[VatInfoRecord, None, PaginationInfo]:
         """
-        Parse XML response από RequestVatInfo.
+        Streaming parse απάντησης RequestVatInfo.
+
+        Args:
+            chunks: Iterable από bytes/str (π.χ. response.iter_content())
+
+        Yields:
+            VatInfoRecord objects, μόλις κλείσει κάθε <VatInfo>
+
+        Returns:
+            PaginationInfo από το continuationToken
+
+        Raises:
+            MyDataResponseError: Σφάλμα XML (π.χ. κομμένη απάντηση) - ίσως
+                έχουν ήδη γίνει yield records, άρα τα δεδομένα είναι ελλιπή
 
         Handles both formats:
         1. Detailed format with RecType, VatCategory, NetValue, VatAmount
         2. Summary format with Vat303 (εκροές), Vat333 (εισροές)
 
-        Note: ΑΑΔΕ uses namespace, so we need to handle it.
+        Note: ΑΑΔΕ uses namespace, so we match by local name.
         Also handles WCF-style double-encoded responses wrapped in <string> element.
         """
-        import html
-
-        records = []
+        ns = {'aade': 'http://www.aade.gr/myDATA/invoice/v1.0'}
         pagination = PaginationInfo(has_more=False)
-
-        if not response or not isinstance(response, str):
-            return records, pagination
-
-        # Handle WCF-style double-encoded response
-        # Response may be wrapped in: <string xmlns="...">HTML-encoded XML</string>
-        if response.strip().startswith('<string'):
-            try:
-                # Parse the wrapper
-                wrapper_root = ET.fromstring(response)
-                # Get the text content (HTML-encoded XML)
-                inner_xml = wrapper_root.text
-                if inner_xml:
-                    # Decode HTML entities (&lt; -> <, &gt; -> >, etc.)
-                    response = html.unescape(inner_xml)
-                    logger.debug("Decoded WCF-wrapped response")
-            except ET.ParseError:
-                pass  # Fall through to normal parsing
+        parser = StreamingXMLParser(tags=('VatInfo', 'continuationToken'))
 
         try:
-            root = ET.fromstring(response)
+            for elem in parser.iter_elements(chunks):
+                if _local_name(elem.tag) == 'continuationToken':
+                    pagination = self._parse_continuation(elem, ns)
+                    continue
+                yield from self._parse_vat_info_element(elem)
         except ET.ParseError as e:
-            logger.error(f"XML Parse Error in VatInfo response: {e}")
-            logger.debug(f"Response preview: {response[:500]}")
-            return records, pagination
+            logger.error(
+                f"XML Parse Error in VatInfo response after {parser.bytes_read} bytes: {e}"
+            )
+            raise MyDataResponseError(f"Invalid VatInfo response: {e}") from e
 
-        # Define namespace (ΑΑΔΕ uses this)
-        ns = {'aade': 'http://www.aade.gr/myDATA/invoice/v1.0'}
+        return pagination
 
-        # Try with namespace first, then without
-        vat_info_elements = root.findall('aade:VatInfo', ns)
-        if not vat_info_elements:
-            vat_info_elements = root.findall('VatInfo')
-        if not vat_info_elements:
-            # Try finding all elements with local name VatInfo
-            vat_info_elements = [elem for elem in root.iter() if elem.tag.endswith('VatInfo')]
-
-        # === DEBUG LOGGING: Δες τι επιστρέφει το API ===
-        print(f"[DEBUG] RequestVatInfo: Found {len(vat_info_elements)} VatInfo elements")
-        for i, vat_elem in enumerate(vat_info_elements[:5]):  # Πρώτα 5 για debugging
-            xml_str = ET.tostring(vat_elem, encoding='unicode')
-            print(f"[DEBUG] VatInfo[{i}] RAW XML:\n{xml_str}")
-            # Έλεγχος για RecType field
-            rec_type_check = self._get_xml_text_flexible(vat_elem, 'RecType', ns)
-            vat303_check = self._get_xml_text_flexible(vat_elem, 'Vat303', ns)
-            vat333_check = self._get_xml_text_flexible(vat_elem, 'Vat333', ns)
-            print(f"[DEBUG] VatInfo[{i}] Fields: RecType={rec_type_check}, Vat303={vat303_check}, Vat333={vat333_check}")
-        # === END DEBUG LOGGING ===
-
-        # Parse continuation token (pagination) - try both with and without namespace
-        continuation = root.find('aade:continuationToken', ns)
-        if continuation is None:
-            continuation = root.find('continuationToken')
+    def _parse_vat_info_response(
+        self,
+        response: str
+    ) -> tuple[List[VatInfoRecord], PaginationInfo]:
+        """
+        Parse ολόκληρης απάντησης RequestVatInfo (string).
 
-        if continuation is not None:
-            next_partition = self._get_xml_text_flexible(continuation, 'nextPartitionKey', ns)
-            next_row = self._get_xml_text_flexible(continuation, 'nextRowKey', ns)
+        Kept for backwards compatibility· χρησιμοποιεί τον streaming parser.
+        """
+        if not response or not isinstance(response, str):
+            return [], PaginationInfo(has_more=False)
 
-            if next_partition or next_row:
-                pagination = PaginationInfo(
-                    has_more=True,
-                    next_partition_key=next_partition,
-                    next_row_key=next_row
+        return _collect(self.iter_vat_info_xml([response]))
+
+    def _parse_continuation(self, continuation: ET.Element, ns: dict) -> PaginationInfo:
+        """PaginationInfo από <continuationToken>"""
+        next_partition = self._get_xml_text_flexible(continuation, 'nextPartitionKey', ns)
+        next_row = self._get_xml_text_flexible(continuation, 'nextRowKey', ns)
+
+        if next_partition or next_row:
+            return PaginationInfo(
+                has_more=True,
+                next_partition_key=next_partition,
+                next_row_key=next_row
+            )
+        return PaginationInfo(has_more=False)
+
+    def _parse_vat_info_element(self, vat_elem: ET.Element) -> List[VatInfoRecord]:
+        """VatInfoRecord(s) από ένα <VatInfo> (εκροές και/ή εισροές)"""
+        records = []
+        try:
+            # Local name -> text των πεδίων, μία φορά ανά element (οποιοδήποτε namespace)
+            fields = {}
+            for child in vat_elem:
+                if child.text:
+                    fields.setdefault(_local_name(child.tag), child.text.strip())
+            get = fields.get
+
+            # Get Mark (try both cases)
+            mark_str = get('Mark')
+            if not mark_str:
+                mark_str = get('mark')
+            mark = int(mark_str) if mark_str else 0
+
+            # Get IsCancelled
+            is_cancelled_str = get('IsCancelled')
+            if not is_cancelled_str:
+                is_cancelled_str = get('isCancelled')
+            is_cancelled = self._parse_bool(is_cancelled_str or 'false')
+
+            # Get IssueDate
+            issue_date_str = get('IssueDate')
+            if not issue_date_str:
+                issue_date_str = get('issueDate')
+            issue_date = self._parse_date(issue_date_str) if issue_date_str else None
+
+            # Get all VAT fields from ΑΑΔΕ
+            # ΕΚΡΟΕΣ (Έσοδα/Πωλήσεις):
+            #   Vat303 = Καθαρή αξία εκροών (φορολογητέα αξία)
+            #   Vat333 = ΦΠΑ εκροών
+            # ΕΙΣΡΟΕΣ (Έξοδα/Αγορές):
+            #   Vat361 / VatUnclassified361 = Καθαρή αξία εισροών
+            #   Vat381 / VatUnclassified381 = ΦΠΑ εισροών
+            vat303 = get('Vat303')  # Καθαρή εκροών
+            vat333 = get('Vat333')  # ΦΠΑ εκροών
+
+            # Εισροές - try both classified and unclassified
+            vat361 = get('Vat361')
+            vat381 = get('Vat381')
+            vat_unclass_361 = get('VatUnclassified361')
+            vat_unclass_381 = get('VatUnclassified381')
+
+            # Combine classified and unclassified for εισροές
+            eisroes_net = vat361 or vat_unclass_361
+            eisroes_vat = vat381 or vat_unclass_381
+
+            # Check if we have ΕΚΡΟΕΣ data (έσοδα)
+            has_ekroes = vat303 or vat333
+
+            # Check if we have ΕΙΣΡΟΕΣ data (έξοδα)
+            has_eisroes = eisroes_net or eisroes_vat
+
+            if has_ekroes:
+                # ΕΚΡΟΕΣ (Έσοδα/Πωλήσεις)
+                net_value = self._parse_decimal(vat303) if vat303 else Decimal('0')
+                vat_amount = self._parse_decimal(vat333) if vat333 else Decimal('0')
+
+                record = VatInfoRecord(
+                    mark=mark,
+                    is_cancelled=is_cancelled,
+                    issue_date=issue_date,
+                    rec_type=1,  # Εκροές
+                    inv_type='ΕΚΡΟΕΣ',
+                    vat_category=1,  # Default 24%
+                    vat_exemption_category='',
+                    net_value=net_value,
+                    vat_amount=vat_amount,
+                    counter_vat_number='',
+                    vat_offset_amount=None,
+                    deductions_amount=None,
+                )
+                records.append(record)
+
+            if has_eisroes:
+                # ΕΙΣΡΟΕΣ (Έξοδα/Αγορές)
+                net_value = self._parse_decimal(eisroes_net) if eisroes_net else Decimal('0')
+                vat_amount = self._parse_decimal(eisroes_vat) if eisroes_vat else Decimal('0')
+
+                record = VatInfoRecord(
+                    mark=mark + 1 if mark and has_ekroes else mark,  # Unique mark if both
+                    is_cancelled=is_cancelled,
+                    issue_date=issue_date,
+                    rec_type=2,  # Εισροές
+                    inv_type='ΕΙΣΡΟΕΣ',
+                    vat_category=1,  # Default 24%
+                    vat_exemption_category='',
+                    net_value=net_value,
+                    vat_amount=vat_amount,
+                    counter_vat_number='',
+                    vat_offset_amount=None,
+                    deductions_amount=None,
                 )
+                records.append(record)
 
-        # Parse VatInfo elements
-        for vat_elem in vat_info_elements:
-            try:
-                # Get Mark (try both cases)
-                mark_str = self._get_xml_text_flexible(vat_elem, 'Mark', ns)
-                if not mark_str:
-                    mark_str = self._get_xml_text_flexible(vat_elem, 'mark', ns)
-                mark = int(mark_str) if mark_str else 0
-
-                # Get IsCancelled
-                is_cancelled_str = self._get_xml_text_flexible(vat_elem, 'IsCancelled', ns)
-                if not is_cancelled_str:
-                    is_cancelled_str = self._get_xml_text_flexible(vat_elem, 'isCancelled', ns)
-                is_cancelled = self._parse_bool(is_cancelled_str or 'false')
-
-                # Get IssueDate
-                issue_date_str = self._get_xml_text_flexible(vat_elem, 'IssueDate', ns)
-                if not issue_date_str:
-                    issue_date_str = self._get_xml_text_flexible(vat_elem, 'issueDate', ns)
-                issue_date = self._parse_date(issue_date_str) if issue_date_str else None
-
-                # Get all VAT fields from ΑΑΔΕ
-                # ΕΚΡΟΕΣ (Έσοδα/Πωλήσεις):
-                #   Vat303 = Καθαρή αξία εκροών (φορολογητέα αξία)
-                #   Vat333 = ΦΠΑ εκροών
-                # ΕΙΣΡΟΕΣ (Έξοδα/Αγορές):
-                #   Vat361 / VatUnclassified361 = Καθαρή αξία εισροών
-                #   Vat381 / VatUnclassified381 = ΦΠΑ εισροών
-                vat303 = self._get_xml_text_flexible(vat_elem, 'Vat303', ns)  # Καθαρή εκροών
-                vat333 = self._get_xml_text_flexible(vat_elem, 'Vat333', ns)  # ΦΠΑ εκροών
-
-                # Εισροές - try both classified and unclassified
-                vat361 = self._get_xml_text_flexible(vat_elem, 'Vat361', ns)
-                vat381 = self._get_xml_text_flexible(vat_elem, 'Vat381', ns)
-                vat_unclass_361 = self._get_xml_text_flexible(vat_elem, 'VatUnclassified361', ns)
-                vat_unclass_381 = self._get_xml_text_flexible(vat_elem, 'VatUnclassified381', ns)
-
-                # Combine classified and unclassified for εισροές
-                eisroes_net = vat361 or vat_unclass_361
-                eisroes_vat = vat381 or vat_unclass_381
-
-                # Check if we have ΕΚΡΟΕΣ data (έσοδα)
-                has_ekroes = vat303 or vat333
-
-                # Check if we have ΕΙΣΡΟΕΣ data (έξοδα)
-                has_eisroes = eisroes_net or eisroes_vat
-
-                if has_ekroes:
-                    # ΕΚΡΟΕΣ (Έσοδα/Πωλήσεις)
-                    net_value = self._parse_decimal(vat303) if vat303 else Decimal('0')
-                    vat_amount = self._parse_decimal(vat333) if vat333 else Decimal('0')
-
-                    record = VatInfoRecord(
-                        mark=mark,
-                        is_cancelled=is_cancelled,
-                        issue_date=issue_date,
-                        rec_type=1,  # Εκροές
-                        inv_type='ΕΚΡΟΕΣ',
-                        vat_category=1,  # Default 24%
-                        vat_exemption_category='',
-                        net_value=net_value,
-                        vat_amount=vat_amount,
-                        counter_vat_number='',
-                        vat_offset_amount=None,
-                        deductions_amount=None,
-                    )
-                    records.append(record)
-
-                if has_eisroes:
-                    # ΕΙΣΡΟΕΣ (Έξοδα/Αγορές)
-                    net_value = self._parse_decimal(eisroes_net) if eisroes_net else Decimal('0')
-                    vat_amount = self._parse_decimal(eisroes_vat) if eisroes_vat else Decimal('0')
-
-                    record = VatInfoRecord(
-                        mark=mark + 1 if mark and has_ekroes else mark,  # Unique mark if both
-                        is_cancelled=is_cancelled,
-                        issue_date=issue_date,
-                        rec_type=2,  # Εισροές
-                        inv_type='ΕΙΣΡΟΕΣ',
-                        vat_category=1,  # Default 24%
-                        vat_exemption_category='',
-                        net_value=net_value,
-                        vat_amount=vat_amount,
-                        counter_vat_number='',
-                        vat_offset_amount=None,
-                        deductions_amount=None,
-                    )
-                    records.append(record)
-
-                # Skip records with no VAT data (empty invoices/cancelled)
-
-            except Exception as e:
-                logger.error(f"Error parsing VatInfo element: {e}")
-                logger.debug(f"Element: {ET.tostring(vat_elem, encoding='unicode')[:500]}")
-                continue
+            # Skip records with no VAT data (empty invoices/cancelled)
 
-        return records, pagination
+        except Exception as e:
+            logger.error(f"Error parsing VatInfo element: {e}")
+            logger.debug(f"Element: {ET.tostring(vat_elem, encoding='unicode')[:500]}")
+
+        return records
 
     def _get_xml_text_flexible(self, elem, tag: str, ns: dict) -> Optional[str]:
         """Get text from XML element, trying with namespace and without."""
@@ -901,24 +1132,10 @@ class MyDataClient:
         Returns:
             XML response string
         """
-        params = {}
-
-        if mark is not None:
-            params['mark'] = mark
-        else:
-            params['mark'] = 0
-
-        if date_from:
-            params['dateFrom'] = self._format_date(date_from)
-        if date_to:
-            params['dateTo'] = self._format_date(date_to)
-        if counter_vat_number:
-            params['counterVatNumber'] = counter_vat_number
-        if inv_type:
-            params['invType'] = inv_type
-        if max_mark:
-            params['maxMark'] = max_mark
-
+        params = self._docs_params(
+            date_from, date_to, mark if mark is not None else 0, max_mark,
+            counter_vat_number=counter_vat_number, inv_type=inv_type
+        )
         return self._make_request('GET', '/RequestDocs', params=params)
 
     def request_transmitted_docs(
@@ -940,6 +1157,51 @@ class MyDataClient:
         Returns:
             XML response string
         """
+        params = self._docs_params(date_from, date_to, mark, max_mark)
+        return self._make_request('GET', '/RequestTransmittedDocs', params=params)
+
+    def iter_docs(
+        self,
+        date_from: Optional[Union[date, datetime]] = None,
+        date_to: Optional[Union[date, datetime]] = None,
+        mark: Optional[int] = None,
+        counter_vat_number: Optional[str] = None,
+        inv_type: Optional[str] = None,
+        max_mark: Optional[int] = None
+    ) -> Generator[Dict, None, None]:
+        """
+        Streaming εκδοχή του request_docs() + parse_invoice_response().
+
+        Yields normalized invoice dicts όσο φτάνει η απάντηση, χωρίς να
+        κρατάει ολόκληρο το XML στη μνήμη.
+        """
+        params = self._docs_params(
+            date_from, date_to, mark if mark is not None else 0, max_mark,
+            counter_vat_number=counter_vat_number, inv_type=inv_type
+        )
+        yield from self._stream_invoices('/RequestDocs', params)
+
+    def iter_transmitted_docs(
+        self,
+        date_from: Optional[Union[date, datetime]] = None,
+        date_to: Optional[Union[date, datetime]] = None,
+        mark: Optional[int] = None,
+        max_mark: Optional[int] = None
+    ) -> Generator[Dict, None, None]:
+        """Streaming εκδοχή του request_transmitted_docs() + parse_invoice_response()"""
+        params = self._docs_params(date_from, date_to, mark, max_mark)
+        yield from self._stream_invoices('/RequestTransmittedDocs', params)
+
+    def _docs_params(
+        self,
+        date_from,
+        date_to,
+        mark: Optional[int],
+        max_mark: Optional[int],
+        counter_vat_number: Optional[str] = None,
+        inv_type: Optional[str] = None
+    ) -> Dict:
+        """Query params για RequestDocs/RequestTransmittedDocs"""
         params = {}
 
         if mark is not None:
@@ -949,10 +1211,29 @@ class MyDataClient:
             params['dateFrom'] = self._format_date(date_from)
         if date_to:
             params['dateTo'] = self._format_date(date_to)
+        if counter_vat_number:
+            params['counterVatNumber'] = counter_vat_number
+        if inv_type:
+            params['invType'] = inv_type
         if max_mark:
             params['maxMark'] = max_mark
 
-        return self._make_request('GET', '/RequestTransmittedDocs', params=params)
+        return params
+
+    def _stream_invoices(self, endpoint: str, params: Dict) -> Generator[Dict, None, None]:
+        """Streaming request + parse παραστατικών"""
+        response = self._stream_request('GET', endpoint, params=params)
+        count = 0
+        try:
+            for invoice in self.iter_invoices_xml(
+                response.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+            ):
+                count += 1
+                yield invoice
+        except ET.ParseError as e:
+            logger.error(f"XML Parse Error in {endpoint} response after {count} invoices: {e}")
+        finally:
+            response.close()
 
     # =========================================================================
     # SEND / CANCEL INVOICES
@@ -1007,56 +1288,8 @@ class MyDataClient:
 
         if isinstance(response, str):
             # XML response
-            ns = {'ns': 'http://www.aade.gr/myDATA/invoice/v1.0'}
-
             try:
-                root = ET.fromstring(response)
-
-                for inv_elem in root.findall('.//ns:invoice', ns):
-                    issuer = inv_elem.find('.//ns:issuer', ns)
-                    issuer_vat = None
-                    if issuer is not None:
-                        vat_elem = issuer.find('ns:vatNumber', ns)
-                        if vat_elem is not None:
-                            issuer_vat = vat_elem.text
-
-                    counterpart = inv_elem.find('.//ns:counterpart', ns)
-                    counterpart_vat = None
-                    if counterpart is not None:
-                        vat_elem = counterpart.find('ns:vatNumber', ns)
-                        if vat_elem is not None:
-                            counterpart_vat = vat_elem.text
-
-                    header = inv_elem.find('.//ns:invoiceHeader', ns)
-                    if header is None:
-                        continue
-
-                    def get_text(parent, tag):
-                        elem = parent.find(f'ns:{tag}', ns)
-                        return elem.text if elem is not None else ''
-
-                    summary = inv_elem.find('.//ns:invoiceSummary', ns)
-                    total_net = total_vat = total_gross = 0
-                    if summary is not None:
-                        total_net = float(get_text(summary, 'totalNetValue') or 0)
-                        total_vat = float(get_text(summary, 'totalVatAmount') or 0)
-                        total_gross = float(get_text(summary, 'totalGrossValue') or 0)
-
-                    invoices.append({
-                        'mark': None,
-                        'uid': None,
-                        'issuer_vat': issuer_vat,
-                        'counterpart_vat': counterpart_vat,
-                        'series': get_text(header, 'series'),
-                        'aa': get_text(header, 'aa'),
-                        'issue_date': get_text(header, 'issueDate'),
-                        'invoice_type': get_text(header, 'invoiceType'),
-                        'total_net': total_net,
-                        'total_vat': total_vat,
-                        'total_gross': total_gross,
-                        'details': []
-                    })
-
+                invoices, _ = _collect(self.iter_invoices_xml([response]))
             except ET.ParseError as e:
                 logger.error(f"XML Parse Error: {e}")
                 return []
@@ -1080,3 +1313,65 @@ class MyDataClient:
                 })
 
         return invoices
+
+    def iter_invoices_xml(self, chunks) -> Generator[Dict, None, None]:
+        """
+        Streaming parse απάντησης RequestDocs/RequestTransmittedDocs.
+
+        Yields normalized invoice dicts (ίδια μορφή με parse_invoice_response)
+        μόλις κλείσει κάθε <invoice>. Σφάλματα XML γίνονται raise ως ET.ParseError.
+        """
+        ns = {'ns': 'http://www.aade.gr/myDATA/invoice/v1.0'}
+        parser = StreamingXMLParser(tags=('invoice',))
+
+        for inv_elem in parser.iter_elements(chunks):
+            invoice = self._parse_invoice_element(inv_elem, ns)
+            if invoice is not None:
+                yield invoice
+
+    @staticmethod
+    def _parse_invoice_element(inv_elem: ET.Element, ns: dict) -> Optional[Dict]:
+        """Normalized dict από ένα <invoice> (None χωρίς invoiceHeader)"""
+        def get_text(parent, tag):
+            elem = parent.find(f'ns:{tag}', ns)
+            return elem.text if elem is not None else ''
+
+        issuer = inv_elem.find('.//ns:issuer', ns)
+        issuer_vat = None
+        if issuer is not None:
+            vat_elem = issuer.find('ns:vatNumber', ns)
+            if vat_elem is not None:
+                issuer_vat = vat_elem.text
+
+        counterpart = inv_elem.find('.//ns:counterpart', ns)
+        counterpart_vat = None
+        if counterpart is not None:
+            vat_elem = counterpart.find('ns:vatNumber', ns)
+            if vat_elem is not None:
+                counterpart_vat = vat_elem.text
+
+        header = inv_elem.find('.//ns:invoiceHeader', ns)
+        if header is None:
+            return None
+
+        summary = inv_elem.find('.//ns:invoiceSummary', ns)
+        total_net = total_vat = total_gross = 0
+        if summary is not None:
+            total_net = float(get_text(summary, 'totalNetValue') or 0)
+            total_vat = float(get_text(summary, 'totalVatAmount') or 0)
+            total_gross = float(get_text(summary, 'totalGrossValue') or 0)
+
+        return {
+            'mark': None,
+            'uid': None,
+            'issuer_vat': issuer_vat,
+            'counterpart_vat': counterpart_vat,
+            'series': get_text(header, 'series'),
+            'aa': get_text(header, 'aa'),
+            'issue_date': get_text(header, 'issueDate'),
+            'invoice_type': get_text(header, 'invoiceType'),
+            'total_net': total_net,
+            'total_vat': total_vat,
+            'total_gross': total_gross,
+            'details': []
+        }
@@ -0,0 +1,214 @@
+"""
+Django management command: python manage.py benchmark_mydata_parser
+
+Συγκρίνει τον παλιό DOM parser (html.unescape + ET.fromstring + root.iter())
+με τον streaming parser του MyDataClient σε μεγάλη απάντηση RequestVatInfo.
+Κάθε parser τρέχει σε ξεχωριστή διεργασία ώστε το peak RSS να μετράει μόνο
+τη δική του μνήμη.
+
+Usage:
+    python manage.py benchmark_mydata_parser --records 200000 --wrapped
+    python manage.py benchmark_mydata_parser --file recorded_vat_info.xml
+"""
+
+import html
+import multiprocessing
+import os
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+
+from django.core.management.base import BaseCommand, CommandError
+
+from mydata.client import MyDataClient, STREAM_CHUNK_SIZE
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+AADE_NS = 'http://www.aade.gr/myDATA/invoice/v1.0'
+WCF_NS = 'http://schemas.microsoft.com/2003/10/Serialization/'
+
+
+def _peak_rss_kb():
+    """Peak RSS της τρέχουσας διεργασίας σε KB (Linux: ru_maxrss σε KB)"""
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _parse_dom(client, path):
+    """Η παλιά προσέγγιση: όλο το έγγραφο στη μνήμη"""
+    with open(path, 'rb') as f:
+        response = f.read().decode('utf-8')
+
+    if response.strip().startswith('<string'):
+        response = html.unescape(ET.fromstring(response).text or '')
+
+    root = ET.fromstring(response)
+    count = 0
+    for elem in [e for e in root.iter() if e.tag.endswith('VatInfo')]:
+        count += len(client._parse_vat_info_element(elem))
+    return count
+
+
+def _parse_stream(client, path):
+    """Streaming parser, με chunks όπως από response.iter_content()"""
+    def chunks():
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(STREAM_CHUNK_SIZE)
+                if not chunk:
+                    return
+                yield chunk
+
+    return sum(1 for _ in client.iter_vat_info_xml(chunks()))
+
+
+PARSERS = {
+    'dom': _parse_dom,
+    'stream': _parse_stream,
+}
+
+
+def _run_parser(name, path, queue):
+    """Εκτελείται στη θυγατρική διεργασία"""
+    client = MyDataClient('benchmark', 'benchmark')
+    baseline = _peak_rss_kb()
+    started = time.perf_counter()
+    count = PARSERS[name](client, path)
+    elapsed = time.perf_counter() - started
+    peak = _peak_rss_kb()
+    queue.put({
+        'records': count,
+        'seconds': elapsed,
+        'peak_rss_kb': peak,
+        'rss_growth_kb': peak - baseline if peak is not None else None,
+    })
+
+
+def write_vat_info_response(path, records, wrapped=False):
+    """Γράφει συνθετική απάντηση RequestVatInfo με `records` VatInfo"""
+    def body():
+        yield '<?xml version="1.0" encoding="utf-8"?>'
+        yield f'<RequestedVatInfo xmlns="{AADE_NS}">'
+        for idx in range(records):
+            mark = 400000000000000 + idx * 2
+            day = idx % 28 + 1
+            if idx % 2:
+                amounts = (
+                    f'<Vat361>{idx % 1000}.50</Vat361>'
+                    f'<Vat381>{idx % 240}.12</Vat381>'
+                )
+            else:
+                amounts = (
+                    f'<Vat303>{idx % 1000}.00</Vat303>'
+                    f'<Vat333>{idx % 240}.00</Vat333>'
+                )
+            yield (
+                f'<VatInfo><Mark>{mark}</Mark><IsCancelled>false</IsCancelled>'
+                f'<IssueDate>2025-01-{day:02d}T00:00:00</IssueDate>{amounts}</VatInfo>'
+            )
+        yield '</RequestedVatInfo>'
+
+    with open(path, 'w', encoding='utf-8') as f:
+        if wrapped:
+            f.write(f'<string xmlns="{WCF_NS}">')
+            for part in body():
+                f.write(html.escape(part, quote=False))
+            f.write('</string>')
+        else:
+            for part in body():
+                f.write(part)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark: DOM vs streaming parser για απαντήσεις RequestVatInfo'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--file',
+            type=str,
+            help='Καταγεγραμμένη απάντηση RequestVatInfo (XML ή WCF <string>)'
+        )
+        parser.add_argument(
+            '--records',
+            type=int,
+            default=200000,
+            help='Πλήθος VatInfo για συνθετική απάντηση (default: 200000)'
+        )
+        parser.add_argument(
+            '--wrapped',
+            action='store_true',
+            help='Η συνθετική απάντηση τυλίγεται σε WCF <string> (HTML-encoded)'
+        )
+        parser.add_argument(
+            '--parsers',
+            nargs='+',
+            choices=sorted(PARSERS),
+            default=['dom', 'stream'],
+            help='Ποιοι parsers θα μετρηθούν'
+        )
+
+    def handle(self, *args, **options):
+        path = options['file']
+        generated = None
+
+        if path:
+            if not os.path.exists(path):
+                raise CommandError(f"Δεν βρέθηκε το αρχείο: {path}")
+        else:
+            fd, generated = tempfile.mkstemp(suffix='.xml', prefix='vat_info_')
+            os.close(fd)
+            write_vat_info_response(generated, options['records'], options['wrapped'])
+            path = generated
+
+        try:
+            size_mb = os.path.getsize(path) / (1024 * 1024)
+            self.stdout.write(f"Response: {path} ({size_mb:.1f} MB)")
+
+            results = {}
+            for name in options['parsers']:
+                results[name] = self._measure(name, path)
+                self._print_result(name, results[name])
+
+            if 'dom' in results and 'stream' in results:
+                self._print_comparison(results['dom'], results['stream'])
+        finally:
+            if generated:
+                os.unlink(generated)
+
+    def _measure(self, name, path):
+        """Τρέχει τον parser σε νέα διεργασία και επιστρέφει τις μετρήσεις"""
+        ctx = multiprocessing.get_context(
+            'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+        )
+        queue = ctx.Queue()
+        process = ctx.Process(target=_run_parser, args=(name, path, queue))
+        process.start()
+        result = queue.get()
+        process.join()
+        return result
+
+    def _print_result(self, name, result):
+        rss = (
+            f"peak RSS {result['peak_rss_kb'] / 1024:.1f} MB "
+            f"(+{result['rss_growth_kb'] / 1024:.1f} MB)"
+            if result['peak_rss_kb'] is not None else 'peak RSS n/a'
+        )
+        self.stdout.write(
+            f"  {name:<7} {result['records']} records in {result['seconds']:.2f}s, {rss}"
+        )
+
+    def _print_comparison(self, dom, stream):
+        if dom['records'] != stream['records']:
+            self.stdout.write(self.style.ERROR(
+                f"Διαφορετικό πλήθος records: dom={dom['records']} stream={stream['records']}"
+            ))
+        speedup = dom['seconds'] / stream['seconds'] if stream['seconds'] else 0
+        line = f"Streaming: {speedup:.2f}x χρόνος"
+        if dom['rss_growth_kb'] is not None:
+            saved = (dom['rss_growth_kb'] - stream['rss_growth_kb']) / 1024
+            line += f", -{saved:.1f} MB peak RSS"
+        self.stdout.write(self.style.SUCCESS(line))
@@ -15,16 +15,25 @@ Usage:
     # Sync VAT για ΟΛΟΥΣ τους πελάτες με credentials
     python manage.py mydata_sync_vat --all
 
+    # Παράλληλο sync με 8 workers και κοινό όριο 5 req/sec προς την ΑΑΔΕ
+    python manage.py mydata_sync_vat --all --workers=8 --rate=5
+
     # Dry run (δεν αποθηκεύει τίποτα)
     python manage.py mydata_sync_vat --client=123456789 --dry-run
 """
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
-from django.db import transaction
+from django.db import close_old_connections, connection, connections, transaction
 from django.utils import timezone
 from datetime import date, datetime, timedelta
 from calendar import monthrange
 import logging
+import math
+import threading
+import time
 
 from accounting.models import ClientProfile
 from mydata.models import MyDataCredentials, VATRecord, VATSyncLog
@@ -33,11 +42,43 @@ from mydata.client import (
     MyDataCredentialsNotFoundError,
     MyDataAuthError,
     MyDataAPIError,
+    RateLimiter,
 )
 
 logger = logging.getLogger(__name__)
 
 
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile (0 για κενή λίστα)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class SyncMetrics:
+    """Thread-safe συλλογή metrics για το summary στο τέλος του sync."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.request_latencies = []
+        self.client_durations = []
+        self.records_fetched = 0
+        self.clients_ok = 0
+        self.clients_failed = 0
+
+    def add_client(self, duration: float, latencies: list, fetched: int, failed: bool):
+        with self._lock:
+            self.client_durations.append(duration)
+            self.request_latencies.extend(latencies)
+            self.records_fetched += fetched
+            if failed:
+                self.clients_failed += 1
+            else:
+                self.clients_ok += 1
+
+
 class Command(BaseCommand):
     help = 'Sync VAT data from myDATA for specified client(s)'
 
@@ -107,16 +148,60 @@ class Command(BaseCommand):
             help='Να μην διαγράψει τα παλιά records'
         )
 
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Εγγραφές ανά bulk upsert (default: 1000)'
+        )
+
+        # Concurrency
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Αριθμός πελατών που συγχρονίζονται παράλληλα (default: 1)'
+        )
+        parser.add_argument(
+            '--rate',
+            type=float,
+            default=None,
+            help='Κοινό όριο requests/sec προς την ΑΑΔΕ για όλους τους workers '
+                 '(default: MYDATA_GLOBAL_REQUESTS_PER_SECOND)'
+        )
+
     def handle(self, *args, **options):
         self.dry_run = options['dry_run']
         self.verbose = options['verbose']
         self.clear_before_sync = options['clear'] and not options['no_clear']
+        self.workers = options['workers']
+        self.batch_size = options['batch_size']
+        rate = options['rate'] or getattr(settings, 'MYDATA_GLOBAL_REQUESTS_PER_SECOND', 5.0)
 
         # Validate arguments
         if not options['client'] and not options['all']:
             raise CommandError(
                 "Πρέπει να δώσεις --client=ΑΦΜ ή --all"
             )
+        if self.workers < 1:
+            raise CommandError("Το --workers πρέπει να είναι >= 1")
+        if self.batch_size < 1:
+            raise CommandError("Το --batch-size πρέπει να είναι >= 1")
+        if rate <= 0:
+            raise CommandError("Το --rate πρέπει να είναι > 0")
+
+        # Κοινός προϋπολογισμός requests για όλους τους workers
+        self.shared_rate_limiter = RateLimiter(rate)
+        self.metrics = SyncMetrics()
+        self._local = threading.local()
+        self._output_lock = threading.Lock()
+        # Η SQLite δέχεται έναν writer τη φορά: με πολλούς workers οι εγγραφές
+        # σειριοποιούνται, αλλιώς γυρίζει "database table is locked"
+        self._db_write_lock = (
+            threading.Lock()
+            if self.workers > 1 and connection.vendor == 'sqlite'
+            else nullcontext()
+        )
 
         # Parse date range
         date_from, date_to = self._parse_date_range(options)
@@ -142,20 +227,41 @@ class Command(BaseCommand):
             return
 
         self.stdout.write(f"Πελάτες για sync: {len(clients)}")
+        if self.workers > 1:
+            self.stdout.write(f"Workers: {self.workers} (κοινό όριο {rate:g} req/sec)")
         self.stdout.write("")
 
         # Sync each client
         total_created = 0
         total_updated = 0
         total_errors = 0
+        started = time.perf_counter()
 
-        for client in clients:
-            created, updated, errors = self._sync_client_vat(
-                client, date_from, date_to
+        if self.workers == 1:
+            results = (
+                self._sync_client_isolated(client, date_from, date_to)
+                for client in clients
             )
-            total_created += created
-            total_updated += updated
-            total_errors += errors
+            for created, updated, errors in results:
+                total_created += created
+                total_updated += updated
+                total_errors += errors
+        else:
+            with ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix='mydata-sync'
+            ) as executor:
+                futures = [
+                    executor.submit(self._sync_client_isolated, client, date_from, date_to)
+                    for client in clients
+                ]
+                for future in as_completed(futures):
+                    created, updated, errors = future.result()
+                    total_created += created
+                    total_updated += updated
+                    total_errors += errors
+
+        elapsed = time.perf_counter() - started
 
         # Summary
         self.stdout.write("")
@@ -165,8 +271,91 @@ class Command(BaseCommand):
         self.stdout.write(f"  Ενημερωμένες: {total_updated}")
         if total_errors:
             self.stdout.write(self.style.ERROR(f"  Σφάλματα: {total_errors}"))
+        self._print_metrics(elapsed)
         self.stdout.write("=" * 60)
 
+    def _print_metrics(self, elapsed: float):
+        """Throughput και latency percentiles."""
+        metrics = self.metrics
+        latencies_ms = [value * 1000 for value in metrics.request_latencies]
+        durations = metrics.client_durations
+
+        self.stdout.write(
+            f"  Πελάτες: {metrics.clients_ok} OK, {metrics.clients_failed} αποτυχίες "
+            f"σε {elapsed:.1f}s"
+        )
+        if elapsed > 0:
+            self.stdout.write(
+                f"  Throughput: {metrics.records_fetched / elapsed:.1f} records/s, "
+                f"{len(durations) * 60 / elapsed:.1f} πελάτες/λεπτό"
+            )
+        self.stdout.write(
+            f"  Requests: {len(latencies_ms)} | latency p50={percentile(latencies_ms, 50):.0f}ms "
+            f"p95={percentile(latencies_ms, 95):.0f}ms p99={percentile(latencies_ms, 99):.0f}ms"
+        )
+        self.stdout.write(
+            f"  Διάρκεια ανά πελάτη: p50={percentile(durations, 50):.1f}s "
+            f"p95={percentile(durations, 95):.1f}s max={max(durations, default=0):.1f}s"
+        )
+
+    def _write(self, message: str):
+        """
+        Output ενός πελάτη. Στο παράλληλο sync μαζεύεται ανά thread και
+        τυπώνεται ενιαία όταν τελειώσει ο πελάτης, ώστε να μην ανακατεύεται.
+        """
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is not None:
+            buffer.append(message)
+        else:
+            self.stdout.write(message)
+
+    def _sync_client_isolated(
+        self,
+        client: ClientProfile,
+        date_from: date,
+        date_to: date
+    ) -> tuple[int, int, int]:
+        """
+        Sync ενός πελάτη με απομόνωση: δικό του output buffer, δικό του
+        API client/sync log, και καμία εξαίρεση δεν περνά στους υπόλοιπους.
+        """
+        threaded = self.workers > 1
+        if threaded:
+            close_old_connections()
+            self._local.buffer = []
+
+        self._local.api_client = None
+        self._local.records_fetched = 0
+        self._local.failed = False
+        started = time.perf_counter()
+        result = (0, 0, 1)
+
+        try:
+            result = self._sync_client_vat(client, date_from, date_to)
+        except Exception as e:
+            logger.exception(f"VAT sync worker crashed for {client.afm}")
+            self._write(self.style.ERROR(f"  Unexpected error: {str(e)}"))
+            self._local.failed = True
+        finally:
+            api_client = self._local.api_client
+            self.metrics.add_client(
+                duration=time.perf_counter() - started,
+                latencies=api_client.request_latencies if api_client else [],
+                fetched=self._local.records_fetched,
+                failed=self._local.failed,
+            )
+
+            if threaded:
+                buffer = self._local.buffer
+                self._local.buffer = None
+                with self._output_lock:
+                    for message in buffer:
+                        self.stdout.write(message)
+                # Κάθε thread έχει δική του DB connection
+                connections.close_all()
+
+        return result
+
     def _parse_date_range(self, options) -> tuple[date, date]:
         """Parse date range from command options."""
         today = date.today()
@@ -241,39 +430,42 @@ class Command(BaseCommand):
         Returns:
             Tuple (created, updated, errors)
         """
-        self.stdout.write(f"\n{'='*60}")
-        self.stdout.write(f"Πελάτης: {client.eponimia} ({client.afm})")
-        self.stdout.write(f"{'='*60}")
+        self._write(f"\n{'='*60}")
+        self._write(f"Πελάτης: {client.eponimia} ({client.afm})")
+        self._write(f"{'='*60}")
 
         # Check credentials
         try:
             credentials = client.mydata_credentials
         except MyDataCredentials.DoesNotExist:
-            self.stdout.write(
+            self._write(
                 self.style.ERROR(
                     f"  Δεν υπάρχουν myDATA credentials για τον πελάτη {client.afm}"
                 )
             )
+            self._local.failed = True
             return 0, 0, 1
 
         if not credentials.has_credentials:
-            self.stdout.write(
+            self._write(
                 self.style.ERROR(
                     f"  Τα credentials δεν έχουν συμπληρωθεί"
                 )
             )
+            self._local.failed = True
             return 0, 0, 1
 
         # Create sync log
         sync_log = None
         if not self.dry_run:
-            sync_log = VATSyncLog.objects.create(
-                client=client,
-                sync_type='VAT_INFO',
-                status='PENDING',
-                date_from=date_from,
-                date_to=date_to
-            )
+            with self._db_write_lock:
+                sync_log = VATSyncLog.objects.create(
+                    client=client,
+                    sync_type='VAT_INFO',
+                    status='PENDING',
+                    date_from=date_from,
+                    date_to=date_to
+                )
 
         created = 0
         updated = 0
@@ -283,95 +475,173 @@ class Command(BaseCommand):
         try:
             # Clear existing records for this period if requested
             if self.clear_before_sync and not self.dry_run:
-                deleted = VATRecord.objects.filter(
-                    client=client,
-                    issue_date__gte=date_from,
-                    issue_date__lte=date_to
-                ).delete()[0]
+                with self._db_write_lock:
+                    deleted = VATRecord.objects.filter(
+                        client=client,
+                        issue_date__gte=date_from,
+                        issue_date__lte=date_to
+                    ).delete()[0]
                 if deleted > 0:
-                    self.stdout.write(
+                    self._write(
                         self.style.WARNING(f"  Διαγράφηκαν {deleted} παλιά records")
                     )
 
             # Get API client
-            api_client = credentials.get_api_client()
+            api_client = credentials.get_api_client(
+                shared_rate_limiter=self.shared_rate_limiter
+            )
+            self._local.api_client = api_client
 
             env = "SANDBOX" if credentials.is_sandbox else "PRODUCTION"
-            self.stdout.write(f"  Environment: {env}")
-            self.stdout.write(f"  Fetching VAT info...")
+            self._write(f"  Environment: {env}")
+            self._write(f"  Fetching VAT info...")
 
-            # Fetch VAT records
+            # Fetch VAT records - buffered σε batches ώστε η μνήμη να μένει
+            # σταθερή όσες σελίδες κι αν επιστρέψει το API
             records_fetched = 0
+            batch = []
 
             for vat_record in api_client.request_vat_info(
                 date_from=date_from,
                 date_to=date_to
             ):
                 records_fetched += 1
+                self._local.records_fetched = records_fetched
 
                 if self.verbose:
                     self._print_vat_record(vat_record)
 
                 if not self.dry_run:
-                    try:
-                        is_created = self._save_vat_record(client, vat_record)
-                        if is_created:
-                            created += 1
-                        else:
-                            updated += 1
-                    except Exception as e:
-                        logger.error(f"Error saving VAT record: {e}")
-                        errors += 1
+                    batch.append(vat_record)
+                    if len(batch) >= self.batch_size:
+                        batch_created, batch_updated, batch_errors = self._save_vat_batch(
+                            client, batch, sync_log
+                        )
+                        created += batch_created
+                        updated += batch_updated
+                        errors += batch_errors
+                        batch = []
+
+            if batch:
+                batch_created, batch_updated, batch_errors = self._save_vat_batch(
+                    client, batch, sync_log
+                )
+                created += batch_created
+                updated += batch_updated
+                errors += batch_errors
 
-            self.stdout.write(f"  Fetched: {records_fetched} records")
+            self._write(f"  Fetched: {records_fetched} records")
 
             if not self.dry_run:
-                self.stdout.write(
+                self._write(
                     self.style.SUCCESS(
                         f"  Created: {created}, Updated: {updated}, Errors: {errors}"
                     )
                 )
 
-                # Update sync log
-                if sync_log:
-                    sync_log.records_fetched = records_fetched
-                    sync_log.records_created = created
-                    sync_log.records_updated = updated
-                    sync_log.records_failed = errors
-                    sync_log.mark_completed(
-                        'SUCCESS' if errors == 0 else 'PARTIAL'
-                    )
+                with self._db_write_lock:
+                    # Update sync log (οι μετρητές ενημερώνονται ανά batch)
+                    if sync_log:
+                        sync_log.details = self._sync_details(api_client)
+                        sync_log.mark_completed(
+                            'SUCCESS' if errors == 0 else 'PARTIAL'
+                        )
 
-                # Update credentials last sync
-                credentials.mark_vat_sync_completed()
+                    # Update credentials last sync
+                    credentials.mark_vat_sync_completed()
 
         except MyDataAuthError as e:
-            self.stdout.write(
+            self._write(
                 self.style.ERROR(f"  Authentication failed: {e.message}")
             )
             if sync_log:
-                sync_log.mark_failed(e.message)
+                sync_log.details = self._sync_details(self._local.api_client)
+                with self._db_write_lock:
+                    sync_log.mark_failed(e.message)
+            self._local.failed = True
             return 0, 0, 1
 
         except MyDataAPIError as e:
-            self.stdout.write(
+            self._write(
                 self.style.ERROR(f"  API Error: {e.message}")
             )
             if sync_log:
-                sync_log.mark_failed(e.message)
+                sync_log.details = self._sync_details(self._local.api_client)
+                with self._db_write_lock:
+                    sync_log.mark_failed(e.message)
+            self._local.failed = True
             return 0, 0, 1
 
         except Exception as e:
-            self.stdout.write(
+            self._write(
                 self.style.ERROR(f"  Unexpected error: {str(e)}")
             )
             logger.exception(f"Unexpected error syncing VAT for {client.afm}")
             if sync_log:
-                sync_log.mark_failed(str(e))
+                sync_log.details = self._sync_details(self._local.api_client)
+                with self._db_write_lock:
+                    sync_log.mark_failed(str(e))
+            self._local.failed = True
             return 0, 0, 1
 
         return created, updated, errors
 
+    def _sync_details(self, api_client) -> dict:
+        """Request metrics του πελάτη για το VATSyncLog.details."""
+        latencies_ms = [value * 1000 for value in (api_client.request_latencies if api_client else [])]
+        return {
+            'requests': len(latencies_ms),
+            'latency_ms_p50': round(percentile(latencies_ms, 50), 1),
+            'latency_ms_p95': round(percentile(latencies_ms, 95), 1),
+            'worker': threading.current_thread().name,
+        }
+
+    def _save_vat_batch(
+        self,
+        client: ClientProfile,
+        batch: list,
+        sync_log
+    ) -> tuple[int, int, int]:
+        """
+        Αποθήκευση ενός batch με VATRecord.bulk_upsert.
+
+        Αν το batch αποτύχει, ξαναδοκιμάζεται εγγραφή-εγγραφή ώστε να
+        μετρηθούν ακριβώς οι αποτυχημένες εγγραφές.
+
+        Returns:
+            Tuple (created, updated, errors)
+        """
+        with self._db_write_lock:
+            try:
+                with transaction.atomic():
+                    created, updated = VATRecord.bulk_upsert(client, batch)
+                errors = 0
+            except Exception as e:
+                logger.warning(
+                    f"Bulk upsert failed for {client.afm} ({len(batch)} records), "
+                    f"falling back to per-record save: {e}"
+                )
+                created = updated = errors = 0
+                for vat_record in batch:
+                    try:
+                        if self._save_vat_record(client, vat_record):
+                            created += 1
+                        else:
+                            updated += 1
+                    except Exception as e:
+                        logger.error(f"Error saving VAT record: {e}")
+                        errors += 1
+
+            if sync_log:
+                sync_log.increment_stats(
+                    fetched=len(batch),
+                    created=created,
+                    updated=updated,
+                    failed=errors
+                )
+
+        return created, updated, errors
+
     def _save_vat_record(self, client: ClientProfile, vat_record) -> bool:
         """
         Save or update a VAT record.
@@ -403,7 +673,7 @@ class Command(BaseCommand):
     def _print_vat_record(self, vat_record):
         """Print VAT record details (verbose mode)."""
         type_str = "Εκροή" if vat_record.rec_type == 1 else "Εισροή"
-        self.stdout.write(
+        self._write(
             f"    [{vat_record.mark}] {type_str} | "
             f"{vat_record.issue_date} | "
             f"Net: {vat_record.net_value} | "
@@ -0,0 +1,66 @@
+# mydata/management/commands/rebuild_vat_aggregates.py
+"""
+Management command για πλήρη ανακατασκευή των μηνιαίων συνόλων ΦΠΑ
+(VATMonthlyAggregate) από τα VATRecord.
+
+Usage:
+    # Όλοι οι πελάτες
+    python manage.py rebuild_vat_aggregates
+
+    # Συγκεκριμένος πελάτης / έτος
+    python manage.py rebuild_vat_aggregates --client=123456789 --year=2025
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from accounting.models import ClientProfile
+from mydata.models import VATMonthlyAggregate
+
+
+class Command(BaseCommand):
+    help = 'Ανακατασκευή των μηνιαίων συνόλων ΦΠΑ (VATMonthlyAggregate) από τα VATRecord'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--client',
+            type=str,
+            help='ΑΦΜ πελάτη (default: όλοι)'
+        )
+        parser.add_argument(
+            '--year',
+            type=int,
+            help='Μόνο για συγκεκριμένο έτος'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Γραμμές ανά bulk insert (default: 1000)'
+        )
+
+    def handle(self, *args, **options):
+        client = None
+        if options['client']:
+            try:
+                client = ClientProfile.objects.get(afm=options['client'])
+            except ClientProfile.DoesNotExist:
+                raise CommandError(f"Δεν βρέθηκε πελάτης με ΑΦΜ: {options['client']}")
+
+        started = time.perf_counter()
+        with transaction.atomic():
+            total = VATMonthlyAggregate.rebuild(
+                client=client,
+                year=options['year'],
+                batch_size=options['batch_size']
+            )
+        elapsed = time.perf_counter() - started
+
+        scope = client.afm if client else 'όλοι οι πελάτες'
+        if options['year']:
+            scope += f", {options['year']}"
+        self.stdout.write(self.style.SUCCESS(
+            f"Μηνιαία σύνολα ΦΠΑ ({scope}): {total} γραμμές σε {elapsed:.2f}s"
+        ))
@@ -0,0 +1,147 @@
+# Generated by Django 5.0.14 on 2026-10-16 20:12
+
+import django.core.validators
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def populate_vat_aggregates(apps, schema_editor):
+    """Αρχικό γέμισμα των μηνιαίων συνόλων από τα υπάρχοντα VATRecord."""
+    VATRecord = apps.get_model("mydata", "VATRecord")
+    VATMonthlyAggregate = apps.get_model("mydata", "VATMonthlyAggregate")
+
+    grouped = (
+        VATRecord.objects.filter(is_cancelled=False)
+        .annotate(agg_year=ExtractYear("issue_date"), agg_month=ExtractMonth("issue_date"))
+        .values("client_id", "agg_year", "agg_month", "rec_type", "vat_category")
+        .annotate(
+            total_net=Sum("net_value"),
+            total_vat=Sum("vat_amount"),
+            record_count=Count("id"),
+        )
+        .order_by()
+    )
+
+    VATMonthlyAggregate.objects.bulk_create(
+        [
+            VATMonthlyAggregate(
+                client_id=row["client_id"],
+                year=row["agg_year"],
+                month=row["agg_month"],
+                rec_type=row["rec_type"],
+                vat_category=row["vat_category"],
+                net_value=row["total_net"] or Decimal("0.00"),
+                vat_amount=row["total_vat"] or Decimal("0.00"),
+                record_count=row["record_count"],
+            )
+            for row in grouped.iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounting", "10001_remove_clientprofile_client_afm_idx_and_more"),
+        ("mydata", "0003_remove_vatrecord_unique_client_mark_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VATMonthlyAggregate",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("year", models.IntegerField(verbose_name="Έτος")),
+                (
+                    "month",
+                    models.IntegerField(
+                        validators=[
+                            django.core.validators.MinValueValidator(1),
+                            django.core.validators.MaxValueValidator(12),
+                        ],
+                        verbose_name="Μήνας",
+                    ),
+                ),
+                (
+                    "rec_type",
+                    models.IntegerField(
+                        choices=[(1, "Εκροές (Έσοδα)"), (2, "Εισροές (Έξοδα)")],
+                        verbose_name="Τύπος",
+                    ),
+                ),
+                (
+                    "vat_category",
+                    models.IntegerField(
+                        choices=[
+                            (1, "ΦΠΑ 24%"),
+                            (2, "ΦΠΑ 13%"),
+                            (3, "ΦΠΑ 6%"),
+                            (4, "ΦΠΑ 17%"),
+                            (5, "ΦΠΑ 9%"),
+                            (6, "ΦΠΑ 4%"),
+                            (7, "ΦΠΑ 0%"),
+                            (8, "Χωρίς ΦΠΑ"),
+                        ],
+                        verbose_name="Κατηγορία ΦΠΑ",
+                    ),
+                ),
+                (
+                    "net_value",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=Decimal("0.00"),
+                        max_digits=15,
+                        verbose_name="Καθαρή Αξία",
+                    ),
+                ),
+                (
+                    "vat_amount",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=Decimal("0.00"),
+                        max_digits=15,
+                        verbose_name="Ποσό ΦΠΑ",
+                    ),
+                ),
+                (
+                    "record_count",
+                    models.IntegerField(default=0, verbose_name="Πλήθος Εγγραφών"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Ημ/νία Ενημέρωσης"),
+                ),
+                (
+                    "client",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="vat_monthly_aggregates",
+                        to="accounting.clientprofile",
+                        verbose_name="Πελάτης",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Μηνιαίο Σύνολο ΦΠΑ",
+                "verbose_name_plural": "Μηνιαία Σύνολα ΦΠΑ",
+                "ordering": ["-year", "-month", "rec_type", "vat_category"],
+                "indexes": [
+                    models.Index(fields=["year", "month"], name="mydata_vatm_year_e7580a_idx")
+                ],
+                "unique_together": {("client", "year", "month", "rec_type", "vat_category")},
+            },
+        ),
+        migrations.RunPython(populate_vat_aggregates, migrations.RunPython.noop),
+    ]
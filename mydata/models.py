@@ -5,6 +5,7 @@ Models για myDATA Integration (ΑΑΔΕ Ηλεκτρονικά Βιβλία)
 Περιλαμβάνει:
 - MyDataCredentials: Per-client encrypted credentials
 - VATRecord: Αναλυτικά VAT records από RequestVatInfo
+- VATMonthlyAggregate: Μηνιαία σύνολα ΦΠΑ (rollup των VATRecord)
 - MyDataSyncLog: Logging για sync operations
 """
 
@@ -12,8 +13,12 @@ from django.db import models
 from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
+from datetime import date
 from decimal import Decimal
+from functools import reduce
+import calendar
 import logging
+import operator
 
 from .encryption import encrypt_value, decrypt_value, safe_decrypt, is_encrypted
 
@@ -229,16 +234,20 @@ class MyDataCredentials(models.Model):
         """Shortcut to client's AFM."""
         return self.client.afm if self.client else ''
 
-    def get_api_client(self):
+    def get_api_client(self, shared_rate_limiter=None):
         """
         Δημιουργεί MyDataClient instance με τα credentials αυτού του πελάτη.
 
+        Args:
+            shared_rate_limiter: Κοινός RateLimiter όταν γίνεται παράλληλο sync
+
         Returns:
             MyDataClient instance
 
         Raises:
             ValueError: Αν δεν υπάρχουν credentials
         """
+        from django.conf import settings
         from .client import MyDataClient, MyDataCredentialsNotFoundError
 
         if not self.has_credentials:
@@ -247,7 +256,9 @@ class MyDataCredentials(models.Model):
         return MyDataClient(
             user_id=self.user_id,
             subscription_key=self.subscription_key,
-            is_sandbox=self.is_sandbox
+            is_sandbox=self.is_sandbox,
+            shared_rate_limiter=shared_rate_limiter,
+            base_url=getattr(settings, 'MYDATA_BASE_URL', '') or None
         )
 
     def verify_credentials(self) -> bool:
@@ -326,7 +337,7 @@ class VATRecord(models.Model):
     Αναλυτική εγγραφή ΦΠΑ από myDATA RequestVatInfo.
 
     Κάθε record αντιστοιχεί σε μία VatInfo εγγραφή από το API.
-    Τα summaries υπολογίζονται on-the-fly από αυτά τα records.
+    Τα μηνιαία σύνολα διατηρούνται στο VATMonthlyAggregate.
     """
 
     REC_TYPE_CHOICES = [
@@ -680,6 +691,335 @@ class VATRecord(models.Model):
             .order_by('vat_category')
         )
 
+    # =========================================================================
+    # BULK INGESTION
+    # =========================================================================
+
+    # Πεδία που έρχονται από το RequestVatInfo και ενημερώνονται σε κάθε sync
+    SYNC_FIELDS = [
+        'is_cancelled', 'issue_date', 'rec_type', 'inv_type', 'vat_category',
+        'vat_exemption_category', 'net_value', 'vat_amount', 'counter_vat_number',
+        'vat_offset_amount', 'deductions_amount',
+    ]
+
+    @classmethod
+    def from_vat_info(cls, client, vat_record) -> 'VATRecord':
+        """Unsaved VATRecord από ένα client.VatInfoRecord."""
+        return cls(
+            client=client,
+            mark=vat_record.mark,
+            is_cancelled=vat_record.is_cancelled,
+            issue_date=vat_record.issue_date,
+            rec_type=vat_record.rec_type,
+            inv_type=vat_record.inv_type,
+            vat_category=vat_record.vat_category,
+            vat_exemption_category=vat_record.vat_exemption_category or '',
+            net_value=vat_record.net_value,
+            vat_amount=vat_record.vat_amount,
+            counter_vat_number=vat_record.counter_vat_number or '',
+            vat_offset_amount=vat_record.vat_offset_amount,
+            deductions_amount=vat_record.deductions_amount,
+        )
+
+    @classmethod
+    def bulk_upsert(cls, client, vat_records: list) -> tuple[int, int]:
+        """
+        Insert/update ενός batch VatInfoRecord για έναν πελάτη.
+
+        Ένα query για τα υπάρχοντα marks και μετά native upsert
+        (INSERT ... ON CONFLICT) όπου υποστηρίζεται, αλλιώς
+        bulk_create + bulk_update. Ίδια σημασιολογία με update_or_create
+        ανά εγγραφή: διπλό mark μέσα στο batch μετράει ως ενημέρωση.
+
+        Returns:
+            Tuple (created, updated)
+        """
+        from django.db import connections
+
+        rows = {}
+        duplicates = 0
+        for vat_record in vat_records:
+            if vat_record.mark in rows:
+                duplicates += 1
+            rows[vat_record.mark] = cls.from_vat_info(client, vat_record)
+
+        if not rows:
+            return 0, 0
+
+        existing = {}
+        # Μήνες που αλλάζουν: νέες ημερομηνίες + παλιές των υπαρχόντων
+        months = {(r.issue_date.year, r.issue_date.month) for r in rows.values()}
+        for mark, pk, issue_date in (
+            cls.objects.filter(client=client, mark__in=list(rows))
+            .values_list('mark', 'id', 'issue_date')
+        ):
+            existing[mark] = pk
+            months.add((issue_date.year, issue_date.month))
+        created = len(rows) - len(existing)
+        updated = len(existing) + duplicates
+
+        now = timezone.now()
+        for record in rows.values():
+            record.updated_at = now
+
+        features = connections[cls.objects.db].features
+        if features.supports_update_conflicts_with_target:
+            cls.objects.bulk_create(
+                list(rows.values()),
+                update_conflicts=True,
+                unique_fields=['client', 'mark'],
+                update_fields=cls.SYNC_FIELDS + ['updated_at'],
+            )
+            VATMonthlyAggregate.refresh_months(client.pk, months)
+            return created, updated
+
+        new_records = []
+        existing_records = []
+        for mark, record in rows.items():
+            if mark in existing:
+                record.pk = existing[mark]
+                existing_records.append(record)
+            else:
+                new_records.append(record)
+
+        if new_records:
+            cls.objects.bulk_create(new_records)
+        if existing_records:
+            cls.objects.bulk_update(existing_records, cls.SYNC_FIELDS + ['updated_at'])
+
+        VATMonthlyAggregate.refresh_months(client.pk, months)
+        return created, updated
+
+
+# =============================================================================
+# VAT MONTHLY AGGREGATE
+# =============================================================================
+
+class VATMonthlyAggregate(models.Model):
+    """
+    Μηνιαία σύνολα ΦΠΑ ανά πελάτη, τύπο (εκροές/εισροές) και κατηγορία ΦΠΑ.
+
+    Rollup των μη ακυρωμένων VATRecord ώστε dashboards και υπολογισμοί
+    περιόδων να διαβάζουν λίγες γραμμές αντί για aggregates ανά πελάτη/μήνα.
+    Ενημερώνεται ανά μήνα από το VATRecord.bulk_upsert και από signals σε
+    save/delete. Πλήρης ανακατασκευή: `python manage.py rebuild_vat_aggregates`.
+    """
+
+    client = models.ForeignKey(
+        'accounting.ClientProfile',
+        on_delete=models.CASCADE,
+        related_name='vat_monthly_aggregates',
+        verbose_name='Πελάτης'
+    )
+
+    year = models.IntegerField(verbose_name='Έτος')
+
+    month = models.IntegerField(
+        verbose_name='Μήνας',
+        validators=[MinValueValidator(1), MaxValueValidator(12)]
+    )
+
+    rec_type = models.IntegerField(
+        verbose_name='Τύπος',
+        choices=VATRecord.REC_TYPE_CHOICES
+    )
+
+    vat_category = models.IntegerField(
+        verbose_name='Κατηγορία ΦΠΑ',
+        choices=VATRecord.VAT_CATEGORY_CHOICES
+    )
+
+    net_value = models.DecimalField(
+        verbose_name='Καθαρή Αξία',
+        max_digits=15,
+        decimal_places=2,
+        default=Decimal('0.00')
+    )
+
+    vat_amount = models.DecimalField(
+        verbose_name='Ποσό ΦΠΑ',
+        max_digits=15,
+        decimal_places=2,
+        default=Decimal('0.00')
+    )
+
+    record_count = models.IntegerField(
+        verbose_name='Πλήθος Εγγραφών',
+        default=0
+    )
+
+    updated_at = models.DateTimeField(
+        verbose_name='Ημ/νία Ενημέρωσης',
+        auto_now=True
+    )
+
+    class Meta:
+        verbose_name = 'Μηνιαίο Σύνολο ΦΠΑ'
+        verbose_name_plural = 'Μηνιαία Σύνολα ΦΠΑ'
+        ordering = ['-year', '-month', 'rec_type', 'vat_category']
+        unique_together = [['client', 'year', 'month', 'rec_type', 'vat_category']]
+        indexes = [
+            models.Index(fields=['year', 'month']),
+        ]
+
+    def __str__(self):
+        type_str = "Εκροές" if self.rec_type == 1 else "Εισροές"
+        return f"{self.client_id} | {self.month}/{self.year} | {type_str} | {self.net_value}+{self.vat_amount}"
+
+    @property
+    def gross_value(self) -> Decimal:
+        """Συνολική αξία (καθαρή + ΦΠΑ)."""
+        return self.net_value + self.vat_amount
+
+    # =========================================================================
+    # MAINTENANCE
+    # =========================================================================
+
+    @classmethod
+    def _aggregate_records(cls, records) -> list:
+        """Unsaved aggregates από queryset VATRecord (ένα GROUP BY query)."""
+        from django.db.models import Count, Sum
+        from django.db.models.functions import ExtractMonth, ExtractYear
+
+        grouped = (
+            records.filter(is_cancelled=False)
+            .annotate(agg_year=ExtractYear('issue_date'), agg_month=ExtractMonth('issue_date'))
+            .values('client_id', 'agg_year', 'agg_month', 'rec_type', 'vat_category')
+            .annotate(
+                total_net=Sum('net_value'),
+                total_vat=Sum('vat_amount'),
+                record_count=Count('id')
+            )
+            .order_by()
+        )
+
+        return [
+            cls(
+                client_id=row['client_id'],
+                year=row['agg_year'],
+                month=row['agg_month'],
+                rec_type=row['rec_type'],
+                vat_category=row['vat_category'],
+                net_value=row['total_net'] or Decimal('0.00'),
+                vat_amount=row['total_vat'] or Decimal('0.00'),
+                record_count=row['record_count'],
+            )
+            for row in grouped.iterator()
+        ]
+
+    @classmethod
+    def refresh_months(cls, client_id: int, months) -> None:
+        """
+        Επανυπολογίζει τους μήνες `months` [(year, month), ...] ενός πελάτη.
+
+        Σταθερός αριθμός queries (aggregate, delete, insert) ανεξάρτητα από
+        το πλήθος μηνών και εγγραφών.
+        """
+        months = set(months)
+        if not months:
+            return
+
+        date_ranges = reduce(operator.or_, (
+            models.Q(
+                issue_date__gte=date(year, month, 1),
+                issue_date__lte=date(year, month, calendar.monthrange(year, month)[1]),
+            )
+            for year, month in months
+        ))
+        period_filter = reduce(operator.or_, (
+            models.Q(year=year, month=month) for year, month in months
+        ))
+
+        aggregates = cls._aggregate_records(
+            VATRecord.objects.filter(date_ranges, client_id=client_id)
+        )
+        cls.objects.filter(period_filter, client_id=client_id).delete()
+        cls.objects.bulk_create(aggregates)
+
+    @classmethod
+    def rebuild(cls, client=None, year: int = None, batch_size: int = 1000) -> int:
+        """
+        Πλήρης ανακατασκευή από τα VATRecord (όλοι ή ένας πελάτης / έτος).
+
+        Returns:
+            Πλήθος γραμμών που δημιουργήθηκαν
+        """
+        records = VATRecord.objects.all()
+        existing = cls.objects.all()
+        if client is not None:
+            records = records.filter(client=client)
+            existing = existing.filter(client=client)
+        if year is not None:
+            records = records.filter(issue_date__year=year)
+            existing = existing.filter(year=year)
+
+        aggregates = cls._aggregate_records(records)
+        existing.delete()
+        cls.objects.bulk_create(aggregates, batch_size=batch_size)
+        return len(aggregates)
+
+    # =========================================================================
+    # QUERIES
+    # =========================================================================
+
+    @classmethod
+    def for_months(cls, year: int, months, client=None):
+        """Queryset για συγκεκριμένους μήνες ενός έτους (όλοι ή ένας πελάτης)."""
+        qs = cls.objects.filter(year=year, month__in=list(months))
+        if client is not None:
+            qs = qs.filter(client=client)
+        return qs
+
+    @staticmethod
+    def totals_by_rec_type(rows) -> dict:
+        """
+        Σύνολα ανά rec_type από γραμμές aggregates.
+
+        Returns:
+            {1: {...}, 2: {...}} με net_value, vat_amount, gross_value, count
+        """
+        totals = {
+            rec_type: {'net_value': Decimal('0.00'), 'vat_amount': Decimal('0.00'), 'count': 0}
+            for rec_type in (1, 2)
+        }
+        for row in rows:
+            bucket = totals.setdefault(
+                row.rec_type,
+                {'net_value': Decimal('0.00'), 'vat_amount': Decimal('0.00'), 'count': 0}
+            )
+            bucket['net_value'] += row.net_value
+            bucket['vat_amount'] += row.vat_amount
+            bucket['count'] += row.record_count
+
+        for bucket in totals.values():
+            bucket['gross_value'] = bucket['net_value'] + bucket['vat_amount']
+        return totals
+
+    @staticmethod
+    def by_category(rows, rec_type: int) -> list:
+        """
+        Breakdown ανά κατηγορία ΦΠΑ από γραμμές aggregates.
+
+        Returns:
+            List of dicts με vat_category, total_net, total_vat, record_count
+            (ίδια μορφή με VATRecord.get_period_by_category)
+        """
+        categories = {}
+        for row in rows:
+            if row.rec_type != rec_type:
+                continue
+            item = categories.setdefault(row.vat_category, {
+                'vat_category': row.vat_category,
+                'total_net': Decimal('0.00'),
+                'total_vat': Decimal('0.00'),
+                'record_count': 0,
+            })
+            item['total_net'] += row.net_value
+            item['total_vat'] += row.vat_amount
+            item['record_count'] += row.record_count
+
+        return [categories[key] for key in sorted(categories)]
+
 
 # =============================================================================
 # VAT SYNC LOG
@@ -1080,37 +1420,22 @@ class VATPeriodResult(models.Model):
 
     def calculate_from_records(self, save: bool = True) -> dict:
         """
-        Υπολογίζει τα ποσά ΦΠΑ από τα VATRecords.
+        Υπολογίζει τα ποσά ΦΠΑ από τα VATRecords (μέσω VATMonthlyAggregate).
 
         Returns:
             Dict με τα υπολογισμένα ποσά
         """
-        from django.db.models import Sum
-
         if self.is_locked:
             raise ValidationError("Δεν μπορείτε να επανυπολογίσετε κλειδωμένη περίοδο")
 
-        months = self.months_in_period
-
-        # Query VATRecords for this period
-        records = VATRecord.objects.filter(
-            client=self.client,
-            issue_date__year=self.year,
-            issue_date__month__in=months,
-            is_cancelled=False
-        )
-
-        # Calculate output VAT (εκροές = rec_type 1)
-        output_result = records.filter(rec_type=1).aggregate(
-            total=Sum('vat_amount')
+        # Ένα query στα μηνιαία σύνολα της περιόδου
+        totals = VATMonthlyAggregate.totals_by_rec_type(
+            VATMonthlyAggregate.for_months(self.year, self.months_in_period, client=self.client)
         )
-        self.vat_output = output_result['total'] or Decimal('0.00')
 
-        # Calculate input VAT (εισροές = rec_type 2)
-        input_result = records.filter(rec_type=2).aggregate(
-            total=Sum('vat_amount')
-        )
-        self.vat_input = input_result['total'] or Decimal('0.00')
+        # Output VAT (εκροές = rec_type 1), Input VAT (εισροές = rec_type 2)
+        self.vat_output = totals[1]['vat_amount']
+        self.vat_input = totals[2]['vat_amount']
 
         # Calculate difference
         self.vat_difference = self.vat_output - self.vat_input
@@ -60,18 +60,19 @@ class MyDataService:
         try:
             # Pull data από myDATA
             date_from = datetime.now() - timedelta(days=days_back)
-            response = self.client.request_docs(
+            # Streaming: τα παραστατικά επεξεργάζονται όσο φτάνει το XML
+            invoices = self.client.iter_docs(
                 date_from=date_from,
                 date_to=datetime.now()
             )
             
-            invoices = self.client.parse_invoice_response(response)
-            
+            processed = 0
             created = 0
             updated = 0
             errors = []
             
             for inv_data in invoices:
+                processed += 1
                 try:
                     with transaction.atomic():
                         created_count, updated_count = self._process_invoice(
@@ -89,7 +90,7 @@ class MyDataService:
             # Update log
             log.status = 'SUCCESS' if not errors else 'ERROR'
             log.completed_at = timezone.now()
-            log.records_processed = len(invoices)
+            log.records_processed = processed
             log.records_created = created
             log.records_updated = updated
             log.records_failed = len(errors)
@@ -126,18 +127,19 @@ class MyDataService:
         try:
             # Pull data από myDATA
             date_from = datetime.now() - timedelta(days=days_back)
-            response = self.client.request_transmitted_docs(
+            # Streaming: τα παραστατικά επεξεργάζονται όσο φτάνει το XML
+            invoices = self.client.iter_transmitted_docs(
                 date_from=date_from,
                 date_to=datetime.now()
             )
             
-            invoices = self.client.parse_invoice_response(response)
-            
+            processed = 0
             created = 0
             updated = 0
             errors = []
             
             for inv_data in invoices:
+                processed += 1
                 try:
                     with transaction.atomic():
                         created_count, updated_count = self._process_invoice(
@@ -155,7 +157,7 @@ class MyDataService:
             # Update log
             log.status = 'SUCCESS' if not errors else 'ERROR'
             log.completed_at = timezone.now()
-            log.records_processed = len(invoices)
+            log.records_processed = processed
             log.records_created = created
             log.records_updated = updated
             log.records_failed = len(errors)
@@ -0,0 +1,82 @@
+# mydata/signals.py
+"""
+Signals για το myDATA app.
+
+Handles:
+- Ενημέρωση VATMonthlyAggregate όταν αποθηκεύεται/διαγράφεται VATRecord
+"""
+import logging
+import threading
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils.dateparse import parse_date
+
+logger = logging.getLogger(__name__)
+
+# Μήνες προς επανυπολογισμό ανά thread: {client_id: {(year, month), ...}}
+_pending = threading.local()
+
+
+def _flush_pending_months():
+    """Επανυπολογίζει τους μήνες που άλλαξαν (μία φορά ανά transaction)."""
+    from mydata.models import VATMonthlyAggregate
+
+    months_by_client = getattr(_pending, 'months', None) or {}
+    _pending.months = None
+
+    for client_id, months in months_by_client.items():
+        try:
+            VATMonthlyAggregate.refresh_months(client_id, months)
+        except Exception as e:
+            logger.error(f"Failed to refresh VAT aggregates for client {client_id}: {e}")
+
+
+def _schedule_refresh(client_id, issue_date):
+    """
+    Σημειώνει έναν μήνα πελάτη για επανυπολογισμό στο commit.
+
+    Μέσα σε transaction (π.χ. queryset.delete() πολλών εγγραφών) κάθε μήνας
+    υπολογίζεται μία φορά· σε autocommit ο υπολογισμός γίνεται αμέσως.
+    Μήνες από transaction που έκανε rollback απλώς επανυπολογίζονται στο
+    επόμενο commit, που είναι ακίνδυνο.
+    """
+    if isinstance(issue_date, str):
+        issue_date = parse_date(issue_date[:10])
+    if not issue_date:
+        return
+
+    months_by_client = getattr(_pending, 'months', None)
+    if months_by_client is None:
+        months_by_client = _pending.months = {}
+
+    months_by_client.setdefault(client_id, set()).add((issue_date.year, issue_date.month))
+    transaction.on_commit(_flush_pending_months)
+
+
+@receiver(pre_save, sender='mydata.VATRecord')
+def track_vat_record_previous_month(sender, instance, raw=False, **kwargs):
+    """Αν αλλάζει πελάτης/ημερομηνία, ο παλιός μήνας επανυπολογίζεται επίσης."""
+    if raw or instance.pk is None:
+        return
+
+    previous = sender.objects.filter(pk=instance.pk).values_list(
+        'client_id', 'issue_date'
+    ).first()
+    if previous and previous != (instance.client_id, instance.issue_date):
+        _schedule_refresh(*previous)
+
+
+@receiver(post_save, sender='mydata.VATRecord')
+def refresh_vat_aggregates_on_save(sender, instance, raw=False, **kwargs):
+    """Ενημέρωση μηνιαίων συνόλων μετά από save ενός VATRecord."""
+    if raw:
+        return
+    _schedule_refresh(instance.client_id, instance.issue_date)
+
+
+@receiver(post_delete, sender='mydata.VATRecord')
+def refresh_vat_aggregates_on_delete(sender, instance, **kwargs):
+    """Ενημέρωση μηνιαίων συνόλων μετά από διαγραφή VATRecord."""
+    _schedule_refresh(instance.client_id, instance.issue_date)
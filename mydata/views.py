@@ -11,10 +11,13 @@ Django REST Framework Views για myDATA module.
 
 from datetime import date, timedelta
 from calendar import monthrange
+from collections import defaultdict
 from decimal import Decimal
+from functools import reduce
 import logging
+import operator
 
-from django.db.models import Sum, Count, Q
+from django.db.models import Sum, Q
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 
@@ -24,7 +27,7 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from accounting.models import ClientProfile
-from .models import MyDataCredentials, VATRecord, VATSyncLog
+from .models import MyDataCredentials, VATMonthlyAggregate, VATRecord, VATSyncLog
 from .serializers import (
     MyDataCredentialsSerializer,
     CredentialsUpdateSerializer,
@@ -55,10 +58,18 @@ def get_vat_rate_display(category: int) -> str:
     return f"{rate}%" if category < 8 else "Χωρίς ΦΠΑ"
 
 
-def build_period_summary(client, year: int, month: int) -> dict:
-    """Build complete period summary for a client."""
-    income = VATRecord.get_period_summary(client, year, month, rec_type=1)
-    expense = VATRecord.get_period_summary(client, year, month, rec_type=2)
+def build_period_summary(client, year: int, month: int, rows=None) -> dict:
+    """
+    Build complete period summary for a client.
+
+    Διαβάζει από το VATMonthlyAggregate· το `rows` επιτρέπει σε views να
+    περάσουν γραμμές που έχουν ήδη φέρει (π.χ. για όλους τους πελάτες).
+    """
+    if rows is None:
+        rows = list(VATMonthlyAggregate.for_months(year, [month], client=client))
+    totals = VATMonthlyAggregate.totals_by_rec_type(rows)
+    income = totals[1]
+    expense = totals[2]
 
     return {
         'year': year,
@@ -76,9 +87,11 @@ def build_period_summary(client, year: int, month: int) -> dict:
     }
 
 
-def build_category_breakdown(client, year: int, month: int, rec_type: int) -> list:
-    """Build VAT category breakdown for a period."""
-    breakdown = VATRecord.get_period_by_category(client, year, month, rec_type)
+def build_category_breakdown(client, year: int, month: int, rec_type: int, rows=None) -> list:
+    """Build VAT category breakdown for a period (από VATMonthlyAggregate)."""
+    if rows is None:
+        rows = list(VATMonthlyAggregate.for_months(year, [month], client=client))
+    breakdown = VATMonthlyAggregate.by_category(rows, rec_type)
 
     return [
         {
@@ -130,10 +143,30 @@ def get_period_date_range(year: int, month: int = None, quarter: int = None, per
     return date_from, date_to, label
 
 
-def build_date_range_summary(client, date_from, date_to) -> dict:
+def get_date_range_aggregates(client, date_from, date_to) -> list:
+    """
+    Γραμμές VATMonthlyAggregate για τους μήνες που καλύπτει το εύρος.
+
+    Τα εύρη του get_period_date_range είναι πάντα ολόκληροι μήνες.
+    """
+    periods = []
+    current = date(date_from.year, date_from.month, 1)
+    while current <= date_to:
+        periods.append(Q(year=current.year, month=current.month))
+        current = (current + timedelta(days=32)).replace(day=1)
+
+    if not periods:
+        return []
+    return list(VATMonthlyAggregate.objects.filter(reduce(operator.or_, periods), client=client))
+
+
+def build_date_range_summary(client, date_from, date_to, rows=None) -> dict:
     """Build complete period summary for a client using date range."""
-    income = VATRecord.get_date_range_summary(client, date_from, date_to, rec_type=1)
-    expense = VATRecord.get_date_range_summary(client, date_from, date_to, rec_type=2)
+    if rows is None:
+        rows = get_date_range_aggregates(client, date_from, date_to)
+    totals = VATMonthlyAggregate.totals_by_rec_type(rows)
+    income = totals[1]
+    expense = totals[2]
 
     return {
         'income_net': float(income['net_value']),
@@ -149,9 +182,11 @@ def build_date_range_summary(client, date_from, date_to) -> dict:
     }
 
 
-def build_date_range_category_breakdown(client, date_from, date_to, rec_type: int) -> list:
+def build_date_range_category_breakdown(client, date_from, date_to, rec_type: int, rows=None) -> list:
     """Build VAT category breakdown for a date range."""
-    breakdown = VATRecord.get_date_range_by_category(client, date_from, date_to, rec_type)
+    if rows is None:
+        rows = get_date_range_aggregates(client, date_from, date_to)
+    breakdown = VATMonthlyAggregate.by_category(rows, rec_type)
 
     return [
         {
@@ -500,8 +535,9 @@ class VATRecordViewSet(viewsets.ReadOnlyModelViewSet):
             return Response(serializer.data)
 
         # Return both income and expense
-        income_breakdown = build_category_breakdown(client, year, month, 1)
-        expense_breakdown = build_category_breakdown(client, year, month, 2)
+        rows = list(VATMonthlyAggregate.for_months(year, [month], client=client))
+        income_breakdown = build_category_breakdown(client, year, month, 1, rows=rows)
+        expense_breakdown = build_category_breakdown(client, year, month, 2, rows=rows)
 
         return Response({
             'income': VATCategoryBreakdownSerializer(income_breakdown, many=True).data,
@@ -586,30 +622,22 @@ class MyDataDashboardView(APIView):
         clients_with_credentials = credentials_qs.count()
         verified_credentials = credentials_qs.filter(is_verified=True).count()
 
-        # Aggregate totals for the period
-        period_records = VATRecord.objects.filter(
-            issue_date__year=year,
-            issue_date__month=month,
-            is_cancelled=False
-        )
-
-        income_totals = period_records.filter(rec_type=1).aggregate(
-            total_net=Sum('net_value'),
-            total_vat=Sum('vat_amount'),
-        )
+        # Μηνιαία σύνολα όλων των πελατών σε ένα query
+        period_rows = list(VATMonthlyAggregate.for_months(year, [month]))
+        totals = VATMonthlyAggregate.totals_by_rec_type(period_rows)
 
-        expense_totals = period_records.filter(rec_type=2).aggregate(
-            total_net=Sum('net_value'),
-            total_vat=Sum('vat_amount'),
-        )
+        rows_by_client = defaultdict(list)
+        for row in period_rows:
+            rows_by_client[row.client_id].append(row)
 
         # Per-client summaries
         clients_data = []
         for creds in credentials_qs:
             client = creds.client
-            summary = build_period_summary(client, year, month)
-            income_breakdown = build_category_breakdown(client, year, month, 1)
-            expense_breakdown = build_category_breakdown(client, year, month, 2)
+            rows = rows_by_client.get(client.pk, [])
+            summary = build_period_summary(client, year, month, rows=rows)
+            income_breakdown = build_category_breakdown(client, year, month, 1, rows=rows)
+            expense_breakdown = build_category_breakdown(client, year, month, 2, rows=rows)
 
             clients_data.append({
                 'client_afm': client.afm,
@@ -631,10 +659,10 @@ class MyDataDashboardView(APIView):
                 'total_clients': total_clients,
                 'clients_with_credentials': clients_with_credentials,
                 'verified_credentials': verified_credentials,
-                'total_income_net': income_totals['total_net'] or Decimal('0.00'),
-                'total_income_vat': income_totals['total_vat'] or Decimal('0.00'),
-                'total_expense_net': expense_totals['total_net'] or Decimal('0.00'),
-                'total_expense_vat': expense_totals['total_vat'] or Decimal('0.00'),
+                'total_income_net': totals[1]['net_value'],
+                'total_income_vat': totals[1]['vat_amount'],
+                'total_expense_net': totals[2]['net_value'],
+                'total_expense_vat': totals[2]['vat_amount'],
             },
             'clients': clients_data,
         })
@@ -705,10 +733,11 @@ class ClientVATDetailView(APIView):
                 is_verified = False
                 last_sync = None
 
-            # Build response using date range functions
-            summary = build_date_range_summary(client, date_from, date_to)
-            income_breakdown = build_date_range_category_breakdown(client, date_from, date_to, 1)
-            expense_breakdown = build_date_range_category_breakdown(client, date_from, date_to, 2)
+            # Build response using date range functions (ένα query στα aggregates)
+            rows = get_date_range_aggregates(client, date_from, date_to)
+            summary = build_date_range_summary(client, date_from, date_to, rows=rows)
+            income_breakdown = build_date_range_category_breakdown(client, date_from, date_to, 1, rows=rows)
+            expense_breakdown = build_date_range_category_breakdown(client, date_from, date_to, 2, rows=rows)
 
             # Add period info to summary
             summary['year'] = year
@@ -799,33 +828,28 @@ class MonthlyTrendView(APIView):
 
         months.reverse()  # Oldest first
 
-        # Build queryset filter
-        base_qs = VATRecord.objects.filter(is_cancelled=False)
+        # Ένα GROUP BY στα μηνιαία σύνολα για όλους τους μήνες
+        base_qs = VATMonthlyAggregate.objects.filter(
+            reduce(operator.or_, (Q(year=year, month=month) for year, month in months))
+        )
         if afm:
             base_qs = base_qs.filter(client__afm=afm)
 
-        # Collect data for each month
-        trend_data = []
-        for year, month in months:
-            income = base_qs.filter(
-                issue_date__year=year,
-                issue_date__month=month,
-                rec_type=1
-            ).aggregate(
+        totals = {
+            (row['year'], row['month'], row['rec_type']): row
+            for row in base_qs.values('year', 'month', 'rec_type').annotate(
                 net=Sum('net_value'),
                 vat=Sum('vat_amount'),
-                count=Count('id')
-            )
+                count=Sum('record_count')
+            ).order_by()
+        }
+        empty = {'net': None, 'vat': None, 'count': None}
 
-            expense = base_qs.filter(
-                issue_date__year=year,
-                issue_date__month=month,
-                rec_type=2
-            ).aggregate(
-                net=Sum('net_value'),
-                vat=Sum('vat_amount'),
-                count=Count('id')
-            )
+        # Collect data for each month
+        trend_data = []
+        for year, month in months:
+            income = totals.get((year, month, 1), empty)
+            expense = totals.get((year, month, 2), empty)
 
             trend_data.append({
                 'year': year,
@@ -86,10 +86,10 @@ admin.site.register(StopPhrase, StopPhraseAdmin)
 class BackupSettingsAdmin(admin.ModelAdmin):
     """Admin για ρυθμίσεις Backup - Singleton."""
 
-    list_display = ['backup_path', 'include_media', 'max_backups', 'updated_at']
+    list_display = ['backup_path', 'include_media', 'incremental_media', 'max_backups', 'updated_at']
     fieldsets = (
         ('Ρυθμίσεις', {
-            'fields': ('backup_path', 'include_media', 'max_backups')
+            'fields': ('backup_path', 'include_media', 'incremental_media', 'max_backups')
         }),
     )
 
@@ -116,13 +116,16 @@ class BackupHistoryAdmin(admin.ModelAdmin):
     search_fields = ['filename', 'notes']
     readonly_fields = [
         'filename', 'file_path', 'file_size', 'includes_db', 'includes_media',
-        'created_by', 'created_at', 'restored_at', 'restored_by', 'restore_mode'
+        'media_incremental', 'media_parent', 'created_by', 'created_at', 'restored_at', 'restored_by', 'restore_mode'
     ]
     ordering = ['-created_at']
 
     fieldsets = (
         ('Αρχείο', {
-            'fields': ('filename', 'file_path', 'file_size', 'includes_db', 'includes_media')
+            'fields': (
+                'filename', 'file_path', 'file_size', 'includes_db', 'includes_media',
+                'media_incremental', 'media_parent'
+            )
         }),
         ('Δημιουργία', {
             'fields': ('created_by', 'created_at', 'notes')
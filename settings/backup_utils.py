@@ -4,35 +4,79 @@ Backup utilities for LogistikoCRM.
 
 Provides functions to create and restore backups of database and media files.
 """
+import io
 import os
 import json
 import shutil
+import hashlib
 import zipfile
 import logging
+from collections import defaultdict
 from datetime import datetime
-from io import StringIO
+from itertools import islice
 
+from django.apps import apps
 from django.conf import settings
+from django.core import serializers
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.serializers.python import Deserializer as PythonDeserializer
 from django.core.management import call_command
-from django.db import connection
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connection, router, transaction
 
 logger = logging.getLogger(__name__)
 
 # Μέγιστο μέγεθος backup αρχείου (500MB)
 MAX_BACKUP_SIZE = 500 * 1024 * 1024
 
-# Απαιτούμενα αρχεία στο backup ZIP
-REQUIRED_BACKUP_FILES = ['database.json']
+# Streaming μορφή βάσης: manifest + NDJSON chunks ανά model
+DB_MANIFEST = 'database/manifest.json'
+DB_FORMAT_VERSION = 2
+DB_CHUNK_SIZE = 5000
 
+# Παλιά μορφή (ένα dumpdata JSON) - υποστηρίζεται μόνο για restore
+LEGACY_DB_FILE = 'database.json'
 
-def create_backup(user=None, include_media=True, notes=''):
+# Ένα από αυτά πρέπει να υπάρχει στο backup ZIP
+REQUIRED_BACKUP_FILES = [DB_MANIFEST, LEGACY_DB_FILE]
+
+# Ίδια εξαίρεση με το παλιό dumpdata
+EXCLUDED_APPS = {'contenttypes', 'sessions'}
+EXCLUDED_MODELS = {'auth.permission', 'admin.logentry'}
+
+# Incremental media: manifest (hash/size/mtime ανά αρχείο) + blobs ανά sha256
+MEDIA_MANIFEST = 'media/manifest.json'
+MEDIA_BLOB_DIR = 'media/blobs/'
+# 'archive' για blobs μέσα στο ίδιο το backup, ώστε να αντέχει μετονομασία
+# (π.χ. uploaded_<timestamp>.zip)
+MEDIA_SELF_ARCHIVE = '.'
+# Μετά από τόσα backups στην αλυσίδα γίνεται νέο πλήρες (base) media backup
+MEDIA_CHAIN_MAX_LENGTH = 7
+
+# Ήδη συμπιεσμένοι τύποι - αποθηκεύονται χωρίς νέα συμπίεση (ZIP_STORED)
+STORED_EXTENSIONS = {
+    '.pdf', '.jpg', '.jpeg', '.png', '.gif', '.webp', '.heic',
+    '.zip', '.gz', '.tgz', '.bz2', '.xz', '.7z', '.rar',
+    '.docx', '.xlsx', '.pptx', '.odt', '.ods', '.odp',
+    '.mp3', '.mp4', '.m4a', '.mov', '.avi', '.ogg', '.webm',
+}
+
+
+def create_backup(user=None, include_media=True, notes='', compact=False, incremental_media=None):
     """
     Δημιουργεί backup της βάσης και των media files.
 
+    Η βάση γράφεται απευθείας στο ZIP ως NDJSON chunks ανά model, οπότε η
+    μνήμη δεν εξαρτάται από το μέγεθος των πινάκων.
+
     Args:
         user: Ο χρήστης που δημιουργεί το backup
         include_media: Αν θα συμπεριληφθούν τα media files
         notes: Σημειώσεις για το backup
+        compact: Συμπαγής κωδικοποίηση (χωρίς "model"/κενά ανά γραμμή,
+            μέγιστη συμπίεση)
+        incremental_media: Μόνο νέα/αλλαγμένα media σε σχέση με το
+            προηγούμενο incremental backup (default: BackupSettings)
 
     Returns:
         BackupHistory instance ή None σε περίπτωση σφάλματος
@@ -48,12 +92,24 @@ def create_backup(user=None, include_media=True, notes=''):
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     filename = f'backup_{timestamp}.zip'
     file_path = os.path.join(backup_dir, filename)
+    suffix = 1
+    while os.path.exists(file_path):
+        # Τα incremental backups αναφέρονται το ένα στο άλλο με το filename
+        filename = f'backup_{timestamp}_{suffix}.zip'
+        file_path = os.path.join(backup_dir, filename)
+        suffix += 1
+
+    if incremental_media is None:
+        incremental_media = backup_settings.incremental_media
+    include_media = include_media and hasattr(settings, 'MEDIA_ROOT') and os.path.exists(settings.MEDIA_ROOT)
+    incremental_media = include_media and incremental_media
+    media_parent = _incremental_media_parent() if incremental_media else None
 
     try:
-        with zipfile.ZipFile(file_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            # 1. Database dump
-            db_dump = _dump_database()
-            zipf.writestr('database.json', db_dump)
+        compresslevel = 9 if compact else None
+        with zipfile.ZipFile(file_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=compresslevel) as zipf:
+            # 1. Database dump (streaming)
+            manifest = _dump_database(zipf, compact=compact)
 
             # 2. Metadata
             metadata = {
@@ -61,21 +117,23 @@ def create_backup(user=None, include_media=True, notes=''):
                 'created_by': user.username if user else 'system',
                 'django_version': settings.VERSION if hasattr(settings, 'VERSION') else 'unknown',
                 'includes_media': include_media,
+                'media_mode': 'incremental' if incremental_media else 'full',
+                'media_parent': media_parent.filename if media_parent else None,
+                'database_format': 'ndjson',
+                'database_objects': manifest['total_objects'],
                 'notes': notes,
             }
             zipf.writestr('metadata.json', json.dumps(metadata, indent=2, ensure_ascii=False))
 
             # 3. Media files (optional)
-            if include_media and hasattr(settings, 'MEDIA_ROOT') and os.path.exists(settings.MEDIA_ROOT):
-                media_root = settings.MEDIA_ROOT
-                for root, dirs, files in os.walk(media_root):
-                    # Skip backup folder itself
-                    if 'backups' in root:
-                        continue
-                    for file in files:
-                        file_path_full = os.path.join(root, file)
-                        arcname = os.path.join('media', os.path.relpath(file_path_full, media_root))
-                        zipf.write(file_path_full, arcname)
+            if incremental_media:
+                _write_incremental_media(zipf, media_parent)
+            elif include_media:
+                for file_path_full, relpath in _iter_media_files(settings.MEDIA_ROOT):
+                    zipf.write(
+                        file_path_full, f'media/{relpath}',
+                        compress_type=_media_compress_type(relpath)
+                    )
 
         # Δημιουργία record στο ιστορικό
         file_size = os.path.getsize(file_path)
@@ -85,6 +143,8 @@ def create_backup(user=None, include_media=True, notes=''):
             file_size=file_size,
             includes_db=True,
             includes_media=include_media,
+            media_incremental=incremental_media,
+            media_parent=media_parent,
             created_by=user,
             notes=notes
         )
@@ -135,21 +195,37 @@ def validate_backup_file(file_path):
 
             # Έλεγχος για απαιτούμενα αρχεία
             namelist = zipf.namelist()
-            for required in REQUIRED_BACKUP_FILES:
-                if required not in namelist:
-                    return False, f"Λείπει απαιτούμενο αρχείο: {required}"
+            if not any(required in namelist for required in REQUIRED_BACKUP_FILES):
+                return False, f"Λείπει απαιτούμενο αρχείο: {DB_MANIFEST}"
 
             # Έλεγχος για path traversal attacks (../)
             for name in namelist:
                 if '..' in name or name.startswith('/'):
                     return False, f"Μη έγκυρο path στο ZIP: {name}"
 
-            # Επικύρωση database.json format
-            try:
-                db_content = zipf.read('database.json').decode('utf-8')
-                json.loads(db_content)
-            except (json.JSONDecodeError, UnicodeDecodeError) as e:
-                return False, f"Μη έγκυρο database.json: {e}"
+            if DB_MANIFEST in namelist:
+                # Επικύρωση manifest και ότι υπάρχουν όλα τα chunks
+                try:
+                    manifest = json.loads(zipf.read(DB_MANIFEST).decode('utf-8'))
+                    chunks = [chunk for entry in manifest['models'] for chunk in entry['chunks']]
+                except (json.JSONDecodeError, UnicodeDecodeError, KeyError, TypeError) as e:
+                    return False, f"Μη έγκυρο {DB_MANIFEST}: {e}"
+                names = set(namelist)
+                for chunk in chunks:
+                    if chunk not in names:
+                        return False, f"Λείπει chunk της βάσης: {chunk}"
+            else:
+                # Επικύρωση database.json format (παλιά backups)
+                try:
+                    with zipf.open(LEGACY_DB_FILE) as f:
+                        json.load(io.TextIOWrapper(f, encoding='utf-8'))
+                except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                    return False, f"Μη έγκυρο database.json: {e}"
+
+            if MEDIA_MANIFEST in namelist:
+                error = _validate_media_manifest(zipf, file_path)
+                if error:
+                    return False, error
 
     except zipfile.BadZipFile:
         return False, "Κατεστραμμένο ZIP αρχείο"
@@ -157,7 +233,8 @@ def validate_backup_file(file_path):
     return True, None
 
 
-def restore_backup(backup_id, user=None, mode='replace', create_safety_backup=True):
+def restore_backup(backup_id, user=None, mode='replace', create_safety_backup=True,
+                   resume=False, progress_callback=None):
     """
     Επαναφέρει backup.
 
@@ -166,6 +243,9 @@ def restore_backup(backup_id, user=None, mode='replace', create_safety_backup=Tr
         user: Ο χρήστης που κάνει restore
         mode: 'replace' (αντικατάσταση) ή 'merge' (συγχώνευση)
         create_safety_backup: Δημιουργία backup πριν το restore (default: True)
+        resume: Συνέχεια διακοπείσας επαναφοράς από το τελευταίο chunk
+            (χωρίς νέο flush/safety backup)
+        progress_callback: callable(done, total, label) μετά από κάθε chunk
 
     Returns:
         dict με status και πληροφορίες
@@ -176,6 +256,7 @@ def restore_backup(backup_id, user=None, mode='replace', create_safety_backup=Tr
     result = {
         'success': False,
         'safety_backup_id': None,
+        'resumed': False,
         'error': None
     }
 
@@ -198,9 +279,13 @@ def restore_backup(backup_id, user=None, mode='replace', create_safety_backup=Tr
         logger.error(result['error'])
         return result
 
+    progress_path = _restore_progress_path(backup.file_path)
+    resuming = resume and os.path.exists(progress_path)
+    result['resumed'] = resuming
+
     # Δημιουργία safety backup πριν το restore (για replace mode)
     safety_backup = None
-    if create_safety_backup and mode == 'replace':
+    if create_safety_backup and mode == 'replace' and not resuming:
         logger.info("Creating safety backup before restore...")
         try:
             safety_backup = create_backup(
@@ -217,12 +302,20 @@ def restore_backup(backup_id, user=None, mode='replace', create_safety_backup=Tr
     try:
         with zipfile.ZipFile(backup.file_path, 'r') as zipf:
             # 1. Restore database
-            if 'database.json' in zipf.namelist():
-                db_data = zipf.read('database.json').decode('utf-8')
-                _restore_database(db_data, mode=mode)
+            namelist = zipf.namelist()
+            if DB_MANIFEST in namelist:
+                _restore_database(
+                    zipf, mode=mode, progress_path=progress_path,
+                    resume=resuming, progress_callback=progress_callback,
+                    preserve=(_resume_record(backup),)
+                )
+            elif LEGACY_DB_FILE in namelist:
+                _restore_legacy_database(zipf, mode=mode)
 
             # 2. Restore media files
-            if backup.includes_media:
+            if backup.includes_media and MEDIA_MANIFEST in namelist:
+                _restore_incremental_media(zipf, backup.file_path, mode=mode)
+            elif backup.includes_media:
                 media_files = [f for f in zipf.namelist() if f.startswith('media/')]
                 for media_file in media_files:
                     # Skip directories
@@ -236,7 +329,11 @@ def restore_backup(backup_id, user=None, mode='replace', create_safety_backup=Tr
 
                     if mode == 'replace' or not os.path.exists(target_path):
                         with zipf.open(media_file) as src, open(target_path, 'wb') as dst:
-                            dst.write(src.read())
+                            shutil.copyfileobj(src, dst)
+
+        # Ολοκληρώθηκε - δεν χρειάζεται πλέον το resume state
+        if os.path.exists(progress_path):
+            os.remove(progress_path)
 
         # Ενημέρωση record
         backup.restored_at = timezone.now()
@@ -251,42 +348,338 @@ def restore_backup(backup_id, user=None, mode='replace', create_safety_backup=Tr
     except Exception as e:
         logger.error(f"Backup restore failed: {e}")
         result['error'] = str(e)
+        result['can_resume'] = os.path.exists(progress_path)
         return result
 
 
-def _dump_database():
+# ============================================
+# STREAMING DATABASE DUMP / RESTORE
+# ============================================
+
+def _relations(model):
+    """
+    target model -> FK/O2O fields που μπορούν να φορτωθούν αργότερα (nullable).
+    Τα M2M και τα NOT NULL FKs δίνουν None (πρέπει να φορτωθεί πρώτα ο target).
+    """
+    relations = {}
+    for field in model._meta.concrete_fields + tuple(model._meta.many_to_many):
+        target = field.related_model if field.is_relation else None
+        if target is None or target._meta.concrete_model is model._meta.concrete_model:
+            continue
+        target = target._meta.concrete_model
+        if field.many_to_many or not field.null or relations.get(target, []) is None:
+            relations[target] = None
+        else:
+            relations.setdefault(target, []).append(field.attname)
+    return relations
+
+
+def _sort_by_foreign_keys(models):
+    """
+    Topological sort: κάθε model μετά από τα models στα οποία δείχνει.
+
+    Σταθερό ως προς την αρχική σειρά. Σε κυκλικές εξαρτήσεις (π.χ.
+    crm.Deal <-> crm.Request) προχωρά πρώτα ένα model του κύκλου που δείχνει
+    στα υπόλοιπα μόνο με nullable FKs· αυτά φορτώνονται NULL και
+    συμπληρώνονται στο τέλος της επαναφοράς.
+
+    Returns:
+        tuple: (models με σειρά φόρτωσης, {label: [attnames που συμπληρώνονται στο τέλος]})
+    """
+    remaining = list(models)
+    relations = {model: _relations(model) for model in remaining}
+    ordered = []
+    later = {}
+    while remaining:
+        placed = set(ordered)
+        pending = {model: set(relations[model]) & set(remaining) - placed - {model} for model in remaining}
+        ready = next((model for model in remaining if not pending[model]), None)
+        if ready is None:
+            ready = next(
+                (model for model in remaining
+                 if all(relations[model][target] is not None for target in pending[model])),
+                remaining[0],
+            )
+            fields = [
+                attname for target in pending[ready] for attname in (relations[ready][target] or [])
+            ]
+            if fields:
+                later[ready._meta.label_lower] = fields
+            else:
+                logger.warning(
+                    f"Backup: circular foreign keys for {ready._meta.label_lower} -> "
+                    f"{sorted(m._meta.label_lower for m in pending[ready])}"
+                )
+        remaining.remove(ready)
+        ordered.append(ready)
+    return ordered, later
+
+
+def _backup_plan():
+    """
+    Τα models του backup με σειρά ώστε κάθε model να φορτώνεται μετά τα
+    models στα οποία δείχνουν τα FK/O2O/M2M του (και τα natural keys, όπως
+    το dumpdata με --natural-foreign), χωρίς proxy και εξαιρούμενα models,
+    μαζί με τα FKs των κύκλων που συμπληρώνονται στο τέλος.
+    """
+    app_list = [
+        (app_config, None) for app_config in apps.get_app_configs()
+        if app_config.models_module is not None and app_config.label not in EXCLUDED_APPS
+    ]
+    return _sort_by_foreign_keys([
+        model for model in serializers.sort_dependencies(app_list, allow_cycles=True)
+        if model._meta.label_lower not in EXCLUDED_MODELS
+        and not model._meta.proxy
+        and router.allow_migrate_model(DEFAULT_DB_ALIAS, model)
+    ])
+
+
+def _backup_models():
+    return _backup_plan()[0]
+
+
+def _dump_database(zipf, compact=False, chunk_size=None):
     """
-    Δημιουργεί JSON dump της βάσης.
+    Γράφει τη βάση στο ZIP ως NDJSON chunks ανά model.
+
+    Κάθε model διαβάζεται με iterator() και γράφεται σε chunks των
+    `chunk_size` εγγραφών (database/<app.model>/00000.ndjson, ...), οπότε
+    στη μνήμη υπάρχει το πολύ ένα chunk. Στο compact mode οι γραμμές είναι
+    [pk, fields] χωρίς κενά (το model προκύπτει από το manifest).
+
+    Returns:
+        dict: Το manifest που γράφτηκε στο database/manifest.json
     """
-    output = StringIO()
-    call_command(
-        'dumpdata',
-        '--natural-foreign',
-        '--natural-primary',
-        '--exclude=contenttypes',
-        '--exclude=auth.permission',
-        '--exclude=sessions',
-        '--exclude=admin.logentry',
-        '--indent=2',
-        stdout=output
+    chunk_size = chunk_size or DB_CHUNK_SIZE
+    python_serializer = serializers.get_serializer('python')
+    separators = (',', ':') if compact else (',', ': ')
+    manifest = {
+        'format': 'ndjson',
+        'version': DB_FORMAT_VERSION,
+        'compact': compact,
+        'chunk_size': chunk_size,
+        'total_objects': 0,
+        'models': [],
+    }
+
+    for model in _backup_models():
+        label = model._meta.label_lower
+        entry = {'model': label, 'count': 0, 'chunks': []}
+        objects = model._default_manager.order_by(model._meta.pk.name).iterator(chunk_size=chunk_size)
+
+        while True:
+            batch = list(islice(objects, chunk_size))
+            if not batch:
+                break
+            rows = python_serializer().serialize(
+                batch,
+                use_natural_foreign_keys=True,
+                use_natural_primary_keys=True,
+            )
+            chunk_name = f"database/{label}/{len(entry['chunks']):05d}.ndjson"
+            with zipf.open(chunk_name, 'w', force_zip64=True) as raw:
+                stream = io.TextIOWrapper(raw, encoding='utf-8', newline='\n')
+                for row in rows:
+                    line = [row.get('pk'), row['fields']] if compact else row
+                    json.dump(
+                        line, stream, cls=DjangoJSONEncoder,
+                        ensure_ascii=False, separators=separators
+                    )
+                    stream.write('\n')
+                stream.flush()
+                stream.detach()
+
+            entry['chunks'].append(chunk_name)
+            entry['count'] += len(rows)
+
+        manifest['models'].append(entry)
+        manifest['total_objects'] += entry['count']
+
+    zipf.writestr(DB_MANIFEST, json.dumps(manifest, indent=2, ensure_ascii=False))
+    return manifest
+
+
+def _restore_progress_path(backup_path):
+    """Αρχείο κατάστασης για resume, δίπλα στο backup."""
+    return f"{backup_path}.restore-progress.json"
+
+
+def _read_chunk(zipf, chunk_name, label, compact):
+    """Διαβάζει ένα NDJSON chunk ως λίστα dicts της python serialization."""
+    rows = []
+    with zipf.open(chunk_name) as raw:
+        for line in io.TextIOWrapper(raw, encoding='utf-8'):
+            if not line.strip():
+                continue
+            data = json.loads(line)
+            if compact:
+                pk, fields = data
+                data = {'model': label, 'fields': fields}
+                if pk is not None:
+                    data['pk'] = pk
+            rows.append(data)
+    return rows
+
+
+def _restore_database(zipf, mode='replace', progress_path=None, resume=False, progress_callback=None,
+                      preserve=()):
+    """
+    Επαναφέρει τη βάση από τα NDJSON chunks, ένα chunk τη φορά.
+
+    Τα models φορτώνονται με τη σειρά του _backup_plan() (κάθε model μετά
+    τα models στα οποία δείχνουν τα FKs του, και για backups με παλαιότερη
+    σειρά στο manifest), ώστε το commit κάθε chunk να περνά τον έλεγχο FK
+    και στο PostgreSQL, όπου το constraint_checks_disabled() δεν ισχύει.
+    Τα nullable FKs που κλείνουν κύκλο γράφονται NULL και συμπληρώνονται
+    μετά τη φόρτωση όλων των models (κρατούνται στο resume state).
+    Κάθε chunk αποθηκεύεται σε δική του transaction και καταγράφεται στο
+    `progress_path`, ώστε μια διακοπείσα επαναφορά να συνεχίσει από εκεί
+    που σταμάτησε (resume=True) χωρίς νέο flush.
+
+    Args:
+        zipf: Ανοιχτό ZipFile του backup
+        mode: 'replace' ή 'merge'
+        progress_path: Αρχείο κατάστασης για resume
+        resume: Παράλειψη των chunks που έχουν ήδη φορτωθεί
+        progress_callback: callable(done, total, label) μετά από κάθε chunk
+        preserve: Instances που ξαναγράφονται μετά το flush (π.χ. το
+            BackupHistory record, ώστε να βρεθεί σε resume)
+    """
+    manifest = json.loads(zipf.read(DB_MANIFEST).decode('utf-8'))
+    compact = manifest.get('compact', False)
+    total = manifest.get('total_objects', 0)
+
+    state = {'completed_chunks': [], 'objects_loaded': 0, 'later_fks': []}
+    if resume and progress_path and os.path.exists(progress_path):
+        with open(progress_path, encoding='utf-8') as f:
+            state = json.load(f)
+        logger.info(f"Resuming restore: {len(state['completed_chunks'])} chunks already loaded")
+    else:
+        if mode == 'replace':
+            # Διαγραφή υπαρχόντων δεδομένων (προσεκτικά!)
+            call_command('flush', '--no-input')
+            for instance in preserve:
+                instance.save(force_insert=True)
+        _ensure_default_groups()
+        _save_restore_progress(progress_path, state)
+
+    completed = set(state['completed_chunks'])
+    restored_models = set()
+    deferred = []
+
+    models, later = _backup_plan()
+    order = {model._meta.label_lower: index for index, model in enumerate(models)}
+    entries = sorted(manifest['models'], key=lambda entry: order.get(entry['model'], len(order)))
+    later_fks = state.setdefault('later_fks', [])
+
+    with connection.constraint_checks_disabled():
+        for entry in entries:
+            label = entry['model']
+            try:
+                model = apps.get_model(label)
+            except LookupError:
+                logger.warning(f"Skipping unknown model in backup: {label}")
+                continue
+
+            for chunk_name in entry['chunks']:
+                if chunk_name in completed:
+                    continue
+
+                rows = _read_chunk(zipf, chunk_name, label, compact)
+                with transaction.atomic():
+                    for obj in PythonDeserializer(
+                        rows, ignorenonexistent=True, handle_forward_references=True
+                    ):
+                        values = {
+                            attname: getattr(obj.object, attname) for attname in later.get(label, ())
+                            if getattr(obj.object, attname) is not None
+                        }
+                        for attname in values:
+                            setattr(obj.object, attname, None)
+                        obj.save()
+                        if values:
+                            later_fks.append([label, obj.object.pk, values])
+                        if obj.deferred_fields:
+                            deferred.append(obj)
+
+                restored_models.add(model)
+                state['completed_chunks'].append(chunk_name)
+                state['objects_loaded'] += len(rows)
+                _save_restore_progress(progress_path, state)
+
+                logger.info(f"Restored {label} {chunk_name}: {state['objects_loaded']}/{total}")
+                if progress_callback:
+                    progress_callback(state['objects_loaded'], total, label)
+
+        # Forward references (κυκλικές εξαρτήσεις natural keys)
+        for obj in deferred:
+            obj.save_deferred_fields()
+
+        # FKs που κλείνουν κύκλο, τώρα που υπάρχουν όλες οι εγγραφές
+        with transaction.atomic():
+            for label, pk, values in later_fks:
+                apps.get_model(label)._base_manager.filter(pk=pk).update(**values)
+
+    if restored_models:
+        table_names = [model._meta.db_table for model in restored_models]
+        connection.check_constraints(table_names=table_names)
+
+        # Reset sequences (PostgreSQL) όπως το loaddata
+        sequence_sql = connection.ops.sequence_reset_sql(no_style(), list(restored_models))
+        if sequence_sql:
+            with connection.cursor() as cursor:
+                for sql in sequence_sql:
+                    cursor.execute(sql)
+
+
+def _resume_record(backup):
+    """Αντίγραφο του BackupHistory χωρίς FKs, για να επιβιώσει του flush."""
+    from .models import BackupHistory
+
+    return BackupHistory(
+        pk=backup.pk,
+        filename=backup.filename,
+        file_path=backup.file_path,
+        file_size=backup.file_size,
+        includes_db=backup.includes_db,
+        includes_media=backup.includes_media,
+        notes=backup.notes,
     )
-    return output.getvalue()
 
 
-def _restore_database(json_data, mode='replace'):
+def _save_restore_progress(progress_path, state):
+    """Atomic εγγραφή του resume state."""
+    if not progress_path:
+        return
+    tmp_path = f"{progress_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, progress_path)
+
+
+def _ensure_default_groups():
+    """Δημιουργία default groups αν δεν υπάρχουν."""
+    from django.contrib.auth.models import Group
+
+    default_groups = ['Administrators', 'Managers', 'Users', 'Λογιστές', 'Υπάλληλοι']
+    for group_name in default_groups:
+        Group.objects.get_or_create(name=group_name)
+
+
+def _restore_legacy_database(zipf, mode='replace'):
     """
-    Επαναφέρει τη βάση από JSON dump.
+    Επαναφέρει τη βάση από παλιό backup (ένα dumpdata database.json).
 
     Args:
-        json_data: JSON string με τα δεδομένα
+        zipf: Ανοιχτό ZipFile του backup
         mode: 'replace' ή 'merge'
     """
     import tempfile
-    from django.contrib.auth.models import Group
 
-    # Γράψε σε temp file
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False, encoding='utf-8') as f:
-        f.write(json_data)
+    # Αντιγραφή σε temp file χωρίς να φορτωθεί όλο στη μνήμη
+    with tempfile.NamedTemporaryFile(mode='wb', suffix='.json', delete=False) as f:
+        with zipf.open(LEGACY_DB_FILE) as src:
+            shutil.copyfileobj(src, f)
         temp_path = f.name
 
     try:
@@ -294,10 +687,7 @@ def _restore_database(json_data, mode='replace'):
             # Διαγραφή υπαρχόντων δεδομένων (προσεκτικά!)
             call_command('flush', '--no-input')
 
-        # Δημιουργία default groups αν δεν υπάρχουν
-        default_groups = ['Administrators', 'Managers', 'Users', 'Λογιστές', 'Υπάλληλοι']
-        for group_name in default_groups:
-            Group.objects.get_or_create(name=group_name)
+        _ensure_default_groups()
 
         # Φόρτωση δεδομένων με ignorenonexistent για missing FKs
         call_command('loaddata', temp_path, '--ignorenonexistent')
@@ -309,23 +699,235 @@ def _restore_database(json_data, mode='replace'):
 def _cleanup_old_backups(backup_settings):
     """
     Διαγράφει παλιά backups αν ξεπεραστεί το όριο.
+
+    Backups που ανήκουν στην αλυσίδα incremental media ενός backup που
+    κρατάμε δεν διαγράφονται, γιατί περιέχουν blobs που χρειάζεται.
     """
     from .models import BackupHistory
 
     if backup_settings.max_backups <= 0:
         return
 
-    backups = BackupHistory.objects.order_by('-created_at')
-    if backups.count() > backup_settings.max_backups:
-        old_backups = backups[backup_settings.max_backups:]
-        for backup in old_backups:
-            if backup.file_exists():
-                try:
-                    os.remove(backup.file_path)
-                except OSError:
-                    pass
-            backup.delete()
-        logger.info(f"Cleaned up {len(old_backups)} old backups")
+    backups = list(BackupHistory.objects.order_by('-created_at'))
+    if len(backups) <= backup_settings.max_backups:
+        return
+
+    parents = {backup.pk: backup.media_parent_id for backup in backups}
+    needed = set()
+    for backup in backups[:backup_settings.max_backups]:
+        pk = backup.pk
+        while pk is not None and pk not in needed:
+            needed.add(pk)
+            pk = parents.get(pk)
+
+    # Από το νεότερο στο παλαιότερο: τα παιδιά διαγράφονται πριν τους γονείς
+    removed = 0
+    for backup in backups[backup_settings.max_backups:]:
+        if backup.pk in needed:
+            continue
+        if backup.file_exists():
+            try:
+                os.remove(backup.file_path)
+            except OSError:
+                pass
+        backup.delete()
+        removed += 1
+
+    if removed:
+        logger.info(f"Cleaned up {removed} old backups")
+
+
+# ============================================
+# INCREMENTAL MEDIA
+# ============================================
+
+def _iter_media_files(media_root):
+    """(πλήρες path, σχετικό path με /) για κάθε αρχείο του MEDIA_ROOT, εκτός backups."""
+    for root, dirs, files in os.walk(media_root):
+        # Skip backup folder itself
+        if 'backups' in root:
+            continue
+        for file in files:
+            full_path = os.path.join(root, file)
+            yield full_path, os.path.relpath(full_path, media_root).replace(os.sep, '/')
+
+
+def _media_compress_type(path):
+    """ZIP_STORED για ήδη συμπιεσμένους τύπους, αλλιώς ZIP_DEFLATED."""
+    if os.path.splitext(path)[1].lower() in STORED_EXTENSIONS:
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _is_safe_relpath(relpath):
+    return bool(relpath) and not relpath.startswith('/') and '..' not in relpath.split('/')
+
+
+def _read_media_manifest(path):
+    with zipfile.ZipFile(path, 'r') as zipf:
+        return json.loads(zipf.read(MEDIA_MANIFEST).decode('utf-8'))
+
+
+def _incremental_media_parent():
+    """
+    Το τελευταίο incremental media backup, αν μπορεί να γίνει γονέας.
+
+    None (δηλ. νέο πλήρες base) αν δεν υπάρχει, αν λείπει κάποιο αρχείο
+    της αλυσίδας ή αν η αλυσίδα έφτασε το MEDIA_CHAIN_MAX_LENGTH.
+    """
+    from .models import BackupHistory
+
+    parent = BackupHistory.objects.filter(media_incremental=True).order_by('-created_at').first()
+    if parent is None:
+        return None
+
+    chain = parent.media_chain()
+    if len(chain) >= MEDIA_CHAIN_MAX_LENGTH:
+        return None
+    if not all(backup.file_exists() for backup in chain):
+        logger.warning(f"Incremental media chain of {parent.filename} is incomplete, starting a new base")
+        return None
+    return parent
+
+
+def _write_incremental_media(zipf, parent=None):
+    """
+    Γράφει media/manifest.json και μόνο τα νέα/αλλαγμένα blobs.
+
+    Για κάθε αρχείο το manifest κρατά sha256, size, mtime και το backup
+    (archive) που περιέχει το blob: MEDIA_SELF_ARCHIVE για το ίδιο το
+    backup, αλλιώς το filename του backup της αλυσίδας. Αρχεία με ίδιο size/mtime με τον γονέα
+    δεν ξαναδιαβάζονται· ίδιο περιεχόμενο αποθηκεύεται μία φορά.
+
+    Returns:
+        dict με στατιστικά (files, new_blobs, new_bytes)
+    """
+    previous = _read_media_manifest(parent.file_path)['files'] if parent else {}
+    # sha256 -> archive που ήδη περιέχει το blob
+    blobs = {
+        info['sha256']: parent.filename if _is_own_archive(info['archive'], parent.file_path) else info['archive']
+        for info in previous.values()
+    }
+
+    files = {}
+    stats = {'files': 0, 'new_blobs': 0, 'new_bytes': 0}
+    for full_path, relpath in _iter_media_files(settings.MEDIA_ROOT):
+        stat = os.stat(full_path)
+        prev = previous.get(relpath)
+        if prev and prev['size'] == stat.st_size and prev['mtime'] == stat.st_mtime_ns:
+            sha256 = prev['sha256']
+        else:
+            sha256 = _file_sha256(full_path)
+
+        archive = blobs.get(sha256)
+        if archive is None:
+            zipf.write(full_path, f'{MEDIA_BLOB_DIR}{sha256}', compress_type=_media_compress_type(relpath))
+            archive = blobs[sha256] = MEDIA_SELF_ARCHIVE
+            stats['new_blobs'] += 1
+            stats['new_bytes'] += stat.st_size
+
+        files[relpath] = {
+            'sha256': sha256,
+            'size': stat.st_size,
+            'mtime': stat.st_mtime_ns,
+            'archive': archive,
+        }
+        stats['files'] += 1
+
+    manifest = {
+        'version': 1,
+        'parent': parent.filename if parent else None,
+        'files': files,
+        'stats': stats,
+    }
+    zipf.writestr(MEDIA_MANIFEST, json.dumps(manifest, ensure_ascii=False))
+    logger.info(
+        f"Incremental media: {stats['files']} files, {stats['new_blobs']} new blobs "
+        f"({stats['new_bytes']} bytes), parent: {manifest['parent']}"
+    )
+    return stats
+
+
+def _is_own_archive(archive, path):
+    """Αν το 'archive' του manifest είναι το ίδιο το backup (παλιά backups: το filename του)."""
+    return archive in (MEDIA_SELF_ARCHIVE, os.path.basename(path))
+
+
+def _validate_media_manifest(zipf, file_path):
+    """Έλεγχος του media manifest και των archives της αλυσίδας. Επιστρέφει μήνυμα λάθους ή None."""
+    try:
+        files = json.loads(zipf.read(MEDIA_MANIFEST).decode('utf-8'))['files']
+    except (json.JSONDecodeError, UnicodeDecodeError, KeyError, TypeError) as e:
+        return f"Μη έγκυρο {MEDIA_MANIFEST}: {e}"
+
+    names = set(zipf.namelist())
+    backup_dir = os.path.dirname(file_path)
+    for relpath, info in files.items():
+        if not _is_safe_relpath(relpath):
+            return f"Μη έγκυρο path στο media manifest: {relpath}"
+        if _is_own_archive(info['archive'], file_path):
+            if f"{MEDIA_BLOB_DIR}{info['sha256']}" not in names:
+                return f"Λείπει blob για: {relpath}"
+        elif not os.path.exists(os.path.join(backup_dir, info['archive'])):
+            return f"Λείπει backup της αλυσίδας: {info['archive']}"
+    return None
+
+
+def _restore_incremental_media(zipf, backup_path, mode='replace'):
+    """
+    Ανασυνθέτει όλο το media tree από το manifest, ανοίγοντας κάθε
+    archive της αλυσίδας που περιέχει blobs μία φορά.
+
+    Στο replace mode αρχεία με ίδιο περιεχόμενο δεν ξαναγράφονται· στο
+    merge mode υπάρχοντα αρχεία δεν αγγίζονται.
+    """
+    manifest = json.loads(zipf.read(MEDIA_MANIFEST).decode('utf-8'))
+    backup_dir = os.path.dirname(backup_path)
+
+    by_archive = defaultdict(list)
+    for relpath, info in manifest['files'].items():
+        if not _is_safe_relpath(relpath):
+            raise ValueError(f"Μη έγκυρο path στο media manifest: {relpath}")
+        archive = MEDIA_SELF_ARCHIVE if _is_own_archive(info['archive'], backup_path) else info['archive']
+        by_archive[archive].append((relpath, info))
+
+    restored = 0
+    for archive, entries in by_archive.items():
+        if archive == MEDIA_SELF_ARCHIVE:
+            source = zipf
+        else:
+            archive_path = os.path.join(backup_dir, archive)
+            if not os.path.exists(archive_path):
+                raise FileNotFoundError(f"Λείπει backup της αλυσίδας: {archive}")
+            source = zipfile.ZipFile(archive_path, 'r')
+
+        try:
+            for relpath, info in entries:
+                target_path = os.path.join(settings.MEDIA_ROOT, *relpath.split('/'))
+                if os.path.exists(target_path):
+                    if mode != 'replace':
+                        continue
+                    if (os.path.getsize(target_path) == info['size']
+                            and _file_sha256(target_path) == info['sha256']):
+                        continue
+
+                os.makedirs(os.path.dirname(target_path), exist_ok=True)
+                with source.open(f"{MEDIA_BLOB_DIR}{info['sha256']}") as src, open(target_path, 'wb') as dst:
+                    shutil.copyfileobj(src, dst)
+                restored += 1
+        finally:
+            if source is not zipf:
+                source.close()
+
+    logger.info(f"Incremental media restored: {restored} files written from {len(by_archive)} archives")
 
 
 def get_backup_list():
@@ -22,15 +22,18 @@ Usage:
 
     # Verbose output
     python manage.py init_filing_system --verbose
+
+Για αλλαγή έτους (π.χ. Δεκέμβριος) αρκεί το --year με το νέο έτος.
+Χωρίς αυτό οι φάκελοι δημιουργούνται ούτως ή άλλως με το πρώτο έγγραφο.
 """
 
 import os
 from datetime import datetime
 from django.core.management.base import BaseCommand, CommandError
-from django.conf import settings as django_settings
 
 from settings.models import FilingSystemSettings
 from accounting.models import ClientProfile
+from accounting.services.folder_provisioning import FolderLayout, FolderProvisioner
 
 
 class Command(BaseCommand):
@@ -134,134 +137,31 @@ class Command(BaseCommand):
         if options['dry_run']:
             self.stdout.write(self.style.WARNING("\n[DRY RUN - Καμία αλλαγή δεν θα γίνει]\n"))
 
-        # Counters
-        folders_created = 0
-        folders_existing = 0
-        errors = 0
-
-        # Δημιουργία φακέλων
-        for idx, client in enumerate(clients, 1):
-            self.stdout.write(f"\n[{idx}/{client_count}] {client.eponimia} ({client.afm})")
-
-            try:
-                created, existing = self._create_client_folders(
-                    client,
-                    filing_settings,
-                    archive_root,
-                    years,
-                    options
+        # Ένα os.makedirs ανά φάκελο-φύλλο, χωρίς επανάληψη για γνωστούς φακέλους
+        provisioner = FolderProvisioner(
+            FolderLayout(filing_settings, archive_root),
+            dry_run=options['dry_run']
+        )
+        for idx, client in enumerate(clients.iterator(chunk_size=500), 1):
+            before = provisioner.stats['makedirs']
+            provisioner.provision_client(
+                client,
+                years=[] if options['only_permanent'] else years,
+            )
+            if options['verbose']:
+                self.stdout.write(
+                    f"[{idx}/{client_count}] {client.eponimia} ({client.afm}): "
+                    f"{provisioner.stats['makedirs'] - before} φάκελοι"
                 )
-                folders_created += created
-                folders_existing += existing
-            except Exception as e:
-                errors += 1
-                self.stdout.write(self.style.ERROR(f"  ✗ Σφάλμα: {e}"))
+
+        stats = provisioner.stats
 
         # Summary
         self.stdout.write(f"\n{'=' * 60}")
         self.stdout.write(self.style.SUCCESS('ΟΛΟΚΛΗΡΩΣΗ'))
         self.stdout.write(f"{'=' * 60}")
-        self.stdout.write(f"Νέοι φάκελοι: {folders_created}")
-        self.stdout.write(f"Υπάρχοντες: {folders_existing}")
-        if errors:
-            self.stdout.write(self.style.ERROR(f"Σφάλματα: {errors}"))
-
-    def _create_client_folders(self, client, settings, archive_root, years, options):
-        """Δημιουργεί τη δομή φακέλων για έναν πελάτη."""
-        import re
-
-        created = 0
-        existing = 0
-        dry_run = options['dry_run']
-        verbose = options['verbose']
-        only_permanent = options['only_permanent']
-
-        # Καθαρισμός επωνυμίας
-        safe_name = re.sub(r'[^\w\s-]', '', client.eponimia)[:30]
-        safe_name = safe_name.replace(' ', '_').strip('_')
-
-        # Base client folder
-        client_folder = os.path.join(archive_root, 'clients', f"{client.afm}_{safe_name}")
-
-        # === 1. ΜΟΝΙΜΟΣ ΦΑΚΕΛΟΣ (00_ΜΟΝΙΜΑ) ===
-        if settings.enable_permanent_folder:
-            permanent_path = os.path.join(client_folder, settings.permanent_folder_name)
-
-            for category in settings.get_permanent_folder_categories():
-                cat_path = os.path.join(permanent_path, category)
-                c, e = self._ensure_folder(cat_path, dry_run, verbose)
-                created += c
-                existing += e
-
-        if only_permanent:
-            return created, existing
-
-        # === 2. ΕΤΗΣΙΟΙ ΦΑΚΕΛΟΙ ===
-        for year in years:
-            year_path = os.path.join(client_folder, str(year))
-
-            # Μηνιαίοι φάκελοι (01-12)
-            for month in range(1, 13):
-                month_name = settings.get_month_folder_name(month)
-                month_path = os.path.join(year_path, month_name)
-
-                for category in settings.get_monthly_folder_categories():
-                    cat_path = os.path.join(month_path, category)
-                    c, e = self._ensure_folder(cat_path, dry_run, verbose)
-                    created += c
-                    existing += e
-
-            # === 3. ΕΤΗΣΙΟΣ ΦΑΚΕΛΟΣ (13_ΕΤΗΣΙΑ) ===
-            if settings.enable_yearend_folder:
-                yearend_path = os.path.join(year_path, settings.yearend_folder_name)
-
-                for category in settings.get_yearend_folder_categories():
-                    cat_path = os.path.join(yearend_path, category)
-                    c, e = self._ensure_folder(cat_path, dry_run, verbose)
-                    created += c
-                    existing += e
-
-        # === 4. INFO.txt ===
-        info_path = os.path.join(client_folder, 'INFO.txt')
-        if not os.path.exists(info_path) and not dry_run:
-            try:
-                os.makedirs(client_folder, exist_ok=True)
-                with open(info_path, 'w', encoding='utf-8') as f:
-                    f.write(f"ΠΕΛΑΤΗΣ: {client.eponimia}\n")
-                    f.write(f"ΑΦΜ: {client.afm}\n")
-                    f.write(f"ΔΟΥ: {client.doy or '-'}\n")
-                    f.write(f"Email: {client.email or '-'}\n")
-                    f.write(f"Τηλέφωνο: {client.phone or '-'}\n")
-                    f.write(f"Δημιουργία: {datetime.now().strftime('%d/%m/%Y %H:%M')}\n")
-                    f.write(f"\n--- Δομή Φακέλων ---\n")
-                    f.write(f"00_ΜΟΝΙΜΑ/ - Μόνιμα έγγραφα (συμβάσεις, καταστατικό)\n")
-                    f.write(f"YYYY/MM/  - Μηνιαία έγγραφα ανά έτος\n")
-                    f.write(f"YYYY/13_ΕΤΗΣΙΑ/ - Ετήσιες δηλώσεις (Ε1, Ε2, Ε3, ΕΝΦΙΑ)\n")
-                if verbose:
-                    self.stdout.write(f"    ✓ INFO.txt")
-                created += 1
-            except Exception as e:
-                self.stdout.write(self.style.ERROR(f"    ✗ INFO.txt: {e}"))
-
-        return created, existing
-
-    def _ensure_folder(self, path, dry_run, verbose):
-        """Δημιουργεί φάκελο αν δεν υπάρχει."""
-        if os.path.exists(path):
-            if verbose:
-                self.stdout.write(f"    - {path} (υπάρχει)")
-            return 0, 1
-
-        if dry_run:
-            if verbose:
-                self.stdout.write(f"    + {path} (θα δημιουργηθεί)")
-            return 1, 0
-
-        try:
-            os.makedirs(path, exist_ok=True)
-            if verbose:
-                self.stdout.write(self.style.SUCCESS(f"    ✓ {path}"))
-            return 1, 0
-        except Exception as e:
-            self.stdout.write(self.style.ERROR(f"    ✗ {path}: {e}"))
-            return 0, 0
+        self.stdout.write(f"Φάκελοι (os.makedirs): {stats['makedirs']}")
+        self.stdout.write(f"Παραλείφθηκαν (γνωστοί): {stats['skipped']}")
+        self.stdout.write(f"Νέα INFO.txt: {stats['info_files']}")
+        if stats['errors']:
+            self.stdout.write(self.style.ERROR(f"Σφάλματα: {stats['errors']}"))
@@ -7,6 +7,8 @@ Usage:
     python manage.py quick_backup
     python manage.py quick_backup --notes "Before major update"
     python manage.py quick_backup --no-media
+    python manage.py quick_backup --compact
+    python manage.py quick_backup --incremental   # Only new/changed media files
 """
 from django.core.management.base import BaseCommand, CommandError
 
@@ -29,6 +31,17 @@ class Command(BaseCommand):
             action='store_true',
             help='Skip backing up media files (faster)'
         )
+        parser.add_argument(
+            '--compact',
+            action='store_true',
+            help='Compact NDJSON encoding and maximum compression (smaller, slower)'
+        )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            default=None,
+            help='Incremental media backup (only new/changed files since the previous one)'
+        )
         parser.add_argument(
             '--quiet',
             action='store_true',
@@ -50,7 +63,9 @@ class Command(BaseCommand):
             backup = create_backup(
                 user=None,
                 include_media=include_media,
-                notes=notes or 'CLI backup'
+                notes=notes or 'CLI backup',
+                compact=options['compact'],
+                incremental_media=options['incremental']
             )
 
             if quiet:
@@ -59,6 +74,9 @@ class Command(BaseCommand):
                 self.stdout.write(self.style.SUCCESS(f'\n✅ Backup created successfully!'))
                 self.stdout.write(f'   📄 File: {backup.filename}')
                 self.stdout.write(f'   📏 Size: {backup.file_size_display()}')
+                if backup.media_incremental:
+                    parent = backup.media_parent.filename if backup.media_parent else 'none (new base)'
+                    self.stdout.write(f'   🔗 Media parent: {parent}')
                 self.stdout.write(f'   📍 Path: {backup.file_path}')
 
         except Exception as e:
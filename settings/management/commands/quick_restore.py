@@ -7,6 +7,7 @@ Usage:
     python manage.py quick_restore --latest     # Restore latest backup
     python manage.py quick_restore --id 5       # Restore backup with ID 5
     python manage.py quick_restore --file backup_20241201.zip  # By filename
+    python manage.py quick_restore --id 5 --resume  # Continue an interrupted restore
 
 WARNING: 'replace' mode will OVERWRITE your current database!
 """
@@ -47,6 +48,11 @@ class Command(BaseCommand):
             action='store_true',
             help='Skip creating safety backup before restore (not recommended!)'
         )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Continue an interrupted restore from the last loaded chunk'
+        )
         parser.add_argument(
             '--yes',
             action='store_true',
@@ -60,6 +66,7 @@ class Command(BaseCommand):
         mode = options['mode']
         skip_safety = options['no_safety_backup']
         auto_confirm = options['yes']
+        resume = options['resume']
 
         # Determine which backup to restore
         backup = None
@@ -106,6 +113,8 @@ class Command(BaseCommand):
         self.stdout.write(f'   Size:    {backup.file_size_display()}')
         self.stdout.write(f'   Mode:    {mode}')
         self.stdout.write(f'   Safety:  {"No" if skip_safety else "Yes"}')
+        if resume:
+            self.stdout.write('   Resume:  Yes')
         if backup.notes:
             self.stdout.write(f'   Notes:   {backup.notes}')
         self.stdout.write('=' * 50 + '\n')
@@ -129,7 +138,9 @@ class Command(BaseCommand):
             backup.id,
             user=None,
             mode=mode,
-            create_safety_backup=not skip_safety
+            create_safety_backup=not skip_safety,
+            resume=resume,
+            progress_callback=self._show_progress
         )
 
         if result['success']:
@@ -138,8 +149,17 @@ class Command(BaseCommand):
                 safety = BackupHistory.objects.get(pk=result['safety_backup_id'])
                 self.stdout.write(f'   Safety backup: {safety.filename}')
         else:
+            if result.get('can_resume'):
+                self.stdout.write(self.style.WARNING(
+                    f'   Continue with: python manage.py quick_restore --id {backup.id} --resume'
+                ))
             raise CommandError(f'❌ Restore failed: {result.get("error", "Unknown error")}')
 
+    def _show_progress(self, done, total, label):
+        """Progress ανά chunk της βάσης."""
+        percent = done * 100 // total if total else 100
+        self.stdout.write(f'   {percent:3d}% ({done}/{total}) {label}')
+
     def _show_backup_list(self):
         """Show interactive list of available backups."""
         backups = BackupHistory.objects.order_by('-created_at')[:20]
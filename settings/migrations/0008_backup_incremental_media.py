@@ -0,0 +1,29 @@
+# Generated manually for incremental media backups
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('settings', '0007_backupsettings_backuphistory'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='backupsettings',
+            name='incremental_media',
+            field=models.BooleanField(default=False, help_text='Αποθήκευση μόνο νέων/αλλαγμένων αρχείων (βάσει hash) σε σχέση με το προηγούμενο backup', verbose_name='Incremental Media'),
+        ),
+        migrations.AddField(
+            model_name='backuphistory',
+            name='media_incremental',
+            field=models.BooleanField(default=False, help_text='Τα media αποθηκεύονται ως manifest + blobs (βάσει hash)', verbose_name='Incremental Media'),
+        ),
+        migrations.AddField(
+            model_name='backuphistory',
+            name='media_parent',
+            field=models.ForeignKey(blank=True, help_text='Backup από το οποίο προέρχονται τα αμετάβλητα αρχεία', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='media_children', to='settings.backuphistory', verbose_name='Προηγούμενο Media Backup'),
+        ),
+    ]
@@ -366,6 +366,11 @@ class BackupSettings(models.Model):
         default=10,
         help_text='Αυτόματη διαγραφή παλαιότερων (0 = χωρίς όριο)'
     )
+    incremental_media = models.BooleanField(
+        'Incremental Media',
+        default=False,
+        help_text='Αποθήκευση μόνο νέων/αλλαγμένων αρχείων (βάσει hash) σε σχέση με το προηγούμενο backup'
+    )
     created_at = models.DateTimeField('Δημιουργήθηκε', auto_now_add=True)
     updated_at = models.DateTimeField('Ενημερώθηκε', auto_now=True)
 
@@ -412,6 +417,20 @@ class BackupHistory(models.Model):
     file_size = models.BigIntegerField('Μέγεθος (bytes)', default=0)
     includes_db = models.BooleanField('Περιέχει DB', default=True)
     includes_media = models.BooleanField('Περιέχει Media', default=False)
+    media_incremental = models.BooleanField(
+        'Incremental Media',
+        default=False,
+        help_text='Τα media αποθηκεύονται ως manifest + blobs (βάσει hash)'
+    )
+    media_parent = models.ForeignKey(
+        'self',
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='media_children',
+        verbose_name='Προηγούμενο Media Backup',
+        help_text='Backup από το οποίο προέρχονται τα αμετάβλητα αρχεία'
+    )
     created_by = models.ForeignKey(
         'auth.User',
         on_delete=models.SET_NULL,
@@ -454,6 +473,15 @@ class BackupHistory(models.Model):
         """Έλεγχος αν το αρχείο υπάρχει."""
         return os.path.exists(self.file_path)
 
+    def media_chain(self):
+        """Η αλυσίδα incremental media backups, από αυτό μέχρι τη βάση."""
+        chain = []
+        backup = self
+        while backup is not None:
+            chain.append(backup)
+            backup = backup.media_parent
+        return chain
+
     def __str__(self):
         return f"{self.filename} ({self.created_at.strftime('%d/%m/%Y %H:%M')})"
 
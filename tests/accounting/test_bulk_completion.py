@@ -0,0 +1,162 @@
+"""
+Tests for the asynchronous bulk complete with documents pipeline
+Tests for: staging, BulkCompletionJob execution, status endpoint
+"""
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import Group, User
+from django.core import mail
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounting.models import (
+    BulkCompletionJob, ClientDocument, ClientProfile, EmailLog, EmailTemplate,
+    MonthlyObligation, ObligationType
+)
+from accounting.services.bulk_completion import run_bulk_completion_job
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+BULK_URL = '/accounting/api/v1/obligations/bulk-complete-with-documents/'
+
+
+@override_settings(
+    AUTO_CREATE_CLIENT_OBLIGATION=False,
+    CACHES=LOCMEM_CACHE,
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+)
+class BulkCompletionJobTest(TestCase):
+    """bulk_complete_with_documents -> BulkCompletionJob -> Celery task"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media_override = override_settings(MEDIA_ROOT=self.media_root)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+        # Create co-workers group (required by signal)
+        Group.objects.create(name='co-workers')
+        self.user = User.objects.create_user(username='bulkuser', password='testpass123')
+        self.api = APIClient()
+        self.api.force_authenticate(user=self.user)
+
+        self.obligation_type = ObligationType.objects.create(
+            name="ΦΠΑ Μηνιαίο", code="ΦΠΑ", frequency="monthly", deadline_type="last_day"
+        )
+        EmailTemplate.objects.create(
+            name='Ολοκλήρωση',
+            subject='Ολοκλήρωση {obligation_type}',
+            body_html='<p>{client_name}</p>',
+            is_active=True
+        )
+        self.obligations = []
+        for index, email in enumerate(('a@example.com', 'b@example.com', '')):
+            client = ClientProfile.objects.create(
+                afm=f"80000020{index}", eponimia=f"Bulk Client {index}", email=email
+            )
+            self.obligations.append(MonthlyObligation.objects.create(
+                client=client,
+                obligation_type=self.obligation_type,
+                year=2025,
+                month=1,
+                deadline=timezone.now().date() + timedelta(days=5),
+            ))
+
+    def post(self, **extra):
+        ids = [obligation.id for obligation in self.obligations]
+        data = {
+            'obligation_ids': str(ids),
+            'save_to_folders': 'true',
+            'send_emails': 'true',
+            'attach_to_emails': 'true',
+            f'file_{ids[0]}': SimpleUploadedFile('vat.pdf', b'%PDF-1.4 test', 'application/pdf'),
+            f'file_{ids[1]}': SimpleUploadedFile('virus.exe', b'MZ', 'application/octet-stream'),
+        }
+        data.update(extra)
+        return self.api.post(BULK_URL, data, format='multipart', secure=True)
+
+    @mock.patch('accounting.tasks.process_bulk_completion_job.delay')
+    def test_request_only_stages_files(self, delay):
+        response = self.post()
+
+        self.assertEqual(response.status_code, 202)
+        job = BulkCompletionJob.objects.get(id=response.data['job_id'])
+        delay.assert_called_once_with(job.id)
+        self.assertEqual(response.data['status'], 'pending')
+        self.assertIn(f'/bulk-complete-jobs/{job.id}/', response.data['status_url'])
+
+        # Μόνο το έγκυρο αρχείο, τίποτα δεν έχει ολοκληρωθεί ακόμα
+        self.assertEqual(list(job.staged_files), [str(self.obligations[0].id)])
+        self.assertTrue(os.path.exists(os.path.join(job.staging_dir, f'{self.obligations[0].id}.pdf')))
+        self.assertFalse(MonthlyObligation.objects.filter(status='completed').exists())
+        self.assertFalse(ClientDocument.objects.exists())
+
+    @mock.patch('accounting.tasks.process_bulk_completion_job.delay')
+    def test_job_pipeline(self, delay):
+        job_id = self.post().data['job_id']
+
+        job = run_bulk_completion_job(job_id)
+
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual(job.completed_count, 3)
+        self.assertEqual(job.progress, 100)
+        self.assertEqual(
+            MonthlyObligation.objects.filter(status='completed', completed_by=self.user).count(), 3
+        )
+
+        document = ClientDocument.objects.get()
+        self.assertEqual(document.obligation, self.obligations[0])
+        self.assertEqual(document.document_category, 'vat')
+        self.assertEqual(job.results[0]['document_id'], document.id)
+        self.assertFalse(os.path.exists(job.staging_dir))
+
+        self.assertEqual(
+            {k: job.email_results[k] for k in ('sent', 'failed', 'skipped')},
+            {'sent': 2, 'failed': 0, 'skipped': 1}
+        )
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(len(mail.outbox[0].attachments), 1)
+        self.assertEqual(EmailLog.objects.filter(status='sent').count(), 2)
+
+        # Δεύτερη εκτέλεση (π.χ. retry του task) δεν κάνει τίποτα
+        run_bulk_completion_job(job_id)
+        self.assertEqual(len(mail.outbox), 2)
+
+    @mock.patch('accounting.tasks.process_bulk_completion_job.delay', side_effect=OSError('no broker'))
+    def test_runs_synchronously_without_broker(self, delay):
+        response = self.post(send_emails='false')
+
+        self.assertEqual(response.status_code, 202)
+        self.assertTrue(response.data['is_finished'])
+        self.assertEqual(response.data['completed_count'], 3)
+        self.assertEqual(len(mail.outbox), 0)
+
+    @mock.patch('accounting.tasks.process_bulk_completion_job.delay')
+    def test_status_endpoint(self, delay):
+        job_id = self.post().data['job_id']
+        url = f'/accounting/api/v1/obligations/bulk-complete-jobs/{job_id}/'
+
+        response = self.api.get(url, secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.data['is_finished'])
+
+        run_bulk_completion_job(job_id)
+        response = self.api.get(url, secure=True)
+        self.assertTrue(response.data['is_finished'])
+        self.assertEqual(response.data['message'], '3 υποχρεώσεις ολοκληρώθηκαν.')
+
+        other = User.objects.create_user(username='otheruser', password='testpass123')
+        self.api.force_authenticate(user=other)
+        self.assertEqual(self.api.get(url, secure=True).status_code, 404)
+
+    def test_no_pending_obligations(self):
+        MonthlyObligation.objects.update(status='completed')
+        response = self.post()
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(BulkCompletionJob.objects.exists())
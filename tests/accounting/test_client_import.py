@@ -0,0 +1,189 @@
+"""
+Tests for the bulk client import pipeline
+Tests for: row validation report, upsert modes, import job API, import_clients command
+"""
+import io
+import shutil
+import tempfile
+from datetime import date
+
+import openpyxl
+from django.contrib.auth.models import Group, User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounting.models import (
+    ClientImportJob, ClientObligation, ClientPhoneIndex, ClientProfile, MonthlyObligation, ObligationType,
+)
+from accounting.services.client_import import import_clients
+from accounting.services.document_counters import get_documents_version
+from accounting.services.notification_feed import feed_version, notification_feed
+
+HEADERS = ['Α.Φ.Μ.', 'Επωνυμία/Επώνυμο', 'Email', 'Κινητό τηλέφωνο', 'Ημ. Γέννησης', 'Είδος Υπόχρεου']
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def build_workbook(path, rows):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(HEADERS)
+    for row in rows:
+        sheet.append(row)
+    workbook.save(path)
+
+
+@override_settings(AUTO_CREATE_CLIENT_OBLIGATION=False, CACHES=LOCMEM_CACHE)
+class ClientImportTest(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+        media_override = override_settings(MEDIA_ROOT=self.tmp_dir)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+        Group.objects.create(name='co-workers')
+        self.path = f'{self.tmp_dir}/clients.xlsx'
+        ClientProfile.objects.create(
+            afm='800000616', eponimia='Υπάρχων Πελάτης', email='old@example.com', kinito_tilefono='6971111111'
+        )
+
+    def test_validation_report(self):
+        build_workbook(self.path, [
+            ['123456789', 'Παράδειγμα', '', '', '', ''],           # γραμμή παραδείγματος
+            [800000604, 'Νέος Α.Ε.', 'new@example.com', 6972222222, '01/02/1980', 'ΕΤΑΙΡΕΙΑ'],
+            ['12345', 'Λάθος ΑΦΜ', '', '', '', ''],
+            ['800000604', 'Διπλότυπος', '', '', '', ''],
+            ['800000628', 'Λάθος ημερομηνία', '', '', '31/31/2020', ''],
+            ['800000629', 'Check digit', 'not-an-email', '', '', ''],
+            ['800000631', 'Check digit', '', '', '', ''],
+            [None, None, None, None, None, None],
+        ])
+
+        stats = import_clients(self.path, mode='update', batch_size=2)
+
+        self.assertEqual(stats['processed'], 6)
+        self.assertEqual((stats['created'], stats['updated'], stats['errors'], stats['warnings']), (2, 0, 4, 1))
+        client = ClientProfile.objects.get(afm='800000604')
+        self.assertEqual(client.eidos_ipoxreou, 'company')
+        self.assertEqual(client.imerominia_gennisis, date(1980, 2, 1))
+        self.assertEqual(client.kinito_tilefono, '6972222222')
+
+        report = {entry['row']: entry for entry in stats['report']}
+        self.assertIn('9 ψηφία', report[4]['messages'][0])
+        self.assertIn('Διπλότυπο ΑΦΜ στο αρχείο (γραμμή 3)', report[5]['messages'][0])
+        self.assertIn('Μη έγκυρη ημερομηνία', report[6]['messages'][0])
+        self.assertEqual(report[7]['messages'], [
+            'Άκυρο email: not-an-email', 'Το ΑΦΜ 800000629 δεν περνά τον έλεγχο check digit'
+        ])
+        self.assertEqual(report[8]['level'], 'warning')
+        self.assertTrue(ClientProfile.objects.filter(afm='800000631').exists())
+        # Ευρετήριο τηλεφώνων χωρίς post_save
+        self.assertTrue(ClientPhoneIndex.objects.filter(client=client, phone='6972222222').exists())
+
+    def test_upsert_modes(self):
+        build_workbook(self.path, [
+            ['800000616', 'Νέα Επωνυμία', '', 6973333333, '', ''],
+            ['800000604', 'Νέος Πελάτης', '', '', '', ''],
+        ])
+
+        stats = import_clients(self.path, mode='skip')
+        self.assertEqual((stats['created'], stats['updated'], stats['skipped']), (1, 0, 1))
+        self.assertEqual(ClientProfile.objects.get(afm='800000616').eponimia, 'Υπάρχων Πελάτης')
+
+        stats = import_clients(self.path, mode='update')
+        self.assertEqual((stats['created'], stats['updated']), (0, 2))
+        client = ClientProfile.objects.get(afm='800000616')
+        self.assertEqual(client.eponimia, 'Νέα Επωνυμία')
+        # Κενό κελί δεν σβήνει την υπάρχουσα τιμή
+        self.assertEqual(client.email, 'old@example.com')
+        self.assertEqual(
+            list(ClientPhoneIndex.objects.filter(client=client).values_list('phone', flat=True)),
+            ['6973333333']
+        )
+        self.assertEqual(ClientProfile.objects.count(), 2)
+
+    def test_update_refreshes_notification_feed(self):
+        client = ClientProfile.objects.get(afm='800000616')
+        obligation_type = ObligationType.objects.create(name='ΦΠΑ', code='VAT', frequency='monthly')
+        deadline = timezone.localdate()
+        MonthlyObligation.objects.create(
+            client=client, obligation_type=obligation_type, deadline=deadline, status='pending',
+            year=deadline.year, month=deadline.month,
+        )
+        user = User.objects.create_user(username='feed', password='testpass123')
+        version = feed_version()
+        build_workbook(self.path, [['800000616', 'Νέα Επωνυμία', '', '', '', '']])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            import_clients(self.path, mode='update')
+
+        names = [entry['client_name'] for entry in notification_feed(user)['notifications']]
+        self.assertEqual(names, ['Νέα Επωνυμία'])
+        self.assertNotEqual(feed_version(), version)
+
+    def test_import_invalidates_document_tree(self):
+        version = get_documents_version()
+        build_workbook(self.path, [['800000616', 'Νέα Επωνυμία', '', '', '', '']])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            import_clients(self.path, mode='update')
+
+        self.assertNotEqual(get_documents_version(), version)
+
+    @override_settings(AUTO_CREATE_CLIENT_OBLIGATION=True)
+    def test_api_job(self):
+        user = User.objects.create_user(username='importer', password='testpass123')
+        api = APIClient()
+        api.force_authenticate(user=user)
+        build_workbook(self.path, [
+            ['800000604', 'Νέος Α.Ε.', '', '', '', ''],
+            ['12345', 'Λάθος ΑΦΜ', '', '', '', ''],
+        ])
+        with open(self.path, 'rb') as excel_file:
+            upload = SimpleUploadedFile('clients.xlsx', excel_file.read())
+
+        # Χωρίς broker το job εκτελείται συγχρονικά
+        response = api.post(
+            '/accounting/api/v1/import/clients/csv/', {'file': upload, 'mode': 'update'},
+            format='multipart', secure=True
+        )
+
+        self.assertEqual(response.status_code, 202)
+        job = ClientImportJob.objects.get(pk=response.data['job_id'])
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual((job.created_count, job.error_count), (1, 1))
+        self.assertTrue(ClientObligation.objects.filter(client__afm='800000604').exists())
+
+        status_response = api.get(response.data['status_url'], secure=True)
+        self.assertEqual(status_response.data['errors'][0][:9], 'Γραμμή 3:')
+
+        csv_response = api.get(response.data['status_url'], {'export_format': 'csv'}, secure=True)
+        lines = b''.join(csv_response.streaming_content).decode('utf-8-sig').splitlines()
+        self.assertEqual(lines[0], 'Γραμμή,Α.Φ.Μ.,Επίπεδο,Μηνύματα')
+        self.assertTrue(lines[1].startswith('3,12345,Σφάλμα'))
+
+        bad_file = SimpleUploadedFile('clients.xlsx', b'not a workbook')
+        response = api.post('/accounting/api/v1/import/clients/csv/', {'file': bad_file},
+                            format='multipart', secure=True)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(ClientImportJob.objects.count(), 1)
+
+    def test_command_aborts_on_errors_without_skip_errors(self):
+        build_workbook(self.path, [
+            ['800000604', 'Νέος Α.Ε.', '', '', '', ''],
+            ['', 'Χωρίς ΑΦΜ', '', '', '', ''],
+        ])
+
+        out = io.StringIO()
+        call_command('import_clients', self.path, stdout=out)
+        self.assertIn('δεν αποθηκεύτηκε τίποτα', out.getvalue())
+        self.assertFalse(ClientProfile.objects.filter(afm='800000604').exists())
+
+        out = io.StringIO()
+        call_command('import_clients', self.path, '--skip-errors', stdout=out)
+        self.assertIn('IMPORT ΟΛΟΚΛΗΡΩΘΗΚΕ', out.getvalue())
+        self.assertTrue(ClientProfile.objects.filter(afm='800000604').exists())
@@ -1,8 +1,8 @@
 """
 Tests for Accounting management commands
 """
-from django.test import TestCase
-from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.core.management import call_command, CommandError
 from django.utils import timezone
 from io import StringIO
 from datetime import datetime
@@ -339,3 +339,130 @@ class GenerateMonthlyObligationsCommandTest(TestCase):
         # Should have detailed output
         self.assertIn('Test Client', output)
         self.assertIn('ΦΠΑ', output)
+
+
+@override_settings(AUTO_CREATE_CLIENT_OBLIGATION=False)
+class GenerateMonthlyObligationsBulkTest(TestCase):
+    """Test set-based bulk mode of generate_monthly_obligations"""
+
+    def setUp(self):
+        self.client_profile = ClientProfile.objects.create(
+            afm="111111111",
+            eponimia="Bulk Client A",
+            eidos_ipoxreou="company"
+        )
+        self.other_profile = ClientProfile.objects.create(
+            afm="222222222",
+            eponimia="Bulk Client B",
+            eidos_ipoxreou="company"
+        )
+
+        self.monthly_type = ObligationType.objects.create(
+            name="ΦΠΑ Μηνιαία",
+            code="VAT_MONTHLY",
+            frequency="monthly",
+            deadline_type="last_day",
+        )
+        self.quarterly_type = ObligationType.objects.create(
+            name="ΦΠΑ Τριμηνιαία",
+            code="VAT_QUARTERLY",
+            frequency="quarterly",
+            deadline_type="last_day",
+            applicable_months="3,6,9,12",
+        )
+        self.payroll_type = ObligationType.objects.create(
+            name="Μισθοδοσία",
+            code="PAYROLL",
+            frequency="monthly",
+            deadline_type="specific_day",
+            deadline_day=25,
+        )
+
+        profile = ObligationProfile.objects.create(name="Μισθοδοσία Package")
+        profile.obligation_types.add(self.payroll_type)
+
+        client_obl = ClientObligation.objects.create(client=self.client_profile, is_active=True)
+        client_obl.obligation_types.add(self.monthly_type, self.quarterly_type)
+        client_obl.obligation_profiles.add(profile)
+
+        other_obl = ClientObligation.objects.create(client=self.other_profile, is_active=True)
+        other_obl.obligation_types.add(self.monthly_type)
+
+    def test_bulk_single_month(self):
+        """Bulk mode creates the same rows as the per-row mode"""
+        call_command('generate_monthly_obligations', year=2099, month=3, bulk=True, stdout=StringIO())
+
+        self.assertEqual(
+            MonthlyObligation.objects.filter(client=self.client_profile, year=2099, month=3).count(),
+            3
+        )
+        self.assertEqual(
+            MonthlyObligation.objects.filter(client=self.other_profile, year=2099, month=3).count(),
+            1
+        )
+        payroll = MonthlyObligation.objects.get(obligation_type=self.payroll_type, year=2099, month=3)
+        self.assertEqual(payroll.deadline.day, 25)
+        self.assertEqual(payroll.status, 'pending')
+
+    def test_bulk_month_range(self):
+        """--from/--to generates a whole range in one pass"""
+        out = StringIO()
+        call_command(
+            'generate_monthly_obligations',
+            period_from='2099-01',
+            period_to='2099-12',
+            stdout=out
+        )
+
+        # Client A: 12 monthly + 4 quarterly + 12 payroll, Client B: 12 monthly
+        self.assertEqual(MonthlyObligation.objects.filter(year=2099).count(), 40)
+        self.assertIn('Χρόνοι ανά φάση', out.getvalue())
+
+    def test_bulk_is_idempotent(self):
+        """Running twice skips existing rows"""
+        call_command('generate_monthly_obligations', period_from='2099-01', period_to='2099-02', stdout=StringIO())
+        out = StringIO()
+        call_command(
+            'generate_monthly_obligations',
+            period_from='2099-01',
+            period_to='2099-02',
+            quiet=True,
+            stdout=out
+        )
+
+        self.assertEqual(MonthlyObligation.objects.filter(year=2099).count(), 6)
+        self.assertIn('Created: 0, Skipped: 6', out.getvalue())
+
+    def test_bulk_query_count_is_constant(self):
+        """Writes are chunked, so queries don't grow per obligation (incl. search index and notifications)"""
+        with self.assertNumQueries(16):
+            call_command(
+                'generate_monthly_obligations',
+                period_from='2099-01',
+                period_to='2099-06',
+                quiet=True,
+                stdout=StringIO()
+            )
+
+    def test_bulk_force_resets_existing(self):
+        """--force resets status/deadline of existing rows with bulk_update"""
+        existing = MonthlyObligation.objects.create(
+            client=self.client_profile,
+            obligation_type=self.monthly_type,
+            year=2099,
+            month=6,
+            deadline=datetime(2099, 6, 15).date(),
+            status='completed',
+        )
+
+        call_command('generate_monthly_obligations', year=2099, month=6, bulk=True, force=True, stdout=StringIO())
+
+        existing.refresh_from_db()
+        self.assertEqual(existing.status, 'pending')
+        self.assertIsNone(existing.completed_date)
+        self.assertEqual(existing.deadline, datetime(2099, 6, 30).date())
+
+    def test_invalid_period(self):
+        """Malformed --from is rejected"""
+        with self.assertRaises(CommandError):
+            call_command('generate_monthly_obligations', period_from='2099-13', stdout=StringIO())
@@ -0,0 +1,115 @@
+"""
+Tests for the file manager document folder counters
+Tests for: signal maintenance, rebuild, browse/stats from counters, ETag / 304
+"""
+import io
+
+from django.contrib.auth.models import Group, User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from accounting.models import ClientDocument, ClientProfile, DocumentFolderCounter
+from accounting.services.document_counters import document_totals, folder_tree, rebuild_document_counters
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(AUTO_CREATE_CLIENT_OBLIGATION=False, CACHES=LOCMEM_CACHE)
+class DocumentFolderCounterTest(TestCase):
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+
+        Group.objects.create(name='co-workers')
+        self.alpha = ClientProfile.objects.create(afm='800000604', eponimia='Άλφα')
+        self.beta = ClientProfile.objects.create(afm='800000612', eponimia='Βήτα')
+        self.api = APIClient()
+        self.api.force_authenticate(user=User.objects.create_user(username='files', password='testpass123'))
+
+    def create_document(self, client, year=2030, month=1, category='vat', name='doc.pdf', **kwargs):
+        return ClientDocument.objects.create(
+            client=client, file=f'clients/{client.afm}/{name}', year=year, month=month,
+            document_category=category, **kwargs
+        )
+
+    def counts(self):
+        return {
+            (c.client_id, c.year, c.month, c.document_category, c.file_type): c.document_count
+            for c in DocumentFolderCounter.objects.all()
+        }
+
+    def test_signals_keep_counters_in_sync(self):
+        doc = self.create_document(self.alpha)
+        self.create_document(self.alpha, name='second.pdf')
+        self.create_document(self.beta, month=2, category='apd', name='report.xlsx')
+        self.assertEqual(self.counts(), {
+            (self.alpha.id, 2030, 1, 'vat', 'pdf'): 2,
+            (self.beta.id, 2030, 2, 'apd', 'xlsx'): 1,
+        })
+
+        # Μετακίνηση σε άλλο μήνα: -1 στον παλιό φάκελο, +1 στον νέο
+        doc.month = 3
+        doc.save()
+        self.assertEqual(self.counts()[(self.alpha.id, 2030, 1, 'vat', 'pdf')], 1)
+        self.assertEqual(self.counts()[(self.alpha.id, 2030, 3, 'vat', 'pdf')], 1)
+
+        # Μη τρέχουσα έκδοση δεν μετράει, η διαγραφή αφαιρεί τον άδειο φάκελο
+        doc.is_current = False
+        doc.save(update_fields=['is_current'])
+        self.assertNotIn((self.alpha.id, 2030, 3, 'vat', 'pdf'), self.counts())
+        doc.delete()
+        self.assertEqual(sum(self.counts().values()), 2)
+
+    def test_rebuild_matches_documents(self):
+        self.create_document(self.alpha)
+        self.create_document(self.beta, year=2029, name='old.pdf')
+        ClientDocument.objects.filter(client=self.beta).update(is_current=False)
+        DocumentFolderCounter.objects.filter(client=self.alpha).update(document_count=99)
+
+        self.assertEqual(rebuild_document_counters(client_ids=[self.alpha.id, self.beta.id]), 1)
+        self.assertEqual(self.counts(), {(self.alpha.id, 2030, 1, 'vat', 'pdf'): 1})
+
+        out = io.StringIO()
+        call_command('rebuild_document_counters', stdout=out)
+        self.assertIn('Document counters rebuilt: 1 folders', out.getvalue())
+
+    def test_tree_and_totals(self):
+        self.create_document(self.alpha, file_size=100)
+        self.create_document(self.alpha, year=2029, month=12, category='myf', name='b.xlsx', file_size=50)
+        self.create_document(self.beta, name='c.pdf', file_size=10)
+
+        self.assertEqual(
+            [(c['eponimia'], c['document_count']) for c in folder_tree()], [('Άλφα', 2), ('Βήτα', 1)]
+        )
+        self.assertEqual(folder_tree(self.alpha.id), [{'year': 2030, 'count': 1}, {'year': 2029, 'count': 1}])
+        self.assertEqual(folder_tree(self.alpha.id, 2029), [{'month': 12, 'count': 1}])
+
+        totals = document_totals()
+        self.assertEqual(totals['total_documents'], 3)
+        self.assertEqual(totals['by_category'][0], {'document_category': 'vat', 'count': 2})
+        self.assertEqual(totals['by_file_type'][0], {'file_type': 'pdf', 'count': 2})
+
+    def test_browse_etag(self):
+        self.create_document(self.alpha)
+        url = '/accounting/api/v1/file-manager/browse/'
+
+        response = self.api.get(url, {'client_id': self.alpha.id}, secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['years'], [{'year': 2030, 'count': 1}])
+        etag = response['ETag']
+
+        response = self.api.get(url, {'client_id': self.alpha.id}, secure=True, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_document(self.alpha, year=2031, name='new.pdf')
+        response = self.api.get(url, {'client_id': self.alpha.id}, secure=True, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['years']), 2)
+
+        # Η λίστα εγγράφων ενός μήνα δεν έχει ETag
+        response = self.api.get(url, {'client_id': self.alpha.id, 'year': 2030, 'month': 1}, secure=True)
+        self.assertNotIn('ETag', response)
+        self.assertEqual(len(response.data['documents']), 1)
@@ -0,0 +1,121 @@
+"""
+Tests for the EmailTemplate cache
+Tests for: per-obligation-type lookup, compiled templates, signal invalidation
+"""
+from django.test import TestCase, override_settings
+
+from accounting.models import EmailTemplate, ObligationType
+from accounting.utils import email_template_cache
+from accounting.utils.email_template_cache import (
+    get_compiled_template, invalidate_email_template_cache
+)
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class FakeObligation:
+    def __init__(self, obligation_type):
+        self.obligation_type = obligation_type
+        self.obligation_type_id = obligation_type.id if obligation_type else None
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class EmailTemplateCacheTest(TestCase):
+
+    def setUp(self):
+        # Το migration 0025 δημιουργεί ήδη προεπιλεγμένα templates (π.χ. 'Ολοκλήρωση Υποχρέωσης')
+        EmailTemplate.objects.all().delete()
+        invalidate_email_template_cache()
+        self.addCleanup(invalidate_email_template_cache)
+
+        self.vat = ObligationType.objects.create(
+            name="ΦΠΑ Μηνιαίο", code="ΦΠΑ", frequency="monthly", deadline_type="last_day"
+        )
+        self.apd = ObligationType.objects.create(
+            name="ΑΠΔ", code="ΑΠΔ", frequency="monthly", deadline_type="last_day"
+        )
+        self.vat_template = EmailTemplate.objects.create(
+            name='ΦΠΑ', subject='ΦΠΑ {{ client_name }}', body_html='<p>{{ client_name }}</p>',
+            obligation_type=self.vat
+        )
+        self.completion_template = EmailTemplate.objects.create(
+            name='Ολοκλήρωση Υποχρέωσης', subject='Ολοκλήρωση', body_html='<p>ok</p>'
+        )
+        self.reminder_template = EmailTemplate.objects.create(
+            name='Obligation reminder', subject='Υπενθύμιση {{ client_name }}',
+            body_html='<p>{{ deadline }}</p>'
+        )
+
+    def test_lookup_without_queries(self):
+        # Ζέσταμα: ένα query για όλο τον πίνακα
+        with self.assertNumQueries(1):
+            EmailTemplate.get_template_for_obligation(FakeObligation(self.vat))
+
+        with self.assertNumQueries(0):
+            for _ in range(50):
+                self.assertEqual(
+                    EmailTemplate.get_template_for_obligation(FakeObligation(self.vat)),
+                    self.vat_template
+                )
+                self.assertEqual(
+                    EmailTemplate.get_template_for_obligation(FakeObligation(self.apd)),
+                    self.completion_template
+                )
+                self.assertEqual(EmailTemplate.get_reminder_template(), self.reminder_template)
+
+    def test_fallbacks(self):
+        EmailTemplate.objects.filter(pk=self.completion_template.pk).delete()
+        invalidate_email_template_cache()
+        # Χωρίς 'Ολοκλήρωση' -> πρώτο ενεργό κατά όνομα
+        self.assertEqual(
+            EmailTemplate.get_template_for_obligation(FakeObligation(None)),
+            self.reminder_template
+        )
+
+    def test_invalidated_on_save_and_delete(self):
+        self.assertEqual(
+            EmailTemplate.get_template_for_obligation(FakeObligation(self.apd)),
+            self.completion_template
+        )
+
+        apd_template = EmailTemplate.objects.create(
+            name='ΑΠΔ', subject='ΑΠΔ', body_html='<p>apd</p>', obligation_type=self.apd
+        )
+        self.assertEqual(
+            EmailTemplate.get_template_for_obligation(FakeObligation(self.apd)), apd_template
+        )
+
+        apd_template.is_active = False
+        apd_template.save()
+        self.assertEqual(
+            EmailTemplate.get_template_for_obligation(FakeObligation(self.apd)),
+            self.completion_template
+        )
+
+        self.reminder_template.delete()
+        self.assertIsNone(EmailTemplate.get_reminder_template())
+
+    def test_other_process_invalidation(self):
+        EmailTemplate.get_template_for_obligation(FakeObligation(self.vat))
+        EmailTemplate.objects.filter(pk=self.vat_template.pk).update(is_active=False)
+
+        # Άλλη διεργασία άλλαξε την έκδοση στο κοινό cache
+        with override_settings(EMAIL_TEMPLATE_CACHE_CHECK_INTERVAL=0):
+            email_template_cache.cache.set(email_template_cache.EMAIL_TEMPLATE_VERSION_KEY, 'other')
+            self.assertEqual(
+                EmailTemplate.get_template_for_obligation(FakeObligation(self.vat)),
+                self.completion_template
+            )
+
+    def test_render_uses_compiled_templates(self):
+        subject, body = self.reminder_template.render({'client_name': 'Πελάτης', 'deadline': '31/01'})
+        self.assertEqual(subject, 'Υπενθύμιση Πελάτης')
+        self.assertEqual(body, '<p>31/01</p>')
+
+        compiled = get_compiled_template(self.reminder_template)
+        self.assertIs(get_compiled_template(self.reminder_template), compiled)
+
+        # Μη αποθηκευμένη αλλαγή -> νέο compile
+        self.reminder_template.subject = 'Νέο {{ client_name }}'
+        subject, _ = self.reminder_template.render({'client_name': 'Πελάτης'})
+        self.assertEqual(subject, 'Νέο Πελάτης')
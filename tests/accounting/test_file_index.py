@@ -0,0 +1,80 @@
+"""
+Tests for the persistent client file index
+Tests for: incremental refresh, orphan detection, cleanup_orphan_files, file manager stats
+"""
+import io
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth.models import Group, User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from accounting.models import ClientDocument, ClientFileIndex, ClientProfile
+from accounting.services.file_index import orphan_files, refresh_file_index
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(AUTO_CREATE_CLIENT_OBLIGATION=False, CACHES=LOCMEM_CACHE)
+class ClientFileIndexTest(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media_override = override_settings(MEDIA_ROOT=self.media_root)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+        Group.objects.create(name='co-workers')
+        self.client_profile = ClientProfile.objects.create(afm='800000604', eponimia='Πελάτης Α')
+        self.document_path = 'clients/800000604_A/2030/01/vat/doc.pdf'
+        self.orphan_path = 'clients/800000604_A/2030/01/vat/orphan.pdf'
+        self.other_path = 'clients/800000612_B/general/old.txt'
+        for path in (self.document_path, self.orphan_path, self.other_path):
+            self.write(path, b'data')
+        ClientDocument.objects.create(client=self.client_profile, file=self.document_path)
+
+    def write(self, path, content):
+        full_path = os.path.join(self.media_root, *path.split('/'))
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, 'wb') as f:
+            f.write(content)
+
+    def test_incremental_refresh(self):
+        stats = refresh_file_index(workers=2)
+        self.assertEqual((stats['folders'], stats['files'], stats['created']), (2, 3, 3))
+        self.assertEqual(
+            sorted(orphan_files().values_list('path', flat=True)), [self.orphan_path, self.other_path]
+        )
+
+        stats = refresh_file_index()
+        self.assertEqual((stats['created'], stats['updated'], stats['deleted']), (0, 0, 0))
+
+        self.write(self.orphan_path, b'more data')
+        shutil.rmtree(os.path.join(self.media_root, 'clients', '800000612_B'))
+        stats = refresh_file_index(with_hash=True)
+        self.assertEqual((stats['updated'], stats['deleted'], stats['hashed']), (1, 1, 2))
+        entry = ClientFileIndex.objects.get(path=self.orphan_path)
+        self.assertEqual((entry.client_folder, entry.size), ('800000604_A', 9))
+        self.assertEqual(len(entry.sha256), 64)
+
+    def test_cleanup_and_stats_read_the_index(self):
+        out = io.StringIO()
+        call_command('cleanup_orphan_files', '--delete', stdout=out)
+        self.assertIn('Διαγράφηκαν 2 αρχεία', out.getvalue())
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, 'clients', '800000612_B', 'general', 'old.txt')))
+        self.assertTrue(os.path.exists(os.path.join(self.media_root, *self.document_path.split('/'))))
+        self.assertEqual(list(ClientFileIndex.objects.values_list('path', flat=True)), [self.document_path])
+
+        # Τα στατιστικά δεν αγγίζουν τον δίσκο
+        os.remove(os.path.join(self.media_root, *self.document_path.split('/')))
+        api = APIClient()
+        api.force_authenticate(user=User.objects.create_user(username='files', password='testpass123'))
+        response = api.get('/accounting/api/v1/file-manager/stats/', secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_size'], 4)
+        self.assertEqual((response.data['storage']['files'], response.data['storage']['orphan_files']), (1, 0))
+        self.assertEqual(response.data['storage']['by_client_folder'][0]['client_folder'], '800000604_A')
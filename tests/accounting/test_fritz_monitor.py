@@ -0,0 +1,142 @@
+"""
+Tests for the asyncio Fritz!Box call monitor (fritz_monitor.py)
+Tests for: line framing, outbox replay after CRM downtime and restart, idempotent call create
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth.models import Group
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+import fritz_monitor
+from accounting.models import VoIPCall
+
+TRACE = Path(__file__).resolve().parent.parent / 'fixtures' / 'fritz' / 'office_morning.txt'
+
+
+class FakeCRM:
+    """CRM API στη μνήμη· τα πρώτα `down_for` requests αποτυγχάνουν με σφάλμα σύνδεσης."""
+
+    def __init__(self, down_for=0):
+        self.down_for = down_for
+        self.calls = {}
+        self.requests = []
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def request(self, method, endpoint, data=None):
+        if self.down_for:
+            self.down_for -= 1
+            raise ConnectionRefusedError('CRM down')
+        self.requests.append((method, data.get('call_id') if method == 'POST' else endpoint))
+
+        if method == 'POST':
+            for call in self.calls.values():
+                if call['call_id'] == data['call_id']:
+                    return 200, call
+            call = dict(data, id=len(self.calls) + 1, client_name=None)
+            self.calls[call['id']] = call
+            return 201, call
+
+        call = self.calls.get(int(endpoint.split('/')[1]))
+        if call is None:
+            return 404, {'detail': 'Not found.'}
+        call.update(data)
+        return 200, call
+
+    def statuses(self):
+        return sorted((call['phone_number'], call['direction'], call['status']) for call in self.calls.values())
+
+
+EXPECTED = [
+    ('2101234567', 'incoming', 'completed'),
+    ('2310555666', 'incoming', 'missed'),
+    ('6944111222', 'outgoing', 'completed'),
+    ('6977000111', 'incoming', 'missed'),
+]
+
+
+@mock.patch.object(fritz_monitor.Config, 'METRICS_PORT', 0)
+@mock.patch.object(fritz_monitor.Config, 'RETRY_DELAY', 0.01)
+class FritzMonitorReplayTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.outbox_path = os.path.join(self.tmp, 'outbox.sqlite3')
+
+    async def test_replay_frames_lines_split_across_chunks(self):
+        crm = FakeCRM()
+        metrics = await fritz_monitor.replay(str(TRACE), outbox_path=self.outbox_path, api=crm)
+
+        self.assertEqual(crm.statuses(), EXPECTED)
+        missed = [call for call in crm.calls.values() if call['status'] == 'missed']
+        self.assertTrue(all(call['create_ticket'] for call in missed))
+        self.assertEqual((metrics['total_calls'], metrics['missed'], metrics['backlog']), (4, 2, 0))
+        self.assertEqual(metrics['delivered'], 10)
+        self.assertIsNotNone(metrics['latency_p95_ms'])
+
+    async def test_outbox_replays_in_order_after_downtime(self):
+        crm = FakeCRM(down_for=5)
+        metrics = await fritz_monitor.replay(str(TRACE), outbox_path=self.outbox_path, api=crm)
+
+        self.assertEqual(crm.statuses(), EXPECTED)
+        self.assertGreaterEqual(metrics['retries'], 1)
+        # Ανά κλήση: πρώτα το create, μετά τα PATCH
+        for call in crm.calls.values():
+            created = crm.requests.index(('POST', call['call_id']))
+            self.assertTrue(all(
+                index > created for index, request in enumerate(crm.requests)
+                if request == ('PATCH', f"voip-calls/{call['id']}/")
+            ))
+
+    async def test_outbox_survives_restart(self):
+        # Το CRM είναι κάτω όσο έρχονται τα events
+        monitor = fritz_monitor.VoIPMonitor(
+            outbox=fritz_monitor.Outbox(self.outbox_path), api=FakeCRM(down_for=1000), use_event_time=True
+        )
+        for line in fritz_monitor.read_trace(str(TRACE)):
+            monitor.process_line(line)
+        delivered, blocked = await monitor.dispatcher.dispatch_once()
+        self.assertEqual((delivered, blocked), (0, True))
+        monitor.outbox.close()
+
+        crm = FakeCRM()
+        restarted = fritz_monitor.VoIPMonitor(outbox=fritz_monitor.Outbox(self.outbox_path), api=crm)
+        self.assertEqual(restarted.outbox.backlog()[0], 10)
+        while (await restarted.dispatcher.dispatch_once())[0]:
+            pass
+        self.assertEqual(crm.statuses(), EXPECTED)
+        self.assertEqual(restarted.outbox.backlog()[0], 0)
+        restarted.outbox.close()
+
+
+@override_settings(AUTO_CREATE_CLIENT_OBLIGATION=False)
+class VoIPCallIdempotentCreateTest(TestCase):
+
+    def test_repeated_create_returns_existing_call(self):
+        Group.objects.create(name='co-workers')
+        payload = {
+            'call_id': '0_1792141201',
+            'phone_number': '2101234567',
+            'direction': 'incoming',
+            'status': 'active',
+            'started_at': '2026-10-16T06:00:01+00:00',
+        }
+        api = APIClient()
+        first = api.post('/accounting/api/voip-calls/', payload, format='json', secure=True, REMOTE_ADDR='127.0.0.1')
+        self.assertEqual(first.status_code, 201)
+
+        again = api.post('/accounting/api/voip-calls/', payload, format='json', secure=True, REMOTE_ADDR='127.0.0.1')
+        self.assertEqual(again.status_code, 200)
+        self.assertEqual(again.data['id'], first.data['id'])
+        self.assertEqual(VoIPCall.objects.filter(call_id='0_1792141201').count(), 1)
@@ -0,0 +1,119 @@
+"""
+Tests for the live call/ticket feed (accounting/services/live_feed.py, accounting/api_live.py)
+Tests for: signal deltas, events_since/reset, SSE stream, conditional GET fallback
+"""
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounting.models import LiveFeedSequence, VoIPCall
+from accounting.services.live_feed import (
+    LIVE_EVENT_KEY, LIVE_FEED_MAX_EVENTS, current_seq, events_since, publish_live_event,
+)
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(
+    AUTO_CREATE_CLIENT_OBLIGATION=False, CACHES=LOCMEM_CACHE,
+    LIVE_FEED_POLL_INTERVAL=0, LIVE_FEED_MAX_SECONDS=0,
+)
+class LiveFeedTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        Group.objects.create(name='co-workers')
+        self.user = User.objects.create_user(username='liveuser', password='testpass123')
+        self.api = APIClient()
+        self.api.force_authenticate(user=self.user)
+
+    def create_call(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return VoIPCall.objects.create(
+                call_id=kwargs.pop('call_id', '0_100'),
+                phone_number='2101234567',
+                direction='incoming',
+                started_at=timezone.now(),
+                **kwargs
+            )
+
+    def test_call_save_publishes_delta_after_commit(self):
+        call = self.create_call()
+        with self.captureOnCommitCallbacks(execute=True):
+            call.status = 'completed'
+            call.duration_seconds = 42
+            call.save()
+
+        seq, events, reset = events_since(0)
+        self.assertEqual((seq, reset), (2, False))
+        self.assertEqual([(e['type'], e['action']) for e in events], [('call', 'created'), ('call', 'updated')])
+        self.assertEqual(events[1]['data']['status'], 'completed')
+        self.assertEqual(events[1]['data']['duration_seconds'], 42)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_id = call.id
+            call.delete()
+        self.assertEqual(events_since(2)[1][0]['data'], {'id': call_id})
+
+    def test_client_too_far_behind_gets_reset(self):
+        for n in range(LIVE_FEED_MAX_EVENTS + 5):
+            publish_live_event('call', 'updated', {'id': n})
+        self.assertEqual(events_since(0), (current_seq(), [], True))
+
+        # Έληξε το πρώτο event που χρειάζεται ο client
+        seq = current_seq()
+        cache.delete(LIVE_EVENT_KEY.format(seq - 1))
+        self.assertEqual(events_since(seq - 2), (seq, [], True))
+        self.assertEqual(events_since(seq - 1)[1][0]['id'], seq)
+
+    def test_seq_comes_from_database_row(self):
+        self.assertEqual(publish_live_event('call', 'created', {'id': 1}), 1)
+
+        # Χωρίς cache.incr: ένα cache που χάθηκε (ή DatabaseCache) δεν ξαναδίνει το ίδιο seq
+        cache.clear()
+        self.assertEqual(publish_live_event('call', 'updated', {'id': 1}), 2)
+        self.assertEqual(current_seq(), 2)
+        self.assertEqual(LiveFeedSequence.objects.get().value, 2)
+
+    def test_events_fallback_uses_seq_as_etag(self):
+        publish_live_event('ticket', 'created', {'id': 1})
+        response = self.api.get('/accounting/api/v1/live/events/?since=0', secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['seq'], 1)
+        self.assertEqual(len(response.data['events']), 1)
+
+        etag = response['ETag']
+        unchanged = self.api.get('/accounting/api/v1/live/events/?since=1', secure=True, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(unchanged.status_code, 304)
+
+        publish_live_event('ticket', 'updated', {'id': 1})
+        changed = self.api.get('/accounting/api/v1/live/events/?since=1', secure=True, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual([e['action'] for e in changed.data['events']], ['updated'])
+
+    @override_settings(LIVE_FEED_SSE_ENABLED=True)
+    def test_stream_resumes_from_last_event_id(self):
+        self.create_call(call_id='0_1')
+        self.create_call(call_id='0_2')
+
+        response = self.api.get(
+            '/accounting/api/v1/live/feed/', secure=True,
+            HTTP_ACCEPT='text/event-stream', HTTP_LAST_EVENT_ID='1',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        body = b''.join(response.streaming_content).decode()
+        self.assertIn('event: hello', body)
+        self.assertNotIn('id: 1\nevent: call', body)
+        self.assertIn('id: 2\nevent: call', body)
+
+    def test_stream_disabled_by_default(self):
+        response = self.api.get('/accounting/api/v1/live/feed/', secure=True, HTTP_ACCEPT='text/event-stream')
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.streaming)
+
+    def test_stream_requires_authentication(self):
+        response = APIClient().get('/accounting/api/v1/live/feed/', secure=True, HTTP_ACCEPT='text/event-stream')
+        self.assertEqual(response.status_code, 401)
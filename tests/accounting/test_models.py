@@ -411,8 +411,8 @@ class MonthlyObligationModelTest(TestCase):
         self.assertIsNotNone(monthly_obl.completed_date)
         self.assertEqual(monthly_obl.completed_date, timezone.now().date())
 
-    def test_auto_status_overdue_on_save(self):
-        """Test that status auto-changes to overdue if past deadline"""
+    def test_save_keeps_status_past_deadline(self):
+        """Test that save() no longer flips status to overdue (done by mark_overdue_obligations_task)"""
         past_deadline = timezone.now().date() - timedelta(days=1)
 
         monthly_obl = MonthlyObligation.objects.create(
@@ -424,8 +424,8 @@ class MonthlyObligationModelTest(TestCase):
             status='pending'
         )
 
-        # Should auto-change to overdue
-        self.assertEqual(monthly_obl.status, 'overdue')
+        self.assertEqual(monthly_obl.status, 'pending')
+        self.assertTrue(monthly_obl.is_overdue)
 
     def test_unique_constraint(self):
         """Test that client + obligation_type + year + month must be unique"""
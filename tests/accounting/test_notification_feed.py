@@ -0,0 +1,182 @@
+"""
+Tests for the stored notification feed (accounting/services/notification_feed.py, accounting/api_notifications.py)
+Tests for: signal sync and tombstones, daily transitions, cursor deltas, late commits, ETag/304, read/unread
+"""
+from datetime import timedelta
+
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounting.models import ClientProfile, MonthlyObligation, NotificationRead, ObligationNotification, ObligationType
+from accounting.services.notification_feed import refresh_notification_feed, sync_obligation_notifications
+
+URL = '/accounting/api/v1/notifications/'
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(AUTO_CREATE_CLIENT_OBLIGATION=False, CACHES=LOCMEM_CACHE)
+class NotificationFeedTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        Group.objects.create(name='co-workers')
+        self.user = User.objects.create_user(username='notifuser', password='testpass123')
+        self.api = APIClient()
+        self.api.force_authenticate(user=self.user)
+
+        self.today = timezone.localdate()
+        self.client_profile = ClientProfile.objects.create(afm='800000801', eponimia='Αλφα ΑΕ')
+        self.vat = ObligationType.objects.create(name='ΦΠΑ', code='VAT', frequency='monthly')
+
+    def obligation(self, days, month=1, status='pending'):
+        return MonthlyObligation.objects.create(
+            client=self.client_profile, obligation_type=self.vat, year=2020, month=month,
+            deadline=self.today + timedelta(days=days), status=status,
+        )
+
+    def notification(self, obligation):
+        return ObligationNotification.objects.get(obligation_id=obligation.id)
+
+    def age_notifications(self):
+        # Εκτός του CURSOR_OVERLAP, ώστε τα deltas να έχουν μόνο τις νέες γραμμές
+        ObligationNotification.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+
+    def get(self, **params):
+        response = self.api.get(URL, params, secure=True)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_signals_write_notifications_and_tombstones(self):
+        overdue = self.obligation(-5, month=1)
+        due_today = self.obligation(0, month=2)
+        upcoming = self.obligation(2, month=3)
+        self.obligation(10, month=4)
+
+        self.assertEqual(
+            dict(ObligationNotification.objects.values_list('obligation_id', 'notification_type')),
+            {overdue.id: 'overdue', due_today.id: 'due_today', upcoming.id: 'upcoming'},
+        )
+
+        before = self.notification(due_today).id
+        due_today.status = 'completed'
+        due_today.save()
+        tombstone = self.notification(due_today)
+        self.assertFalse(tombstone.is_active)
+        self.assertGreater(tombstone.id, before)
+
+        # Καμία αλλαγή -> καμία εγγραφή
+        cursor = ObligationNotification.objects.latest('id').id
+        upcoming.notes = 'σημείωση'
+        upcoming.save()
+        self.assertEqual(ObligationNotification.objects.latest('id').id, cursor)
+
+        upcoming_id = upcoming.id
+        upcoming.delete()
+        self.assertFalse(ObligationNotification.objects.get(obligation_id=upcoming_id).is_active)
+
+    def test_daily_refresh_moves_notifications(self):
+        obligation = self.obligation(1)
+        self.assertEqual(self.notification(obligation).notification_type, 'upcoming')
+
+        refresh_notification_feed(today=self.today + timedelta(days=1))
+        self.assertEqual(self.notification(obligation).notification_type, 'due_today')
+        refresh_notification_feed(today=self.today + timedelta(days=2))
+        self.assertEqual(self.notification(obligation).notification_type, 'overdue')
+        self.assertEqual(refresh_notification_feed(today=self.today + timedelta(days=2)), 0)
+
+        # Bulk update χωρίς signals: πιάνεται από το sync των bulk paths
+        MonthlyObligation.objects.filter(id=obligation.id).update(status='completed')
+        sync_obligation_notifications([str(obligation.id)])
+        self.assertFalse(self.notification(obligation).is_active)
+
+    def test_snapshot_delta_and_not_modified(self):
+        overdue = self.obligation(-3, month=1)
+        upcoming = self.obligation(3, month=2)
+
+        response = self.get()
+        data = response.data
+        self.assertTrue(data['full'])
+        self.assertEqual([n['id'] for n in data['notifications']], [overdue.id, upcoming.id])
+        self.assertEqual(data['notifications'][0]['title'], 'Καθυστερημένη: ΦΠΑ')
+        self.assertEqual(data['notifications'][0]['message'], 'Αλφα ΑΕ - 3 μέρες καθυστέρηση')
+        self.assertEqual(data['notifications'][1]['message'], 'Αλφα ΑΕ - σε 3 μέρες')
+        self.assertEqual((data['count'], data['overdue_count'], data['unread_count']), (2, 1, 2))
+
+        etag = response['ETag']
+        with self.assertNumQueries(2):  # δύο MAX(), χωρίς να διαβαστούν ειδοποιήσεις
+            response = self.api.get(URL, {'since': data['cursor']}, HTTP_IF_NONE_MATCH=etag, secure=True)
+        self.assertEqual(response.status_code, 304)
+
+        upcoming.status = 'completed'
+        upcoming.save()
+        due_today = self.obligation(0, month=3)
+        delta = self.get(since=data['cursor'], read_since=data['read_cursor']).data
+        self.assertFalse(delta['full'])
+        # Η τελευταία γραμμή κάτω από τον cursor ξαναστέλνεται (CURSOR_OVERLAP)
+        self.assertEqual(
+            [(n['id'], n['type'], n['is_active']) for n in delta['notifications']],
+            [(overdue.id, 'overdue', True), (upcoming.id, 'upcoming', False), (due_today.id, 'due_today', True)],
+        )
+        self.assertEqual((delta['count'], delta['today_count']), (2, 1))
+
+        # Χωρίς νέες γραμμές ξαναστέλνονται μόνο όσες είναι μέσα στο CURSOR_OVERLAP
+        self.age_notifications()
+        ObligationNotification.objects.filter(obligation_id__in=[upcoming.id, due_today.id]).update(
+            updated_at=timezone.now()
+        )
+        self.assertEqual(
+            [n['id'] for n in self.get(since=delta['cursor']).data['notifications']],
+            [upcoming.id, due_today.id],
+        )
+
+    def test_late_commit_below_cursor(self):
+        self.obligation(-3, month=1)
+        self.age_notifications()
+        seen = self.obligation(3, month=2)
+        ObligationNotification.objects.filter(obligation_id=seen.id).update(id=F('id') + 10)
+        response = self.get()
+        cursor = response.data['cursor']
+
+        # Transaction με μικρότερο id που έκανε commit μετά το poll
+        with self.captureOnCommitCallbacks(execute=True):
+            late = self.obligation(0, month=3)
+        ObligationNotification.objects.filter(obligation_id=late.id).update(id=cursor - 5)
+
+        response = self.api.get(URL, {'since': cursor}, HTTP_IF_NONE_MATCH=response['ETag'], secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['cursor'], cursor)
+        self.assertEqual([n['id'] for n in response.data['notifications']], [late.id, seen.id])
+
+    def test_read_state(self):
+        overdue = self.obligation(-1, month=1)
+        upcoming = self.obligation(1, month=2)
+        data = self.get().data
+
+        response = self.api.post(f'{URL}read/', {'ids': [overdue.id]}, format='json', secure=True)
+        self.assertEqual(response.data, {'marked': 1, 'unread_count': 1})
+
+        delta = self.get(since=data['cursor'], read_since=data['read_cursor']).data
+        self.assertEqual(delta['read'], [overdue.id])
+        self.assertEqual(delta['unread_count'], 1)
+        self.assertEqual([n['is_read'] for n in self.get().data['notifications']], [True, False])
+
+        # Αλλαγή ονόματος: νέα γραμμή, παραμένει διαβασμένη
+        self.client_profile.eponimia = 'Άλφα Ανώνυμη Εταιρεία'
+        self.client_profile.save()
+        self.assertEqual(self.notification(overdue).client_name, 'Άλφα Ανώνυμη Εταιρεία')
+        self.assertTrue(NotificationRead.objects.filter(user=self.user, notification=self.notification(overdue)).exists())
+
+        # Αλλαγή είδους: ξανά αδιάβαστη
+        refresh_notification_feed(today=self.today + timedelta(days=1))
+        self.api.post(f'{URL}read/', {'ids': [upcoming.id]}, format='json', secure=True)
+        refresh_notification_feed(today=self.today + timedelta(days=2))
+        self.assertEqual(self.notification(upcoming).notification_type, 'overdue')
+        self.assertFalse(self.notification(upcoming).reads.exists())
+
+        response = self.api.post(f'{URL}read/', {'all': True}, format='json', secure=True)
+        self.assertEqual(response.data, {'marked': 1, 'unread_count': 0})
+        self.assertEqual(self.api.post(f'{URL}read/', {}, format='json', secure=True).status_code, 400)
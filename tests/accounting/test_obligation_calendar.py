@@ -0,0 +1,106 @@
+"""
+Tests for the obligation calendar API
+Tests for: per-day summary, paginated day detail, side-effect free reads, overdue task
+"""
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+
+from django.contrib.auth.models import Group, User
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounting.models import ClientProfile, MonthlyObligation, ObligationType
+from accounting.services.obligation_calendar import calendar_summary, mark_overdue_obligations
+from accounting.tasks import mark_overdue_obligations_task
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+CALENDAR_URL = '/accounting/api/v1/obligations/calendar/'
+DAY_URL = '/accounting/api/v1/obligations/calendar/day/'
+
+
+@override_settings(AUTO_CREATE_CLIENT_OBLIGATION=False, CACHES=LOCMEM_CACHE)
+class ObligationCalendarTest(TestCase):
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+
+        Group.objects.create(name='co-workers')
+        self.api = APIClient()
+        self.api.force_authenticate(user=User.objects.create_user(username='calendar', password='testpass123'))
+
+        self.today = timezone.localdate()
+        self.yesterday = self.today - timedelta(days=1)
+        self.vat = ObligationType.objects.create(name='ΦΠΑ', code='VAT', frequency='monthly')
+        self.apd = ObligationType.objects.create(name='ΑΠΔ', code='APD', frequency='monthly')
+
+        for index in range(3):
+            client = ClientProfile.objects.create(afm=f'80000070{index}', eponimia=f'Πελάτης {index}')
+            self.add(client, self.vat, self.yesterday, 'pending')
+            self.add(client, self.apd, self.yesterday, 'completed' if index else 'pending')
+
+    def add(self, client, obligation_type, deadline, status):
+        return MonthlyObligation.objects.create(
+            client=client, obligation_type=obligation_type, deadline=deadline, status=status,
+            year=deadline.year, month=deadline.month,
+        )
+
+    def test_summary_counts_without_writing(self):
+        params = {'year': self.yesterday.year, 'month': self.yesterday.month}
+        with self.assertNumQueries(1):
+            response = self.api.get(CALENDAR_URL, params, secure=True)
+        self.assertEqual(response.status_code, 200)
+
+        day = response.data['days'][str(self.yesterday.day)]
+        self.assertEqual((day['total'], day['overdue'], day['completed'], day['pending']), (6, 4, 2, 0))
+        self.assertEqual(day['types'][0], {'code': 'APD', 'name': 'ΑΠΔ', 'count': 3})
+        self.assertNotIn('obligations', day)
+        self.assertEqual(response.data['summary']['overdue'], 4)
+
+        # Το GET δεν αλλάζει την κατάσταση στη βάση
+        self.assertEqual(MonthlyObligation.objects.filter(status='pending').count(), 4)
+
+        # Δεύτερη κλήση από το cache
+        with self.assertNumQueries(0):
+            self.api.get(CALENDAR_URL, params, secure=True)
+
+        response = self.api.get(CALENDAR_URL, dict(params, status='overdue', type_id=self.vat.id), secure=True)
+        self.assertEqual(response.data['summary']['total'], 3)
+
+    def test_day_detail_is_paginated(self):
+        response = self.api.get(
+            DAY_URL, {'date': self.yesterday.isoformat(), 'page_size': 4}, secure=True
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 6)
+        self.assertEqual(len(response.data['results']), 4)
+        self.assertEqual(response.data['results'][0]['client_name'], 'Πελάτης 0')
+        self.assertEqual(response.data['results'][0]['status'], 'overdue')
+
+        response = self.api.get(DAY_URL, {'date': 'not-a-date'}, secure=True)
+        self.assertEqual(response.status_code, 400)
+
+    def test_overdue_task(self):
+        future = self.add(ClientProfile.objects.first(), self.vat, date(2099, 1, 31), 'pending')
+        result = mark_overdue_obligations_task()
+        self.assertEqual((result['updated'], result['chunks']), (4, 1))
+        self.assertEqual(MonthlyObligation.objects.filter(status='overdue').count(), 4)
+        future.refresh_from_db()
+        self.assertEqual(future.status, 'pending')
+        self.assertEqual(mark_overdue_obligations_task(), {'updated': 0, 'skipped': True})
+
+    def test_day_changes_at_athens_midnight(self):
+        client = ClientProfile.objects.create(afm='800000799', eponimia='Μεσάνυχτα')
+        obligation = self.add(client, self.vat, date(2026, 3, 9), 'pending')
+
+        # 00:30 ώρα Αθήνας, ακόμη 9 Μαρτίου σε UTC
+        athens_half_past_midnight = datetime(2026, 3, 9, 22, 30, tzinfo=dt_timezone.utc)
+        with mock.patch('django.utils.timezone.now', return_value=athens_half_past_midnight):
+            summary = calendar_summary(2026, 3, client_id=client.id)
+            run = mark_overdue_obligations()
+
+        self.assertEqual(summary['days']['9']['overdue'], 1)
+        self.assertEqual(run.run_date, date(2026, 3, 10))
+        obligation.refresh_from_db()
+        self.assertEqual(obligation.status, 'overdue')
@@ -0,0 +1,89 @@
+"""
+Tests for the daily overdue transition (accounting/services/obligation_calendar.mark_overdue_obligations)
+Tests for: once-per-day guard, audit row, chunked UPDATEs, stale/forced runs, read endpoints without writes
+"""
+from datetime import timedelta
+
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounting.models import ClientProfile, MonthlyObligation, ObligationType, OverdueTransitionRun
+from accounting.services.obligation_calendar import mark_overdue_obligations
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(AUTO_CREATE_CLIENT_OBLIGATION=False, CACHES=LOCMEM_CACHE)
+class OverdueTransitionTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        Group.objects.create(name='co-workers')
+        self.api = APIClient()
+        self.api.force_authenticate(user=User.objects.create_user(username='overdue', password='testpass123'))
+
+        self.today = timezone.localdate()
+        client = ClientProfile.objects.create(afm='800000901', eponimia='Βήτα ΟΕ')
+        vat = ObligationType.objects.create(name='ΦΠΑ', code='VAT', frequency='monthly')
+        for month in range(1, 6):
+            MonthlyObligation.objects.create(
+                client=client, obligation_type=vat, year=2020, month=month,
+                deadline=self.today - timedelta(days=month), status='pending',
+            )
+        self.future = MonthlyObligation.objects.create(
+            client=client, obligation_type=vat, year=2020, month=6,
+            deadline=self.today + timedelta(days=5), status='pending',
+        )
+        self.cancelled = MonthlyObligation.objects.create(
+            client=client, obligation_type=vat, year=2020, month=7,
+            deadline=self.today - timedelta(days=10), status='cancelled',
+        )
+
+    def test_save_does_not_transition(self):
+        self.assertEqual(MonthlyObligation.objects.filter(status='pending').count(), 6)
+        self.cancelled.save()
+        self.cancelled.refresh_from_db()
+        self.assertEqual(self.cancelled.status, 'cancelled')
+
+    def test_chunked_once_per_day(self):
+        run = mark_overdue_obligations(batch_size=2)
+        self.assertEqual((run.transitioned, run.chunks, run.run_date), (5, 3, self.today))
+        self.assertIsNotNone(run.finished_at)
+        self.assertEqual(MonthlyObligation.objects.filter(status='overdue').count(), 5)
+        self.assertEqual(MonthlyObligation.objects.get(pk=self.future.pk).status, 'pending')
+        self.assertEqual(MonthlyObligation.objects.get(pk=self.cancelled.pk).status, 'cancelled')
+
+        # Ίδια ημέρα: καμία δουλειά, ούτε καν SELECT υποψηφίων
+        MonthlyObligation.objects.filter(pk=self.future.pk).update(deadline=self.today - timedelta(days=1))
+        with self.assertNumQueries(2):
+            self.assertIsNone(mark_overdue_obligations())
+        self.assertEqual(MonthlyObligation.objects.get(pk=self.future.pk).status, 'pending')
+
+        run = mark_overdue_obligations(force=True)
+        self.assertEqual((run.transitioned, OverdueTransitionRun.objects.count()), (6, 1))
+
+        run = mark_overdue_obligations(today=self.today + timedelta(days=1))
+        self.assertEqual(run.transitioned, 0)
+        self.assertEqual(OverdueTransitionRun.objects.count(), 2)
+
+    def test_stale_run_is_reclaimed(self):
+        OverdueTransitionRun.objects.create(run_date=self.today, started_at=timezone.now())
+        self.assertIsNone(mark_overdue_obligations())
+
+        OverdueTransitionRun.objects.update(started_at=timezone.now() - timedelta(hours=2))
+        self.assertEqual(mark_overdue_obligations().transitioned, 5)
+
+    def test_read_endpoints_do_not_write(self):
+        response = self.api.get('/accounting/api/obligations/overdue/', secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 5)
+
+        response = self.api.get('/accounting/api/dashboard/stats/', secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['overdue_count'], 5)
+        self.assertEqual(response.data['total_obligations_pending'], 1)
+
+        self.assertEqual(MonthlyObligation.objects.filter(status='overdue').count(), 0)
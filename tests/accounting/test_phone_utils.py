@@ -0,0 +1,90 @@
+"""
+Tests for accounting.phone_utils and the ClientPhoneIndex lookup table
+"""
+from django.test import TestCase
+from django.core.management import call_command
+from django.utils import timezone
+from io import StringIO
+
+from accounting.models import ClientProfile, ClientPhoneIndex, VoIPCall
+from accounting.phone_utils import (
+    normalize_phone, find_client_by_phone, batch_auto_match_calls, rebuild_phone_index
+)
+
+
+class NormalizePhoneTest(TestCase):
+    """Test phone normalization rule"""
+
+    def test_greek_formats(self):
+        for raw in ['6947709311', '+306947709311', '00306947709311', '694 770 9311', '694-770-9311']:
+            self.assertEqual(normalize_phone(raw), '6947709311')
+
+    def test_short_numbers_kept(self):
+        self.assertEqual(normalize_phone('101'), '101')
+        self.assertEqual(normalize_phone(''), '')
+        self.assertEqual(normalize_phone(None), '')
+
+
+class ClientPhoneIndexTest(TestCase):
+    """Test that the phone index follows ClientProfile changes"""
+
+    def setUp(self):
+        self.client_profile = ClientProfile.objects.create(
+            afm="123456789",
+            eponimia="Phone Client",
+            kinito_tilefono="+30 694 770 9311",
+            tilefono_epixeirisis_1="210-1234567",
+        )
+
+    def test_index_created_on_save(self):
+        phones = set(ClientPhoneIndex.objects.filter(
+            client=self.client_profile
+        ).values_list('phone', flat=True))
+        self.assertEqual(phones, {'6947709311', '2101234567'})
+
+    def test_index_updated_on_change(self):
+        self.client_profile.kinito_tilefono = '6900000000'
+        self.client_profile.save()
+
+        self.assertEqual(find_client_by_phone('6900000000'), self.client_profile)
+        self.assertIsNone(find_client_by_phone('6947709311'))
+
+    def test_index_removed_on_delete(self):
+        self.client_profile.delete()
+        self.assertFalse(ClientPhoneIndex.objects.exists())
+
+    def test_find_uses_single_query(self):
+        with self.assertNumQueries(1):
+            client = find_client_by_phone('0030 694 770 9311')
+        self.assertEqual(client, self.client_profile)
+
+    def test_inactive_clients_not_matched(self):
+        self.client_profile.is_active = False
+        self.client_profile.save()
+        self.assertIsNone(find_client_by_phone('6947709311'))
+
+    def test_rebuild(self):
+        ClientPhoneIndex.objects.all().delete()
+        self.assertEqual(rebuild_phone_index(), 2)
+        self.assertEqual(find_client_by_phone('2101234567'), self.client_profile)
+
+    def test_rebuild_command(self):
+        ClientPhoneIndex.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_phone_index', stdout=out)
+        self.assertIn('2 numbers', out.getvalue())
+
+    def test_batch_auto_match(self):
+        for idx, phone in enumerate(['6947709311', '+302101234567', '6999999999']):
+            VoIPCall.objects.create(
+                call_id=f'call-{idx}',
+                phone_number=phone,
+                direction='incoming',
+                started_at=timezone.now(),
+            )
+
+        stats = batch_auto_match_calls()
+
+        self.assertEqual(stats['matched'], 2)
+        self.assertEqual(stats['unmatched'], 1)
+        self.assertEqual(VoIPCall.objects.filter(client=self.client_profile).count(), 2)
@@ -0,0 +1,109 @@
+"""
+Tests for the obligation reminder digest
+Tests for: grouping per client, pooled sending, bulk logs, benchmark command
+"""
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import Group
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from accounting.models import (
+    ClientProfile, EmailTemplate, MonthlyObligation, ObligationType, ScheduledEmail
+)
+from accounting.services.reminder_digest import send_obligation_reminder_digest
+from accounting.tasks import send_obligation_reminders
+from accounting.utils.email_template_cache import invalidate_email_template_cache
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(
+    AUTO_CREATE_CLIENT_OBLIGATION=False,
+    CACHES=LOCMEM_CACHE,
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+)
+class ReminderDigestTest(TestCase):
+
+    def setUp(self):
+        invalidate_email_template_cache()
+        self.addCleanup(invalidate_email_template_cache)
+        Group.objects.create(name='co-workers')
+
+        self.today = timezone.now().date()
+        types = [
+            ObligationType.objects.create(
+                name=name, code=name, frequency="monthly", deadline_type="last_day"
+            )
+            for name in ('ΦΠΑ', 'ΑΠΔ', 'ΜΥΦ')
+        ]
+        self.clients = []
+        for index, email in enumerate(('a@example.com', 'b@example.com', '')):
+            client = ClientProfile.objects.create(
+                afm=f"80000030{index}", eponimia=f"Digest Client {index}", email=email
+            )
+            self.clients.append(client)
+            for days, obligation_type in enumerate(types):
+                MonthlyObligation.objects.create(
+                    client=client,
+                    obligation_type=obligation_type,
+                    year=self.today.year,
+                    month=self.today.month,
+                    deadline=self.today + timedelta(days=days + 1),
+                )
+        # Εκτός εβδομάδας - δεν περιλαμβάνεται
+        MonthlyObligation.objects.create(
+            client=self.clients[0], obligation_type=types[0],
+            year=self.today.year + 1, month=1, deadline=self.today + timedelta(days=30),
+        )
+
+    def test_one_email_per_client(self):
+        stats = send_obligation_reminder_digest(today=self.today)
+
+        self.assertEqual(stats['obligations'], 9)
+        self.assertEqual(stats['messages'], 2)
+        self.assertEqual(stats['sent'], 2)
+        self.assertEqual(stats['skipped'], 1)
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertIn('3 υποχρεώσεις', mail.outbox[0].subject)
+        self.assertIn('ΜΥΦ', mail.outbox[0].body)
+
+        scheduled = ScheduledEmail.objects.get(client=self.clients[0])
+        self.assertEqual(scheduled.status, 'sent')
+        self.assertEqual(scheduled.obligations.count(), 3)
+
+    def test_template_and_query_count(self):
+        EmailTemplate.objects.create(
+            name='Obligation reminder',
+            subject='Υπενθύμιση {{ client_name }}',
+            body_html='<ul>{% for o in obligations %}<li>{{ o.name }} {{ o.deadline }}</li>{% endfor %}</ul>',
+        )
+        # Obligations, template lookup, 2 bulk_create (ScheduledEmail + M2M)
+        with self.assertNumQueries(4):
+            stats = send_obligation_reminder_digest(today=self.today)
+
+        self.assertEqual(stats['sent'], 2)
+        self.assertEqual(mail.outbox[0].subject, 'Υπενθύμιση Digest Client 0')
+        html = mail.outbox[0].alternatives[0][0]
+        self.assertEqual(html.count('<li>'), 3)
+
+    @override_settings(OBLIGATION_REMINDER_DIGEST=False)
+    def test_task_per_obligation_mode(self):
+        result = send_obligation_reminders()
+
+        self.assertIn('Sent 6 obligation reminders', result)
+        self.assertEqual(len(mail.outbox), 6)
+        self.assertEqual(ScheduledEmail.objects.count(), 6)
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('benchmark_reminders', clients=3, obligations=2, stdout=out)
+
+        output = out.getvalue()
+        self.assertIn('per-obligation: 6 emails', output)
+        self.assertIn('digest: 3 emails', output)
+        self.assertIn('9 messages received by the sink', output)
+        self.assertFalse(ScheduledEmail.objects.exists())
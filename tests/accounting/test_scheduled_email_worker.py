@@ -0,0 +1,141 @@
+"""
+Tests for the scheduled emails worker
+Tests for: batch claiming, parallel sending, attachment cache, bulk EmailLog
+"""
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.contrib.auth.models import Group
+from django.core import mail
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from accounting.models import (
+    ClientDocument, ClientProfile, EmailLog, MonthlyObligation, ObligationType, ScheduledEmail
+)
+from accounting.services.scheduled_email_worker import (
+    claim_due_emails, process_due_scheduled_emails, release_stale_claims
+)
+from accounting.tasks import process_scheduled_emails
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(
+    AUTO_CREATE_CLIENT_OBLIGATION=False,
+    CACHES=LOCMEM_CACHE,
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    DEFAULT_FROM_EMAIL='office@example.com',
+)
+class ScheduledEmailWorkerTest(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media_override = override_settings(MEDIA_ROOT=self.media_root)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+        Group.objects.create(name='co-workers')
+        self.client_profile = ClientProfile.objects.create(
+            afm="800000400", eponimia="Scheduled Client", email="client@example.com"
+        )
+        obligation_type = ObligationType.objects.create(
+            name="ΦΠΑ Μηνιαίο", code="ΦΠΑ", frequency="monthly", deadline_type="last_day"
+        )
+        self.obligation = MonthlyObligation.objects.create(
+            client=self.client_profile, obligation_type=obligation_type, year=2025, month=1,
+            deadline=timezone.now().date() + timedelta(days=5),
+        )
+        self.past = timezone.now() - timedelta(minutes=1)
+
+    def schedule(self, recipients='client@example.com', send_at=None, obligations=()):
+        scheduled_email = ScheduledEmail.objects.create(
+            recipient_email=recipients,
+            client=self.client_profile,
+            subject='Θέμα',
+            body_html='<p>Κείμενο</p>',
+            send_at=send_at or self.past,
+        )
+        scheduled_email.obligations.set(obligations)
+        return scheduled_email
+
+    def test_sends_due_emails_and_logs(self):
+        single = self.schedule()
+        multiple = self.schedule('a@example.com, b@example.com\nc@example.com')
+        invalid = self.schedule('not-an-email')
+        future = self.schedule(send_at=timezone.now() + timedelta(hours=1))
+
+        result = process_scheduled_emails()
+
+        self.assertIn('2 sent (4 recipients), 1 failed', result)
+        self.assertEqual(len(mail.outbox), 2)
+        bcc_email = next(email for email in mail.outbox if email.bcc)
+        self.assertEqual(bcc_email.to, ['office@example.com'])
+        self.assertEqual(len(bcc_email.bcc), 3)
+
+        statuses = dict(ScheduledEmail.objects.values_list('id', 'status'))
+        self.assertEqual(statuses[single.id], 'sent')
+        self.assertEqual(statuses[multiple.id], 'sent')
+        self.assertEqual(statuses[invalid.id], 'failed')
+        self.assertEqual(statuses[future.id], 'pending')
+        self.assertEqual(EmailLog.objects.filter(status='sent').count(), 2)
+        self.assertEqual(EmailLog.objects.filter(status='failed').count(), 1)
+
+    def test_parallel_batches_send_each_email_once(self):
+        for index in range(7):
+            self.schedule(f'client{index}@example.com')
+
+        stats = process_due_scheduled_emails(batch_size=3, max_workers=3)
+
+        self.assertEqual(stats['batches'], 3)
+        self.assertEqual(stats['sent'], 7)
+        self.assertEqual(sorted(email.to[0] for email in mail.outbox),
+                         sorted(f'client{index}@example.com' for index in range(7)))
+        self.assertFalse(ScheduledEmail.objects.exclude(status='sent').exists())
+
+        # Δεύτερο run δεν ξαναστέλνει
+        self.assertEqual(process_due_scheduled_emails()['batches'], 0)
+        self.assertEqual(len(mail.outbox), 7)
+
+    def test_claimed_emails_are_skipped_until_stale(self):
+        claimed = self.schedule()
+        ScheduledEmail.objects.filter(pk=claimed.pk).update(status='sending', updated_at=timezone.now())
+
+        self.assertEqual(process_due_scheduled_emails()['sent'], 0)
+        self.assertEqual(len(mail.outbox), 0)
+
+        # Εγκαταλελειμμένο claim (worker σκοτώθηκε) -> ξαναστέλνεται
+        ScheduledEmail.objects.filter(pk=claimed.pk).update(
+            updated_at=timezone.now() - timedelta(hours=1)
+        )
+        self.assertEqual(process_due_scheduled_emails()['sent'], 1)
+
+    def test_claims_are_stamped_at_claim_time(self):
+        # Run που ξεκίνησε πριν από ώρα: το cutoff είναι παλιό, το claim όχι
+        started = timezone.now() - timedelta(hours=1)
+        scheduled_email = self.schedule(send_at=started - timedelta(minutes=1))
+
+        self.assertEqual(claim_due_emails(10, due_before=started), [scheduled_email])
+        self.assertEqual(release_stale_claims(), 0)
+        self.assertEqual(ScheduledEmail.objects.get(pk=scheduled_email.pk).status, 'sending')
+
+    def test_attachment_bytes_are_cached(self):
+        document = ClientDocument(
+            client=self.client_profile, obligation=self.obligation, uploaded_by=None,
+            original_filename='vat.pdf', document_category='vat',
+        )
+        document.file = SimpleUploadedFile('vat.pdf', b'%PDF-1.4 test', 'application/pdf')
+        document.save()
+        for _ in range(3):
+            self.schedule(obligations=[self.obligation])
+
+        stats = process_due_scheduled_emails(max_workers=1)
+
+        self.assertEqual(stats['sent'], 3)
+        self.assertEqual(stats['attachment_cache_hits'], 2)
+        for email in mail.outbox:
+            self.assertEqual(len(email.attachments), 1)
+            self.assertEqual(email.attachments[0][1], b'%PDF-1.4 test')
@@ -0,0 +1,114 @@
+"""
+Tests for the global search index (accounting/services/search_index.py)
+Tests for: accent-insensitive matching, signal sync, ranking, one-query search, SQLite FTS5 backend
+"""
+import io
+from datetime import date
+
+from django.contrib.auth.models import Group, User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounting.models import ClientProfile, MonthlyObligation, ObligationType, SearchDocument, Ticket, VoIPCall
+from accounting.services.search_index import (
+    FTS_TABLE, install_search_backend, normalize_search_text, search_documents, uninstall_search_backend,
+)
+
+
+@override_settings(AUTO_CREATE_CLIENT_OBLIGATION=False)
+class SearchIndexTest(TestCase):
+
+    def setUp(self):
+        Group.objects.create(name='co-workers')
+        self.api = APIClient()
+        self.api.force_authenticate(user=User.objects.create_user(username='search', password='testpass123'))
+
+        self.papadopoulos = ClientProfile.objects.create(
+            afm='800000701', eponimia='ΠΑΠΑΔΌΠΟΥΛΟΣ ΓΕΏΡΓΙΟΣ', email='info@papadopoulos.gr',
+            kinito_tilefono='694 770 9311',
+        )
+        self.kostas = ClientProfile.objects.create(afm='800000719', eponimia='Κώστας Παπαδόπουλος ΟΕ')
+        self.inactive = ClientProfile.objects.create(afm='800000727', eponimia='Παπαδοπούλου Μαρία', is_active=False)
+
+        self.vat = ObligationType.objects.create(name='ΦΠΑ', code='VAT', frequency='monthly')
+        self.obligation = MonthlyObligation.objects.create(
+            client=self.papadopoulos, obligation_type=self.vat, year=2030, month=1, deadline=date(2030, 2, 20),
+        )
+        self.call = VoIPCall.objects.create(
+            call_id='0_1', phone_number='2101234567', direction='incoming', status='completed',
+            started_at=timezone.now(), client=self.papadopoulos,
+        )
+        self.ticket = Ticket.objects.create(title='Επιστροφή κλήσης για ΦΠΑ', client=self.kostas)
+
+    def search(self, query):
+        response = self.api.get('/accounting/api/v1/search/', {'q': query}, secure=True)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_normalize_strips_accents_and_case(self):
+        self.assertEqual(normalize_search_text('Παπαδόπουλος', 'Ϊάσονας'), ' ΠΑΠΑΔΟΠΟΥΛΟΣ ΙΑΣΟΝΑΣ ')
+        self.assertEqual(normalize_search_text('info@Café.gr'), ' INFO CAFE GR ')
+
+    def test_accent_insensitive_search_across_categories(self):
+        for query in ('παπαδοπουλος', 'ΠΑΠΑΔΌΠΟΥΛΟΣ', 'Παπαδόπουλ'):
+            data = self.search(query)
+            self.assertEqual(
+                [c['id'] for c in data['results']['clients']], [self.papadopoulos.id, self.kostas.id], query
+            )
+            self.assertEqual([o['id'] for o in data['results']['obligations']], [self.obligation.id])
+            self.assertEqual([c['id'] for c in data['results']['calls']], [self.call.id])
+            self.assertEqual([t['id'] for t in data['results']['tickets']], [self.ticket.id])
+
+        data = self.search('φπα 01/2030')
+        self.assertEqual(data['results']['obligations'][0]['title'], 'ΦΠΑ 01/2030')
+        self.assertEqual(self.search('1234567')['results']['calls'][0]['id'], self.call.id)
+        self.assertEqual(self.search('+30 6947709311')['results']['clients'][0]['id'], self.papadopoulos.id)
+
+    def test_one_query_for_all_categories(self):
+        with self.assertNumQueries(1):
+            ids = search_documents('παπαδοπουλος', limit=1)
+        self.assertEqual(ids['client'], [self.papadopoulos.id])
+        self.assertEqual(ids['ticket'], [self.ticket.id])
+
+    def test_signals_keep_index_in_sync(self):
+        self.papadopoulos.eponimia = 'Νικολάου Ανδρέας'
+        self.papadopoulos.save()
+        self.assertEqual(search_documents('papadopoulos')['client'], [self.papadopoulos.id])  # email
+        self.assertEqual(search_documents('νικολαου')['obligation'], [self.obligation.id])
+        self.assertEqual(search_documents('νικολαου')['call'], [self.call.id])
+
+        self.vat.name = 'Φόρος Προστιθέμενης Αξίας'
+        self.vat.save()
+        self.assertEqual(search_documents('προστιθεμενης')['obligation'], [self.obligation.id])
+
+        kostas_id = self.kostas.id
+        self.kostas.delete()
+        self.assertFalse(SearchDocument.objects.filter(kind='client', object_id=kostas_id).exists())
+        self.assertEqual(search_documents('κωστας')['ticket'], [])
+        self.assertEqual(search_documents('επιστροφη')['ticket'], [self.ticket.id])
+
+    def test_rebuild_command(self):
+        SearchDocument.objects.all().delete()
+        out = io.StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn('Search index rebuilt: 6 documents', out.getvalue())
+        self.assertEqual(search_documents('γεωργιος')['client'], [self.papadopoulos.id])
+
+    def test_sqlite_fts5_backend(self):
+        if connection.vendor != 'sqlite' or not install_search_backend(connection):
+            self.skipTest('SQLite FTS5 not available')
+        self.addCleanup(uninstall_search_backend, connection)
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH 'ΓΕΩΡ*'")
+            self.assertEqual(len(cursor.fetchall()), 3)  # πελάτης, υποχρέωση, κλήση
+
+        self.assertEqual(search_documents('παπαδ γεωρ')['client'], [self.papadopoulos.id])
+        VoIPCall.objects.create(
+            call_id='0_2', phone_number='2310555666', direction='incoming', started_at=timezone.now(),
+            client=self.inactive,
+        )
+        self.assertEqual(len(search_documents('παπαδοπουλου')['call']), 1)
+        self.assertEqual(search_documents('παπαδοπουλου')['client'], [])
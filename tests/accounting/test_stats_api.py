@@ -0,0 +1,149 @@
+"""
+Tests for the dashboard/reports statistics endpoints
+Tests for: query budget, stats cache and its signal invalidation
+"""
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+
+from django.contrib.auth.models import Group, User
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounting.api_reports import calculate_comparison
+from accounting.models import ClientProfile, MonthlyObligation, ObligationType
+from accounting.utils import get_date_range
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(AUTO_CREATE_CLIENT_OBLIGATION=False, CACHES=LOCMEM_CACHE)
+class StatsEndpointsTest(TestCase):
+    """reports_stats / dashboard_stats"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+
+        # Create co-workers group (required by signal)
+        Group.objects.create(name='co-workers')
+        self.user = User.objects.create_user(username='statsuser', password='testpass123')
+        self.api = APIClient()
+        self.api.force_authenticate(user=self.user)
+
+        self.today = timezone.localdate()
+        self.types = [
+            ObligationType.objects.create(
+                name=f"Type {code}", code=code, frequency="monthly", deadline_type="last_day"
+            )
+            for code in ("VAT", "APD", "MYF")
+        ]
+        self.afm = 800000100
+
+    def add_obligations(self, clients):
+        for _ in range(clients):
+            self.afm += 1
+            client = ClientProfile.objects.create(afm=str(self.afm), eponimia=f"Client {self.afm}")
+            for index, obl_type in enumerate(self.types):
+                status = ('pending', 'completed', 'overdue')[index]
+                MonthlyObligation.objects.create(
+                    client=client,
+                    obligation_type=obl_type,
+                    year=self.today.year,
+                    month=self.today.month,
+                    deadline=self.today + timedelta(days=index + 1),
+                    status=status,
+                    completed_date=self.today if status == 'completed' else None,
+                )
+
+    def get(self, url):
+        response = self.api.get(url, secure=True)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_reports_stats_query_budget(self):
+        self.add_obligations(1)
+        # Μετρητές υποχρεώσεων + πελάτες + ανά τύπο, ανεξάρτητα από τα δεδομένα
+        with self.assertNumQueries(3):
+            self.get('/accounting/api/reports/stats/?period=month')
+
+        self.add_obligations(4)
+        with self.assertNumQueries(3):
+            data = self.get('/accounting/api/reports/stats/?period=year')
+
+        self.assertEqual(data['total_clients'], 5)
+        self.assertEqual(data['completed_obligations'], 5)
+        self.assertEqual(data['pending_obligations'], 5)
+        self.assertEqual(data['overdue_obligations'], 5)
+        self.assertEqual(len(data['monthly_activity']), 12)
+        self.assertEqual(data['monthly_activity'][-1]['count'], 5)
+        self.assertEqual(data['monthly_activity'][-1]['month_num'], self.today.month)
+
+    def test_dashboard_stats_query_budget(self):
+        self.add_obligations(1)
+        # πελάτες + μετρητές + upcoming + top types (χωρίς UPDATE στο read)
+        with self.assertNumQueries(4):
+            self.get('/accounting/api/dashboard/stats/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.add_obligations(4)
+        with self.assertNumQueries(4):
+            data = self.get('/accounting/api/dashboard/stats/')
+
+        self.assertEqual(data['total_clients'], 5)
+        self.assertEqual(data['total_obligations_pending'], 5)
+        self.assertEqual(data['total_obligations_completed_this_month'], 5)
+        self.assertEqual(data['overdue_count'], 5)
+        self.assertEqual(data['status_breakdown'], {'pending': 5, 'completed': 5, 'overdue': 5})
+        self.assertEqual(data['upcoming_count'], 5)
+
+    def test_stats_follow_local_date(self):
+        client = ClientProfile.objects.create(afm='800000199', eponimia='Μεσάνυχτα')
+        MonthlyObligation.objects.create(
+            client=client, obligation_type=self.types[0], year=2026, month=3,
+            deadline=date(2026, 3, 31), status='pending',
+        )
+
+        # 00:30 ώρα Αθήνας την 1η Απριλίου, ακόμη 31 Μαρτίου σε UTC
+        athens_half_past_midnight = datetime(2026, 3, 31, 21, 30, tzinfo=dt_timezone.utc)
+        with mock.patch('django.utils.timezone.now', return_value=athens_half_past_midnight):
+            dashboard = self.get('/accounting/api/dashboard/stats/')
+            reports = self.get('/accounting/api/reports/stats/?period=month')
+
+        self.assertEqual(dashboard['overdue_count'], 1)
+        self.assertEqual(reports['monthly_activity'][-1]['month_num'], 4)
+
+    def test_cached_until_obligation_changes(self):
+        self.add_obligations(1)
+        first = self.get('/accounting/api/dashboard/stats/')
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get('/accounting/api/dashboard/stats/'), first)
+
+        obligation = MonthlyObligation.objects.filter(status='pending').first()
+        with self.captureOnCommitCallbacks(execute=True):
+            obligation.status = 'completed'
+            obligation.completed_date = self.today
+            obligation.save()
+
+        data = self.get('/accounting/api/dashboard/stats/')
+        self.assertEqual(data['total_obligations_pending'], 0)
+        self.assertEqual(data['total_obligations_completed_this_month'], 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            obligation.delete()
+        data = self.get('/accounting/api/dashboard/stats/')
+        self.assertEqual(data['total_obligations_completed_this_month'], 1)
+
+    def test_calculate_comparison(self):
+        self.add_obligations(2)
+        start, end = get_date_range('month')
+
+        with self.assertNumQueries(2):
+            comparison = calculate_comparison('month', start, end)
+
+        self.assertEqual(comparison, {'clients_change': 100, 'completed_change': 100})
+        self.assertEqual(
+            calculate_comparison('all', None, None),
+            {'clients_change': 0, 'completed_change': 0}
+        )
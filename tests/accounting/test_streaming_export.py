@@ -0,0 +1,88 @@
+"""
+Tests for the streaming export engine
+Tests for: obligation export (xlsx/csv), client exports
+"""
+import io
+from datetime import date
+
+import openpyxl
+from django.contrib.auth.models import Group, User
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from accounting.export_import import export_clients_summary_to_excel, export_clients_to_excel
+from accounting.models import ClientProfile, MonthlyObligation, ObligationType
+
+EXPORT_URL = '/accounting/api/v1/obligations/export/'
+
+
+def load_sheet(response):
+    content = b''.join(response.streaming_content)
+    return openpyxl.load_workbook(io.BytesIO(content)).active
+
+
+@override_settings(AUTO_CREATE_CLIENT_OBLIGATION=False)
+class StreamingExportTest(TestCase):
+
+    def setUp(self):
+        Group.objects.create(name='co-workers')
+        self.user = User.objects.create_user(username='exportuser', password='testpass123')
+        self.api = APIClient()
+        self.api.force_authenticate(user=self.user)
+
+        obligation_type = ObligationType.objects.create(
+            name="ΦΠΑ Μηνιαίο", code="ΦΠΑ", frequency="monthly", deadline_type="last_day"
+        )
+        self.client_profile = ClientProfile.objects.create(
+            afm="800000500", eponimia="Εξαγωγή Α.Ε.", eidos_ipoxreou="company", email="x@example.com"
+        )
+        ClientProfile.objects.create(afm="800000501", eponimia="Άλφα Ο.Ε.", is_active=False)
+        for month in (1, 2, 3):
+            MonthlyObligation.objects.create(
+                client=self.client_profile, obligation_type=obligation_type, year=2030,
+                month=month, deadline=date(2030, month, 20), notes='σημείωση' if month == 2 else '',
+            )
+
+    def test_obligations_xlsx(self):
+        response = self.api.get(EXPORT_URL, {'month': 2}, secure=True)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('.xlsx', response['Content-Disposition'])
+        rows = list(load_sheet(response).iter_rows(values_only=True))
+        self.assertEqual(rows[0][:3], ('ID', 'Πελάτης', 'ΑΦΜ'))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][1:], (
+            'Εξαγωγή Α.Ε.', '800000500', 'ΦΠΑ Μηνιαίο', 'ΦΠΑ', 2, 2030,
+            '20/02/2030', 'Εκκρεμεί', None, 'σημείωση'
+        ))
+
+    def test_obligations_csv(self):
+        response = self.api.get(EXPORT_URL, {'export_format': 'csv'}, secure=True)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode('utf-8-sig').splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(lines[0].startswith('ID,Πελάτης,ΑΦΜ'))
+        self.assertIn('Εξαγωγή Α.Ε.,800000500,ΦΠΑ Μηνιαίο,ΦΠΑ,1,2030,20/01/2030,Εκκρεμεί', lines[1])
+
+    def test_obligations_unknown_format(self):
+        response = self.api.get(EXPORT_URL, {'export_format': 'pdf'}, secure=True)
+        self.assertEqual(response.status_code, 400)
+
+    def test_client_exports(self):
+        sheet = load_sheet(export_clients_to_excel())
+        rows = list(sheet.iter_rows(values_only=True))
+        self.assertTrue(rows[0][0].startswith('ΕΞΑΓΩΓΗ ΠΕΛΑΤΩΝ'))
+        self.assertEqual(rows[2][:3], ('Α.Φ.Μ.', 'Δ.Ο.Υ.', 'Επωνυμία/Επώνυμο'))
+        # Ταξινόμηση κατά επωνυμία, ΝΑΙ/ΟΧΙ για is_active
+        self.assertEqual(rows[3][2], 'Άλφα Ο.Ε.')
+        self.assertEqual(rows[3][49], 'ΟΧΙ')
+        self.assertEqual(rows[-1][0], 'Σύνολο: 2 πελάτες')
+
+        summary = list(load_sheet(
+            export_clients_summary_to_excel(ClientProfile.objects.filter(is_active=True))
+        ).iter_rows(values_only=True))
+        self.assertEqual(summary[1][:2], ('800000500', 'Εξαγωγή Α.Ε.'))
+        self.assertEqual(summary[1][4], 'Εταιρεία')
+        self.assertEqual(summary[-1][0], 'Σύνολο: 1 πελάτες')
@@ -0,0 +1,118 @@
+from unittest import mock
+from dateutil.relativedelta import relativedelta
+from django.contrib.auth.models import Group
+from django.core.management import call_command
+from django.test import tag
+
+from analytics.models import IncomeStatSnapshot
+from analytics.tasks import save_monthly_income_snapshots
+from analytics.utils.income_stats import build_income_context
+from analytics.utils.monthly_snapshot_saving import save_month_snapshots
+from common.utils.helpers import get_department_id
+from common.utils.helpers import get_today
+from crm.models import Currency
+from crm.models import Deal
+from crm.models import Payment
+from tests.base_test_classes import BaseTestCase
+from tests.crm.test_deal import get_contact_request
+from tests.crm.test_deal import get_test_deal
+from tests.crm.test_request_methods import populate_db
+
+
+# python manage.py test tests.analytics.test_income_snapshots --keepdb
+
+
+@tag('TestCase')
+class TestIncomeSnapshots(BaseTestCase):
+    """Income Summary snapshots computed without rendering admin pages"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        populate_db(cls)
+        cls.contact_request = get_contact_request()
+        cls.co_owner = None
+        cls.department = Group.objects.get(id=get_department_id(cls.owner))
+        cls.deal = get_test_deal(cls)
+        cls.currency = Currency.objects.first()
+        cls.this_month = get_today().replace(day=1)
+        cls.first_month = cls.this_month + relativedelta(months=-2)
+        for payment_date, amount in (
+                (cls.this_month, 100),
+                (cls.first_month, 250),
+        ):
+            Payment.objects.create(
+                deal=cls.deal,
+                status=Payment.RECEIVED,
+                amount=amount,
+                currency=cls.currency,
+                payment_date=payment_date,
+            )
+
+    def test_backfill_saves_one_snapshot_per_month(self):
+        snapshots = save_month_snapshots(
+            self.first_month, self.this_month, [self.department]
+        )
+        self.assertEqual(len(snapshots), 3)
+        saved = IncomeStatSnapshot.objects.filter(
+            department=self.department
+        ).order_by('creation_date')
+        self.assertEqual(
+            [s.creation_date.date().replace(day=1) for s in saved],
+            [self.first_month + relativedelta(months=i) for i in range(3)]
+        )
+        first = saved.first()
+        self.assertEqual(first.webpage.count('<head>'), 1)
+        self.assertIn('250', first.webpage)
+        self.assertIn('350', saved.last().webpage)
+
+        # manual snapshots are kept, automatic ones are replaced
+        IncomeStatSnapshot.objects.create(
+            department=self.department,
+            webpage='<head></head>',
+            modified_by=self.owner,
+        )
+        save_month_snapshots(
+            self.first_month, self.this_month, [self.department]
+        )
+        self.assertEqual(
+            IncomeStatSnapshot.objects.filter(department=self.department).count(), 4
+        )
+
+    def test_backfill_command(self):
+        call_command(
+            'backfill_income_snapshots',
+            '--from', f'{self.first_month:%Y-%m}',
+            '--department', str(self.department.id),
+            stdout=mock.MagicMock()
+        )
+        self.assertEqual(
+            IncomeStatSnapshot.objects.filter(department=self.department).count(), 3
+        )
+
+    def test_task_runs_on_last_day_of_month(self):
+        not_last_day = self.this_month.replace(day=15)
+        with mock.patch('analytics.tasks.get_today', return_value=not_last_day):
+            self.assertEqual(save_monthly_income_snapshots(), 0)
+        self.assertFalse(IncomeStatSnapshot.objects.exists())
+
+        with mock.patch('analytics.tasks.save_snapshots') as save_snapshots:
+            save_snapshots.return_value = [IncomeStatSnapshot()]
+            self.assertEqual(save_monthly_income_snapshots(force=True), 1)
+
+    def test_income_context(self):
+        deals = Deal.objects.filter(department=self.department)
+        # monthly income + payments received (total, rows, products) + won deals
+        with self.assertNumQueries(5):
+            context = build_income_context(
+                deals, get_today(), self.currency.name,
+                'rate_to_marketing_currency', expected=False
+            )
+        current, previous, averaged = context['charts']
+        self.assertEqual(
+            [x['total'] for x in current['data']][-3:], [250, 0, 100]
+        )
+        self.assertFalse(any(x['total'] for x in previous['data']))
+        self.assertEqual(averaged['data'][-1]['total'], 350)
+        self.assertEqual(len(context['data_tables']), 1)
+        self.assertEqual(len(context['data_tables'][0]['body']), 1)
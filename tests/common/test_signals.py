@@ -95,40 +95,63 @@ class UserCreationSignalTest(TestCase):
 class ClientProfileFolderCreationSignalTest(TestCase):
     """Test client profile folder creation signal"""
 
-    def test_client_folders_created_on_profile_creation(self):
-        """Test that folders are created when ClientProfile is created"""
+    def setUp(self):
+        import shutil
+        import tempfile
+        from django.test import override_settings
+        from accounting.services import folder_provisioning
+
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media_override = override_settings(MEDIA_ROOT=self.media_root)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+        folder_provisioning._info_written.clear()
+
+    def create_client(self):
         from accounting.models import ClientProfile
-        from django.conf import settings
-        import os
 
-        client = ClientProfile.objects.create(
+        return ClientProfile.objects.create(
             afm="123456789",
             eponimia="Test Client",
             eidos_ipoxreou="company"
         )
 
-        # Check that folder structure was created
+    def test_no_folders_created_on_profile_creation(self):
+        """Test that folders are created lazily, not when ClientProfile is created"""
+        import os
         from accounting.models import get_client_folder
-        base_path = os.path.join(settings.MEDIA_ROOT, get_client_folder(client))
+        from accounting.services.folder_provisioning import ensure_client_info
 
-        # Categories that should be created
-        expected_categories = [
-            'contracts', 'invoices', 'tax', 'myf', 'vat', 'payroll', 'general'
-        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            client = self.create_client()
 
-        for category in expected_categories:
-            category_path = os.path.join(base_path, category)
-            self.assertTrue(
-                os.path.exists(category_path),
-                f"Category folder '{category}' was not created"
-            )
+        base_path = os.path.join(self.media_root, get_client_folder(client))
+        self.assertFalse(os.path.exists(base_path))
 
-        # Check INFO.txt was created
-        info_file = os.path.join(base_path, 'INFO.txt')
-        self.assertTrue(os.path.exists(info_file))
-
-        # Check INFO.txt content
-        with open(info_file, 'r', encoding='utf-8') as f:
+        # First document writes INFO.txt
+        self.assertTrue(ensure_client_info(client))
+        self.assertFalse(ensure_client_info(client))
+        with open(os.path.join(base_path, 'INFO.txt'), 'r', encoding='utf-8') as f:
             content = f.read()
             self.assertIn(client.eponimia, content)
             self.assertIn(client.afm, content)
+
+    def test_client_skeleton_created_after_commit_when_enabled(self):
+        """Test that the folder skeleton is provisioned after commit when enabled"""
+        import os
+        from datetime import datetime
+        from django.test import override_settings
+        from accounting.models import get_client_folder
+
+        with override_settings(CLIENT_FOLDERS_SKELETON_ON_CREATE=True):
+            with self.captureOnCommitCallbacks(execute=True):
+                client = self.create_client()
+
+        base_path = os.path.join(self.media_root, get_client_folder(client))
+        for category in ['contracts', 'registration', 'licenses']:
+            self.assertTrue(os.path.isdir(os.path.join(base_path, '00_ΜΟΝΙΜΑ', category)))
+        year_path = os.path.join(base_path, str(datetime.now().year))
+        self.assertTrue(os.path.isdir(os.path.join(year_path, '01', 'vat')))
+        self.assertTrue(os.path.isdir(os.path.join(year_path, '13_ΕΤΗΣΙΑ', 'e3')))
+        self.assertTrue(os.path.exists(os.path.join(base_path, 'INFO.txt')))
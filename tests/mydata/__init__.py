@@ -0,0 +1 @@
+# myDATA app tests
@@ -0,0 +1,79 @@
+"""
+Local stub of the myDATA REST API that serves recorded XML responses.
+
+Pages are chosen by the `nextPartitionKey` query parameter (first page when
+missing). Requests whose `aade-user-id` header is listed in `reject_users`
+get a 401, to exercise per-client failure handling.
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES_DIR = Path(__file__).resolve().parent.parent / 'fixtures' / 'mydata'
+
+
+class MyDataStubServer:
+    """Threaded HTTP server for tests: `with MyDataStubServer() as url: ...`"""
+
+    def __init__(self, pages=None, reject_users=(), delay=0.0):
+        self.pages = pages or {
+            None: FIXTURES_DIR / 'vat_info_page1.xml',
+            'page2': FIXTURES_DIR / 'vat_info_page2.xml',
+        }
+        self.reject_users = set(reject_users)
+        self.delay = delay
+        self.requests = []
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                user_id = self.headers.get('aade-user-id')
+                with stub._lock:
+                    stub.requests.append((url.path, user_id))
+
+                if stub.delay:
+                    threading.Event().wait(stub.delay)
+
+                if user_id in stub.reject_users:
+                    self._send(401, b'Unauthorized')
+                    return
+
+                page_key = query.get('nextPartitionKey', [None])[0]
+                page = stub.pages.get(page_key)
+                if page is None:
+                    self._send(404, b'Unknown page')
+                    return
+
+                self._send(200, Path(page).read_bytes(), 'application/xml')
+
+            def _send(self, status, body, content_type='text/plain'):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._make_handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        host, port = self._server.server_address
+        return f'http://{host}:{port}'
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
@@ -0,0 +1,171 @@
+"""
+Tests for VATMonthlyAggregate (μηνιαία σύνολα ΦΠΑ)
+"""
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import Group, User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from accounting.models import ClientProfile
+from mydata.models import MyDataCredentials, VATMonthlyAggregate, VATPeriodResult, VATRecord
+from tests.mydata.test_models import make_vat_info
+
+
+def make_record(client, mark, issue_date, rec_type=1, net='100.00', vat='24.00', **kwargs):
+    return VATRecord.objects.create(
+        client=client,
+        mark=mark,
+        issue_date=issue_date,
+        rec_type=rec_type,
+        vat_category=kwargs.pop('vat_category', 1),
+        net_value=Decimal(net),
+        vat_amount=Decimal(vat),
+        **kwargs
+    )
+
+
+def aggregate_map(client):
+    return {
+        (row.year, row.month, row.rec_type, row.vat_category): (
+            row.net_value, row.vat_amount, row.record_count
+        )
+        for row in VATMonthlyAggregate.objects.filter(client=client)
+    }
+
+
+@override_settings(AUTO_CREATE_CLIENT_OBLIGATION=False)
+class VATMonthlyAggregateMaintenanceTest(TestCase):
+    """bulk_upsert, signals και rebuild_vat_aggregates"""
+
+    def setUp(self):
+        self.client_profile = ClientProfile.objects.create(afm="700000011", eponimia="Aggregate Client")
+
+    def test_bulk_upsert_refreshes_months(self):
+        VATRecord.bulk_upsert(self.client_profile, [make_vat_info(mark) for mark in range(1, 4)])
+        self.assertEqual(
+            aggregate_map(self.client_profile),
+            {(2025, 1, 1, 1): (Decimal('300.00'), Decimal('72.00'), 3)}
+        )
+
+        moved = make_vat_info(3, net='50.00', vat='12.00')
+        moved.issue_date = date(2025, 2, 3)
+        VATRecord.bulk_upsert(self.client_profile, [moved])
+
+        self.assertEqual(aggregate_map(self.client_profile), {
+            (2025, 1, 1, 1): (Decimal('200.00'), Decimal('48.00'), 2),
+            (2025, 2, 1, 1): (Decimal('50.00'), Decimal('12.00'), 1),
+        })
+
+    def test_signals_on_save_and_delete(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            record = make_record(self.client_profile, 1, date(2025, 3, 10))
+            make_record(self.client_profile, 2, date(2025, 3, 11), rec_type=2, net='10.00', vat='1.30',
+                        vat_category=2)
+            make_record(self.client_profile, 3, date(2025, 3, 12), is_cancelled=True)
+
+        self.assertEqual(aggregate_map(self.client_profile), {
+            (2025, 3, 1, 1): (Decimal('100.00'), Decimal('24.00'), 1),
+            (2025, 3, 2, 2): (Decimal('10.00'), Decimal('1.30'), 1),
+        })
+
+        with self.captureOnCommitCallbacks(execute=True):
+            record.issue_date = date(2025, 4, 1)
+            record.save()
+        self.assertIn((2025, 4, 1, 1), aggregate_map(self.client_profile))
+        self.assertNotIn((2025, 3, 1, 1), aggregate_map(self.client_profile))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            VATRecord.objects.filter(client=self.client_profile).delete()
+        self.assertEqual(aggregate_map(self.client_profile), {})
+
+    def test_rebuild_command(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            make_record(self.client_profile, 1, date(2025, 5, 1))
+            make_record(self.client_profile, 2, date(2025, 5, 2))
+        self.assertEqual(aggregate_map(self.client_profile), {})
+
+        out = StringIO()
+        call_command('rebuild_vat_aggregates', client=self.client_profile.afm, stdout=out)
+
+        self.assertEqual(
+            aggregate_map(self.client_profile),
+            {(2025, 5, 1, 1): (Decimal('200.00'), Decimal('48.00'), 2)}
+        )
+        self.assertIn('1 γραμμές', out.getvalue())
+
+    def test_calculate_from_records(self):
+        VATRecord.bulk_upsert(self.client_profile, [
+            make_vat_info(1, net='1000.00', vat='240.00'),
+            make_vat_info(2, net='500.00', vat='120.00', rec_type=2),
+        ])
+        period = VATPeriodResult.objects.create(
+            client=self.client_profile, period_type='monthly', year=2025, period=1,
+            previous_credit=Decimal('20.00'),
+        )
+
+        with self.assertNumQueries(1):
+            result = period.calculate_from_records(save=False)
+
+        self.assertEqual(result['vat_output'], Decimal('240.00'))
+        self.assertEqual(result['vat_input'], Decimal('120.00'))
+        self.assertEqual(period.final_result, Decimal('100.00'))
+
+
+@override_settings(AUTO_CREATE_CLIENT_OBLIGATION=False)
+class VATAggregateViewsQueryCountTest(TestCase):
+    """Dashboard/trend διαβάζουν τα aggregates σε σταθερό αριθμό queries"""
+
+    def setUp(self):
+        # Create co-workers group (required by signal)
+        Group.objects.create(name='co-workers')
+        self.user = User.objects.create_user(username='vatuser', password='pass12345')
+        self.api = APIClient()
+        self.api.force_authenticate(user=self.user)
+        self.mark = 0
+        self.today = date.today().replace(day=1)
+
+    def add_client(self, afm):
+        client = ClientProfile.objects.create(afm=afm, eponimia=f"Client {afm}")
+        MyDataCredentials.objects.create(client=client)
+        records = []
+        for rec_type in (1, 2):
+            self.mark += 1
+            info = make_vat_info(self.mark, rec_type=rec_type)
+            info.issue_date = self.today
+            records.append(info)
+        VATRecord.bulk_upsert(client, records)
+        return client
+
+    def count_queries(self, url):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.api.get(url, secure=True)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response
+
+    def test_dashboard_query_count_independent_of_clients(self):
+        self.add_client("700000021")
+        single, _ = self.count_queries('/accounting/api/mydata/dashboard/')
+
+        for afm in ("700000022", "700000023", "700000024"):
+            self.add_client(afm)
+        many, response = self.count_queries('/accounting/api/mydata/dashboard/')
+
+        self.assertEqual(single, many)
+        self.assertEqual(len(response.data['clients']), 4)
+        self.assertEqual(response.data['overview']['total_income_net'], Decimal('400.00'))
+
+    def test_trend_query_count_independent_of_months(self):
+        self.add_client("700000031")
+        three, _ = self.count_queries('/accounting/api/mydata/trend/?months=3')
+        twelve, response = self.count_queries('/accounting/api/mydata/trend/?months=12')
+
+        self.assertEqual(three, twelve)
+        self.assertEqual(response.data['data'][-1]['income_net'], Decimal('100.00'))
+        self.assertEqual(response.data['data'][-1]['expense_count'], 1)
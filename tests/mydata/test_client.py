@@ -0,0 +1,188 @@
+"""
+Tests for the streaming XML parsing of MyDataClient
+"""
+import html
+from contextlib import redirect_stdout
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from mydata.client import MyDataClient, MyDataResponseError, StreamingXMLParser, _collect
+from tests.mydata.stub_server import FIXTURES_DIR, MyDataStubServer
+
+WCF_NS = 'http://schemas.microsoft.com/2003/10/Serialization/'
+
+INVOICES_XML = """<?xml version="1.0" encoding="utf-8"?>
+<RequestedDoc xmlns="http://www.aade.gr/myDATA/invoice/v1.0">
+  <invoicesDoc>
+    <invoice>
+      <issuer><vatNumber>800000001</vatNumber></issuer>
+      <counterpart><vatNumber>800000002</vatNumber></counterpart>
+      <invoiceHeader>
+        <series>Α</series><aa>101</aa>
+        <issueDate>2025-01-10</issueDate><invoiceType>1.1</invoiceType>
+      </invoiceHeader>
+      <invoiceSummary>
+        <totalNetValue>100.00</totalNetValue>
+        <totalVatAmount>24.00</totalVatAmount>
+        <totalGrossValue>124.00</totalGrossValue>
+      </invoiceSummary>
+    </invoice>
+    <invoice>
+      <issuer><vatNumber>800000003</vatNumber></issuer>
+      <invoiceHeader>
+        <series>Β</series><aa>7</aa>
+        <issueDate>2025-01-11</issueDate><invoiceType>2.1</invoiceType>
+      </invoiceHeader>
+    </invoice>
+  </invoicesDoc>
+</RequestedDoc>
+"""
+
+
+def byte_chunks(data, size=1):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def wcf_wrap(xml_text):
+    return f'<string xmlns="{WCF_NS}">{html.escape(xml_text, quote=False)}</string>'
+
+
+class VatInfoStreamingParserTest(SimpleTestCase):
+    """iter_vat_info_xml / _parse_vat_info_response"""
+
+    def setUp(self):
+        self.client = MyDataClient('user', 'key')
+        self.page1 = (FIXTURES_DIR / 'vat_info_page1.xml').read_text(encoding='utf-8')
+
+    def test_parse_response_string(self):
+        records, pagination = self.client._parse_vat_info_response(self.page1)
+
+        self.assertEqual([r.mark for r in records], [400000000000001, 400000000000002])
+        self.assertEqual([r.rec_type for r in records], [1, 2])
+        self.assertEqual(records[0].net_value, Decimal('1000.00'))
+        self.assertEqual(records[1].vat_amount, Decimal('120.00'))
+        self.assertTrue(pagination.has_more)
+        self.assertEqual(pagination.next_partition_key, 'page2')
+        self.assertEqual(pagination.next_row_key, '400000000000003')
+
+    def test_wcf_wrapped_response_in_single_byte_chunks(self):
+        expected = self.client._parse_vat_info_response(self.page1)
+        wrapped = wcf_wrap(self.page1).encode('utf-8')
+
+        result = _collect(self.client.iter_vat_info_xml(byte_chunks(wrapped)))
+
+        self.assertEqual(result, expected)
+
+    def test_records_are_yielded_before_response_ends(self):
+        data = self.page1.encode('utf-8')
+        cut = data.index(b'</VatInfo>') + len(b'</VatInfo>')
+        fed = []
+
+        def chunks():
+            fed.append(1)
+            yield data[:cut]
+            fed.append(2)
+            yield data[cut:]
+
+        parser = self.client.iter_vat_info_xml(chunks())
+        first = next(parser)
+
+        self.assertEqual(first.mark, 400000000000001)
+        self.assertEqual(fed, [1])
+
+    def test_no_debug_output(self):
+        out = StringIO()
+        with redirect_stdout(out):
+            self.client._parse_vat_info_response(self.page1)
+        self.assertEqual(out.getvalue(), '')
+
+    def test_parse_error_after_records_raises(self):
+        truncated = self.page1[:self.page1.index('<VatInfo>', self.page1.index('</VatInfo>'))]
+        parser = self.client.iter_vat_info_xml([truncated + '<VatInfo><Ma'])
+
+        self.assertEqual(next(parser).mark, 400000000000001)
+        with self.assertRaises(MyDataResponseError):
+            list(parser)
+
+    def test_empty_responses(self):
+        for response in ('', None, {}):
+            records, pagination = self.client._parse_vat_info_response(response)
+            self.assertEqual(records, [])
+            self.assertFalse(pagination.has_more)
+
+    def test_wcf_wrapper_with_empty_body(self):
+        records, pagination = self.client._parse_vat_info_response(f'<string xmlns="{WCF_NS}"/>')
+        self.assertEqual(records, [])
+        self.assertFalse(pagination.has_more)
+
+    def test_request_vat_info_streams_all_pages(self):
+        stub = MyDataStubServer()
+        with stub as url:
+            client = MyDataClient('user', 'key', requests_per_second=1000, base_url=url)
+            records = list(client.request_vat_info(
+                date_from=date(2025, 1, 1),
+                date_to=date(2025, 1, 31),
+            ))
+
+        self.assertEqual(len(records), 3)
+        self.assertEqual(len(stub.requests), 2)
+
+
+class StreamingXMLParserTest(SimpleTestCase):
+    """StreamingXMLParser"""
+
+    def test_elements_are_freed_after_yield(self):
+        parser = StreamingXMLParser(tags=('invoice',))
+        seen = []
+        for elem in parser.iter_elements(byte_chunks(INVOICES_XML.encode('utf-8'), 16)):
+            self.assertGreater(len(elem), 0)
+            seen.append(elem)
+
+        self.assertEqual(len(seen), 2)
+        self.assertTrue(all(len(elem) == 0 for elem in seen))
+        self.assertEqual(parser.bytes_read, len(INVOICES_XML.encode('utf-8')))
+
+
+class InvoiceStreamingParserTest(SimpleTestCase):
+    """iter_invoices_xml / parse_invoice_response"""
+
+    def setUp(self):
+        self.client = MyDataClient('user', 'key')
+
+    def test_parse_invoice_response(self):
+        invoices = self.client.parse_invoice_response(INVOICES_XML)
+
+        self.assertEqual(len(invoices), 2)
+        self.assertEqual(invoices[0]['issuer_vat'], '800000001')
+        self.assertEqual(invoices[0]['counterpart_vat'], '800000002')
+        self.assertEqual(invoices[0]['series'], 'Α')
+        self.assertEqual(invoices[0]['total_gross'], 124.0)
+        self.assertIsNone(invoices[1]['counterpart_vat'])
+        self.assertEqual(invoices[1]['total_net'], 0)
+
+    def test_chunked_bytes_match_string_parse(self):
+        chunks = byte_chunks(INVOICES_XML.encode('utf-8'), 7)
+        self.assertEqual(
+            list(self.client.iter_invoices_xml(chunks)),
+            self.client.parse_invoice_response(INVOICES_XML)
+        )
+
+    def test_parse_error(self):
+        self.assertEqual(self.client.parse_invoice_response('<RequestedDoc><invoice>'), [])
+
+
+class BenchmarkMyDataParserCommandTest(SimpleTestCase):
+    """benchmark_mydata_parser management command"""
+
+    def test_small_wrapped_run(self):
+        out = StringIO()
+        call_command('benchmark_mydata_parser', records=50, wrapped=True, stdout=out)
+
+        output = out.getvalue()
+        self.assertIn('dom     50 records', output)
+        self.assertIn('stream  50 records', output)
+        self.assertIn('Streaming:', output)
@@ -0,0 +1,67 @@
+"""
+Tests for mydata models
+"""
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+
+from accounting.models import ClientProfile
+from mydata.client import VatInfoRecord
+from mydata.models import VATRecord
+
+
+def make_vat_info(mark, net='100.00', vat='24.00', rec_type=1):
+    return VatInfoRecord(
+        mark=mark,
+        is_cancelled=False,
+        issue_date=date(2025, 1, 15),
+        rec_type=rec_type,
+        inv_type='ΕΚΡΟΕΣ',
+        vat_category=1,
+        vat_exemption_category='',
+        net_value=Decimal(net),
+        vat_amount=Decimal(vat),
+        counter_vat_number='',
+        vat_offset_amount=None,
+        deductions_amount=None,
+    )
+
+
+@override_settings(AUTO_CREATE_CLIENT_OBLIGATION=False)
+class VATRecordBulkUpsertTest(TestCase):
+    """Test VATRecord.bulk_upsert"""
+
+    def setUp(self):
+        self.client_profile = ClientProfile.objects.create(afm="700000001", eponimia="VAT Client")
+
+    def test_creates_and_updates_with_exact_counts(self):
+        created, updated = VATRecord.bulk_upsert(
+            self.client_profile, [make_vat_info(mark) for mark in range(1, 6)]
+        )
+        self.assertEqual((created, updated), (5, 0))
+
+        created, updated = VATRecord.bulk_upsert(
+            self.client_profile,
+            [make_vat_info(4, net='400.00'), make_vat_info(5), make_vat_info(6), make_vat_info(7)]
+        )
+        self.assertEqual((created, updated), (2, 2))
+        self.assertEqual(VATRecord.objects.count(), 7)
+        self.assertEqual(VATRecord.objects.get(mark=4).net_value, Decimal('400.00'))
+
+    def test_duplicate_mark_in_batch_counts_as_update(self):
+        created, updated = VATRecord.bulk_upsert(
+            self.client_profile, [make_vat_info(1, net='1.00'), make_vat_info(1, net='2.00')]
+        )
+        self.assertEqual((created, updated), (1, 1))
+        self.assertEqual(VATRecord.objects.get(mark=1).net_value, Decimal('2.00'))
+
+    def test_single_lookup_and_single_write(self):
+        VATRecord.bulk_upsert(self.client_profile, [make_vat_info(mark) for mark in range(1, 40)])
+
+        # One lookup of existing marks + one native upsert for the mixed batch,
+        # plus aggregate/delete/insert for the affected VATMonthlyAggregate months
+        with self.assertNumQueries(5):
+            VATRecord.bulk_upsert(self.client_profile, [make_vat_info(mark) for mark in range(20, 60)])
+
+        self.assertEqual(VATRecord.objects.count(), 59)
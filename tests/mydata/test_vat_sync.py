@@ -0,0 +1,109 @@
+"""
+Tests for the mydata_sync_vat management command against a local stub server
+"""
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TransactionTestCase, override_settings
+
+from accounting.models import ClientProfile
+from mydata.models import MyDataCredentials, VATRecord, VATSyncLog
+from tests.mydata.stub_server import FIXTURES_DIR, MyDataStubServer
+
+
+@override_settings(AUTO_CREATE_CLIENT_OBLIGATION=False)
+class MyDataSyncVatCommandTest(TransactionTestCase):
+    """Serial and concurrent VAT sync against recorded XML responses"""
+
+    def setUp(self):
+        self.clients = []
+        for idx in range(4):
+            client = ClientProfile.objects.create(
+                afm=f"80000000{idx}",
+                eponimia=f"myDATA Client {idx}",
+            )
+            credentials = MyDataCredentials(client=client, is_sandbox=True)
+            credentials.user_id = f"user{idx}"
+            credentials.subscription_key = f"key{idx}"
+            credentials.save()
+            self.clients.append(client)
+
+    def _run(self, stub, **options):
+        out = StringIO()
+        with stub as url, override_settings(MYDATA_BASE_URL=url):
+            call_command(
+                'mydata_sync_vat',
+                all=True,
+                date_from='01/01/2025',
+                date_to='31/01/2025',
+                rate=1000,
+                stdout=out,
+                **options
+            )
+        return out.getvalue()
+
+    def test_serial_sync(self):
+        stub = MyDataStubServer()
+        output = self._run(stub)
+
+        # 3 VatInfo records per client over two pages
+        self.assertEqual(VATRecord.objects.count(), 12)
+        self.assertEqual(len(stub.requests), 8)
+        self.assertIn('latency p50=', output)
+
+    def test_concurrent_sync_with_failure_isolation(self):
+        stub = MyDataStubServer(reject_users={'user1'}, delay=0.05)
+        output = self._run(stub, workers=3)
+
+        failed = self.clients[1]
+        self.assertEqual(VATRecord.objects.exclude(client=failed).count(), 9)
+        self.assertFalse(VATRecord.objects.filter(client=failed).exists())
+
+        failed_log = VATSyncLog.objects.get(client=failed)
+        self.assertEqual(failed_log.status, 'ERROR')
+        self.assertEqual(
+            VATSyncLog.objects.filter(status='SUCCESS').count(), 3
+        )
+        ok_log = VATSyncLog.objects.filter(status='SUCCESS').first()
+        self.assertEqual(ok_log.details['requests'], 2)
+
+        self.assertIn('3 OK, 1 αποτυχίες', output)
+        # Each client's output block is printed contiguously
+        for client in self.clients:
+            block_start = output.index(f"Πελάτης: {client.eponimia}")
+            next_block = output.find("Πελάτης:", block_start + 1)
+            block = output[block_start:next_block if next_block != -1 else None]
+            self.assertIn('Environment', block)
+
+    def test_batched_sync_keeps_exact_counts(self):
+        VATRecord.objects.create(
+            client=self.clients[0],
+            mark=400000000000001,
+            issue_date='2025-01-10',
+            rec_type=1,
+            inv_type='ΕΚΡΟΕΣ',
+            vat_category=1,
+        )
+
+        self._run(MyDataStubServer(), batch_size=2, no_clear=True)
+
+        log = VATSyncLog.objects.get(client=self.clients[0])
+        self.assertEqual(
+            (log.records_fetched, log.records_created, log.records_updated, log.records_failed),
+            (3, 2, 1, 0)
+        )
+        self.assertEqual(VATRecord.objects.count(), 12)
+
+    def test_truncated_response_fails_sync(self):
+        page1 = (FIXTURES_DIR / 'vat_info_page1.xml').read_text(encoding='utf-8')
+        with tempfile.TemporaryDirectory() as tmp:
+            truncated = Path(tmp) / 'truncated.xml'
+            truncated.write_text(page1[:page1.index('</VatInfo>') + len('</VatInfo>')] + '<VatInfo><Ma',
+                                 encoding='utf-8')
+            self._run(MyDataStubServer(pages={None: truncated}))
+
+        self.assertEqual(VATSyncLog.objects.filter(status='ERROR').count(), 4)
+        self.assertFalse(VATSyncLog.objects.filter(status='SUCCESS').exists())
+        self.assertFalse(MyDataCredentials.objects.filter(last_vat_sync_at__isnull=False).exists())
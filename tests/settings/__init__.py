@@ -0,0 +1 @@
+# Settings app tests
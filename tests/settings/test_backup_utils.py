@@ -0,0 +1,253 @@
+"""
+Tests for the streaming database backup/restore (settings.backup_utils)
+"""
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+from contextlib import nullcontext
+from datetime import date
+from unittest import mock
+
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+
+from accounting.models import ClientDocument, ClientProfile, MonthlyObligation
+from crm.models import Company, Contact, Deal, Request
+from settings import backup_utils
+from settings.backup_utils import DB_MANIFEST, create_backup, restore_backup, validate_backup_file
+from settings.models import BackupHistory, BackupSettings
+
+
+@override_settings(AUTO_CREATE_CLIENT_OBLIGATION=False)
+class StreamingBackupTest(TransactionTestCase):
+    """create_backup / restore_backup με NDJSON chunks"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        media_override = override_settings(MEDIA_ROOT=self.media_root)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+
+        chunk_patch = mock.patch.object(backup_utils, 'DB_CHUNK_SIZE', 2)
+        chunk_patch.start()
+        self.addCleanup(chunk_patch.stop)
+
+        for index in range(5):
+            ClientProfile.objects.create(afm=f"80000020{index}", eponimia=f"Πελάτης {index}")
+
+    def client_entry(self, manifest):
+        return next(e for e in manifest['models'] if e['model'] == 'accounting.clientprofile')
+
+    def test_backup_writes_chunked_ndjson(self):
+        backup = create_backup(include_media=False)
+
+        with zipfile.ZipFile(backup.file_path) as zipf:
+            manifest = json.loads(zipf.read(DB_MANIFEST))
+            entry = self.client_entry(manifest)
+            self.assertEqual(entry['count'], 5)
+            self.assertEqual(len(entry['chunks']), 3)
+
+            lines = zipf.read(entry['chunks'][0]).decode('utf-8').splitlines()
+            self.assertEqual(len(lines), 2)
+            self.assertEqual(json.loads(lines[0])['model'], 'accounting.clientprofile')
+            self.assertNotIn('database.json', zipf.namelist())
+
+        self.assertEqual(validate_backup_file(backup.file_path), (True, None))
+
+    def test_compact_round_trip(self):
+        backup = create_backup(include_media=False, compact=True)
+        with zipfile.ZipFile(backup.file_path) as zipf:
+            entry = self.client_entry(json.loads(zipf.read(DB_MANIFEST)))
+            _pk, fields = json.loads(zipf.read(entry['chunks'][0]).decode('utf-8').splitlines()[0])
+            self.assertEqual(fields['eponimia'], 'Πελάτης 0')
+
+        ClientProfile.objects.filter(afm='800000204').delete()
+        ClientProfile.objects.filter(afm='800000200').update(eponimia='Αλλαγμένος')
+
+        result = restore_backup(backup.id, mode='merge', create_safety_backup=False)
+
+        self.assertTrue(result['success'], result['error'])
+        self.assertEqual(ClientProfile.objects.count(), 5)
+        self.assertEqual(ClientProfile.objects.get(afm='800000200').eponimia, 'Πελάτης 0')
+
+    def test_models_follow_foreign_keys(self):
+        models, later = backup_utils._backup_plan()
+        position = {model: index for index, model in enumerate(models)}
+
+        self.assertLess(position[Company], position[Contact])
+        self.assertLess(position[MonthlyObligation], position[ClientDocument])
+        self.assertEqual(later, {'crm.deal': ['request_id']})
+
+    def test_replace_restore_with_forward_foreign_key(self):
+        company = Company.objects.create(full_name='Εταιρεία ΑΕ')
+        Contact.objects.create(first_name='Γιάννης', company=company)
+
+        # Backup με την παλιά σειρά του manifest (crm.contact πριν από crm.company)
+        with mock.patch.object(backup_utils, '_sort_by_foreign_keys', lambda models: (models, {})):
+            backup = create_backup(include_media=False)
+        with zipfile.ZipFile(backup.file_path) as zipf:
+            labels = [entry['model'] for entry in json.loads(zipf.read(DB_MANIFEST))['models']]
+        self.assertLess(labels.index('crm.contact'), labels.index('crm.company'))
+
+        # Έλεγχος FK στο commit κάθε chunk, όπως στο PostgreSQL
+        with mock.patch.object(connection, 'constraint_checks_disabled', nullcontext):
+            result = restore_backup(backup.id, mode='replace', create_safety_backup=False)
+
+        self.assertTrue(result['success'], result['error'])
+        self.assertEqual(Contact.objects.get().company.full_name, 'Εταιρεία ΑΕ')
+
+    def test_replace_restore_with_circular_foreign_keys(self):
+        request = Request.objects.create(request_for='Αίτημα')
+        deal = Deal.objects.create(
+            name='Συμφωνία', request=request, next_step='Κλήση', next_step_date=date.today()
+        )
+        Request.objects.filter(pk=request.pk).update(deal=deal)
+        backup = create_backup(include_media=False)
+
+        with mock.patch.object(connection, 'constraint_checks_disabled', nullcontext):
+            result = restore_backup(backup.id, mode='replace', create_safety_backup=False)
+
+        self.assertTrue(result['success'], result['error'])
+        self.assertEqual(Deal.objects.get().request.deal.name, 'Συμφωνία')
+
+    def test_interrupted_restore_resumes(self):
+        backup = create_backup(include_media=False)
+        total_clients = ClientProfile.objects.count()
+
+        def fail_after_first_client_chunk(done, total, label):
+            if label == 'accounting.clientprofile':
+                raise RuntimeError('interrupted')
+
+        result = restore_backup(
+            backup.id, mode='replace', create_safety_backup=False,
+            progress_callback=fail_after_first_client_chunk
+        )
+        self.assertFalse(result['success'])
+        self.assertTrue(result['can_resume'])
+        self.assertEqual(ClientProfile.objects.count(), 2)
+
+        progress = []
+        result = restore_backup(
+            backup.id, mode='replace', create_safety_backup=False, resume=True,
+            progress_callback=lambda done, total, label: progress.append((done, total))
+        )
+
+        self.assertTrue(result['success'], result['error'])
+        self.assertTrue(result['resumed'])
+        self.assertEqual(ClientProfile.objects.count(), total_clients)
+        self.assertEqual(progress[-1][0], progress[-1][1])
+        self.assertFalse(os.path.exists(backup_utils._restore_progress_path(backup.file_path)))
+
+
+@override_settings(AUTO_CREATE_CLIENT_OBLIGATION=False)
+class IncrementalMediaBackupTest(TransactionTestCase):
+    """Incremental media backups: manifest, dedup, αλυσίδα, cleanup"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        media_override = override_settings(MEDIA_ROOT=self.media_root)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+
+        self.write('clients/a/invoice.pdf', b'%PDF-1.4 invoice')
+        self.write('clients/a/notes.txt', b'notes ' * 100)
+        self.write('clients/b/copy.pdf', b'%PDF-1.4 invoice')
+
+    def write(self, relpath, content):
+        path = os.path.join(self.media_root, *relpath.split('/'))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    def media_manifest(self, backup):
+        with zipfile.ZipFile(backup.file_path) as zipf:
+            blobs = [n for n in zipf.namelist() if n.startswith(backup_utils.MEDIA_BLOB_DIR)]
+            infos = {i.filename: i for i in zipf.infolist()}
+            return json.loads(zipf.read(backup_utils.MEDIA_MANIFEST)), blobs, infos
+
+    def test_base_dedups_and_stores_compressed_types(self):
+        base = create_backup(include_media=True, incremental_media=True)
+        manifest, blobs, infos = self.media_manifest(base)
+
+        self.assertTrue(base.media_incremental)
+        self.assertIsNone(base.media_parent)
+        self.assertEqual(len(manifest['files']), 3)
+        self.assertEqual(len(blobs), 2)  # invoice.pdf == copy.pdf
+        pdf_blob = backup_utils.MEDIA_BLOB_DIR + manifest['files']['clients/a/invoice.pdf']['sha256']
+        txt_blob = backup_utils.MEDIA_BLOB_DIR + manifest['files']['clients/a/notes.txt']['sha256']
+        self.assertEqual(infos[pdf_blob].compress_type, zipfile.ZIP_STORED)
+        self.assertEqual(infos[txt_blob].compress_type, zipfile.ZIP_DEFLATED)
+
+    def test_incremental_stores_only_changes_and_restores_full_tree(self):
+        base = create_backup(include_media=True, incremental_media=True)
+        self.write('clients/a/notes.txt', b'changed notes')
+        self.write('clients/c/new.jpg', b'jpeg bytes')
+
+        child = create_backup(include_media=True, incremental_media=True)
+        manifest, blobs, _infos = self.media_manifest(child)
+
+        self.assertEqual(child.media_parent, base)
+        self.assertEqual(len(blobs), 2)
+        self.assertEqual(manifest['files']['clients/a/invoice.pdf']['archive'], base.filename)
+        self.assertEqual(manifest['files']['clients/c/new.jpg']['archive'], backup_utils.MEDIA_SELF_ARCHIVE)
+
+        shutil.rmtree(os.path.join(self.media_root, 'clients'))
+        result = restore_backup(child.id, mode='merge', create_safety_backup=False)
+
+        self.assertTrue(result['success'], result['error'])
+        with open(os.path.join(self.media_root, 'clients', 'a', 'notes.txt'), 'rb') as f:
+            self.assertEqual(f.read(), b'changed notes')
+        with open(os.path.join(self.media_root, 'clients', 'b', 'copy.pdf'), 'rb') as f:
+            self.assertEqual(f.read(), b'%PDF-1.4 invoice')
+        self.assertTrue(os.path.exists(os.path.join(self.media_root, 'clients', 'c', 'new.jpg')))
+
+    def test_renamed_incremental_backup_restores(self):
+        base = create_backup(include_media=True, incremental_media=True)
+        self.write('clients/c/new.jpg', b'jpeg bytes')
+        child = create_backup(include_media=True, incremental_media=True)
+
+        # Όπως το BackupUploadRestoreAPIView: αποθήκευση ως uploaded_<timestamp>.zip
+        file_path = os.path.join(os.path.dirname(child.file_path), 'uploaded_20260101_000000.zip')
+        os.rename(child.file_path, file_path)
+        self.assertEqual(validate_backup_file(file_path), (True, None))
+        uploaded = BackupHistory.objects.create(
+            filename=os.path.basename(file_path), file_path=file_path,
+            file_size=os.path.getsize(file_path), includes_db=True, includes_media=True,
+        )
+
+        shutil.rmtree(os.path.join(self.media_root, 'clients'))
+        result = restore_backup(uploaded.id, mode='merge', create_safety_backup=False)
+
+        self.assertTrue(result['success'], result['error'])
+        self.assertTrue(base.file_exists())
+        with open(os.path.join(self.media_root, 'clients', 'c', 'new.jpg'), 'rb') as f:
+            self.assertEqual(f.read(), b'jpeg bytes')
+        with open(os.path.join(self.media_root, 'clients', 'a', 'invoice.pdf'), 'rb') as f:
+            self.assertEqual(f.read(), b'%PDF-1.4 invoice')
+
+    def test_cleanup_keeps_bases_still_needed(self):
+        backup_settings = BackupSettings.get_settings()
+        backup_settings.max_backups = 2
+        backup_settings.save()
+
+        base = create_backup(include_media=True, incremental_media=True)
+        create_backup(include_media=True, incremental_media=True)
+        latest = create_backup(include_media=True, incremental_media=True)
+
+        # Το όριο είναι 2 αλλά ο base χρειάζεται από τα δύο νεότερα
+        self.assertTrue(BackupHistory.objects.filter(pk=base.pk).exists())
+        self.assertTrue(base.file_exists())
+        self.assertEqual(len(latest.media_chain()), 3)
+
+        safety = create_backup(include_media=False)
+        create_backup(include_media=False)
+
+        # Κανένα kept backup δεν χρειάζεται πλέον την αλυσίδα
+        self.assertFalse(BackupHistory.objects.filter(pk=base.pk).exists())
+        self.assertFalse(base.file_exists())
+        self.assertTrue(safety.file_exists())
@@ -80,6 +80,14 @@ EMAIL_MAX_RETRIES = int(os.getenv('EMAIL_MAX_RETRIES', '3'))
 EMAIL_RETRY_BASE_DELAY = float(os.getenv('EMAIL_RETRY_BASE_DELAY', '2.0'))  # seconds
 EMAIL_RETRY_MAX_DELAY = float(os.getenv('EMAIL_RETRY_MAX_DELAY', '30.0'))   # seconds
 
+# Obligation reminders: one email per client with all obligations due (digest)
+OBLIGATION_REMINDER_DIGEST = os.getenv('OBLIGATION_REMINDER_DIGEST', 'true').lower() in ('true', '1', 'yes')
+
+# Scheduled emails worker (process_scheduled_emails)
+SCHEDULED_EMAIL_BATCH_SIZE = int(os.getenv('SCHEDULED_EMAIL_BATCH_SIZE', '50'))  # rows claimed per batch
+SCHEDULED_EMAIL_WORKERS = int(os.getenv('SCHEDULED_EMAIL_WORKERS', str(EMAIL_POOL_MAX_CONNECTIONS)))  # sender threads
+SCHEDULED_EMAIL_CLAIM_TIMEOUT_MINUTES = 30  # 'sending' rows older than this are released
+
 # Admin email for error notifications - configure via environment
 ADMIN_NAME = os.getenv('ADMIN_NAME', 'Admin')
 ADMIN_EMAIL = os.getenv('ADMIN_EMAIL', os.getenv('EMAIL_HOST_USER', ''))
@@ -484,6 +492,11 @@ MYDATA_SUBSCRIPTION_KEY = os.getenv('MYDATA_SUBSCRIPTION_KEY', '')
 
 MYDATA_IS_SANDBOX = True  
 
+# Override του myDATA API URL (π.χ. local stub server για tests) - κενό = AADE
+MYDATA_BASE_URL = os.getenv('MYDATA_BASE_URL', '')
+# Κοινός προϋπολογισμός requests/sec για παράλληλο sync (mydata_sync_vat --workers)
+MYDATA_GLOBAL_REQUESTS_PER_SECOND = float(os.getenv('MYDATA_GLOBAL_REQUESTS_PER_SECOND', '5'))
+
 
 Q_CLUSTER = {
     'name': 'LogistikoCRM',
@@ -574,6 +587,17 @@ AUTO_CREATE_CLIENT_OBLIGATION = True
 # Όνομα profile: π.χ. "Βασικό" ή "Απλογραφικά"
 AUTO_CLIENT_OBLIGATION_PROFILE = None  # Βάλε το όνομα του default profile αν θες
 
+# Φάκελοι αρχειοθέτησης νέων πελατών
+# False: Κάθε φάκελος δημιουργείται με το πρώτο έγγραφο (lazy)
+# True: Ολόκληρος ο σκελετός (00_ΜΟΝΙΜΑ, μήνες τρέχοντος έτους, 13_ΕΤΗΣΙΑ)
+#       από Celery task μετά το commit
+# Για αλλαγή έτους: python manage.py init_filing_system --year YYYY
+CLIENT_FOLDERS_SKELETON_ON_CREATE = os.getenv('CLIENT_FOLDERS_SKELETON_ON_CREATE', 'false').lower() in ('true', '1', 'yes')
+
+# Ευρετήριο αρχείων (ClientFileIndex): παράλληλα scandir ανά φάκελο πελάτη
+# Σε NAS η καθυστέρηση είναι ανά κλήση, οπότε περισσότερα threads βοηθούν
+FILE_INDEX_WORKERS = int(os.getenv('FILE_INDEX_WORKERS', '8'))
+
 
 # ==================== CELERY CONFIG ====================
 CELERY_BROKER_URL = 'redis://localhost:6379'
@@ -603,6 +627,24 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'accounting.tasks.retry_failed_emails',
         'schedule': crontab(minute='*/30'),  # Every 30 minutes
     },
+    'mark-overdue-obligations': {
+        'task': 'accounting.tasks.mark_overdue_obligations_task',
+        # Κάθε ώρα στο :05· η μετάβαση γίνεται μία φορά την ημέρα (OverdueTransitionRun)
+        'schedule': crontab(minute=5),
+    },
+    'refresh-notifications': {
+        'task': 'accounting.tasks.refresh_notifications_task',
+        'schedule': crontab(hour=0, minute=10),  # 00:10 daily, μετά το mark-overdue
+    },
+    'refresh-file-index': {
+        'task': 'accounting.tasks.refresh_file_index_task',
+        'schedule': crontab(hour=2, minute=30),  # 02:30 daily
+    },
+    'save-monthly-income-snapshots': {
+        'task': 'analytics.tasks.save_monthly_income_snapshots',
+        # Το task ελέγχει ότι είναι η τελευταία ημέρα του μήνα
+        'schedule': crontab(hour=23, minute=0, day_of_month='28-31'),  # 23:00
+    },
 }
 
 # ==================== SITE CONFIGURATION ====================
@@ -660,6 +702,18 @@ except ImportError:
 CACHE_TTL_SHORT = 60 * 5       # 5 minutes - for frequently changing data
 CACHE_TTL_MEDIUM = 60 * 60     # 1 hour - for moderately changing data
 CACHE_TTL_LONG = 60 * 60 * 24  # 24 hours - for rarely changing data
+CACHE_TTL_STATS = 60           # 1 minute - dashboard/report counters (invalidated by signals)
+EMAIL_TEMPLATE_CACHE_CHECK_INTERVAL = 30  # seconds - other processes re-check the email template cache version
+
+# Live feed κλήσεων/tickets (accounting/services/live_feed.py)
+# Προεπιλογή: conditional GET στο /api/v1/live/events/ (ETag -> 304).
+# Το SSE stream κρατά έναν worker ανά ανοιχτή καρτέλα - ενεργοποίησέ το μόνο
+# με ASGI ή async/threaded workers (π.χ. gunicorn -k gthread).
+LIVE_FEED_SSE_ENABLED = os.getenv('LIVE_FEED_SSE_ENABLED', 'false').lower() in ('true', '1', 'yes')
+LIVE_FEED_POLL_INTERVAL = 1     # seconds - κάθε stream ελέγχει το cache για νέα events
+LIVE_FEED_HEARTBEAT = 15        # seconds - keep-alive ώστε proxies να μην κλείνουν το stream
+LIVE_FEED_MAX_SECONDS = 55      # seconds - κάτω από το gunicorn --timeout· ο browser ξανασυνδέεται με Last-Event-ID
+LIVE_FEED_EVENT_TTL = 600       # seconds - πόσο κρατούνται τα events για reconnect/fallback
 
 # ==============================================================================
 # 🔒 PRODUCTION SECURITY SETTINGS